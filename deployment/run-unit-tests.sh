@@ -114,6 +114,15 @@ run_python_lambda_test() {
 		echo "(source/run-all-tests.sh) ERROR: there is likely output above." 1>&2
 		exit 1
 	fi
+	# the benchmarks and import time budgets are timed, so they run again without xdist workers competing for the CPU.
+	# Benchmarks slower than their baselines are listed in the warnings summary, as timings are too noisy to fail on.
+	if [ -d "test/benchmarks" ]; then
+		CHECK_BENCHMARK_BASELINES=true uv run pytest -sv test/benchmarks -p no:xdist
+		if [ "$?" = "1" ]; then
+			echo "(source/run-all-tests.sh) ERROR: there is likely output above." 1>&2
+			exit 1
+		fi
+	fi
 	sed -i -e "s,<source>$source_dir,<source>source,g" $coverage_report_path
 	sed -i -e "s,filename=\"$source_dir/,filename=\",g" $coverage_report_path
 	echo "deactivate virtual environment"
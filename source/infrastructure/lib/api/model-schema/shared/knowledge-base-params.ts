@@ -12,6 +12,7 @@ import {
     DEFAULT_SCORE_THRESHOLD,
     KENDRA_EDITIONS,
     KNOWLEDGE_BASE_TYPES,
+    MAX_ADDITIONAL_KNOWLEDGE_BASES,
     MAX_KENDRA_NUMBER_OF_DOCS,
     MAX_KENDRA_QUERY_CAPACITY_UNITS,
     MAX_KENDRA_STORAGE_CAPACITY_UNITS,
@@ -26,6 +27,108 @@ import {
  * Supports both Amazon Kendra and Amazon Bedrock Knowledge Bases with conditional validation.
  */
 
+// Schema for the existing knowledge bases queried alongside the one configured by KnowledgeBaseParams
+const additionalKnowledgeBasesSchema: JsonSchema = {
+    type: JsonSchemaType.ARRAY,
+    description:
+        'Existing knowledge bases queried together with the one configured by KnowledgeBaseParams. Their documents are fused with its documents into NumberOfDocs documents.',
+    maxItems: MAX_ADDITIONAL_KNOWLEDGE_BASES,
+    items: {
+        type: JsonSchemaType.OBJECT,
+        properties: {
+            KnowledgeBaseType: {
+                type: JsonSchemaType.STRING,
+                description: 'The type of the additional knowledge base. Required.',
+                enum: SUPPORTED_KNOWLEDGE_BASE_TYPES
+            },
+            KendraKnowledgeBaseParams: {
+                type: JsonSchemaType.OBJECT,
+                description: 'Parameters specific to Kendra',
+                properties: {
+                    ExistingKendraIndexId: {
+                        type: JsonSchemaType.STRING,
+                        description: 'Index ID of an existing Kendra index to query. Required.',
+                        pattern: '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
+                    },
+                    AttributeFilter: {
+                        type: JsonSchemaType.OBJECT,
+                        description:
+                            'Filter to apply when querying the Kendra index. See: https://docs.aws.amazon.com/kendra/latest/APIReference/API_AttributeFilter.html'
+                    },
+                    RoleBasedAccessControlEnabled: {
+                        type: JsonSchemaType.BOOLEAN,
+                        description:
+                            'Whether role-based access control is enabled on the Kendra index, used to restrict Kendra queries to documents accessible by user group and id.',
+                        default: DEFAULT_ENABLE_RBAC
+                    }
+                },
+                required: ['ExistingKendraIndexId'],
+                additionalProperties: false
+            },
+            BedrockKnowledgeBaseParams: {
+                type: JsonSchemaType.OBJECT,
+                description: 'Parameters specific to Bedrock Knowledge Bases',
+                properties: {
+                    BedrockKnowledgeBaseId: {
+                        type: JsonSchemaType.STRING,
+                        description: 'ID of the Bedrock knowledge base to query. Required.',
+                        pattern: '^[0-9a-zA-Z]{1,10}$'
+                    },
+                    RetrievalFilter: {
+                        type: JsonSchemaType.OBJECT,
+                        description:
+                            'Filter to apply when querying the Bedrock knowledge base. See: https://docs.aws.amazon.com/bedrock/latest/APIReference/API_agent-runtime_RetrievalFilter.html'
+                    },
+                    OverrideSearchType: {
+                        type: JsonSchemaType.STRING,
+                        description:
+                            'Whether to query an Amazon OpenSearch Serverless vector store with a HYBRID or a SEMANTIC search. By default Amazon Bedrock will choose for you. See https://docs.aws.amazon.com/bedrock/latest/userguide/kb-test-config.html',
+                        enum: ['HYBRID', 'SEMANTIC']
+                    }
+                },
+                required: ['BedrockKnowledgeBaseId'],
+                additionalProperties: false
+            },
+            NumberOfDocs: {
+                type: JsonSchemaType.INTEGER,
+                description:
+                    'The number of documents retrieved from the additional knowledge base before they are fused',
+                minimum: MIN_KENDRA_NUMBER_OF_DOCS,
+                maximum: MAX_KENDRA_NUMBER_OF_DOCS
+            },
+            ScoreThreshold: {
+                type: JsonSchemaType.NUMBER,
+                description: 'The minimum score a document must have to be returned from the additional knowledge base',
+                minimum: MIN_SCORE_THRESHOLD,
+                maximum: MAX_SCORE_THRESHOLD
+            }
+        },
+        // Ensure only parameters for the selected knowledge base type are provided
+        oneOf: [
+            {
+                properties: {
+                    KnowledgeBaseType: { enum: [KNOWLEDGE_BASE_TYPES.KENDRA] },
+                    BedrockKnowledgeBaseParams: {
+                        not: {}
+                    }
+                },
+                required: ['KendraKnowledgeBaseParams']
+            },
+            {
+                properties: {
+                    KnowledgeBaseType: { enum: [KNOWLEDGE_BASE_TYPES.BEDROCK] },
+                    KendraKnowledgeBaseParams: {
+                        not: {}
+                    }
+                },
+                required: ['BedrockKnowledgeBaseParams']
+            }
+        ],
+        required: ['KnowledgeBaseType'],
+        additionalProperties: false
+    }
+};
+
 export const knowledgeBaseParamsSchema: JsonSchema = {
     type: JsonSchemaType.OBJECT,
     description:
@@ -169,7 +272,8 @@ export const knowledgeBaseParamsSchema: JsonSchema = {
             description:
                 'Whether to return information about the source of documents returned from the knowledge base',
             default: DEFAULT_RETURN_SOURCE_DOCS
-        }
+        },
+        AdditionalKnowledgeBases: additionalKnowledgeBasesSchema
     },
     // Ensure only parameters for the selected knowledge base type are provided
     oneOf: [
@@ -285,7 +389,8 @@ export const knowledgeBaseParamsUpdateSchema: JsonSchema = {
             description:
                 'Whether to return information about the source of documents returned from the knowledge base',
             default: DEFAULT_RETURN_SOURCE_DOCS
-        }
+        },
+        AdditionalKnowledgeBases: additionalKnowledgeBasesSchema
     },
     oneOf: [
         // Case 1: Knowledge base type unchanged - no additional validation needed
@@ -66,6 +66,26 @@ export const llmParamsSchema: JsonSchema = {
                     default: BEDROCK_INFERENCE_TYPES.QUICK_START,
                     enum: SUPPORTED_BEDROCK_INFERENCE_TYPES
                 },
+                PromptCaching: {
+                    type: JsonSchemaType.OBJECT,
+                    description:
+                        'Bedrock prompt caching for the model invocations, for models that support it. Cached prompt prefixes are not processed again on later turns. See: https://docs.aws.amazon.com/bedrock/latest/userguide/prompt-caching.html',
+                    properties: {
+                        Enabled: {
+                            type: JsonSchemaType.BOOLEAN,
+                            description: 'Whether to place a cache checkpoint after the system prompt.',
+                            default: false
+                        },
+                        CacheHistory: {
+                            type: JsonSchemaType.BOOLEAN,
+                            description:
+                                'Whether to also place a cache checkpoint after the conversation history. Only applies when Enabled is true, and not to RAG use cases, whose history follows the retrieved context.',
+                            default: false
+                        }
+                    },
+                    required: ['Enabled'],
+                    additionalProperties: false
+                },
             },
             required: ['BedrockInferenceType'],
             allOf: [
@@ -234,6 +254,55 @@ export const llmParamsSchema: JsonSchema = {
             description: 'Whether to print out debug messages to the console',
             default: false
         },
+        DisambiguationParams: {
+            type: JsonSchemaType.OBJECT,
+            description: `Parameters of a separate, typically smaller, Bedrock model used to disambiguate queries. Only applies when using RAG with "ModelProvider" ${CHAT_PROVIDERS.BEDROCK}. When not provided, the main model disambiguates queries.`,
+            properties: {
+                ModelId: {
+                    type: JsonSchemaType.STRING,
+                    description:
+                        'On-demand model ID of the Bedrock model used for disambiguation. When provided, an InferenceProfileId should not be provided.',
+                    pattern:
+                        '^([a-z0-9-]{1,63}[.]{1}[a-z0-9-]{1,63}([.:]?[a-z0-9-]{1,63}))|(([0-9a-zA-Z][_-]?)+)$'
+                },
+                InferenceProfileId: {
+                    type: JsonSchemaType.STRING,
+                    description:
+                        'The identifier of the Bedrock inference profile used for disambiguation. When provided, a ModelId should not be provided. The deployment grants the use case access to the models of the inference profile.',
+                    pattern: '^[a-zA-Z0-9-:.]+$'
+                },
+                MaxTokens: {
+                    type: JsonSchemaType.INTEGER,
+                    description: 'Maximum number of tokens the disambiguation model may generate.',
+                    minimum: 1
+                },
+                Temperature: {
+                    type: JsonSchemaType.NUMBER,
+                    description: 'Temperature value which will be fed to the disambiguation model.',
+                    minimum: 0,
+                    maximum: 100
+                }
+            },
+            oneOf: [
+                {
+                    properties: {
+                        InferenceProfileId: {
+                            not: {}
+                        }
+                    },
+                    required: ['ModelId']
+                },
+                {
+                    properties: {
+                        ModelId: {
+                            not: {}
+                        }
+                    },
+                    required: ['InferenceProfileId']
+                }
+            ],
+            additionalProperties: false
+        },
         MultimodalParams: {
             type: JsonSchemaType.OBJECT,
             description: 'Parameters for the multimodal capability for the LLM.',
@@ -316,6 +385,26 @@ export const llmParamsUpdateSchema: JsonSchema = {
                     description: 'The type of Bedrock inference to use. Required for Bedrock LLM params.',
                     default: BEDROCK_INFERENCE_TYPES.QUICK_START,
                     enum: SUPPORTED_BEDROCK_INFERENCE_TYPES
+                },
+                PromptCaching: {
+                    type: JsonSchemaType.OBJECT,
+                    description:
+                        'Bedrock prompt caching for the model invocations, for models that support it. Cached prompt prefixes are not processed again on later turns. See: https://docs.aws.amazon.com/bedrock/latest/userguide/prompt-caching.html',
+                    properties: {
+                        Enabled: {
+                            type: JsonSchemaType.BOOLEAN,
+                            description: 'Whether to place a cache checkpoint after the system prompt.',
+                            default: false
+                        },
+                        CacheHistory: {
+                            type: JsonSchemaType.BOOLEAN,
+                            description:
+                                'Whether to also place a cache checkpoint after the conversation history. Only applies when Enabled is true, and not to RAG use cases, whose history follows the retrieved context.',
+                            default: false
+                        }
+                    },
+                    required: ['Enabled'],
+                    additionalProperties: false
                 }
             },
             required: ['BedrockInferenceType'],
@@ -469,6 +558,55 @@ export const llmParamsUpdateSchema: JsonSchema = {
             type: JsonSchemaType.BOOLEAN,
             description: 'Whether to print out debug messages to the console'
         },
+        DisambiguationParams: {
+            type: JsonSchemaType.OBJECT,
+            description: `Parameters of a separate, typically smaller, Bedrock model used to disambiguate queries. Only applies when using RAG with "ModelProvider" ${CHAT_PROVIDERS.BEDROCK}. When not provided, the main model disambiguates queries.`,
+            properties: {
+                ModelId: {
+                    type: JsonSchemaType.STRING,
+                    description:
+                        'On-demand model ID of the Bedrock model used for disambiguation. When provided, an InferenceProfileId should not be provided.',
+                    pattern:
+                        '^([a-z0-9-]{1,63}[.]{1}[a-z0-9-]{1,63}([.:]?[a-z0-9-]{1,63}))|(([0-9a-zA-Z][_-]?)+)$'
+                },
+                InferenceProfileId: {
+                    type: JsonSchemaType.STRING,
+                    description:
+                        'The identifier of the Bedrock inference profile used for disambiguation. When provided, a ModelId should not be provided. The deployment grants the use case access to the models of the inference profile.',
+                    pattern: '^[a-zA-Z0-9-:.]+$'
+                },
+                MaxTokens: {
+                    type: JsonSchemaType.INTEGER,
+                    description: 'Maximum number of tokens the disambiguation model may generate.',
+                    minimum: 1
+                },
+                Temperature: {
+                    type: JsonSchemaType.NUMBER,
+                    description: 'Temperature value which will be fed to the disambiguation model.',
+                    minimum: 0,
+                    maximum: 100
+                }
+            },
+            oneOf: [
+                {
+                    properties: {
+                        InferenceProfileId: {
+                            not: {}
+                        }
+                    },
+                    required: ['ModelId']
+                },
+                {
+                    properties: {
+                        ModelId: {
+                            not: {}
+                        }
+                    },
+                    required: ['InferenceProfileId']
+                }
+            ],
+            additionalProperties: false
+        },
         MultimodalParams: {
             type: JsonSchemaType.OBJECT,
             description: 'Parameters for the multimodal capability for the LLM.',
@@ -266,7 +266,7 @@ export class FeedbackSetupStack extends BaseNestedStack {
         this.feedbackAPILambdaRole.addToPolicy(
             new iam.PolicyStatement({
                 effect: iam.Effect.ALLOW,
-                actions: ['dynamodb:GetItem'],
+                actions: ['dynamodb:GetItem', 'dynamodb:Query'],
                 resources: [`arn:${cdk.Aws.PARTITION}:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/*-ChatStorageSetupChatStorageNestedStackChat*-ConversationTable75C14D21*`]
             })
         );
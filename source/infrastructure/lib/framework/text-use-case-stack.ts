@@ -29,6 +29,7 @@ import {
     MAX_KENDRA_QUERY_CAPACITY_UNITS,
     MAX_KENDRA_STORAGE_CAPACITY_UNITS,
     MODEL_INFO_TABLE_NAME_ENV_VAR,
+    RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR,
     SUPPORTED_KNOWLEDGE_BASE_TYPES,
     USER_POOL_ID_ENV_VAR,
     USE_CASE_TYPES,
@@ -77,6 +78,16 @@ export class TextUseCaseParameters extends UseCaseParameters {
      */
     public bedrockKnowledgeBaseId: cdk.CfnParameter;
 
+    /**
+     * Index IDs of the existing Kendra indexes listed in the AdditionalKnowledgeBases of the use case
+     */
+    public additionalKendraIndexIds: cdk.CfnParameter;
+
+    /**
+     * IDs of the bedrock knowledge bases listed in the AdditionalKnowledgeBases of the use case
+     */
+    public additionalBedrockKnowledgeBaseIds: cdk.CfnParameter;
+
     /**
      * Name of the table which stores info/defaults for models. If not provided (passed an empty string), the table will be created.
      */
@@ -158,6 +169,22 @@ export class TextUseCaseParameters extends UseCaseParameters {
             default: ''
         });
 
+        this.additionalKendraIndexIds = new cdk.CfnParameter(stack, 'AdditionalKendraIndexIds', {
+            type: 'CommaDelimitedList',
+            allowedPattern: '^$|^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$',
+            description:
+                'Comma separated list of the index IDs of existing Kendra indexes queried alongside the knowledge base of a RAG use case.',
+            default: ''
+        });
+
+        this.additionalBedrockKnowledgeBaseIds = new cdk.CfnParameter(stack, 'AdditionalBedrockKnowledgeBaseIds', {
+            type: 'CommaDelimitedList',
+            allowedPattern: '^[0-9a-zA-Z]{0,10}$',
+            description:
+                'Comma separated list of the IDs of bedrock knowledge bases queried alongside the knowledge base of a RAG use case.',
+            default: ''
+        });
+
         this.existingModelInfoTableName = new cdk.CfnParameter(stack, 'ExistingModelInfoTableName', {
             type: 'String',
             maxLength: 255,
@@ -180,6 +207,14 @@ export class TextUseCaseParameters extends UseCaseParameters {
             Parameters: [this.bedrockKnowledgeBaseId.logicalId]
         });
 
+        existingParameterGroups.unshift({
+            Label: {
+                default:
+                    'Please provide the additional knowledge bases if using RAG based architecture with more than one knowledge base'
+            },
+            Parameters: [this.additionalKendraIndexIds.logicalId, this.additionalBedrockKnowledgeBaseIds.logicalId]
+        });
+
         existingParameterGroups.unshift({
             Label: {
                 default:
@@ -522,6 +557,15 @@ export abstract class TextUseCase extends UseCaseStack {
             tablePermissions: 'Read',
             tableEnvironmentVariableName: MODEL_INFO_TABLE_NAME_ENV_VAR
         });
+
+        // shared tier of the retrieval cache, used once RETRIEVAL_CACHE_TTL is set on the lambda
+        // prettier-ignore
+        new LambdaToDynamoDB(this, 'ChatProviderLambdaToRetrievalCacheTable', { // NOSONAR - construct instantiation
+            existingLambdaObj: this.chatLlmProviderLambda,
+            existingTableObj: this.chatStorageSetup.chatStorage.retrievalCacheTable!,
+            tablePermissions: 'ReadWrite',
+            tableEnvironmentVariableName: RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR
+        });
     }
 
     /**
@@ -582,5 +626,84 @@ export abstract class TextUseCase extends UseCaseStack {
         (lambdaQueryBedrockKnowledgeBasePolicy.node.defaultChild as cdk.CfnResource).cfnOptions.condition =
             bedrockRagEnabledCondition;
         lambdaQueryBedrockKnowledgeBasePolicy.attachToRole(this.chatLlmProviderLambda.role!);
+
+        // connection to the additional knowledge bases of the use case (optional), which may be of either type
+        const additionalKendraIndexesCondition = new cdk.CfnCondition(this, 'AdditionalKendraIndexesCondition', {
+            expression: cdk.Fn.conditionAnd(
+                ragEnabledCondition,
+                cdk.Fn.conditionNot(
+                    cdk.Fn.conditionEquals(
+                        cdk.Fn.join('', this.stackParameters.additionalKendraIndexIds.valueAsList),
+                        ''
+                    )
+                )
+            )
+        });
+        const kendraIndexArnPrefix = `arn:${cdk.Aws.PARTITION}:kendra:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:index/`;
+        const lambdaQueryAdditionalKendraIndexesPolicy = new iam.Policy(
+            this,
+            'LambdaQueryAdditionalKendraIndexesPolicy',
+            {
+                statements: [
+                    new iam.PolicyStatement({
+                        effect: iam.Effect.ALLOW,
+                        actions: ['kendra:Query', 'kendra:SubmitFeedback', 'kendra:Retrieve'],
+                        // prefixes each index id of the list with the index arn
+                        resources: cdk.Fn.split(
+                            ',',
+                            kendraIndexArnPrefix +
+                                cdk.Fn.join(
+                                    `,${kendraIndexArnPrefix}`,
+                                    this.stackParameters.additionalKendraIndexIds.valueAsList
+                                )
+                        )
+                    })
+                ]
+            }
+        );
+        (lambdaQueryAdditionalKendraIndexesPolicy.node.defaultChild as cdk.CfnResource).cfnOptions.condition =
+            additionalKendraIndexesCondition;
+        lambdaQueryAdditionalKendraIndexesPolicy.attachToRole(this.chatLlmProviderLambda.role!);
+
+        const additionalBedrockKnowledgeBasesCondition = new cdk.CfnCondition(
+            this,
+            'AdditionalBedrockKnowledgeBasesCondition',
+            {
+                expression: cdk.Fn.conditionAnd(
+                    ragEnabledCondition,
+                    cdk.Fn.conditionNot(
+                        cdk.Fn.conditionEquals(
+                            cdk.Fn.join('', this.stackParameters.additionalBedrockKnowledgeBaseIds.valueAsList),
+                            ''
+                        )
+                    )
+                )
+            }
+        );
+        const knowledgeBaseArnPrefix = `arn:${cdk.Aws.PARTITION}:bedrock:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:knowledge-base/`;
+        const lambdaQueryAdditionalBedrockKnowledgeBasesPolicy = new iam.Policy(
+            this,
+            'LambdaQueryAdditionalBedrockKnowledgeBasesPolicy',
+            {
+                statements: [
+                    new iam.PolicyStatement({
+                        effect: iam.Effect.ALLOW,
+                        actions: ['bedrock:Retrieve'],
+                        // prefixes each knowledge base id of the list with the knowledge base arn
+                        resources: cdk.Fn.split(
+                            ',',
+                            knowledgeBaseArnPrefix +
+                                cdk.Fn.join(
+                                    `,${knowledgeBaseArnPrefix}`,
+                                    this.stackParameters.additionalBedrockKnowledgeBaseIds.valueAsList
+                                )
+                        )
+                    })
+                ]
+            }
+        );
+        (lambdaQueryAdditionalBedrockKnowledgeBasesPolicy.node.defaultChild as cdk.CfnResource).cfnOptions.condition =
+            additionalBedrockKnowledgeBasesCondition;
+        lambdaQueryAdditionalBedrockKnowledgeBasesPolicy.attachToRole(this.chatLlmProviderLambda.role!);
     }
 }
@@ -9,6 +9,7 @@ import * as s3 from 'aws-cdk-lib/aws-s3';
 
 import { Construct } from 'constructs';
 import { BaseStackProps } from '../framework/base-stack';
+import { USE_CASE_TYPES } from '../utils/constants';
 import { DynamoDBChatStorage } from './chat-storage-stack';
 
 export interface ChatStorageProps extends BaseStackProps {
@@ -82,5 +83,10 @@ export class ChatStorageSetup extends Construct {
             },
             description: `Nested Stack that creates the DynamoDB tables for the chat use case - Version ${props.solutionVersion}`
         });
+
+        // knowledge base retrievals are only cached by the text use case's chat lambda
+        if (props.useCaseType === USE_CASE_TYPES.TEXT) {
+            this.chatStorage.addRetrievalCacheTable();
+        }
     }
 }
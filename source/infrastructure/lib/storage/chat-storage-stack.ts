@@ -63,6 +63,12 @@ export class DynamoDBChatStorage extends BaseNestedStack {
      */
     public conversationTable: dynamodb.Table;
 
+    /**
+     * The DynamoDB table which shares knowledge base retrieval results between the chat lambda's containers. Only
+     * created for text use cases, see addRetrievalCacheTable
+     */
+    public retrievalCacheTable?: dynamodb.Table;
+
     /**
      * Construct managing the DynamoDB table which will store model info and defaults.
      */
@@ -120,4 +126,41 @@ export class DynamoDBChatStorage extends BaseNestedStack {
             customResourceRoleArn: this.customResourceLambdaRoleArn
         });
     }
+
+    /**
+     * Creates the table that shares knowledge base retrieval results between containers of the chat lambda. Items
+     * expire through the TTL attribute, so the table only holds results that are still fresh.
+     */
+    public addRetrievalCacheTable(): dynamodb.Table {
+        this.retrievalCacheTable = new dynamodb.Table(this, 'RetrievalCacheTable', {
+            encryption: dynamodb.TableEncryption.AWS_MANAGED,
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            partitionKey: {
+                name: DynamoDBAttributes.RETRIEVAL_CACHE_TABLE_PARTITION_KEY,
+                type: dynamodb.AttributeType.STRING
+            },
+            timeToLiveAttribute: DynamoDBAttributes.TIME_TO_LIVE,
+            removalPolicy: cdk.RemovalPolicy.DESTROY
+        });
+
+        NagSuppressions.addResourceSuppressions(this.retrievalCacheTable, [
+            {
+                id: 'AwsSolutions-DDB3',
+                reason: 'The table only holds cached retrieval results that expire, which do not need point-in-time recovery'
+            }
+        ]);
+
+        cfn_guard.addCfnSuppressRules(this.retrievalCacheTable, [
+            {
+                id: 'W74',
+                reason: 'The table is encrypted using AWS manged keys'
+            },
+            {
+                id: 'W78',
+                reason: 'The table only holds cached retrieval results that expire, which do not need point-in-time recovery'
+            }
+        ]);
+
+        return this.retrievalCacheTable;
+    }
 }
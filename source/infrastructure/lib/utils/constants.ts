@@ -224,6 +224,7 @@ export enum DynamoDBAttributes {
     USE_CASES_TABLE_SECONDARY_INDEX_KEY = 'Status',
     MODEL_INFO_TABLE_PARTITION_KEY = 'UseCase',
     MODEL_INFO_TABLE_SORT_KEY = 'SortKey',
+    RETRIEVAL_CACHE_TABLE_PARTITION_KEY = 'CacheKey',
     TIME_TO_LIVE = 'TTL',
     COGNITO_TABLE_PARTITION_KEY = 'group',
     USE_CASE_CONFIG_RECORD_KEY_ATTRIBUTE_NAME = 'key'
@@ -252,6 +253,7 @@ export const USE_CASE_CONFIG_RECORD_KEY_ENV_VAR = 'USE_CASE_CONFIG_RECORD_KEY';
 export const USE_CASE_CONFIG_TABLE_NAME_ENV_VAR = 'USE_CASE_CONFIG_TABLE_NAME';
 export const CONVERSATION_TABLE_NAME_ENV_VAR = 'CONVERSATION_TABLE_NAME';
 export const MODEL_INFO_TABLE_NAME_ENV_VAR = 'MODEL_INFO_TABLE_NAME';
+export const RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR = 'RETRIEVAL_CACHE_TABLE_NAME';
 export const KENDRA_INDEX_ID_ENV_VAR = 'KENDRA_INDEX_ID';
 export const BEDROCK_KNOWLEDGE_BASE_ID_ENV_VAR = 'BEDROCK_KNOWLEDGE_BASE_ID';
 export const COGNITO_POLICY_TABLE_ENV_VAR = 'COGNITO_POLICY_TABLE_NAME';
@@ -292,6 +294,7 @@ export const MIN_SCORE_THRESHOLD = 0;
 export const MAX_SCORE_THRESHOLD = 1;
 export const DEFAULT_RETURN_SOURCE_DOCS = false;
 export const DEFAULT_ENABLE_RBAC = false;
+export const MAX_ADDITIONAL_KNOWLEDGE_BASES = 4;
 export const MODEL_PARAM_TYPES = ['string', 'integer', 'float', 'boolean', 'list', 'dictionary'];
 
 export const LOG_RETENTION_PERIOD = logs.RetentionDays.TEN_YEARS;
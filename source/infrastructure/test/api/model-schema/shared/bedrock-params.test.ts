@@ -9,6 +9,7 @@ import {
     BEDROCK_INFERENCE_TYPES,
     KNOWLEDGE_BASE_TYPES, 
     DEFAULT_KENDRA_EDITION,
+    MAX_ADDITIONAL_KNOWLEDGE_BASES,
     MAX_KENDRA_NUMBER_OF_DOCS,
     MAX_SCORE_THRESHOLD,
     MIN_KENDRA_NUMBER_OF_DOCS,
@@ -604,6 +605,96 @@ describe('Testing KnowledgeBaseParams schema validation', () => {
             };
             checkValidationFailed(validator.validate(payload, schema));
         });
+
+        describe('AdditionalKnowledgeBases validations', () => {
+            const payloadWith = (additionalKnowledgeBases: any[]) => ({
+                UseCaseType: USE_CASE_TYPES.TEXT,
+                UseCaseName: 'test',
+                LlmParams: {
+                    ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                    BedrockLlmParams: {
+                        ModelId: 'fakemodel',
+                        BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START
+                    },
+                    RAGEnabled: true
+                },
+                KnowledgeBaseParams: {
+                    KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.KENDRA,
+                    KendraKnowledgeBaseParams: {
+                        ExistingKendraIndexId: testKendraIndexId
+                    },
+                    AdditionalKnowledgeBases: additionalKnowledgeBases
+                }
+            });
+
+            it('Additional knowledge bases of either type succeed', () => {
+                const payload = payloadWith([
+                    {
+                        KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.BEDROCK,
+                        NumberOfDocs: 4,
+                        BedrockKnowledgeBaseParams: {
+                            BedrockKnowledgeBaseId: 'testid',
+                            OverrideSearchType: 'HYBRID'
+                        }
+                    },
+                    {
+                        KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.KENDRA,
+                        ScoreThreshold: MAX_SCORE_THRESHOLD,
+                        KendraKnowledgeBaseParams: {
+                            ExistingKendraIndexId: '22222222-2222-2222-2222-222222222222',
+                            RoleBasedAccessControlEnabled: true
+                        }
+                    }
+                ]);
+                checkValidationSucceeded(validator.validate(payload, schema));
+            });
+
+            it('Additional Kendra knowledge base fails for a new index', () => {
+                const payload = payloadWith([
+                    {
+                        KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.KENDRA,
+                        KendraKnowledgeBaseParams: {
+                            KendraIndexName: 'test'
+                        }
+                    }
+                ]);
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+
+            it('Additional Bedrock knowledge base fails without an id', () => {
+                const payload = payloadWith([
+                    {
+                        KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.BEDROCK,
+                        BedrockKnowledgeBaseParams: {}
+                    }
+                ]);
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+
+            it('Additional knowledge base fails with params of the other type', () => {
+                const payload = payloadWith([
+                    {
+                        KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.KENDRA,
+                        BedrockKnowledgeBaseParams: {
+                            BedrockKnowledgeBaseId: 'testid'
+                        }
+                    }
+                ]);
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+
+            it('Additional knowledge bases fail above the maximum', () => {
+                const payload = payloadWith(
+                    Array(MAX_ADDITIONAL_KNOWLEDGE_BASES + 1).fill({
+                        KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.BEDROCK,
+                        BedrockKnowledgeBaseParams: {
+                            BedrockKnowledgeBaseId: 'testid'
+                        }
+                    })
+                );
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+        });
     });
 
 
@@ -945,5 +1036,38 @@ describe('Testing KnowledgeBaseParams schema validation', () => {
             };
             checkValidationFailed(validator.validate(payload, schema));
         });
+
+        it('Updating the additional knowledge bases succeeds', () => {
+            const payload = {
+                UseCaseType: USE_CASE_TYPES.TEXT,
+                KnowledgeBaseParams: {
+                    AdditionalKnowledgeBases: [
+                        {
+                            KnowledgeBaseType: KNOWLEDGE_BASE_TYPES.BEDROCK,
+                            BedrockKnowledgeBaseParams: {
+                                BedrockKnowledgeBaseId: 'testid'
+                            }
+                        }
+                    ]
+                }
+            };
+            checkValidationSucceeded(validator.validate(payload, schema));
+        });
+
+        it('Updating an additional knowledge base fails without its type', () => {
+            const payload = {
+                UseCaseType: USE_CASE_TYPES.TEXT,
+                KnowledgeBaseParams: {
+                    AdditionalKnowledgeBases: [
+                        {
+                            BedrockKnowledgeBaseParams: {
+                                BedrockKnowledgeBaseId: 'testid'
+                            }
+                        }
+                    ]
+                }
+            };
+            checkValidationFailed(validator.validate(payload, schema));
+        });
     });
 });
\ No newline at end of file
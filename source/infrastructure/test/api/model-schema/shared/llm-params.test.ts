@@ -359,6 +359,120 @@ describe('Testing LlmParams schema validation', () => {
                 checkValidationFailed(validator.validate(payload, schema));
             });
 
+            it('Test Bedrock deployment, PromptCaching passes', () => {
+                const payload = {
+                    UseCaseName: 'test',
+                    UseCaseType: USE_CASE_TYPES.TEXT,
+                    LlmParams: {
+                        ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                        BedrockLlmParams: {
+                            ModelId: 'fakemodel',
+                            BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START,
+                            PromptCaching: {
+                                Enabled: true,
+                                CacheHistory: true
+                            }
+                        }
+                    }
+                };
+                checkValidationSucceeded(validator.validate(payload, schema));
+            });
+
+            it('Test Bedrock deployment, PromptCaching with unknown property fails', () => {
+                const payload = {
+                    UseCaseName: 'test',
+                    UseCaseType: USE_CASE_TYPES.TEXT,
+                    LlmParams: {
+                        ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                        BedrockLlmParams: {
+                            ModelId: 'fakemodel',
+                            BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START,
+                            PromptCaching: {
+                                Enabled: true,
+                                CacheContext: true
+                            }
+                        }
+                    }
+                };
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+
+            it('Test Bedrock deployment, DisambiguationParams passes', () => {
+                const payload = {
+                    UseCaseName: 'test',
+                    UseCaseType: USE_CASE_TYPES.TEXT,
+                    LlmParams: {
+                        ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                        BedrockLlmParams: {
+                            ModelId: 'fakemodel',
+                            BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START
+                        },
+                        DisambiguationParams: {
+                            ModelId: 'amazon.nova-micro-v1:0',
+                            MaxTokens: 128,
+                            Temperature: 0
+                        }
+                    }
+                };
+                checkValidationSucceeded(validator.validate(payload, schema));
+            });
+
+            it('Test Bedrock deployment, DisambiguationParams with InferenceProfileId passes', () => {
+                const payload = {
+                    UseCaseName: 'test',
+                    UseCaseType: USE_CASE_TYPES.TEXT,
+                    LlmParams: {
+                        ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                        BedrockLlmParams: {
+                            ModelId: 'fakemodel',
+                            BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START
+                        },
+                        DisambiguationParams: {
+                            InferenceProfileId: 'us.amazon.nova-micro-v1:0',
+                            MaxTokens: 128
+                        }
+                    }
+                };
+                checkValidationSucceeded(validator.validate(payload, schema));
+            });
+
+            it('Test Bedrock deployment, DisambiguationParams with both ModelId and InferenceProfileId fails', () => {
+                const payload = {
+                    UseCaseName: 'test',
+                    UseCaseType: USE_CASE_TYPES.TEXT,
+                    LlmParams: {
+                        ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                        BedrockLlmParams: {
+                            ModelId: 'fakemodel',
+                            BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START
+                        },
+                        DisambiguationParams: {
+                            ModelId: 'amazon.nova-micro-v1:0',
+                            InferenceProfileId: 'us.amazon.nova-micro-v1:0'
+                        }
+                    }
+                };
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+
+            it('Test Bedrock deployment, DisambiguationParams without ModelId or InferenceProfileId fails', () => {
+                const payload = {
+                    UseCaseName: 'test',
+                    UseCaseType: USE_CASE_TYPES.TEXT,
+                    LlmParams: {
+                        ModelProvider: CHAT_PROVIDERS.BEDROCK,
+                        BedrockLlmParams: {
+                            ModelId: 'fakemodel',
+                            BedrockInferenceType: BEDROCK_INFERENCE_TYPES.QUICK_START
+                        },
+                        DisambiguationParams: {
+                            MaxTokens: 128
+                        }
+                    }
+                };
+                checkValidationFailed(validator.validate(payload, schema));
+            });
+
             it('Test Bedrock deployment, RestApi Id resources pass', () => {
                 const payload = {
                     UseCaseType: USE_CASE_TYPES.TEXT,
@@ -243,7 +243,7 @@ describe('FeedbackSetupStack', () => {
                             ]
                         },
                         {
-                            Action: 'dynamodb:GetItem',
+                            Action: ['dynamodb:GetItem', 'dynamodb:Query'],
                             Effect: 'Allow',
                             Resource: {
                                 'Fn::Join': [
@@ -106,6 +106,18 @@ describe('When Chat use case is created', () => {
             Default: ''
         });
 
+        template.hasParameter('AdditionalKendraIndexIds', {
+            Type: 'CommaDelimitedList',
+            AllowedPattern: '^$|^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$',
+            Default: ''
+        });
+
+        template.hasParameter('AdditionalBedrockKnowledgeBaseIds', {
+            Type: 'CommaDelimitedList',
+            AllowedPattern: '^[0-9a-zA-Z]{0,10}$',
+            Default: ''
+        });
+
         template.hasParameter('UseCaseConfigTableName', {
             Type: 'String',
             AllowedPattern: '^[a-zA-Z0-9_.-]{3,255}$',
@@ -987,6 +999,14 @@ describe('When Chat use case is created', () => {
                                 }
                             ]
                         },
+                        'RETRIEVAL_CACHE_TABLE_NAME': {
+                            'Fn::GetAtt': [
+                                Match.stringLikeRegexp(
+                                    'ChatStorageSetupChatStorageNestedStackChatStorageNestedStackResource*'
+                                ),
+                                Match.stringLikeRegexp('Outputs.ChatStackChatStorageSetupChatStorageRetrievalCacheTable*')
+                            ]
+                        },
                         'KENDRA_INDEX_ID': {
                             'Fn::If': [
                                 'DeployKendraIndexCondition',
@@ -1213,6 +1233,79 @@ describe('When Chat use case is created', () => {
                 ]
             });
         });
+
+        it('chat provider lambda is properly configured to access the additional knowledge bases', () => {
+            template.hasCondition('AdditionalKendraIndexesCondition', {
+                'Fn::And': [
+                    { 'Condition': 'RAGEnabledCondition' },
+                    {
+                        'Fn::Not': [
+                            {
+                                'Fn::Equals': [{ 'Fn::Join': ['', { 'Ref': 'AdditionalKendraIndexIds' }] }, '']
+                            }
+                        ]
+                    }
+                ]
+            });
+            template.hasResource('AWS::IAM::Policy', {
+                'Condition': 'AdditionalKendraIndexesCondition',
+                'Properties': {
+                    'PolicyDocument': {
+                        'Statement': [
+                            {
+                                'Action': ['kendra:Query', 'kendra:SubmitFeedback', 'kendra:Retrieve'],
+                                'Effect': 'Allow',
+                                'Resource': { 'Fn::Split': [',', Match.anyValue()] }
+                            }
+                        ],
+                        'Version': '2012-10-17'
+                    },
+                    'PolicyName': Match.stringLikeRegexp('LambdaQueryAdditionalKendraIndexesPolicy*'),
+                    'Roles': [
+                        {
+                            'Ref': Match.stringLikeRegexp('ChatLlmProviderLambdaRole*')
+                        }
+                    ]
+                }
+            });
+
+            template.hasCondition('AdditionalBedrockKnowledgeBasesCondition', {
+                'Fn::And': [
+                    { 'Condition': 'RAGEnabledCondition' },
+                    {
+                        'Fn::Not': [
+                            {
+                                'Fn::Equals': [
+                                    { 'Fn::Join': ['', { 'Ref': 'AdditionalBedrockKnowledgeBaseIds' }] },
+                                    ''
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            });
+            template.hasResource('AWS::IAM::Policy', {
+                'Condition': 'AdditionalBedrockKnowledgeBasesCondition',
+                'Properties': {
+                    'PolicyDocument': {
+                        'Statement': [
+                            {
+                                'Action': 'bedrock:Retrieve',
+                                'Effect': 'Allow',
+                                'Resource': { 'Fn::Split': [',', Match.anyValue()] }
+                            }
+                        ],
+                        'Version': '2012-10-17'
+                    },
+                    'PolicyName': Match.stringLikeRegexp('LambdaQueryAdditionalBedrockKnowledgeBasesPolicy*'),
+                    'Roles': [
+                        {
+                            'Ref': Match.stringLikeRegexp('ChatLlmProviderLambdaRole*')
+                        }
+                    ]
+                }
+            });
+        });
     });
 
     describe('API Gateway and REST endpoint setup', () => {
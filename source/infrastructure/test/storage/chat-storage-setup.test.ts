@@ -56,9 +56,25 @@ describe('When creating the chat storage construct for text use case', () => {
         template.resourceCountIs('AWS::CloudFormation::Stack', 1);
     });
 
-    it('nested stack has both ddb tables', () => {
+    it('nested stack has the conversation, model info and retrieval cache tables', () => {
         // NOTE: actual table configuration tested in model-info-storage.test.ts
-        nestedStackTemplate.resourceCountIs('AWS::DynamoDB::Table', 2);
+        nestedStackTemplate.resourceCountIs('AWS::DynamoDB::Table', 3);
+    });
+
+    it('creates the retrieval cache table with a TTL', () => {
+        nestedStackTemplate.hasResourceProperties('AWS::DynamoDB::Table', {
+            KeySchema: [
+                {
+                    AttributeName: 'CacheKey',
+                    KeyType: 'HASH'
+                }
+            ],
+            BillingMode: 'PAY_PER_REQUEST',
+            TimeToLiveSpecification: {
+                AttributeName: 'TTL',
+                Enabled: true
+            }
+        });
     });
 
     it('passes the correct parameters to the nested stack', () => {
@@ -116,9 +132,9 @@ describe('When creating the chat storage construct with an existing model info t
         template.resourceCountIs('AWS::CloudFormation::Stack', 1);
     });
 
-    it('nested stack has 2 ddb tables', () => {
+    it('nested stack has 3 ddb tables', () => {
         // NOTE: actual table configuration tested in model-info-storage.test.ts
-        nestedStackTemplate.resourceCountIs('AWS::DynamoDB::Table', 2);
+        nestedStackTemplate.resourceCountIs('AWS::DynamoDB::Table', 3);
     });
 });
 
@@ -160,7 +176,8 @@ describe('When creating the chat storage construct for agent use case', () => {
     });
 
     it('nested stack has the conversation table and a conditionally disabled model info table', () => {
-        // Both tables are defined in the template, but the model info table has a condition
+        // Both tables are defined in the template, but the model info table has a condition. Retrievals are not
+        // cached for agents, so there is no retrieval cache table
         nestedStackTemplate.resourceCountIs('AWS::DynamoDB::Table', 2);
 
         // Verify the conversation table exists
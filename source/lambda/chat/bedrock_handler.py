@@ -7,6 +7,7 @@ from typing import Any, Dict
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from clients.bedrock_client import BedrockClient
+from handlers.container_priming import prime_container_on_init
 from handlers.use_case_handler import UseCaseHandler
 from utils.enum_types import CloudWatchNamespaces
 from utils.helpers import get_metrics_client
@@ -15,6 +16,9 @@ logger = Logger(utc=True)
 tracer = Tracer()
 metrics = get_metrics_client(CloudWatchNamespaces.COLD_STARTS)
 
+# builds the chat model while Lambda initializes the container, so the first request runs as a warm one
+prime_container_on_init(BedrockClient)
+
 
 @tracer.capture_lambda_handler
 @metrics.log_metrics(capture_cold_start_metric=True)
@@ -3,15 +3,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
-from typing import Dict, Optional, Union
+from typing import Dict, Optional
 from uuid import UUID, uuid4
 
 from aws_lambda_powertools import Logger, Tracer
 
 from clients.builders.bedrock_builder import BedrockBuilder
 from clients.llm_chat_client import LLMChatClient
-from llms.bedrock import BedrockLLM
-from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
+from llms.base_langchain import BaseLangChainModel
 from utils.constants import (
     AUTH_TOKEN_EVENT_KEY,
     BEDROCK_INFERENCE_PROFILE_MODEL,
@@ -55,13 +54,13 @@ class BedrockClient(LLMChatClient):
     ) -> None:
         super().__init__(connection_id=connection_id, rag_enabled=rag_enabled, use_case_config=use_case_config)
 
-    def get_model(self, event_body: Dict, user_id: UUID) -> Union[BedrockLLM, BedrockRetrievalLLM]:
+    def get_model(self, event_body: Dict, user_id: UUID) -> BaseLangChainModel:
         """
         Retrieves the Bedrock client.
 
         :param event (Dict): The AWS Lambda event
         Returns:
-            BedrockLLM: The Bedrock LLM that is used to generate content.
+            BedrockLLM or BedrockRetrievalLLM: The Bedrock LLM that is used to generate content.
         """
         super().get_model(event_body)
 
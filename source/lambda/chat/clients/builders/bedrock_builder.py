@@ -11,7 +11,6 @@ from aws_lambda_powertools.metrics import MetricUnit
 from clients.builders.llm_builder import LLMBuilder
 from llms.bedrock import BedrockLLM
 from llms.models.model_provider_inputs import BedrockInputs
-from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
 from utils.constants import DEFAULT_RAG_ENABLED_MODE, TRACE_ID_ENV_VAR
 from utils.enum_types import BedrockModelProviders, CloudWatchMetrics, CloudWatchNamespaces
 from utils.helpers import get_metrics_client
@@ -118,6 +117,7 @@ class BedrockBuilder(LLMBuilder):
             "model_family": model_family,
             "model_arn": bedrock_config.get("ModelArn"),
             "guardrails": self.get_guardrails(bedrock_config),
+            "prompt_caching": bedrock_config.get("PromptCaching"),
         }
         self.model_inputs = BedrockInputs(**vars(self.model_inputs), **bedrock_specific_inputs)
 
@@ -126,6 +126,9 @@ class BedrockBuilder(LLMBuilder):
             logger.error("KnowledgeBase is required for RAG-enabled Bedrock chat model.")
             raise ValueError("KnowledgeBase is required for RAG-enabled Bedrock chat model.")
         elif self.rag_enabled and self.knowledge_base:
+            # the retrieval chains are only imported by RAG use cases
+            from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
+
             self.llm = BedrockRetrievalLLM(model_inputs=self.model_inputs, model_defaults=self.model_defaults)
 
         else:
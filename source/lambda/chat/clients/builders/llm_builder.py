@@ -67,6 +67,7 @@ class LLMBuilder(ABC):
         - validate_event_input_sizes(event_body): Validates the input sizes of prompt and user query using the defaults retrieved from ModelInfoStorage DynamoDB table
         - set_knowledge_base(): Sets the value for the knowledge base object that is used to supplement the LLM context using information from the user's knowledge base
         - set_conversation_memory(user_id, conversation_id): Sets the value for the conversation memory object that is used to store the user chat history
+        - get_reserved_prompt_size(): Returns the characters of the prompt the conversation history has to leave room for
         - set_streaming_callbacks(response_if_no_docs_found, return_source_docs): Sets the value of callbacks for the LLM
         - get_guardrails(model_config): Returns the guardrails configuration object for the model.
         - set_llm(model): Sets the value of the LLM model in the builder. Each subclass implements its own LLM
@@ -272,8 +273,22 @@ class LLMBuilder(ABC):
             conversation_id=conversation_id,
             message_id=self.message_id,
             errors=self.errors,
+            max_prompt_size=self.model_defaults.max_prompt_size,
+            reserved_prompt_size=self.get_reserved_prompt_size(),
         )
 
+    def get_reserved_prompt_size(self) -> int:
+        """
+        Returns the characters of the prompt taken by the prompt template, the use case's or else the model's default,
+        and by the longest question a user may ask, which the conversation history has to leave room for.
+        """
+        prompt_template = (
+            self.use_case_config.get("LlmParams", {}).get("PromptParams", {}).get("PromptTemplate")
+            or self.model_defaults.prompt
+            or ""
+        )
+        return len(prompt_template) + int(self.model_defaults.max_chat_message_size or 0)
+
     def set_streaming_callbacks(self, response_if_no_docs_found, return_source_docs):
         """
         Sets the value of callbacks for the LLM model
@@ -381,6 +396,7 @@ class LLMBuilder(ABC):
                     "disambiguation_prompt_enabled": llm_params.get("PromptParams", {}).get(
                         "DisambiguationEnabled", DEFAULT_DISAMBIGUATION_ENABLED_MODE
                     ),
+                    "disambiguation_params": llm_params.get("DisambiguationParams"),
                     "rephrase_question": llm_params.get("PromptParams", {}).get(
                         "RephraseQuestion", DEFAULT_REPHRASE_RAG_QUESTION
                     ),
@@ -9,7 +9,6 @@ from aws_lambda_powertools.metrics import MetricUnit
 
 from clients.builders.llm_builder import LLMBuilder
 from llms.models.model_provider_inputs import SageMakerInputs
-from llms.rag.sagemaker_retrieval import SageMakerRetrievalLLM
 from llms.sagemaker import SageMakerLLM
 from utils.constants import DEFAULT_RAG_ENABLED_MODE, DEFAULT_SAGEMAKER_MODEL_ID
 from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
@@ -100,6 +99,9 @@ class SageMakerBuilder(LLMBuilder):
             logger.error("KnowledgeBase is required for RAG-enabled SageMaker chat model.")
             raise ValueError("KnowledgeBase is required for RAG-enabled SageMaker chat model.")
         elif self.rag_enabled and self.knowledge_base:
+            # the retrieval chains are only imported by RAG use cases
+            from llms.rag.sagemaker_retrieval import SageMakerRetrievalLLM
+
             self.llm = SageMakerRetrievalLLM(model_inputs=self.model_inputs, model_defaults=self.model_defaults)
         else:
             self.llm = SageMakerLLM(model_inputs=self.model_inputs, model_defaults=self.model_defaults)
@@ -6,11 +6,27 @@ import os
 from typing import Dict, List, Optional
 
 from aws_lambda_powertools import Logger
-from langchain_classic.base_memory import BaseMemory
+from langchain_core.chat_history import BaseChatMessageHistory
 
 from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
-from utils.constants import CONVERSATION_TABLE_NAME_ENV_VAR, TRACE_ID_ENV_VAR
-from utils.enum_types import ConversationMemoryTypes
+from shared.memory.ddb_message_item_history import DynamoDBMessageItemHistory
+from shared.memory.ddb_summarizing_message_history import SummarizingChatMessageHistory
+from utils.constants import (
+    CHARACTERS_PER_TOKEN,
+    CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR,
+    CONVERSATION_HISTORY_LAYOUT_ENV_VAR,
+    CONVERSATION_HISTORY_WINDOW_ENV_VAR,
+    CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR,
+    CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR,
+    CONVERSATION_TABLE_NAME_ENV_VAR,
+    DEFAULT_CONVERSATION_HISTORY_BUDGET_PERCENT,
+    DEFAULT_CONVERSATION_HISTORY_LAYOUT,
+    DEFAULT_CONVERSATION_HISTORY_WINDOW,
+    DEFAULT_CONVERSATION_SUMMARY_KEEP_MESSAGES,
+    DEFAULT_CONVERSATION_SUMMARY_THRESHOLD,
+    TRACE_ID_ENV_VAR,
+)
+from utils.enum_types import ConversationHistoryLayouts, ConversationHistoryWindows, ConversationMemoryTypes
 
 logger = Logger(utc=True)
 
@@ -29,18 +45,22 @@ class ConversationMemoryFactory:
         conversation_id: str,
         message_id: str,
         errors: Optional[List[str]] = None,
-    ) -> BaseMemory:
+        max_prompt_size: Optional[int] = None,
+        reserved_prompt_size: int = 0,
+    ) -> BaseChatMessageHistory:
         """
-        Returns a BaseMemory object based on the conversation-memory object constructed with the provided configuration.
+        Returns a BaseChatMessageHistory object based on the conversation-memory object constructed with the provided configuration.
         Args:
             use_case_config(Dict): Model configuration set by admin
             default_memory_config: Default memory configuration that includes the memory_key, input_key, output_key, human_prefix, ai_prefix
             user_id(str): User ID
             conversation_id (str): Conversation ID
             errors (List[str]): List of errors to append to
+            max_prompt_size (Optional[int]): MaxPromptSize of the model, from which the history token budget is derived
+            reserved_prompt_size (int): characters of max_prompt_size taken by the prompt template and the question
 
         Returns:
-            BaseMemory: the conversation-memory constructed with the provided configuration
+            BaseChatMessageHistory: the conversation-memory constructed with the provided configuration
         """
         if errors is None:
             errors = []
@@ -84,18 +104,122 @@ class ConversationMemoryFactory:
                 )
                 return
 
-            return (
-                DynamoDBChatMessageHistory,
-                {
-                    "table_name": table_name,
-                    "max_history_length": max_history_length,
-                    "user_id": user_id,
-                    "conversation_id": conversation_id,
-                    "message_id": message_id,
-                    "ai_prefix": ai_prefix,
-                    "human_prefix": human_prefix,
-                },
+            history_params = {
+                "table_name": table_name,
+                "max_history_length": max_history_length,
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+                "message_id": message_id,
+                "ai_prefix": ai_prefix,
+                "human_prefix": human_prefix,
+            }
+            max_history_tokens = self.get_history_token_budget(
+                max_prompt_size,
+                reserved_prompt_size,
+                use_case_config.get("LlmParams", {}).get("RAGEnabled", False),
             )
+            if max_history_tokens is not None:
+                history_params["max_history_tokens"] = max_history_tokens
+
+            history_cls = self.get_dynamodb_history_class()
+            summary_params = self.get_summary_params()
+            if summary_params and history_cls is DynamoDBChatMessageHistory:
+                history_cls = SummarizingChatMessageHistory
+                history_params.update(summary_params)
+            elif summary_params:
+                logger.warning(
+                    f"Conversation summaries are only supported with the {DEFAULT_CONVERSATION_HISTORY_LAYOUT} layout."
+                )
+            return history_cls, history_params
 
         else:
             errors.append(unsupported_memory_error)
+
+    @staticmethod
+    def get_dynamodb_history_class() -> type:
+        """
+        Returns the DynamoDB chat message history class for the layout set in CONVERSATION_HISTORY_LAYOUT.
+        Unsupported values fall back to the single-item layout.
+        """
+        layout = os.getenv(CONVERSATION_HISTORY_LAYOUT_ENV_VAR, DEFAULT_CONVERSATION_HISTORY_LAYOUT)
+        if layout == ConversationHistoryLayouts.MESSAGE_ITEMS.value:
+            return DynamoDBMessageItemHistory
+        if layout != ConversationHistoryLayouts.SINGLE_ITEM.value:
+            logger.warning(
+                f"Unsupported {CONVERSATION_HISTORY_LAYOUT_ENV_VAR} {layout}, using {DEFAULT_CONVERSATION_HISTORY_LAYOUT}."
+            )
+        return DynamoDBChatMessageHistory
+
+    @staticmethod
+    def get_history_token_budget(
+        max_prompt_size: Optional[int], reserved_prompt_size: int = 0, rag_enabled: bool = False
+    ) -> Optional[int]:
+        """
+        Returns the token budget for the conversation history when CONVERSATION_HISTORY_WINDOW is TokenBudget, or None
+        if the history is windowed by message count. The budget is the estimated number of tokens in the characters of
+        max_prompt_size left by the prompt template and the question. With RAG, the retrieved documents need room too,
+        so the history only gets CONVERSATION_HISTORY_BUDGET_PERCENT of them.
+
+        Args:
+            max_prompt_size (Optional[int]): MaxPromptSize of the model, in characters
+            reserved_prompt_size (int): characters taken by the prompt template and the longest question allowed
+            rag_enabled (bool): whether retrieved documents share the prompt with the history
+
+        Returns:
+            Optional[int]: the number of tokens the history may use, or None to keep the last ChatHistoryLength messages
+        """
+        window = os.getenv(CONVERSATION_HISTORY_WINDOW_ENV_VAR, DEFAULT_CONVERSATION_HISTORY_WINDOW)
+        if window == ConversationHistoryWindows.MESSAGE_COUNT.value:
+            return None
+        if window != ConversationHistoryWindows.TOKEN_BUDGET.value:
+            logger.warning(
+                f"Unsupported {CONVERSATION_HISTORY_WINDOW_ENV_VAR} {window}, using {DEFAULT_CONVERSATION_HISTORY_WINDOW}."
+            )
+            return None
+        if not max_prompt_size:
+            logger.warning("No MaxPromptSize to derive the history token budget from, using the message count.")
+            return None
+
+        history_size = max(int(max_prompt_size) - reserved_prompt_size, 0)
+        if rag_enabled:
+            history_size = history_size * ConversationMemoryFactory.get_history_budget_percent() // 100
+        if not history_size:
+            logger.warning("The prompt template and question leave no room for the conversation history.")
+        return history_size // CHARACTERS_PER_TOKEN
+
+    @staticmethod
+    def get_history_budget_percent() -> int:
+        """Returns CONVERSATION_HISTORY_BUDGET_PERCENT, clamped to 0-100, or its default if it is not a number"""
+        try:
+            percent = int(
+                os.getenv(CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR, DEFAULT_CONVERSATION_HISTORY_BUDGET_PERCENT)
+            )
+        except ValueError:
+            logger.warning(
+                f"Invalid value for {CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR}, using {DEFAULT_CONVERSATION_HISTORY_BUDGET_PERCENT}."
+            )
+            return DEFAULT_CONVERSATION_HISTORY_BUDGET_PERCENT
+        return min(max(percent, 0), 100)
+
+    @staticmethod
+    def get_summary_params() -> Dict[str, int]:
+        """
+        Returns the parameters of SummarizingChatMessageHistory set with CONVERSATION_SUMMARY_THRESHOLD and
+        CONVERSATION_SUMMARY_KEEP_MESSAGES, or an empty dict if conversations are not summarised.
+        """
+        try:
+            summary_threshold = int(
+                os.getenv(CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR, DEFAULT_CONVERSATION_SUMMARY_THRESHOLD)
+            )
+            summary_keep_messages = int(
+                os.getenv(CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR, DEFAULT_CONVERSATION_SUMMARY_KEEP_MESSAGES)
+            )
+        except ValueError:
+            logger.warning(
+                f"Invalid value for {CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR} or {CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR}, conversations are not summarised."
+            )
+            return {}
+
+        if summary_threshold <= 0:
+            return {}
+        return {"summary_threshold": summary_threshold, "summary_keep_messages": max(summary_keep_messages, 0)}
@@ -2,24 +2,36 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import importlib
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from aws_lambda_powertools import Logger
-from shared.knowledge.bedrock_knowledge_base import BedrockKnowledgeBase
-from shared.knowledge.kendra_knowledge_base import KendraKnowledgeBase
 from shared.knowledge.knowledge_base import KnowledgeBase
 from utils.constants import TRACE_ID_ENV_VAR
 from utils.enum_types import KnowledgeBaseTypes
 
 logger = Logger(utc=True)
 
-KNOWLEDGE_BASE_MAP: Dict[str, type[KnowledgeBase]] = {
-    KnowledgeBaseTypes.KENDRA.value: KendraKnowledgeBase,
-    KnowledgeBaseTypes.BEDROCK.value: BedrockKnowledgeBase,
+# The knowledge base modules pull in their LangChain retrievers and, for Kendra, the Cognito JWT verifier. They are
+# imported when a use case first needs them, so that use cases without a knowledge base do not load them on cold start.
+KNOWLEDGE_BASE_MAP: Dict[str, Tuple[str, str]] = {
+    KnowledgeBaseTypes.KENDRA.value: ("shared.knowledge.kendra_knowledge_base", "KendraKnowledgeBase"),
+    KnowledgeBaseTypes.BEDROCK.value: ("shared.knowledge.bedrock_knowledge_base", "BedrockKnowledgeBase"),
 }
 
 
+def get_knowledge_base_class(knowledge_base_type: str) -> Optional[type[KnowledgeBase]]:
+    """
+    Returns the KnowledgeBase class of the knowledge base type, importing its module on first use, or None if the
+    type is not supported
+    """
+    module_name, class_name = KNOWLEDGE_BASE_MAP.get(knowledge_base_type, (None, None))
+    if module_name is None:
+        return None
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 class KnowledgeBaseFactory:
     """
     Factory class for creating a knowledge base object based on the KnowledgeBaseType provided, along with its configuration
@@ -31,6 +43,7 @@ class KnowledgeBaseFactory:
     ) -> Optional[KnowledgeBase]:
         """
         Returns a KnowledgeBase object based on the knowledge-base object constructed with the provided configuration.
+        When KnowledgeBaseParams lists AdditionalKnowledgeBases, a CompositeKnowledgeBase querying all of them is returned.
 
         Args:
             use_case_config(Dict): Model configuration set by admin
@@ -65,10 +78,78 @@ class KnowledgeBaseFactory:
             errors.append(unsupported_kb_error + f" Supported types are: {[kb.value for kb in KnowledgeBaseTypes]}")
             return
 
-        knowledge_base_class = KNOWLEDGE_BASE_MAP.get(knowledge_base_str, None)
+        knowledge_base_class = get_knowledge_base_class(knowledge_base_str)
         if knowledge_base_class is None:
             errors.append(f"Unsupported KnowledgeBase type: {knowledge_base_type}.")
         else:
             if not use_case_config.get("KnowledgeBaseParams"):
                 raise ValueError("Missing required parameter (KnowledgeBaseParams) for knowledge base.")
-            return knowledge_base_class(use_case_config.get("KnowledgeBaseParams"), user_context_token)
+            knowledge_base = knowledge_base_class(use_case_config.get("KnowledgeBaseParams"), user_context_token)
+
+            additional_knowledge_bases_params = knowledge_base_params.get("AdditionalKnowledgeBases")
+            if not additional_knowledge_bases_params:
+                return knowledge_base
+
+            knowledge_bases = [knowledge_base]
+            for additional_knowledge_base_params in additional_knowledge_bases_params:
+                additional_knowledge_base = self.get_additional_knowledge_base(
+                    additional_knowledge_base_params, knowledge_base_params, errors, user_context_token
+                )
+                if additional_knowledge_base is None:
+                    return
+                knowledge_bases.append(additional_knowledge_base)
+            from shared.knowledge.composite_knowledge_base import CompositeKnowledgeBase
+
+            return CompositeKnowledgeBase(knowledge_bases, knowledge_base_params)
+
+    def get_additional_knowledge_base(
+        self,
+        additional_knowledge_base_params: Dict,
+        knowledge_base_params: Dict,
+        errors: List[str],
+        user_context_token: str,
+    ) -> Optional[KnowledgeBase]:
+        """
+        Returns a KnowledgeBase object for an entry of AdditionalKnowledgeBases. Unlike the knowledge base configured by
+        KnowledgeBaseParams, which is read from the environment, the entry names its index or knowledge base:
+        KendraKnowledgeBaseParams.ExistingKendraIndexId or BedrockKnowledgeBaseParams.BedrockKnowledgeBaseId. It
+        returns source documents if the use case does.
+
+        Args:
+            additional_knowledge_base_params(Dict): an entry of KnowledgeBaseParams.AdditionalKnowledgeBases
+            knowledge_base_params(Dict): the KnowledgeBaseParams of the use case
+            errors(List): List of errors to append to
+
+        Returns:
+            KnowledgeBase: the knowledge-base constructed with the provided configuration.
+        """
+        knowledge_base_type = additional_knowledge_base_params.get("KnowledgeBaseType")
+        params = {
+            "ReturnSourceDocs": knowledge_base_params.get("ReturnSourceDocs"),
+            **additional_knowledge_base_params,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+
+        if knowledge_base_type == KnowledgeBaseTypes.KENDRA.value:
+            index_id = params.get("KendraKnowledgeBaseParams", {}).get("ExistingKendraIndexId")
+            if not index_id:
+                errors.append(
+                    "Missing required field (KendraKnowledgeBaseParams.ExistingKendraIndexId) in the configuration of an additional Knowledge Base"
+                )
+                return
+            knowledge_base_class = get_knowledge_base_class(knowledge_base_type)
+            return knowledge_base_class(params, user_context_token, index_id=index_id)
+
+        if knowledge_base_type == KnowledgeBaseTypes.BEDROCK.value:
+            knowledge_base_id = params.get("BedrockKnowledgeBaseParams", {}).get("BedrockKnowledgeBaseId")
+            if not knowledge_base_id:
+                errors.append(
+                    "Missing required field (BedrockKnowledgeBaseParams.BedrockKnowledgeBaseId) in the configuration of an additional Knowledge Base"
+                )
+                return
+            knowledge_base_class = get_knowledge_base_class(knowledge_base_type)
+            return knowledge_base_class(params, user_context_token, knowledge_base_id=knowledge_base_id)
+
+        errors.append(
+            f"Unsupported KnowledgeBase type: {knowledge_base_type}. Supported types are: {[kb.value for kb in KnowledgeBaseTypes]}"
+        )
@@ -5,6 +5,7 @@
 import json
 import os
 from abc import ABC
+from copy import deepcopy
 from typing import Any, Dict, List, Optional, Union
 from uuid import uuid4
 
@@ -19,21 +20,55 @@ from utils.constants import (
     CHAT_REQUIRED_ENV_VARS,
     CONVERSATION_ID_EVENT_KEY,
     DEFAULT_RAG_ENABLED_MODE,
+    DEFAULT_USE_CASE_CONFIG_CACHE_TTL,
     LLM_CONFIG_RECORD_FIELD_NAME,
+    LLM_CONFIG_VERSION_FIELD_NAME,
     MESSAGE_KEY,
     PROMPT_EVENT_KEY,
     QUESTION_EVENT_KEY,
     REQUEST_CONTEXT_KEY,
     TRACE_ID_ENV_VAR,
+    USE_CASE_CONFIG_CACHE_TTL_ENV_VAR,
     USE_CASE_CONFIG_RECORD_KEY_ENV_VAR,
     USE_CASE_CONFIG_TABLE_NAME_ENV_VAR,
     USER_ID_EVENT_KEY,
 )
+from utils.cache import TTLCache
 from utils.enum_types import LLMProviderTypes
 
 logger = Logger(utc=True)
 tracer = Tracer()
 
+# Use case configs keyed by (table name, record key), shared by all invocations served by this container
+_use_case_config_cache = TTLCache()
+
+
+def get_use_case_config_cache_ttl() -> int:
+    """
+    Returns the number of seconds a cached use case config is served before being revalidated. 0 disables caching.
+    """
+    try:
+        return max(int(os.getenv(USE_CASE_CONFIG_CACHE_TTL_ENV_VAR, DEFAULT_USE_CASE_CONFIG_CACHE_TTL)), 0)
+    except ValueError:
+        logger.warning(
+            f"Invalid value for {USE_CASE_CONFIG_CACHE_TTL_ENV_VAR}, defaulting to {DEFAULT_USE_CASE_CONFIG_CACHE_TTL}."
+        )
+        return DEFAULT_USE_CASE_CONFIG_CACHE_TTL
+
+
+def clear_use_case_config_cache() -> None:
+    """
+    Drops all cached use case configs
+    """
+    _use_case_config_cache.clear()
+
+
+def expire_use_case_config_cache() -> None:
+    """
+    Marks all cached use case configs as expired, so that each is revalidated against its version marker when next read
+    """
+    _use_case_config_cache.expire_all()
+
 
 class LLMChatClient(ABC):
     """
@@ -269,36 +304,90 @@ class LLMChatClient(ABC):
     @tracer.capture_method(capture_response=True)
     def retrieve_use_case_config(self) -> Dict:
         """
-        Retrieves the configuration that the admin sets on a use-case fetched from DynamoDB
+        Retrieves the configuration that the admin sets on a use-case fetched from DynamoDB. The config is cached for
+        the lifetime of the warm container; once the cached entry is older than USE_CASE_CONFIG_CACHE_TTL seconds,
+        it is revalidated with a projection-only read of the record's version marker and only re-fetched in full
+        if that marker changed. Setting USE_CASE_CONFIG_CACHE_TTL to 0 disables the cache.
+
         Returns:
             Dict: Stores the configuration that the admin sets on a use-case fetched from DynamoDB
         Raises:
             ValueError: If the environment variables it requires are not set.
         """
 
-        with tracer.provider.in_subsegment("## use_case_config") as subsegment:
-            subsegment.put_annotation("service", "dynamodb")
-            subsegment.put_annotation("operation", "get_item")
+        # The LLM config table from which the config must be fetched
+        use_case_config_table = os.getenv(USE_CASE_CONFIG_TABLE_NAME_ENV_VAR)
+
+        # USE_CASE_CONFIG_RECORD_KEY_ENV_VAR is the key of the row in the DynamoDB table where the config is
+        # LLM_CONFIG_RECORD_FIELD_NAME is the name of DynamoDB field
+        record_key = os.getenv(USE_CASE_CONFIG_RECORD_KEY_ENV_VAR)
+
+        if not use_case_config_table or not record_key:
+            error_message = f"Missing required environment variable {USE_CASE_CONFIG_TABLE_NAME_ENV_VAR} or {USE_CASE_CONFIG_RECORD_KEY_ENV_VAR}."
+            logger.error(error_message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+            raise ValueError(error_message)
+
+        cache_ttl = get_use_case_config_cache_ttl()
+        cache_key = (use_case_config_table, record_key)
+        entry = _use_case_config_cache.get_entry(cache_key) if cache_ttl > 0 else None
+
+        if entry is not None:
+            cached_config, cached_version = entry.value
+            if not entry.expired:
+                return deepcopy(cached_config)
+
+            item = self._get_use_case_config_item(
+                use_case_config_table, record_key, [LLM_CONFIG_RECORD_FIELD_NAME, LLM_CONFIG_VERSION_FIELD_NAME]
+            )
+            if item and item.get(LLM_CONFIG_VERSION_FIELD_NAME) == cached_version:
+                _use_case_config_cache.touch(cache_key, cache_ttl)
+                return deepcopy(cached_config)
+
+            logger.debug(f"Cached usecase config with key {record_key} is stale, fetching it again.")
+            _use_case_config_cache.invalidate(cache_key)
+
+        item = self._get_use_case_config_item(
+            use_case_config_table, record_key, ["config", LLM_CONFIG_VERSION_FIELD_NAME], consistent_read=True
+        )
+        config = item.get("config", {})
+        if config:
+            if cache_ttl > 0:
+                _use_case_config_cache.put(cache_key, (config, item.get(LLM_CONFIG_VERSION_FIELD_NAME)), cache_ttl)
+            return deepcopy(config)
+        else:
+            error_message = f"No usecase config found with key {record_key}."
+            logger.error(error_message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+            raise ValueError(error_message)
 
-            # The LLM config table from which the config must be fetched
-            use_case_config_table = os.getenv(USE_CASE_CONFIG_TABLE_NAME_ENV_VAR)
+    def _get_use_case_config_item(
+        self, table_name: str, record_key: str, attributes: List[str], consistent_read: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Reads the given attributes of the use case config record from DynamoDB.
 
-            # USE_CASE_CONFIG_RECORD_KEY_ENV_VAR is the key of the row in the DynamoDB table where the config is
-            # LLM_CONFIG_RECORD_FIELD_NAME is the name of DynamoDB field
-            record_key = os.getenv(USE_CASE_CONFIG_RECORD_KEY_ENV_VAR)
+        Args:
+            table_name (str): name of the use case config table
+            record_key (str): key of the use case config record
+            attributes (List[str]): attributes to project from the record
+            consistent_read (bool): whether to perform a strongly consistent read
 
-            if not use_case_config_table or not record_key:
-                error_message = f"Missing required environment variable {USE_CASE_CONFIG_TABLE_NAME_ENV_VAR} or {USE_CASE_CONFIG_RECORD_KEY_ENV_VAR}."
-                logger.error(error_message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
-                raise ValueError(error_message)
+        Returns:
+            Dict: the projected item, or an empty dict if the record does not exist
+        Raises:
+            ValueError: If the table does not exist
+        """
+        with tracer.provider.in_subsegment("## use_case_config") as subsegment:
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "get_item")
 
             try:
                 ddb_resource = get_service_resource("dynamodb")
-                use_case_config_table = ddb_resource.Table(use_case_config_table)
+                use_case_config_table = ddb_resource.Table(table_name)
                 response = use_case_config_table.get_item(
                     Key={LLM_CONFIG_RECORD_FIELD_NAME: record_key},
-                    ProjectionExpression="config",
-                    ConsistentRead=True,
+                    ProjectionExpression=", ".join(f"#{idx}" for idx in range(len(attributes))),
+                    ExpressionAttributeNames={f"#{idx}": attribute for idx, attribute in enumerate(attributes)},
+                    ConsistentRead=consistent_read,
                 )
             except ClientError as ce:
                 error_message = f"Error retrieving usecase config with key {record_key}."
@@ -309,13 +398,7 @@ class LLMChatClient(ABC):
                     logger.error(ce, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
                     raise ce
 
-            config = response.get("Item", {}).get("config", {})
-            if config:
-                return config
-            else:
-                error_message = f"No usecase config found with key {record_key}."
-                logger.error(error_message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
-                raise ValueError(error_message)
+            return response.get("Item", {})
 
     @tracer.capture_method
     def construct_chat_model(
@@ -3,15 +3,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
-from typing import Dict, Optional, Union
+from typing import Dict, Optional
 from uuid import UUID, uuid4
 
 from aws_lambda_powertools import Logger, Tracer
 
 from clients.builders.sagemaker_builder import SageMakerBuilder
 from clients.llm_chat_client import LLMChatClient
-from llms.rag.sagemaker_retrieval import SageMakerRetrievalLLM
-from llms.sagemaker import SageMakerLLM
+from llms.base_langchain import BaseLangChainModel
 from utils.constants import (
     AUTH_TOKEN_EVENT_KEY,
     CONVERSATION_ID_EVENT_KEY,
@@ -53,7 +52,7 @@ class SageMakerClient(LLMChatClient):
     ) -> None:
         super().__init__(connection_id=connection_id, rag_enabled=rag_enabled, use_case_config=use_case_config)
 
-    def get_model(self, event_body: Dict, user_id: UUID) -> Union[SageMakerLLM, SageMakerRetrievalLLM]:
+    def get_model(self, event_body: Dict, user_id: UUID) -> BaseLangChainModel:
         """
         Retrieves the SageMaker client.
 
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+
+from aws_lambda_powertools import Logger
+from helper import clear_service_clients
+
+from clients.llm_chat_client import LLMChatClient, expire_use_case_config_cache
+from llms.base_langchain import clear_runnable_cache
+from shared.defaults.model_defaults import expire_model_defaults_cache
+from utils.constants import (
+    CHAT_REQUIRED_ENV_VARS,
+    CONTAINER_PRIMING_ENV_VAR,
+    CONVERSATION_ID_EVENT_KEY,
+    DEFAULT_CONTAINER_PRIMING,
+    DEFAULT_RAG_ENABLED_MODE,
+    LAMBDA_INITIALIZATION_TYPE_ENV_VAR,
+    PRIMING_ID,
+    QUESTION_EVENT_KEY,
+    TRACE_ID_ENV_VAR,
+)
+from utils.request_metrics import request_metrics_scope
+
+logger = Logger(utc=True)
+
+
+def is_container_priming_enabled() -> bool:
+    """
+    Returns True if the container is to be primed: the code is initializing a Lambda execution environment and
+    CONTAINER_PRIMING is "true". Priming is opt-in, as it moves the config and model defaults reads and the model
+    build into the init phase, which the first request still waits for with on-demand initialization. It pays off with
+    SnapStart or provisioned concurrency, whose init phase runs ahead of the requests.
+    """
+    if not os.getenv(LAMBDA_INITIALIZATION_TYPE_ENV_VAR):
+        return False
+
+    container_priming = os.getenv(CONTAINER_PRIMING_ENV_VAR, DEFAULT_CONTAINER_PRIMING).strip().lower()
+    if container_priming not in ("true", "false"):
+        logger.warning(f"Invalid value for {CONTAINER_PRIMING_ENV_VAR}, defaulting to {DEFAULT_CONTAINER_PRIMING}.")
+        container_priming = DEFAULT_CONTAINER_PRIMING
+    return container_priming == "true"
+
+
+def prime_container(llm_client_type: LLMChatClient.__class__) -> bool:
+    """
+    Builds the chat model of the container's use case the way a request does, without asking it a question. This
+    creates the boto3 clients, caches the use case config and the model defaults, and builds the prompt templates and
+    the LangChain runnable, which later requests reuse from the runnable cache. Failures are logged and left for the
+    first request to run into.
+
+    Args:
+        llm_client_type (LLMChatClient.__class__): the client class the handler builds its models with
+
+    Returns:
+        bool: True if the chat model was built
+    """
+    # no trace ID is set while the execution environment initializes
+    missing_env_vars = [env for env in CHAT_REQUIRED_ENV_VARS if env != TRACE_ID_ENV_VAR and not os.getenv(env)]
+    if missing_env_vars:
+        logger.warning(f"Skipping container priming, missing required environment variables {missing_env_vars}.")
+        return False
+
+    start_time = time.time()
+    # the metrics recorded while building the model are dropped rather than published for a request
+    with request_metrics_scope() as request_metrics:
+        try:
+            llm_client = llm_client_type(connection_id=PRIMING_ID)
+            llm_client.rag_enabled = llm_client.use_case_config.get("LlmParams", {}).get(
+                "RAGEnabled", DEFAULT_RAG_ENABLED_MODE
+            )
+            llm_client.get_model({QUESTION_EVENT_KEY: "", CONVERSATION_ID_EVENT_KEY: PRIMING_ID}, PRIMING_ID)
+        except Exception as ex:
+            logger.warning(f"Priming the container failed, the first request will build the chat model: {ex}")
+            return False
+        finally:
+            request_metrics.clear()
+
+    logger.info(f"Primed the container in {(time.time() - start_time) * 1000:.0f} ms.")
+    return True
+
+
+def refresh_after_restore(llm_client_type: LLMChatClient.__class__) -> bool:
+    """
+    Primes a container restored from a snapshot again. The snapshot may be restored long after it was taken, so the
+    use case config and the model defaults cached when it was taken are expired first: the config is then revalidated
+    against its version marker and the model defaults are read again. The cached boto3 clients and the runnables
+    holding them are dropped too, as their connections do not survive the restore, so priming again creates new ones
+    before the first request.
+
+    Args:
+        llm_client_type (LLMChatClient.__class__): the client class the handler builds its models with
+
+    Returns:
+        bool: True if the chat model was built
+    """
+    clear_service_clients()
+    clear_runnable_cache()
+    expire_use_case_config_cache()
+    expire_model_defaults_cache()
+    return prime_container(llm_client_type)
+
+
+def prime_container_on_init(llm_client_type: LLMChatClient.__class__) -> None:
+    """
+    Primes the container while Lambda initializes it, when enabled. Called at module level by the handlers, so that
+    the work is done in the init phase, or before the snapshot is taken with SnapStart, instead of by the first request.
+    With SnapStart, the container is primed again after each restore.
+
+    Args:
+        llm_client_type (LLMChatClient.__class__): the client class the handler builds its models with
+    """
+    if not is_container_priming_enabled():
+        return
+
+    try:
+        # provided by the Lambda runtime for functions with SnapStart
+        from snapshot_restore_py import register_after_restore
+    except ImportError:
+        register_after_restore = None
+
+    if register_after_restore is not None:
+        register_after_restore(refresh_after_restore, llm_client_type)
+
+    prime_container(llm_client_type)
@@ -3,9 +3,11 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
+import contextvars
 import json
 import os
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -14,14 +16,19 @@ from clients.llm_chat_client import LLMChatClient
 from shared.callbacks.websocket_error_handler import WebsocketErrorHandler
 from shared.callbacks.websocket_gone_exception import WebSocketGoneException
 from shared.callbacks.websocket_handler import WebsocketHandler
+from shared.callbacks.websocket_streaming_handler import WebsocketStreamingCallbackHandler
 from utils.constants import (
     DEFAULT_RAG_ENABLED_MODE,
+    DEFAULT_RECORD_PROCESSING_CONCURRENCY,
     END_CONVERSATION_TOKEN,
     MESSAGE_KEY,
+    MIN_REMAINING_TIME_FOR_RECORD_MS,
+    RECORD_PROCESSING_CONCURRENCY_ENV_VAR,
     REQUEST_CONTEXT_KEY,
     TRACE_ID_ENV_VAR,
     USER_ID_EVENT_KEY,
 )
+from utils.request_metrics import request_metrics_scope
 
 logger = Logger(utc=True)
 tracer = Tracer()
@@ -63,6 +70,34 @@ class UseCaseHandler:
             index += 1
         return index
 
+    def drain_streaming_callbacks(self, callbacks) -> None:
+        """
+        Waits for streaming callbacks to deliver everything they have buffered or queued, so that nothing is posted
+        to the connection after END_CONVERSATION_TOKEN.
+
+        :param callbacks: List of callback objects to drain
+        :raises WebSocketGoneException: If the connection went away while payloads were being delivered
+        """
+        for callback in callbacks or []:
+            if isinstance(callback, WebsocketStreamingCallbackHandler):
+                callback.drain()
+
+    def compact_conversation_history(self, llm_chat, context: LambdaContext) -> None:
+        """
+        Lets the model summarise the older turns of the conversation once the response has been sent, if there is
+        time left. A failure only means the conversation is summarised on a later turn, so it does not fail the record.
+        Summarising calls the LLM, so process_records only compacts once every record has been answered.
+
+        :param llm_chat: the model that answered the question
+        :param context (LambdaContext): AWS Lambda Context
+        """
+        if context.get_remaining_time_in_millis() < MIN_REMAINING_TIME_FOR_RECORD_MS:
+            return
+        try:
+            llm_chat.compact_conversation_history()
+        except Exception as ex:
+            logger.warning(f"Failed to summarise the conversation history: {ex}")
+
     def check_streaming_failed(self, callbacks) -> bool:
         """
         Check if streaming failed by examining callbacks for has_streamed attribute.
@@ -77,89 +112,186 @@ class UseCaseHandler:
             logger.info("Streaming was enabled but failed - using fallback")
         return streaming_failed
 
+    @staticmethod
+    def get_record_concurrency() -> int:
+        """
+        Number of connections whose records are processed concurrently, from RECORD_PROCESSING_CONCURRENCY.
+
+        :return: the configured concurrency, DEFAULT_RECORD_PROCESSING_CONCURRENCY if not set or invalid
+        """
+        value = os.environ.get(RECORD_PROCESSING_CONCURRENCY_ENV_VAR)
+        if value is None:
+            return DEFAULT_RECORD_PROCESSING_CONCURRENCY
+        try:
+            return max(int(value), 1)
+        except ValueError:
+            logger.warning(
+                f"Invalid value for {RECORD_PROCESSING_CONCURRENCY_ENV_VAR}, processing records sequentially."
+            )
+            return DEFAULT_RECORD_PROCESSING_CONCURRENCY
+
+    @staticmethod
+    def group_records_by_connection(records: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Groups SQS records by the WebSocket connection they belong to, keeping the order of the records within each
+        connection and ordering the groups by their first record.
+
+        :param records: List of SQS records from the event
+        :return: the records of each connection
+        """
+        groups = {}
+        for record in records:
+            connection_id = record.get("messageAttributes", {}).get("connectionId", {}).get("stringValue")
+            groups.setdefault(connection_id, []).append(record)
+        return list(groups.values())
+
     def handle_event(self, event: Dict[str, Any], context: LambdaContext) -> Dict:
         """
         Create a LLMChatClient concrete object type based on the configuration in `event` and
-        admin configuration and use it to answer user questions
+        admin configuration and use it to answer user questions.
+
+        Records are processed in order. When RECORD_PROCESSING_CONCURRENCY is greater than 1, the records of different
+        connections are processed concurrently on a bounded thread pool, while the records of each connection are
+        still processed in order.
         :param event (Dict): AWS Lambda Event
         :param context (LambdaContext): AWS Lambda Context
         :return: the generated response from the chatbot
         """
+        records = event["Records"]
+        logger.debug(f"Total records received in the event: {len(records)}")
+        sqs_batch_response = {}
+
+        concurrency = self.get_record_concurrency()
+        record_groups = self.group_records_by_connection(records) if concurrency > 1 else []
+        if len(record_groups) > 1:
+            batch_item_failures = self.process_record_groups(record_groups, context, concurrency)
+            # report failures in the order of the batch, as sequential processing does
+            record_positions = {record["messageId"]: index for index, record in enumerate(records)}
+            batch_item_failures.sort(key=lambda failure: record_positions[failure["itemIdentifier"]])
+        else:
+            batch_item_failures = self.process_records(records, context)
+
+        sqs_batch_response["batchItemFailures"] = batch_item_failures
+        return sqs_batch_response
+
+    def process_record_groups(
+        self, record_groups: List[List[Dict[str, Any]]], context: LambdaContext, concurrency: int
+    ) -> List[Dict[str, str]]:
+        """
+        Processes each group of records with process_records, running up to `concurrency` groups at a time.
+
+        :param record_groups: the records of each connection, as returned by group_records_by_connection
+        :param context (LambdaContext): AWS Lambda Context
+        :param concurrency: maximum number of groups processed at the same time
+        :return: the batch item failures of all groups
+        """
+
+        def process_group(group: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+            # a group that waited for a free worker is only started if a record can still complete
+            if context.get_remaining_time_in_millis() < MIN_REMAINING_TIME_FOR_RECORD_MS:
+                logger.debug(f"Lambda reaching timeout and hence adding {len(group)} messages to batch_item_failures")
+                return [{"itemIdentifier": record["messageId"]} for record in group]
+            return self.process_records(group, context)
+
+        with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(record_groups)), thread_name_prefix="record-group"
+        ) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, process_group, group) for group in record_groups]
+            return [failure for future in futures for failure in future.result()]
+
+    def process_records(self, records: List[Dict[str, Any]], context: LambdaContext) -> List[Dict[str, str]]:
+        """
+        Processes the records in order, answering the question in each of them. The conversations answered are then
+        compacted, once per conversation, so that the summarisation LLM calls do not delay the records that follow.
+        :param records: List of SQS records to process
+        :param context (LambdaContext): AWS Lambda Context
+        :return: the batch item failures for records that failed or were not processed in time
+        """
         batch_item_failures = []
+        # the model that last answered each conversation, compacted after the last record
+        models_to_compact = {}
 
         loop_index = 0
-        total_records = len(event["Records"])
-        logger.debug(f"Total records received in the event: {total_records}")
-        sqs_batch_response = {}
+        total_records = len(records)
 
         while loop_index < total_records:
             logger.debug(f"Processing record number {loop_index}")
             connection_id = None
             conversation_id = None
-            record = event["Records"][loop_index]
-
-            try:
-                event_body = json.loads(record["body"])
-                request_context = event_body[REQUEST_CONTEXT_KEY]
-                connection_id = request_context["connectionId"]
-
-                llm_client = self.llm_client_type(
-                    connection_id=connection_id,
-                )
-                conversation_id = llm_client.get_event_conversation_id(event_body)
-                llm_client.check_env()
-                updated_event_body = llm_client.check_event(event_body, conversation_id)
-                event_message = updated_event_body[MESSAGE_KEY]
-                llm_client.rag_enabled = llm_client.use_case_config.get("LlmParams", {}).get(
-                    "RAGEnabled", DEFAULT_RAG_ENABLED_MODE
-                )
-                llm_chat = llm_client.get_model(
-                    event_message,
-                    request_context["authorizer"][USER_ID_EVENT_KEY],
-                )
-                ai_response = llm_chat.generate(event_message["question"])
-
-                socket_handler = WebsocketHandler(
-                    connection_id=connection_id,
-                    conversation_id=conversation_id,
-                    message_id=llm_client.builder.message_id,
-                )
-
-                # Send response via WebSocket if streaming is disabled OR if streaming failed
-                streaming_failed = self.check_streaming_failed(llm_client.builder.callbacks)
-
-                if not llm_client.builder.is_streaming or streaming_failed:
-                    socket_handler.post_response_to_connection(ai_response)
-
-                socket_handler.post_token_to_connection(END_CONVERSATION_TOKEN)
-                loop_index = loop_index + 1
-
-                # check if under 20 seconds remaining, proceed with aborting processing of records
-                while context.get_remaining_time_in_millis() < 20000 and loop_index < total_records:
-                    logger.debug(
-                        f"Lambda reaching timeout and hence adding {loop_index}th message to batch_item_failures"
+            record = records[loop_index]
+
+            # every metric recorded for this record is published as one EMF document when the scope exits
+            with request_metrics_scope():
+                try:
+                    event_body = json.loads(record["body"])
+                    request_context = event_body[REQUEST_CONTEXT_KEY]
+                    connection_id = request_context["connectionId"]
+
+                    llm_client = self.llm_client_type(
+                        connection_id=connection_id,
+                    )
+                    conversation_id = llm_client.get_event_conversation_id(event_body)
+                    llm_client.check_env()
+                    updated_event_body = llm_client.check_event(event_body, conversation_id)
+                    event_message = updated_event_body[MESSAGE_KEY]
+                    llm_client.rag_enabled = llm_client.use_case_config.get("LlmParams", {}).get(
+                        "RAGEnabled", DEFAULT_RAG_ENABLED_MODE
                     )
-                    batch_item_failures.append({"itemIdentifier": event["Records"][loop_index]["messageId"]})
+                    llm_chat = llm_client.get_model(
+                        event_message,
+                        request_context["authorizer"][USER_ID_EVENT_KEY],
+                    )
+                    ai_response = llm_chat.generate(event_message["question"])
+                    self.drain_streaming_callbacks(llm_client.builder.callbacks)
+
+                    socket_handler = WebsocketHandler(
+                        connection_id=connection_id,
+                        conversation_id=conversation_id,
+                        message_id=llm_client.builder.message_id,
+                    )
+
+                    # Send response via WebSocket if streaming is disabled OR if streaming failed
+                    streaming_failed = self.check_streaming_failed(llm_client.builder.callbacks)
+
+                    if not llm_client.builder.is_streaming or streaming_failed:
+                        socket_handler.post_response_to_connection(ai_response)
+
+                    socket_handler.post_token_to_connection(END_CONVERSATION_TOKEN)
+                    models_to_compact[conversation_id] = llm_chat
                     loop_index = loop_index + 1
-            except WebSocketGoneException:
-                logger.error(
-                    f"WebSocket connection {connection_id} is gone. Returning success to SQS.",
-                    xray_trace_id=os.getenv(TRACE_ID_ENV_VAR),
-                )
-                loop_index = self.skip_records_for_connection(event["Records"], loop_index, total_records, connection_id)
-            except Exception as ex:
-                tracer_id = os.getenv(TRACE_ID_ENV_VAR)
-                chat_error = f"Chat service failed to respond. Please contact your administrator for support and quote the following trace id: {tracer_id}"
-                logger.error(f"An exception occurred in the processing of chat: {ex}", xray_trace_id=tracer_id)
-                error_handler = WebsocketErrorHandler(
-                    connection_id=connection_id, trace_id=tracer_id, conversation_id=conversation_id
-                )
-                error_handler.post_token_to_connection(chat_error)
-
-                start_index = loop_index
-                loop_index = self.skip_records_for_connection(event["Records"], loop_index, total_records, connection_id)
-                for i in range(start_index, loop_index):
-                    batch_item_failures.append({"itemIdentifier": event["Records"][i]["messageId"]})
 
-        sqs_batch_response["batchItemFailures"] = batch_item_failures
-        return sqs_batch_response
+                    # check if under 20 seconds remaining, proceed with aborting processing of records
+                    while (
+                        context.get_remaining_time_in_millis() < MIN_REMAINING_TIME_FOR_RECORD_MS
+                        and loop_index < total_records
+                    ):
+                        logger.debug(
+                            f"Lambda reaching timeout and hence adding {loop_index}th message to batch_item_failures"
+                        )
+                        batch_item_failures.append({"itemIdentifier": records[loop_index]["messageId"]})
+                        loop_index = loop_index + 1
+                except WebSocketGoneException:
+                    logger.error(
+                        f"WebSocket connection {connection_id} is gone. Returning success to SQS.",
+                        xray_trace_id=os.getenv(TRACE_ID_ENV_VAR),
+                    )
+                    loop_index = self.skip_records_for_connection(records, loop_index, total_records, connection_id)
+                except Exception as ex:
+                    tracer_id = os.getenv(TRACE_ID_ENV_VAR)
+                    chat_error = f"Chat service failed to respond. Please contact your administrator for support and quote the following trace id: {tracer_id}"
+                    logger.error(f"An exception occurred in the processing of chat: {ex}", xray_trace_id=tracer_id)
+                    error_handler = WebsocketErrorHandler(
+                        connection_id=connection_id, trace_id=tracer_id, conversation_id=conversation_id
+                    )
+                    error_handler.post_token_to_connection(chat_error)
+
+                    start_index = loop_index
+                    loop_index = self.skip_records_for_connection(records, loop_index, total_records, connection_id)
+                    for i in range(start_index, loop_index):
+                        batch_item_failures.append({"itemIdentifier": records[i]["messageId"]})
+
+        for llm_chat in models_to_compact.values():
+            with request_metrics_scope():
+                self.compact_conversation_history(llm_chat, context)
+
+        return batch_item_failures
@@ -2,10 +2,14 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import hashlib
+import json
+import math
 import os
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Union
+from dataclasses import fields
+from typing import Any, Dict, List, Tuple, Union
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.metrics import MetricUnit
@@ -21,16 +25,21 @@ from langchain_core.runnables.history import RunnableWithMessageHistory
 
 from llms.models.model_provider_inputs import ModelProviderInputs
 from shared.defaults.model_defaults import ModelDefaults
+from shared.memory.ddb_summarizing_message_history import SummarizingChatMessageHistory
+from utils.cache import TTLCache
 from utils.constants import (
     CONVERSATION_ID_KEY,
     CONVERSATION_TRACER_KEY,
     DEFAULT_RAG_ENABLED_MODE,
+    DEFAULT_RUNNABLE_CACHE_SIZE,
     DEFAULT_VERBOSE_MODE,
     HISTORY_KEY,
     INPUT_KEY,
     LLM_RESPONSE_KEY,
     MESSAGE_ID_KEY,
     RAG_CONVERSATION_TRACER_KEY,
+    REQUEST_CALLBACKS_KEY,
+    SESSION_HISTORY_CACHE_SIZE,
     TRACE_ID_ENV_VAR,
     USER_ID_KEY,
 )
@@ -41,6 +50,40 @@ tracer = Tracer()
 logger = Logger(utc=True)
 metrics = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
 
+# LangChain components keyed by a hash of the effective config they were built from. Per-request state (callbacks,
+# retrievers and IDs) is supplied through the invoke configuration, so one graph serves every request with that config.
+_runnable_cache = TTLCache(ttl=math.inf, max_size=DEFAULT_RUNNABLE_CACHE_SIZE)
+
+# Summarising histories handed to the runnables, keyed by message ID, so that compacting the conversation once the
+# response has been sent reuses the history the request already read and appended to
+_session_histories = TTLCache(ttl=math.inf, max_size=SESSION_HISTORY_CACHE_SIZE)
+
+# Model inputs that carry per-request state and are therefore not part of the runnable cache key
+REQUEST_SCOPED_MODEL_INPUTS = ("callbacks", "knowledge_base", "conversation_history_params")
+REQUEST_SCOPED_HISTORY_PARAMS = (USER_ID_KEY, CONVERSATION_ID_KEY, MESSAGE_ID_KEY)
+
+
+def clear_runnable_cache() -> None:
+    """
+    Drops all cached LangChain components
+    """
+    _runnable_cache.clear()
+
+
+def request_callbacks_config(config: RunnableConfig) -> RunnableConfig:
+    """
+    Config factory that attaches the callbacks passed for the current request under REQUEST_CALLBACKS_KEY
+    """
+    callbacks = config.get("configurable", {}).get(REQUEST_CALLBACKS_KEY)
+    return {"callbacks": list(callbacks)} if callbacks else {}
+
+
+def bind_request_callbacks(runnable: RunnableSerializable) -> RunnableBinding:
+    """
+    Wraps the runnable so that the request's callbacks are attached to it, and its children, at invoke time
+    """
+    return RunnableBinding(bound=runnable, config_factories=[request_callbacks_config])
+
 
 class BaseLangChainModel(ABC):
     """
@@ -53,6 +96,7 @@ class BaseLangChainModel(ABC):
     Methods:
         Specific implementation must be provided by the implementing class for the following abstract methods:
 
+        - set_runnable(): Sets the llm, chain and runnable, reusing the ones built for an identical config in this container
         - get_runnable(): Creates a 'RunnableWithMessageHistory' (in case of non-streaming) or 'RunnableBinding' (in case of streaming) LangChain runnable that is connected to a conversation memory and the specified prompt. In case of Retrieval Augmented Generated (RAG) use cases, this is also connected to a knowledge base.
         - get_session_history(user_id, conversation_id): Retrieves the conversation history from the conversation memory based on the user_id and conversation_id.
         - generate(question, operation): Invokes the LLM to fetch a response for the given question. Operation is used for metrics.
@@ -62,6 +106,9 @@ class BaseLangChainModel(ABC):
         - get_clean_model_params(): Returns the cleaned and formatted model parameters that are used by the LLM. Each child class must provide its own implementation based on the model parameters it supports.
     """
 
+    # Components built by create_runnable that are shared between models with the same effective config
+    RUNNABLE_ATTRIBUTES: Tuple[str, ...] = ("llm", "chain", "runnable_with_history")
+
     def __init__(self, model_defaults: ModelDefaults, model_inputs: ModelProviderInputs) -> None:
         self.model_defaults = model_defaults
         self._model_inputs = model_inputs
@@ -188,10 +235,121 @@ class BaseLangChainModel(ABC):
         Returns:
             BaseChatMessageHistory: The conversation history object.
         """
-        self.conversation_history_params[USER_ID_KEY] = user_id
-        self.conversation_history_params[CONVERSATION_ID_KEY] = conversation_id
-        self.conversation_history_params[MESSAGE_ID_KEY] = message_id
-        return self.conversation_history_cls(**self.conversation_history_params)
+        # The runnable calling this may be shared across requests, so the instance params are not modified
+        conversation_history_params = {
+            **self.conversation_history_params,
+            USER_ID_KEY: user_id,
+            CONVERSATION_ID_KEY: conversation_id,
+            MESSAGE_ID_KEY: message_id,
+        }
+        history = self.conversation_history_cls(**conversation_history_params)
+        if isinstance(history, SummarizingChatMessageHistory):
+            _session_histories.put(message_id, history)
+        return history
+
+    def compact_conversation_history(self) -> None:
+        """
+        Folds the older turns of the conversation into its rolling summary, when the conversation memory keeps one.
+        Summarising calls the LLM, so this is meant to be called after the response has been sent. The history read
+        while answering is reused, so a conversation that does not need summarising costs no further reads.
+        """
+        if not (
+            isinstance(self.conversation_history_cls, type)
+            and issubclass(self.conversation_history_cls, SummarizingChatMessageHistory)
+        ):
+            return
+
+        message_id = self.conversation_history_params[MESSAGE_ID_KEY]
+        history = _session_histories.get(message_id)
+        if history is None:
+            history = self.get_session_history(
+                self.conversation_history_params[USER_ID_KEY],
+                self.conversation_history_params[CONVERSATION_ID_KEY],
+                message_id,
+            )
+        _session_histories.invalidate(message_id)
+        with tracer.provider.in_subsegment("## conversation_summary") as subsegment:
+            subsegment.put_annotation("library", "langchain")
+            if history.compact(self.summarize):
+                logger.debug(f"Stored a new summary for conversation {history.conversation_id}")
+
+    def summarize(self, prompt: str) -> str:
+        """
+        Completes a summarisation prompt with the LLM, without the request's callbacks so nothing is streamed.
+
+        Args:
+            prompt (str): the summarisation prompt
+
+        Returns:
+            str: the generated summary
+        """
+        response = self.llm.invoke(prompt)
+        return response if isinstance(response, str) else response.text
+
+    def create_runnable(self) -> None:
+        """
+        Builds the LLM, chain and runnable for this model. Child classes building additional components override this
+        and extend RUNNABLE_ATTRIBUTES.
+        """
+        self.llm = self.get_llm()
+        self.chain = self.get_chain()
+        self.runnable_with_history = self.get_runnable()
+
+    def set_runnable(self) -> None:
+        """
+        Sets the components listed in RUNNABLE_ATTRIBUTES, reusing the ones built by an earlier model with the same
+        effective config in this container instead of rebuilding the LangChain graph for every request.
+        """
+        cache_key = self.get_runnable_cache_key()
+        components = _runnable_cache.get(cache_key)
+        if components is None:
+            self.create_runnable()
+            _runnable_cache.put(cache_key, {name: getattr(self, name) for name in self.RUNNABLE_ATTRIBUTES})
+        else:
+            logger.debug("Reusing LangChain runnable built for an identical config.")
+            for name, value in components.items():
+                setattr(self, name, value)
+
+    def get_runnable_cache_key(self) -> str:
+        """
+        Hashes the config the runnable is built from: the model class, the model defaults and the model inputs, less
+        the per-request callbacks, knowledge base and conversation IDs.
+
+        Returns:
+            (str): hex digest identifying the effective config
+        """
+        model_inputs = {
+            field.name: getattr(self._model_inputs, field.name)
+            for field in fields(self._model_inputs)
+            if field.name not in REQUEST_SCOPED_MODEL_INPUTS
+        }
+        conversation_history_params = {
+            key: value
+            for key, value in (self.conversation_history_params or {}).items()
+            if key not in REQUEST_SCOPED_HISTORY_PARAMS
+        }
+        effective_config = {
+            "model_class": f"{type(self).__module__}.{type(self).__qualname__}",
+            "model_defaults": vars(self.model_defaults),
+            "model_inputs": model_inputs,
+            "conversation_history_params": conversation_history_params,
+            "knowledge_base": type(self._model_inputs.knowledge_base).__name__,
+        }
+        serialized_config = json.dumps(effective_config, sort_keys=True, default=str)
+        return hashlib.sha256(serialized_config.encode("utf-8")).hexdigest()
+
+    def get_invoke_configuration(self) -> RunnableConfig:
+        """
+        Returns the per-request configuration passed to the runnable when invoking it
+        """
+        return {
+            "configurable": {
+                CONVERSATION_ID_KEY: self.conversation_history_params[CONVERSATION_ID_KEY],
+                USER_ID_KEY: self.conversation_history_params[USER_ID_KEY],
+                MESSAGE_ID_KEY: self.conversation_history_params[MESSAGE_ID_KEY],
+                REQUEST_CALLBACKS_KEY: self.callbacks,
+            }
+        }
 
     @abstractmethod
     def get_chain(self) -> RunnableSerializable:
@@ -262,8 +420,7 @@ class BaseLangChainModel(ABC):
             ],
         )
 
-        with_message_history = with_message_history.with_config(RunnableConfig(callbacks=self.callbacks))
-        return with_message_history
+        return bind_request_callbacks(with_message_history)
 
     @tracer.capture_method(capture_response=True)
     def generate(self, question: str) -> Dict[str, Any]:
@@ -283,20 +440,13 @@ class BaseLangChainModel(ABC):
 
         Note: Add error handling based on your model implementation
         """
-        invoke_configuration = {
-            "configurable": {
-                CONVERSATION_ID_KEY: self.conversation_history_params[CONVERSATION_ID_KEY],
-                USER_ID_KEY: self.conversation_history_params[USER_ID_KEY],
-                MESSAGE_ID_KEY: self.conversation_history_params[MESSAGE_ID_KEY],
-            }
-        }
+        invoke_configuration = self.get_invoke_configuration()
         operation = RAG_CONVERSATION_TRACER_KEY if self.rag_enabled else CONVERSATION_TRACER_KEY
 
         with tracer.provider.in_subsegment("## llm_chain") as subsegment:
             subsegment.put_annotation("library", "langchain")
             subsegment.put_annotation("operation", operation)
             metrics.add_metric(name=CloudWatchMetrics.LANGCHAIN_QUERY.value, unit=MetricUnit.Count, value=1)
-            metrics.flush_metrics()
 
             response = {}
             start_time = time.time()
@@ -320,7 +470,6 @@ class BaseLangChainModel(ABC):
                 value=(end_time - start_time),
             )
             logger.debug(f"Model response received: {model_response}")
-            metrics.flush_metrics()
             return response
 
     def get_validated_prompt(
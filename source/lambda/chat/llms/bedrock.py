@@ -14,7 +14,9 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables.base import RunnableSerializable
 
 from llms.base_langchain import BaseLangChainModel
+from llms.models.bedrock.caching_chat_model import CachingChatBedrockConverse
 from llms.models.model_provider_inputs import BedrockInputs
+from shared.callbacks.websocket_gone_exception import WebSocketGoneException
 from shared.defaults.model_defaults import ModelDefaults
 from utils.constants import BEDROCK_GUARDRAILS_KEY, TOP_LEVEL_PARAMS_MAPPING, TRACE_ID_ENV_VAR
 from utils.custom_exceptions import LLMInvocationError
@@ -67,10 +69,9 @@ class BedrockLLM(BaseLangChainModel):
 
         self.model_arn = model_inputs.model_arn
         self.guardrails = model_inputs.guardrails
+        self.prompt_caching = model_inputs.prompt_caching or {}
         self.model_params = self.get_clean_model_params(model_inputs.model_params)
-        self.llm = self.get_llm()
-        self.chain = self.get_chain()
-        self.runnable_with_history = self.get_runnable()
+        self.set_runnable()
 
     @property
     def prompt_template(self) -> ChatPromptTemplate:
@@ -139,6 +140,10 @@ class BedrockLLM(BaseLangChainModel):
 
         logger.debug(f"Request options: {request_options}")
 
+        if self.prompt_caching.get("Enabled"):
+            return CachingChatBedrockConverse(
+                **request_options, cache_history=bool(self.prompt_caching.get("CacheHistory"))
+            )
         return ChatBedrockConverse(**request_options)
 
     @tracer.capture_method(capture_response=True)
@@ -159,6 +164,9 @@ class BedrockLLM(BaseLangChainModel):
             response = super().generate(question)
             logger.debug(f"Model response: {response}")
             return response
+        except WebSocketGoneException:
+            # not a model failure: the client went away and generation was stopped
+            raise
         except Exception as ex:
             error_message = error_message + str(ex)
             logger.error(
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Any, Iterator, List, Optional
+
+from langchain_aws import ChatBedrockConverse
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+
+class CachingChatBedrockConverse(ChatBedrockConverse):
+    """
+    ChatBedrockConverse that places Bedrock prompt cache checkpoints in the messages it sends, so that the prompt
+    prefix before a checkpoint is read from the cache on later turns instead of being processed again. A checkpoint
+    is placed after the system prompt and, with cache_history, after the conversation history, which the next turn
+    repeats before its own question. Prefixes shorter than the minimum the model caches are processed as usual.
+
+    When the system prompt ends with text that changes on every request, such as the context retrieved for a RAG
+    question, system_prompt_prefix is its static start: the system checkpoint is placed after that prefix, and no
+    history checkpoint is placed as the history follows the changing text.
+
+    The tokens read from and written to the cache are reported in the input_token_details of the usage_metadata.
+
+    Attributes:
+        cache_history (bool): whether to place a checkpoint after the conversation history as well
+        system_prompt_prefix (Optional[str]): the static start of a system prompt that changes on every request. No
+            system checkpoint is placed when it is empty or the system prompt does not start with it
+
+    Methods:
+        add_cache_points(messages): Returns the messages with cache checkpoints
+    """
+
+    cache_history: bool = False
+    system_prompt_prefix: Optional[str] = None
+
+    def add_cache_points(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        Returns the messages with a cache checkpoint at the end of the leading system prompt, or of its
+        system_prompt_prefix, and, with cache_history, at the end of the message before the question. The messages
+        given are not modified.
+        """
+        has_system_prompt = bool(messages) and isinstance(messages[0], SystemMessage)
+        cached_indexes = set()
+        if has_system_prompt and self.system_prompt_prefix is None:
+            cached_indexes.add(0)
+        # the last message is the question; the ones before it after the system prompt are the history
+        if self.cache_history and self.system_prompt_prefix is None and len(messages) > int(has_system_prompt) + 1:
+            cached_indexes.add(len(messages) - 2)
+
+        cached_messages = [
+            self.with_cache_point(message) if index in cached_indexes else message
+            for index, message in enumerate(messages)
+        ]
+        if has_system_prompt and self.system_prompt_prefix:
+            cached_messages[0] = self.with_cache_point_after_prefix(messages[0], self.system_prompt_prefix)
+        return cached_messages
+
+    def with_cache_point(self, message: BaseMessage) -> BaseMessage:
+        """
+        Returns a copy of the message with a cache checkpoint after its content
+        """
+        content = message.content
+        if not content:
+            return message
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        return message.model_copy(update={"content": [*content, self.create_cache_point()]})
+
+    def with_cache_point_after_prefix(self, message: BaseMessage, prefix: str) -> BaseMessage:
+        """
+        Returns a copy of the message with a cache checkpoint after the prefix its content starts with, or the message
+        itself if its content does not start with the prefix
+        """
+        content = message.content
+        if not isinstance(content, str) or not content.startswith(prefix):
+            return message
+        blocks = [{"type": "text", "text": prefix}, self.create_cache_point()]
+        rest = content[len(prefix) :]
+        if rest:
+            blocks.append({"type": "text", "text": rest})
+        return message.model_copy(update={"content": blocks})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        @overrides ChatBedrockConverse._generate
+        """
+        return super()._generate(self.add_cache_points(messages), stop, run_manager, **kwargs)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """
+        @overrides ChatBedrockConverse._stream
+        """
+        return super()._stream(self.add_cache_points(messages), stop, run_manager, **kwargs)
@@ -35,6 +35,7 @@ class ModelProviderInputs(ABC):
     - prompt_placeholders (list): A list of strings which represents the prompt placeholders [optional, defaults to prompt placeholders provided in ModelInfoStorage DynamoDB table]
     - disambiguation_prompt_template (str): A string which represents the disambiguation prompt template [optional, defaults to disambiguation prompt template provided in ModelInfoStorage DynamoDB table]
     - disambiguation_prompt_enabled (bool): A boolean which represents whether the disambiguation prompt is enabled or not [optional, defaults to disambiguation prompt enabled provided in ModelInfoStorage DynamoDB table]
+    - disambiguation_params (dict): The ModelId or InferenceProfileId, MaxTokens and Temperature of a separate model used for disambiguation [optional, defaults to None, which disambiguates with the main model]
     - model (str): Model name/ID that represents the underlying LLM model
     - model_params (dict): A dictionary of model parameters, which can be obtained from the Bedrock documentation [optional]
     - rag_enabled (bool): A boolean which represents whether the RAG is enabled or not [optional, defaults to DEFAULT_RAG_ENABLED_MODE]
@@ -55,6 +56,7 @@ class ModelProviderInputs(ABC):
     prompt_placeholders: Optional[List[str]] = None
     disambiguation_prompt_template: Optional[str] = None
     disambiguation_prompt_enabled: Optional[bool] = DEFAULT_DISAMBIGUATION_ENABLED_MODE
+    disambiguation_params: Optional[Dict[str, Any]] = None
     model: Optional[str] = None
     model_params: Optional[dict] = None
     rag_enabled: Optional[bool] = DEFAULT_RAG_ENABLED_MODE
@@ -90,12 +92,14 @@ class BedrockInputs(ModelProviderInputs):
      - model_family (BedrockModelProviders): A string which represents the model family
      - model_arn (str): A string which represents the model ARN in case of provisioned throughput model invocation [optional, defaults to None]
      - guardrails (dict): A dictionary of Bedrock guardrail details [optional, defaults to None]
+     - prompt_caching (dict): A dictionary of Bedrock prompt caching settings, eg {"Enabled": True, "CacheHistory": False} [optional, defaults to None]
 
     """
 
     model_family: Optional[str] = None
     model_arn: Optional[str] = None
     guardrails: Optional[Dict[str, Any]] = None
+    prompt_caching: Optional[Dict[str, Any]] = None
 
     def __post_init__(self):
         if self.model is None and self.model_arn is None:
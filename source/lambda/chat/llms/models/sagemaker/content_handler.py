@@ -4,7 +4,7 @@
 
 import json
 import os
-from copy import deepcopy
+from functools import lru_cache
 from typing import Any, Dict
 
 import jsonpath_ng as jp
@@ -12,10 +12,12 @@ from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.metrics import MetricUnit
 from langchain_aws.llms.sagemaker_endpoint import LLMContentHandler
 
-from utils.constants import TRACE_ID_ENV_VAR
+from llms.models.sagemaker.input_schema_renderer import InputSchemaRenderer
+from llms.models.sagemaker.response_stream_parser import ResponseStreamParser
+from utils.constants import DEFAULT_JSONPATH_CACHE_SIZE, TRACE_ID_ENV_VAR
 from utils.custom_exceptions import JsonPathExtractionError
 from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
-from utils.helpers import count_keys, get_metrics_client, pop_null_values
+from utils.helpers import get_metrics_client
 
 tracer = Tracer()
 logger = Logger(utc=True)
@@ -23,6 +25,14 @@ metrics = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
 tracer_id = os.getenv(TRACE_ID_ENV_VAR)
 
 
+@lru_cache(maxsize=DEFAULT_JSONPATH_CACHE_SIZE)
+def parse_jsonpath(expression: str) -> jp.JSONPath:
+    """
+    Returns the parsed JSONPath expression. Parsing is slow, so expressions are parsed once per container.
+    """
+    return jp.parse(expression)
+
+
 class SageMakerContentHandler(LLMContentHandler):
     """
     ContentHandler for SageMaker which allows input and output transformations using user-provided
@@ -90,6 +100,16 @@ class SageMakerContentHandler(LLMContentHandler):
                 each time
 
             The <<prompt>> and <<temperature>> are special keywords to replace prompt and temperature received from the user-inputted values in the UI (stored in the DynamoDB config)
+
+            The input_schema is compiled into a render plan when the handler is built (see InputSchemaRenderer), so that
+            each invocation only serializes the placeholder values.
+
+            When streaming, the endpoint streams a JSON object per token instead, and the output JSONPath is that of
+            the token in each of them. For example, for a model streaming lines like:
+
+            {"token": {"text": " response"}, "generated_text": null}
+
+            the output JSONPath is "$.token.text". See ResponseStreamParser.
     """
 
     def __init__(self, input_schema: Dict[Any, Any], output_path_expression: str):
@@ -97,7 +117,8 @@ class SageMakerContentHandler(LLMContentHandler):
         self.content_type = "application/json"
         self.accepts = "application/json"
         self.input_schema = input_schema
-        self.output_path_expression = jp.parse(output_path_expression)
+        self.input_schema_renderer = InputSchemaRenderer(input_schema)
+        self.output_path_expression = parse_jsonpath(output_path_expression)
 
     def transform_input(self, prompt: str, model_kwargs: Dict[str, Any]) -> bytes:
         """
@@ -105,16 +126,10 @@ class SageMakerContentHandler(LLMContentHandler):
         can accept as the request body.
 
         """
-        payload = deepcopy(self.input_schema)
-        placeholders = deepcopy(model_kwargs)
-        placeholders["prompt"] = prompt
-
-        self.replace_placeholders(payload, placeholders)
-        original_keys_len = count_keys(payload)
-        payload = pop_null_values(payload)
-        transformed_keys_len = count_keys(payload)
+        placeholders = {**model_kwargs, "prompt": prompt}
+        payload, keys_popped = self.input_schema_renderer.render(placeholders)
 
-        if original_keys_len > transformed_keys_len:
+        if keys_popped:
             logger.warning(
                 """The input schema contained placeholders which were not provided with actual values in model arguments. """
                 """Proceeding to use this input schema without these placeholders.""",
@@ -123,7 +138,7 @@ class SageMakerContentHandler(LLMContentHandler):
             metrics.add_metric(name=CloudWatchMetrics.INCORRECT_INPUT_FAILURES.value, unit=MetricUnit.Count, value=1)
 
         metrics.flush_metrics()
-        return json.dumps(payload).encode("utf-8")
+        return payload.encode("utf-8")
 
     def transform_output(self, output: bytes) -> str:
         """
@@ -159,6 +174,13 @@ class SageMakerContentHandler(LLMContentHandler):
             metrics.add_metric(name=CloudWatchMetrics.INCORRECT_INPUT_FAILURES.value, unit=MetricUnit.Count, value=1)
             raise JsonPathExtractionError(error_message)
 
+    def get_stream_parser(self) -> ResponseStreamParser:
+        """
+        Returns a parser of the payload parts of a response stream, which reads the token of each streamed line at the
+        output JSONPath
+        """
+        return ResponseStreamParser(self.output_path_expression)
+
     def replace_placeholders(self, input_schema: Dict[Any, Any], placeholders: Dict[str, Any]):
         """
         Finds the occurrence keys with placeholders of the format: <<placeholder>> and replaces the values with
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.helpers import count_keys, pop_null_values
+
+PLACEHOLDER_PREFIX = "<<"
+PLACEHOLDER_SUFFIX = ">>"
+
+
+def is_placeholder(value: Any) -> bool:
+    """
+    Returns True if the value is a placeholder of the format: <<placeholder>>
+    """
+    return isinstance(value, str) and value.startswith(PLACEHOLDER_PREFIX) and value.endswith(PLACEHOLDER_SUFFIX)
+
+
+def has_placeholders(value: Any) -> bool:
+    """
+    Returns True if a placeholder is the value of a key of the value, or of one of the dictionaries nested in it.
+    As in SageMakerContentHandler.replace_placeholders, placeholders that are items of a list are not replaced.
+    """
+    if isinstance(value, dict):
+        return any(is_placeholder(item) or has_placeholders(item) for item in value.values())
+    if isinstance(value, list):
+        return any(has_placeholders(item) for item in value)
+    return False
+
+
+class RenderNode(ABC):
+    """
+    A part of the render plan of an input schema. Rendering returns the JSON of the part with null values popped, or
+    None if nothing is left of it, and whether keys of nested dictionaries were popped.
+    """
+
+    @abstractmethod
+    def render(self, placeholders: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        pass
+
+
+class StaticNode(RenderNode):
+    """
+    A part of the input schema without placeholders, serialized once when the schema is compiled
+    """
+
+    def __init__(self, value: Any) -> None:
+        popped_value = pop_null_values(value)
+        self.fragment = json.dumps(popped_value) if popped_value else None
+        self.keys_popped = count_keys(value) > count_keys(popped_value)
+
+    def render(self, placeholders: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        return self.fragment, self.keys_popped
+
+
+class PlaceholderNode(RenderNode):
+    """
+    A placeholder, serialized with its value on every render
+    """
+
+    def __init__(self, placeholder: str) -> None:
+        self.name = placeholder[len(PLACEHOLDER_PREFIX) : -len(PLACEHOLDER_SUFFIX)]
+
+    def render(self, placeholders: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        value = placeholders.get(self.name)
+        popped_value = pop_null_values(value)
+        if not popped_value:
+            return None, True
+        return json.dumps(popped_value), count_keys(value) > count_keys(popped_value)
+
+
+class DictNode(RenderNode):
+    """
+    A dictionary with placeholders. The JSON of its keys is serialized when the schema is compiled.
+    """
+
+    def __init__(self, items: List[Tuple[str, RenderNode]]) -> None:
+        self.items = items
+
+    def render(self, placeholders: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        fragments = []
+        keys_popped = False
+        for key_fragment, node in self.items:
+            fragment, node_keys_popped = node.render(placeholders)
+            keys_popped = keys_popped or node_keys_popped or fragment is None
+            if fragment is not None:
+                fragments.append(key_fragment + fragment)
+        return ("{" + ", ".join(fragments) + "}" if fragments else None), keys_popped
+
+
+class ListNode(RenderNode):
+    """
+    A list with placeholders. Keys popped from the dictionaries in a list are not reported, as count_keys does not
+    count them.
+    """
+
+    def __init__(self, items: List[RenderNode]) -> None:
+        self.items = items
+
+    def render(self, placeholders: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        fragments = [fragment for fragment, _ in (node.render(placeholders) for node in self.items) if fragment]
+        return ("[" + ", ".join(fragments) + "]" if fragments else None), False
+
+
+class InputSchemaRenderer:
+    """
+    Renders the request body of a SageMaker endpoint from its input schema. The schema is compiled once into a render
+    plan: the parts without placeholders are serialized to JSON up front, leaving only the placeholders to serialize
+    on each render. Rendering gives the same JSON as replacing the placeholders of a copy of the schema with
+    SageMakerContentHandler.replace_placeholders, popping its null values with pop_null_values and dumping it with
+    json.dumps.
+
+    Attributes:
+        plan (RenderNode): the render plan of the input schema
+        empty_payload (str): the JSON rendered when nothing is left of the schema once null values are popped
+
+    Methods:
+        compile(value): Returns the render plan of a part of the input schema
+        render(placeholders): Returns the JSON of the input schema with the placeholders replaced, and whether keys
+            were popped for having null values
+    """
+
+    def __init__(self, input_schema: Any) -> None:
+        self.plan = self.compile(input_schema)
+        if isinstance(input_schema, dict):
+            self.empty_payload = "{}"
+        elif isinstance(input_schema, list):
+            self.empty_payload = "[]"
+        else:
+            self.empty_payload = json.dumps(pop_null_values(input_schema))
+
+    @classmethod
+    def compile(cls, value: Any) -> RenderNode:
+        """
+        Returns the render plan of a part of the input schema
+        """
+        if not has_placeholders(value):
+            return StaticNode(value)
+        if isinstance(value, dict):
+            # keys of a schema parsed from JSON are strings
+            return DictNode(
+                [
+                    (f"{json.dumps(key)}: ", PlaceholderNode(item) if is_placeholder(item) else cls.compile(item))
+                    for key, item in value.items()
+                ]
+            )
+        return ListNode([cls.compile(item) for item in value])
+
+    def render(self, placeholders: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Returns the JSON of the input schema with the placeholders replaced by their values, and whether keys were
+        popped for having null values, such as placeholders that were not given a value.
+
+        Args:
+            placeholders (dict): The dictionary with actual values of the placeholders, eg {"placeholder1": 0.2}
+
+        Returns:
+            Tuple[str, bool]: the JSON of the request body, and whether keys were popped from it
+        """
+        payload, keys_popped = self.plan.render(placeholders)
+        return (payload if payload is not None else self.empty_payload), keys_popped
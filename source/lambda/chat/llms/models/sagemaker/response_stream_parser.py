@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+from typing import Any, List, Optional
+
+import jsonpath_ng as jp
+from aws_lambda_powertools import Logger
+
+from utils.constants import TRACE_ID_ENV_VAR
+
+logger = Logger(utc=True)
+
+# Server-sent events prefix each payload line with its field name; only data lines carry tokens
+SSE_DATA_PREFIX = "data:"
+SSE_DONE_MARKER = "[DONE]"
+
+
+class ResponseStreamParser:
+    """
+    Incrementally parses the payload parts streamed by InvokeEndpointWithResponseStream into tokens. Models stream
+    either line-delimited JSON, eg:
+            {"token": {"text": "Hello"}}
+            {"token": {"text": " world"}}
+
+    or server-sent events, as Text Generation Inference does, eg:
+            data:{"token": {"text": "Hello"}}
+
+            data:{"token": {"text": " world"}}
+
+    A line may be split across payload parts, so the unterminated end of a part is kept until the rest of it arrives.
+    The token of each line is the first match of the output JSONPath, eg "$.token.text". Lines without a match, such
+    as the final summary event of some containers, other server-sent event fields and lines that are not JSON are
+    skipped.
+
+    Attributes:
+        output_path_expression (jp.JSONPath): the parsed JSONPath of the token in each streamed line
+
+    Methods:
+        feed(payload): Returns the tokens of the lines completed by the payload part
+        finish(): Returns the tokens of the last line, if the stream did not end with a line break
+        parse_line(line): Returns the token of a line, or None if it has none
+    """
+
+    def __init__(self, output_path_expression: jp.JSONPath) -> None:
+        self.output_path_expression = output_path_expression
+        self.buffer = b""
+        self.lines_parsed = 0
+        self.tokens_parsed = 0
+
+    def feed(self, payload: bytes) -> List[str]:
+        """
+        Returns the tokens of the lines completed by the payload part, in order
+        """
+        self.buffer += payload
+        *lines, self.buffer = self.buffer.split(b"\n")
+        return [token for token in map(self.parse_line, lines) if token]
+
+    def finish(self) -> List[str]:
+        """
+        Returns the tokens of the last line, if the stream did not end with a line break. Warns if the stream had
+        lines but none of them matched the output JSONPath.
+        """
+        line, self.buffer = self.buffer, b""
+        token = self.parse_line(line)
+        if self.lines_parsed and not self.tokens_parsed:
+            logger.warning(
+                f"None of the {self.lines_parsed} lines streamed by the SageMaker endpoint matched the output JSONPath "
+                f"{self.output_path_expression}. For streaming, the output JSONPath is that of the token in each line.",
+                xray_trace_id=os.environ.get(TRACE_ID_ENV_VAR),
+            )
+        return [token] if token else []
+
+    def parse_line(self, line: bytes) -> Optional[str]:
+        """
+        Returns the token of a line, or None if it has none
+        """
+        text = line.decode("utf-8").strip()
+        if text.startswith(SSE_DATA_PREFIX):
+            text = text[len(SSE_DATA_PREFIX) :].strip()
+        elif text.startswith(":") or text.split(":", 1)[0] in ("event", "id", "retry"):
+            return None
+        if not text or text == SSE_DONE_MARKER:
+            return None
+
+        self.lines_parsed += 1
+        try:
+            response_json = json.loads(text)
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping a line streamed by the SageMaker endpoint that is not JSON: {text}")
+            return None
+
+        token = self.get_token(response_json)
+        if token:
+            self.tokens_parsed += 1
+        return token
+
+    def get_token(self, response_json: Any) -> Optional[str]:
+        """
+        Returns the first match of the output JSONPath in the streamed line, or None if nothing matches
+        """
+        try:
+            matches = self.output_path_expression.find(response_json)
+        except Exception as ex:
+            logger.debug(f"Could not apply the output JSONPath to a streamed line: {response_json}\nError: {ex}")
+            return None
+        if not matches or matches[0].value is None:
+            return None
+        value = matches[0].value
+        return value if isinstance(value, str) else str(value)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+from aws_lambda_powertools.metrics import MetricUnit
+from langchain_aws.llms.sagemaker_endpoint import SagemakerEndpoint
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.outputs import GenerationChunk
+
+from llms.models.sagemaker.response_stream_parser import ResponseStreamParser
+from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
+from utils.helpers import get_metrics_client
+
+metrics = get_metrics_client(CloudWatchNamespaces.AWS_SAGEMAKER)
+
+
+class SageMakerStreamingEndpoint(SagemakerEndpoint):
+    """
+    SagemakerEndpoint that, when streaming, invokes the endpoint with InvokeEndpointWithResponseStream and passes each
+    token to the callbacks as soon as its payload part arrives, so the first token reaches the client after the model
+    latency rather than after the whole generation. The payload parts are parsed by the content handler's
+    ResponseStreamParser, which reads the token of each streamed line at the output JSONPath.
+
+    Without streaming, the endpoint is invoked with InvokeEndpoint as by SagemakerEndpoint.
+
+    Methods:
+        _stream(prompt, stop, run_manager): Invokes the endpoint with a response stream and yields its tokens
+        _call(prompt, stop, run_manager): Returns the completion, streamed when streaming is enabled
+    """
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        """
+        @overrides SagemakerEndpoint._stream
+        Invokes the endpoint with InvokeEndpointWithResponseStream and yields the tokens of the streamed payload parts.
+        Generation stops at the first of the stop sequences, if any.
+        """
+        model_kwargs = {**(self.model_kwargs or {}), **kwargs}
+        start_time = time.time()
+        response = self.client.invoke_endpoint_with_response_stream(
+            EndpointName=self.endpoint_name,
+            Body=self.content_handler.transform_input(prompt, model_kwargs),
+            ContentType=self.content_handler.content_type,
+            Accept=self.content_handler.accepts,
+            **(self.endpoint_kwargs or {}),
+        )
+
+        parser = self.content_handler.get_stream_parser()
+        completion = ""
+        first_token = True
+        for tokens in self.iterate_tokens(response["Body"], parser):
+            for token in tokens:
+                if stop:
+                    token, stopped = self.truncate_at_stop(completion, token, stop)
+                else:
+                    stopped = False
+                if token:
+                    if first_token:
+                        metrics.add_metric(
+                            name=CloudWatchMetrics.SAGEMAKER_TIME_TO_FIRST_TOKEN.value,
+                            unit=MetricUnit.Seconds,
+                            value=(time.time() - start_time),
+                        )
+                        first_token = False
+                    completion += token
+                    chunk = GenerationChunk(text=token)
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+                if stopped:
+                    response["Body"].close()
+                    return
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        @overrides SagemakerEndpoint._call
+        Returns the completion, streamed through the callbacks when streaming is enabled
+        """
+        if self.streaming:
+            return "".join(chunk.text for chunk in self._stream(prompt, stop, run_manager, **kwargs))
+        return super()._call(prompt, stop, run_manager, **kwargs)
+
+    @staticmethod
+    def iterate_tokens(event_stream: Any, parser: ResponseStreamParser) -> Iterator[List[str]]:
+        """
+        Yields the tokens parsed from each payload part of the event stream, then those of the unterminated last line
+        """
+        for event in event_stream:
+            payload_part = event.get("PayloadPart")
+            if payload_part:
+                yield parser.feed(payload_part.get("Bytes", b""))
+        yield parser.finish()
+
+    @staticmethod
+    def truncate_at_stop(completion: str, token: str, stop: List[str]) -> Tuple[str, bool]:
+        """
+        Returns the part of the token before the first stop sequence in the completion followed by the token, and
+        whether a stop sequence was found. Stop sequences spanning tokens are found once their last token arrives.
+        """
+        # only the end of the completion can start a stop sequence that was not found before
+        start = max(len(completion) - max(len(sequence) for sequence in stop) + 1, 0)
+        text = completion[start:] + token
+        stop_indexes = [index for index in (text.find(sequence) for sequence in stop if sequence) if index != -1]
+        if not stop_indexes:
+            return token, False
+        completion_tail_length = len(completion) - start
+        return text[completion_tail_length : max(min(stop_indexes), completion_tail_length)], True
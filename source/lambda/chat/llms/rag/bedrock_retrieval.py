@@ -9,14 +9,16 @@ from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.metrics import MetricUnit
 from helper import get_service_client
 from langchain_aws import ChatBedrockConverse
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 
+from llms.models.bedrock.caching_chat_model import CachingChatBedrockConverse
 from llms.models.model_provider_inputs import ModelProviderInputs
 from llms.rag.retrieval_llm import RetrievalLLM
+from shared.callbacks.websocket_gone_exception import WebSocketGoneException
 from shared.defaults.model_defaults import ModelDefaults
 from utils.constants import BEDROCK_GUARDRAILS_KEY, TOP_LEVEL_PARAMS_MAPPING, TRACE_ID_ENV_VAR
 from utils.custom_exceptions import LLMInvocationError
-from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces, LLMProviderTypes
+from utils.enum_types import BedrockModelProviders, CloudWatchMetrics, CloudWatchNamespaces, LLMProviderTypes
 from utils.helpers import get_metrics_client
 
 tracer = Tracer()
@@ -55,6 +57,7 @@ class BedrockRetrievalLLM(RetrievalLLM):
         - get_validated_prompt(prompt_template, prompt_template_placeholders, llm_provider, rag_enabled): Generates the ChatPromptTemplate using the provided prompt template and
          placeholders. In case of errors, raises ValueError
         - get_llm(): Returns the underlying LLM object that is used by the runnable. Each child class must provide its own implementation.
+        - get_disambiguation_llm(): Returns the LLM object used to disambiguate questions, the model in disambiguation_params if one is set
         - get_clean_model_params(): Returns the cleaned and formatted model parameters that are used by the LLM. Each child class must provide its own implementation based on the model parameters it supports.
         - get_validated_disambiguation_prompt(disambiguation_prompt_template, disambiguation_prompt_placeholders, disambiguation_prompt_enabled): Generates the ChatPromptTemplate used for disambiguating the question using conversation history.
           It uses the provided prompt template and placeholders. In case of errors, it raises ValueError
@@ -82,10 +85,14 @@ class BedrockRetrievalLLM(RetrievalLLM):
 
         self.model_arn = model_inputs.model_arn
         self.guardrails = model_inputs.guardrails
+        self.prompt_caching = model_inputs.prompt_caching or {}
         self.model_params = self.get_clean_model_params(model_inputs.model_params)
 
+        self.set_runnable()
+
+    def create_runnable(self) -> None:
         self.llm = self.get_llm()
-        self.disambiguation_llm = self.get_llm()
+        self.disambiguation_llm = self.get_disambiguation_llm()
         self.chain = self.get_chain()
         self.runnable_with_history = self.get_runnable()
 
@@ -100,14 +107,14 @@ class BedrockRetrievalLLM(RetrievalLLM):
             prompt_template, prompt_placeholders, LLMProviderTypes.BEDROCK, True
         )
 
-    def get_llm(self, *args, **kwargs) -> ChatBedrockConverse:
+    def get_llm(self, *args, cache_points: bool = True, **kwargs) -> ChatBedrockConverse:
         """
         Creates a LangChain `LLM` object which is used to generate chat responses.
 
         Args:
-            condense_prompt_model (bool): Flag that indicates whether to create a model for regular chat or
-                for disambiguating/condensing of the prompt for RAG use-cases.
-                callbacks and streaming are disabled when this flag is set to True
+            cache_points (bool): whether the model places prompt cache checkpoints when prompt caching is enabled.
+                The checkpoint after the system prompt is placed before the retrieved context, see
+                get_system_prompt_prefix.
 
         Returns:
             (ChatBedrockConverse) The created LangChain LLM object that can be invoked in a conversation chain
@@ -149,6 +156,69 @@ class BedrockRetrievalLLM(RetrievalLLM):
 
         logger.debug(f"Request options: {request_options}")
 
+        if cache_points and self.prompt_caching.get("Enabled"):
+            return CachingChatBedrockConverse(
+                **request_options,
+                cache_history=bool(self.prompt_caching.get("CacheHistory")),
+                system_prompt_prefix=self.get_system_prompt_prefix(),
+            )
+        return ChatBedrockConverse(**request_options)
+
+    def get_system_prompt_prefix(self) -> str:
+        """
+        Returns the static start of the system prompt, the text before the context retrieved for each question. It is
+        empty when that text has placeholders of its own, as it then changes with the request too.
+
+        Returns:
+            (str): the system prompt up to its context placeholder
+        """
+        system_prompt_template = self.prompt_template.messages[0].prompt.template
+        try:
+            prefix_template = PromptTemplate.from_template(system_prompt_template.split("{context}", 1)[0])
+        except ValueError:
+            return ""
+        return "" if prefix_template.input_variables else prefix_template.format()
+
+    def get_disambiguation_llm(self) -> ChatBedrockConverse:
+        """
+        Creates the LangChain `LLM` object which is used to disambiguate questions. When disambiguation_params sets an
+        InferenceProfileId or ModelId, that model is used with the MaxTokens and Temperature set alongside it, which
+        lets a small, fast model rewrite the question. Otherwise the model generating chat responses is used, without
+        the prompt cache checkpoints it places for the chat prompt.
+
+        Returns:
+            (ChatBedrockConverse) The created LangChain LLM object that can be invoked in the disambiguation chain
+
+        Raises:
+            ValueError: If the model family cannot be extracted from the disambiguation model
+        """
+        model_id = self.disambiguation_params.get("InferenceProfileId") or self.disambiguation_params.get("ModelId")
+        if model_id is None:
+            return self.get_llm(cache_points=False)
+
+        # on-demand model IDs start with the model family, inference profile IDs with a region prefix followed by it
+        supported_families = {family.value for family in BedrockModelProviders}
+        model_family = next((part for part in model_id.split(".")[:2] if part in supported_families), None)
+        if model_family is None:
+            error_message = f"Unable to extract a supported model family from the disambiguation model '{model_id}'."
+            logger.error(error_message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+            raise ValueError(error_message)
+
+        request_options = {
+            "client": get_service_client("bedrock-runtime"),
+            "model_id": model_id,
+            "provider": model_family,
+            "verbose": self.verbose,
+            "temperature": float(self.disambiguation_params.get("Temperature", self.temperature)),
+        }
+        if self.disambiguation_params.get("MaxTokens") is not None:
+            request_options["max_tokens"] = int(self.disambiguation_params["MaxTokens"])
+
+        if self.guardrails is not None:
+            request_options[BEDROCK_GUARDRAILS_KEY] = self.guardrails
+
+        logger.debug(f"Disambiguation request options: {request_options}")
+
         return ChatBedrockConverse(**request_options)
 
     def get_clean_model_params(self, model_params) -> Dict[str, Any]:
@@ -189,6 +259,9 @@ class BedrockRetrievalLLM(RetrievalLLM):
             response = super().generate(question)
             logger.debug(f"Model response: {response}")
             return response
+        except WebSocketGoneException:
+            # not a model failure: the client went away and generation was stopped
+            raise
         except ValueError as ve:
             error_message = error_message + str(ve)
             logger.error(
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+from typing import List, Optional, Set, Tuple
+
+from aws_lambda_powertools import Logger
+from langchain_core.documents import Document
+
+from utils.constants import (
+    CHARACTERS_PER_TOKEN,
+    DEFAULT_DOCUMENT_PACKING_SIMILARITY,
+    DOCUMENT_PACKING_SHINGLE_SIZE,
+    DOCUMENT_PACKING_SIMILARITY_ENV_VAR,
+    RANK_FUSION_SCORE_KEY,
+)
+from utils.helpers import estimate_tokens
+
+logger = Logger(utc=True)
+
+# Kendra scores documents with a confidence bucket rather than a number
+KENDRA_SCORE_CONFIDENCES = {"VERY_HIGH": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1, "NOT_AVAILABLE": 0}
+
+
+def get_document_packing_similarity() -> float:
+    """
+    Returns the Jaccard similarity, between 0 and 1, of the word shingles of two retrieved passages at which the lower
+    scored one is dropped as a near-duplicate. 0 disables document packing.
+    """
+    try:
+        similarity = float(os.getenv(DOCUMENT_PACKING_SIMILARITY_ENV_VAR, DEFAULT_DOCUMENT_PACKING_SIMILARITY))
+    except ValueError:
+        similarity = -1
+    if not 0 <= similarity <= 1:
+        logger.warning(
+            f"Invalid value for {DOCUMENT_PACKING_SIMILARITY_ENV_VAR}, defaulting to {DEFAULT_DOCUMENT_PACKING_SIMILARITY}."
+        )
+        return DEFAULT_DOCUMENT_PACKING_SIMILARITY
+    return similarity
+
+
+class DocumentPacker:
+    """
+    Chooses the retrieved documents that are stuffed into the prompt. Documents are ordered by retrieval score,
+    keeping the retriever's order between equal scores. A document whose word shingles have a Jaccard similarity of at
+    least similarity_threshold with those of a document kept before it is dropped as a near-duplicate, as are the
+    documents that no longer fit max_tokens once the higher scored ones are packed. The highest scored document is
+    always kept.
+
+    Attributes:
+        similarity_threshold (float): Jaccard similarity at which a document is a near-duplicate of a kept one
+        max_tokens (Optional[int]): estimated tokens the page contents of the kept documents may use, None for no limit
+
+    Methods:
+        from_environment(max_prompt_size): Returns the packer configured with DOCUMENT_PACKING_SIMILARITY
+        get_score(document): Returns the retrieval score of the document as a number
+        get_shingles(text): Returns the word shingles of the text
+        pack(documents): Returns the documents to stuff into the prompt and the documents dropped
+    """
+
+    def __init__(self, similarity_threshold: float, max_tokens: Optional[int] = None) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.max_tokens = max_tokens
+
+    @classmethod
+    def from_environment(cls, max_prompt_size: Optional[int]) -> Optional["DocumentPacker"]:
+        """
+        Returns the packer configured with DOCUMENT_PACKING_SIMILARITY, or None if disabled. The documents get the
+        estimated number of tokens in max_prompt_size characters, the MaxPromptSize of the model.
+        """
+        similarity_threshold = get_document_packing_similarity()
+        if not similarity_threshold:
+            return None
+        max_tokens = int(max_prompt_size) // CHARACTERS_PER_TOKEN if max_prompt_size else None
+        return cls(similarity_threshold=similarity_threshold, max_tokens=max_tokens)
+
+    @staticmethod
+    def get_score(document: Document) -> float:
+        """
+        Returns the retrieval score of the document: the rank fusion score of documents retrieved from several
+        knowledge bases, the Bedrock knowledge base score, or the rank of the Kendra score confidence. Documents without
+        a score rank last.
+        """
+        if RANK_FUSION_SCORE_KEY in document.metadata:
+            return document.metadata[RANK_FUSION_SCORE_KEY]
+        score = document.metadata.get("score")
+        if isinstance(score, str):
+            return KENDRA_SCORE_CONFIDENCES.get(score.upper(), 0)
+        return float(score) if score is not None else 0
+
+    @staticmethod
+    def get_shingles(text: str) -> Set[Tuple[str, ...]]:
+        """
+        Returns the overlapping DOCUMENT_PACKING_SHINGLE_SIZE word sequences of the case folded text. A text with fewer
+        words than that is its own single shingle.
+        """
+        words = re.findall(r"\w+", (text or "").casefold())
+        if len(words) <= DOCUMENT_PACKING_SHINGLE_SIZE:
+            return {tuple(words)}
+        return {
+            tuple(words[i : i + DOCUMENT_PACKING_SHINGLE_SIZE])
+            for i in range(len(words) - DOCUMENT_PACKING_SHINGLE_SIZE + 1)
+        }
+
+    def pack(self, documents: List[Document]) -> Tuple[List[Document], List[Document]]:
+        """
+        Returns the documents to stuff into the prompt, highest scored first, and the documents dropped as
+        near-duplicates or for not fitting the token budget
+        """
+        kept_documents = []
+        kept_shingles = []
+        dropped_documents = []
+        used_tokens = 0
+        for document in sorted(documents, key=self.get_score, reverse=True):
+            shingles = self.get_shingles(document.page_content)
+            is_duplicate = any(
+                len(shingles & other_shingles) / len(shingles | other_shingles) >= self.similarity_threshold
+                for other_shingles in kept_shingles
+            )
+            tokens = estimate_tokens(document.page_content or "")
+            fits = self.max_tokens is None or not kept_documents or used_tokens + tokens <= self.max_tokens
+            if is_duplicate or not fits:
+                dropped_documents.append(document)
+                continue
+            kept_documents.append(document)
+            kept_shingles.append(shingles)
+            used_tokens += tokens
+
+        if dropped_documents:
+            logger.debug(f"Dropped {len(dropped_documents)} of {len(documents)} retrieved documents while packing.")
+        return kept_documents, dropped_documents
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from aws_lambda_powertools import Logger
+from langchain_core.messages import BaseMessage
+
+from utils.constants import (
+    DEFAULT_DISAMBIGUATION_CLASSIFIER,
+    DISAMBIGUATION_CLASSIFIER_ENV_VAR,
+    MIN_SELF_CONTAINED_QUESTION_WORDS,
+)
+from utils.enum_types import DisambiguationClassifiers
+
+logger = Logger(utc=True)
+
+# Words that stand in for something named in an earlier turn
+REFERRING_WORDS = frozenset(
+    {
+        "it",
+        "its",
+        "itself",
+        "they",
+        "them",
+        "their",
+        "theirs",
+        "themselves",
+        "he",
+        "him",
+        "his",
+        "she",
+        "her",
+        "hers",
+        "this",
+        "that",
+        "these",
+        "those",
+        "there",
+        "one",
+        "ones",
+        "former",
+        "latter",
+        "same",
+        "such",
+        "else",
+        "other",
+        "another",
+    }
+)
+
+# Words that point back at the conversation itself
+CONVERSATION_WORDS = frozenset(
+    {
+        "above",
+        "previous",
+        "previously",
+        "earlier",
+        "before",
+        "last",
+        "mentioned",
+        "said",
+        "again",
+        "instead",
+        "also",
+        "too",
+        "elaborate",
+        "continue",
+    }
+)
+
+# Openings of elliptical follow-ups, such as "and for S3?" or "what about pricing?"
+FOLLOW_UP_PATTERN = re.compile(r"^(and|or|but|so|then|what about|how about)\b")
+
+
+class QuestionClassifier(ABC):
+    """
+    Decides whether a question asked with conversation history needs the history to be understood. Questions that do
+    not are retrieved for as asked, without the disambiguation LLM call that rephrases them.
+
+    Methods:
+        is_self_contained(question, history): Returns True if the question can be answered without the history
+    """
+
+    @abstractmethod
+    def is_self_contained(self, question: str, history: List[BaseMessage]) -> bool:
+        pass
+
+
+class HeuristicQuestionClassifier(QuestionClassifier):
+    """
+    Classifies a question as self-contained unless it is short, opens like a follow-up, or contains a word that
+    refers to something said earlier in the conversation, such as a pronoun or "previous".
+    """
+
+    def is_self_contained(self, question: str, history: List[BaseMessage]) -> bool:
+        text = question.strip().casefold()
+        words = re.findall(r"[^\W\d_]+", text)
+        if len(words) < MIN_SELF_CONTAINED_QUESTION_WORDS or FOLLOW_UP_PATTERN.match(text):
+            return False
+        return REFERRING_WORDS.isdisjoint(words) and CONVERSATION_WORDS.isdisjoint(words)
+
+
+def get_question_classifier() -> Optional[QuestionClassifier]:
+    """
+    Returns the classifier selected with DISAMBIGUATION_CLASSIFIER, or None if every question asked with history is
+    disambiguated.
+    """
+    classifier = os.getenv(DISAMBIGUATION_CLASSIFIER_ENV_VAR, DEFAULT_DISAMBIGUATION_CLASSIFIER)
+    if classifier == DisambiguationClassifiers.HEURISTIC.value:
+        return HeuristicQuestionClassifier()
+    if classifier != DisambiguationClassifiers.NONE.value:
+        logger.warning(
+            f"Unsupported {DISAMBIGUATION_CLASSIFIER_ENV_VAR} {classifier}, using {DEFAULT_DISAMBIGUATION_CLASSIFIER}."
+        )
+    return None
@@ -14,9 +14,9 @@ from langchain_classic.chains.combine_documents.base import (
     DEFAULT_DOCUMENT_SEPARATOR,
     _validate_prompt,
 )
-from langchain_core.runnables import RunnableConfig
 from langchain_core.documents import Document
 from langchain_core.language_models import LLM, LanguageModelLike
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import BaseOutputParser, StrOutputParser
 from langchain_core.prompts import BasePromptTemplate, ChatPromptTemplate, PromptTemplate, format_document
 from langchain_core.retrievers import BaseRetriever, RetrieverLike, RetrieverOutput, RetrieverOutputLike
@@ -24,39 +24,76 @@ from langchain_core.runnables import (
     ConfigurableFieldSpec,
     Runnable,
     RunnableBranch,
+    RunnableConfig,
     RunnableLambda,
     RunnablePassthrough,
 )
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_core.runnables.utils import AddableDict
 
-from llms.base_langchain import BaseLangChainModel
+from llms.base_langchain import BaseLangChainModel, bind_request_callbacks
 from llms.models.model_provider_inputs import ModelProviderInputs
+from llms.rag.document_packer import DocumentPacker
+from llms.rag.question_classifier import QuestionClassifier, get_question_classifier
+from shared.callbacks.websocket_streaming_handler import WebsocketStreamingCallbackHandler
 from shared.defaults.model_defaults import ModelDefaults
+from shared.knowledge.answer_cache import AnswerCache, CachedAnswer, get_answer_cache_ttl
 from shared.knowledge.knowledge_base import KnowledgeBase
 from utils.constants import (
     CONTEXT_KEY,
     CONVERSATION_ID_KEY,
     DEFAULT_DISAMBIGUATION_ENABLED_MODE,
+    DEFAULT_SPECULATIVE_RETRIEVAL_SIMILARITY,
     DISAMBIGUATION_PROMPT_PLACEHOLDERS,
+    DROPPED_DOCUMENTS_KEY,
+    DROPPED_SOURCE_DOCUMENTS_OUTPUT_KEY,
     HISTORY_KEY,
     INPUT_KEY,
     LLM_RESPONSE_KEY,
     MESSAGE_ID_KEY,
     RAG_CONVERSATION_TRACER_KEY,
     REPHRASED_QUERY_KEY,
+    REQUEST_RETRIEVER_KEY,
+    RETRIEVAL_PATH_DIMENSION,
+    RETRIEVAL_RESULTS_KEY,
+    RETRIEVED_DOCUMENTS_KEY,
+    SELF_CONTAINED_KEY,
     SOURCE_DOCUMENTS_OUTPUT_KEY,
     SOURCE_DOCUMENTS_RECEIVED_KEY,
+    SPECULATIVE_DOCUMENTS_KEY,
+    SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR,
     TRACE_ID_ENV_VAR,
+    USE_CASE_UUID_ENV_VAR,
     USER_ID_KEY,
 )
-from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
-from utils.helpers import get_metrics_client, validate_prompt_placeholders
+from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces, RetrievalPaths
+from utils.helpers import get_metrics_client, lexical_similarity, validate_prompt_placeholders
 
 tracer = Tracer()
 logger = Logger(utc=True)
 metrics = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
 
 
+def get_speculative_retrieval_similarity() -> float:
+    """
+    Returns the lexical similarity, between 0 and 1, of a rephrased question to the question as asked at which the
+    documents speculatively retrieved for the question as asked are kept. 0 disables speculative retrieval.
+    """
+    try:
+        similarity = float(
+            os.getenv(SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR, DEFAULT_SPECULATIVE_RETRIEVAL_SIMILARITY)
+        )
+    except ValueError:
+        similarity = -1
+    if not 0 <= similarity <= 1:
+        logger.warning(
+            f"Invalid value for {SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR}, "
+            f"defaulting to {DEFAULT_SPECULATIVE_RETRIEVAL_SIMILARITY}."
+        )
+        return DEFAULT_SPECULATIVE_RETRIEVAL_SIMILARITY
+    return similarity
+
+
 class RetrievalLLM(BaseLangChainModel):
     """
     RetrievalLLM represents the interface that the implementing Retrieval Augmented Generation (RAG) models should follow for consistent behavior. Inherits BaseLangChainModel and provides RAG based specific implementations on top of it.
@@ -79,12 +116,16 @@ class RetrievalLLM(BaseLangChainModel):
         - get_validated_disambiguation_prompt(disambiguation_prompt_template, disambiguation_prompt_placeholders, disambiguation_prompt_enabled): Generates the ChatPromptTemplate used for disambiguating the question using conversation history.
           It uses the provided prompt template and placeholders. In case of errors, it raises ValueError
         - save_to_session_history(human_message, ai_response): Saves the conversation history to the conversation memory.
+        - get_answer_cache(): Returns the answer cache of this use case and config, if enabled and the answers do not depend on the user
+        - get_cached_response(answer_cache, question): Answers a question asked without conversation history from the answer cache
         - enhanced_create_history_aware_retriever(llm, retriever, prompt): create_history_aware_retriever enhancement that allows passing of the intermediate rephrased question into the output using RunnablePassthrough
         - enhanced_create_stuff_documents_chain(llm, prompt, rephrased_question, output_parser, document_prompt, document_separator, document_variable_name): create_stuff_documents_chain enhancement that allows rephrased question to be passed as an input to the LLM instead.
-        - enhanced_create_retrieval_chain(retriever, combine_docs_chain, rephrased_question): create_retrieval_chain enhancement that allows rephrased question to be passed into the final output from the model
+        - enhanced_create_retrieval_chain(retriever, combine_docs_chain, rephrased_question, document_packer): create_retrieval_chain enhancement that allows rephrased question to be passed into the final output from the model and the retrieved documents to be packed
 
     """
 
+    RUNNABLE_ATTRIBUTES = BaseLangChainModel.RUNNABLE_ATTRIBUTES + ("disambiguation_llm",)
+
     def __init__(self, model_inputs: ModelProviderInputs, model_defaults: ModelDefaults):
         BaseLangChainModel.__init__(self, model_defaults=model_defaults, model_inputs=model_inputs)
         self.knowledge_base = model_inputs.knowledge_base
@@ -98,6 +139,7 @@ class RetrievalLLM(BaseLangChainModel):
             else DEFAULT_DISAMBIGUATION_ENABLED_MODE
         )
         self.disambiguation_prompt_template = model_inputs.disambiguation_prompt_template
+        self.disambiguation_params = model_inputs.disambiguation_params or {}
         # Child classes set these variables
         self.disambiguation_llm = None
         self.chain = None
@@ -183,6 +225,22 @@ class RetrievalLLM(BaseLangChainModel):
         page_content = doc.page_content or ""
         return prompt.format(page_content=page_content)
 
+    def retrieve_documents(self, query: str, config: RunnableConfig) -> List[Document]:
+        """
+        Retrieves documents for the query using the retriever of the request being served. The retriever is per-request
+        (for example, it carries the user's RBAC context) so it is supplied through the invoke configuration rather
+        than built into the chain.
+
+        Args:
+            query (str): the query to retrieve documents for
+            config (RunnableConfig): the invoke configuration, carrying the retriever under REQUEST_RETRIEVER_KEY
+
+        Returns:
+            List[Document]: the retrieved documents
+        """
+        retriever = config.get("configurable", {}).get(REQUEST_RETRIEVER_KEY) or self.knowledge_base.retriever
+        return retriever.invoke(query, config)
+
     def enhanced_create_history_aware_retriever(
         self,
         llm: LanguageModelLike,
@@ -195,6 +253,10 @@ class RetrievalLLM(BaseLangChainModel):
 
         If there is no `history`, then the `input` is just passed directly to the retriever. If there is `chat_history`, then the prompt and LLM will be used to generate a search query. That search query is then passed to the retriever.
 
+        With DISAMBIGUATION_CLASSIFIER set, questions with `history` that the classifier finds self-contained are passed to the retriever as asked, without the LLM call.
+
+        With SPECULATIVE_RETRIEVAL_SIMILARITY set, the `input` is passed to the retriever while the search query is generated, and those documents are used unless the search query is lexically further from the `input` than that. The time taken is recorded per RetrievalPaths path.
+
         Args:
             llm: Language model to use for generating a search term given chat history
             retriever: RetrieverLike object that takes a string as input and outputs
@@ -212,8 +274,8 @@ class RetrievalLLM(BaseLangChainModel):
         rephrased_question = RunnableBranch(
             (
                 # Both empty string and empty list evaluate to False
-                lambda x: not x.get(HISTORY_KEY, False),
-                # If no chat history, then we just pass input to retriever
+                lambda x: not x.get(HISTORY_KEY, False) or x.get(SELF_CONTAINED_KEY, False),
+                # If no chat history, or the question does not need it, then we just pass input to retriever
                 (lambda x: x[INPUT_KEY]),
             ),
             # If chat history is available, formats it for disambiguation to get the rephrased query
@@ -222,15 +284,96 @@ class RetrievalLLM(BaseLangChainModel):
             RunnableLambda(self.format_chat_history) | prompt | llm | StrOutputParser(),
         ).with_config(run_name="chat_retriever_chain")
 
-        retrieve_documents_with_rephrased_question: RetrieverOutputLike = (
-            RunnablePassthrough.assign(rephrased_query=rephrased_question)
-            .assign(
-                retriever=(lambda x: x[REPHRASED_QUERY_KEY]) | retriever,
-            )
-            .with_config(run_name="chat_retrieve_documents_with_rephrased_question")
+        question_classifier = get_question_classifier()
+        speculative_similarity = get_speculative_retrieval_similarity()
+        if speculative_similarity:
+            # Documents are retrieved for the question as asked while it is rephrased. They are kept if the rephrased
+            # question is lexically close to it, otherwise the documents are retrieved again for the rephrased question
+            def retrieve_for_rephrased_question(inputs: Dict[str, Any], config: RunnableConfig) -> List[Document]:
+                if self.keep_speculative_documents(inputs, speculative_similarity):
+                    return inputs[SPECULATIVE_DOCUMENTS_KEY]
+                return retriever.invoke(inputs[REPHRASED_QUERY_KEY], config)
+
+            retrieve_documents_with_rephrased_question = RunnablePassthrough.assign(
+                rephrased_query=rephrased_question,
+                speculative_documents=(lambda x: x[INPUT_KEY]) | retriever,
+            ).assign(retriever=RunnableLambda(retrieve_for_rephrased_question))
+        else:
+            retrieve_documents_with_rephrased_question = RunnablePassthrough.assign(
+                rephrased_query=rephrased_question
+            ).assign(retriever=(lambda x: x[REPHRASED_QUERY_KEY]) | retriever)
+
+        def retrieve_and_record_latency(inputs: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+            start_time = time.time()
+            if question_classifier is not None and inputs.get(HISTORY_KEY):
+                inputs = {**inputs, SELF_CONTAINED_KEY: self.is_self_contained(question_classifier, inputs)}
+            outputs = retrieve_documents_with_rephrased_question.invoke(inputs, config)
+            self.record_retrieval_latency(outputs, speculative_similarity, time.time() - start_time)
+            return outputs
+
+        return RunnableLambda(retrieve_and_record_latency).with_config(
+            run_name="chat_retrieve_documents_with_rephrased_question"
+        )
+
+    def is_self_contained(self, question_classifier: QuestionClassifier, inputs: Dict[str, Any]) -> bool:
+        """
+        Whether the question can be retrieved for without disambiguating it with the conversation history. Records
+        whether the disambiguation LLM call was skipped.
+
+        Args:
+            question_classifier (QuestionClassifier): the classifier selected with DISAMBIGUATION_CLASSIFIER
+            inputs (Dict[str, Any]): the question, under INPUT_KEY, and the conversation history, under HISTORY_KEY
+
+        Returns:
+            bool: True if the question needs no disambiguation
+        """
+        self_contained = question_classifier.is_self_contained(inputs[INPUT_KEY], inputs[HISTORY_KEY])
+        metric = (
+            CloudWatchMetrics.DISAMBIGUATION_SKIPPED if self_contained else CloudWatchMetrics.DISAMBIGUATION_INVOKED
         )
+        metrics.add_metric(name=metric.value, unit=MetricUnit.Count, value=1)
+        return self_contained
+
+    def keep_speculative_documents(self, inputs: Dict[str, Any], speculative_similarity: float) -> bool:
+        """
+        Whether the documents retrieved for the question as asked can be used for the rephrased question
+
+        Args:
+            inputs (Dict[str, Any]): the question as asked, under INPUT_KEY, and the rephrased question
+            speculative_similarity (float): the lexical similarity at which the documents are kept
+
+        Returns:
+            bool: True if the rephrased question is lexically close enough to the question as asked
+        """
+        return lexical_similarity(inputs[INPUT_KEY], inputs[REPHRASED_QUERY_KEY]) >= speculative_similarity
 
-        return retrieve_documents_with_rephrased_question
+    def record_retrieval_latency(self, outputs: Dict[str, Any], speculative_similarity: float, latency: float) -> None:
+        """
+        Records the time taken to rephrase the question and retrieve its documents, with the path taken as the
+        RetrievalPath dimension.
+
+        Args:
+            outputs (Dict[str, Any]): the outputs of the rephrasing and retrieval, with the inputs they were given
+            speculative_similarity (float): the lexical similarity at which speculatively retrieved documents are kept,
+                0 if speculative retrieval is disabled
+            latency (float): seconds taken to rephrase the question and retrieve its documents
+        """
+        if not outputs.get(HISTORY_KEY):
+            retrieval_path = RetrievalPaths.DIRECT
+        elif outputs.get(SELF_CONTAINED_KEY):
+            retrieval_path = RetrievalPaths.SELF_CONTAINED
+        elif not speculative_similarity:
+            retrieval_path = RetrievalPaths.SEQUENTIAL
+        elif self.keep_speculative_documents(outputs, speculative_similarity):
+            retrieval_path = RetrievalPaths.SPECULATIVE_KEPT
+        else:
+            retrieval_path = RetrievalPaths.SPECULATIVE_RETRIED
+
+        # the path dimension only applies to the latency
+        metrics.close_dimensions()
+        metrics.add_dimension(name=RETRIEVAL_PATH_DIMENSION, value=retrieval_path.value)
+        metrics.add_metric(name=CloudWatchMetrics.RETRIEVAL_PIPELINE_TIME.value, unit=MetricUnit.Seconds, value=latency)
+        metrics.close_dimensions()
 
     def enhanced_create_stuff_documents_chain(
         self,
@@ -316,6 +459,7 @@ class RetrievalLLM(BaseLangChainModel):
         retriever: Union[BaseRetriever, Runnable[dict, RetrieverOutput]],
         combine_docs_chain: Runnable[Dict[str, Any], str],
         rephrased_question: Optional[str] = None,
+        document_packer: Optional[DocumentPacker] = None,
     ) -> Runnable:
         """
         langchain.chains.create_retrieval_chain fetches documents from the knowledge base
@@ -337,6 +481,8 @@ class RetrievalLLM(BaseLangChainModel):
                 retrieval.
             rephrased_question (str): If provided, it will be used as input to the LLM instead of the
                 original question
+            document_packer (DocumentPacker): If provided, chooses the retrieved documents passed to the
+                combine_docs_chain as `context`, and the ones it drops are output as `dropped_documents`
 
         Returns:
             An LCEL Runnable. The Runnable return is a dictionary containing at the very
@@ -349,11 +495,22 @@ class RetrievalLLM(BaseLangChainModel):
 
         retrieval_chain = RunnablePassthrough.assign(
             context=retrieval_docs.with_config(run_name="retrieve_documents"),
-        ).assign(answer=combine_docs_chain)
+        )
+
+        if document_packer is not None:
+
+            def pack_documents(inputs: Dict[str, Any]) -> Dict[str, Any]:
+                documents, dropped_documents = document_packer.pack(inputs[CONTEXT_KEY])
+                return AddableDict({**inputs, CONTEXT_KEY: documents, DROPPED_DOCUMENTS_KEY: dropped_documents})
 
+            retrieval_chain = retrieval_chain | RunnableLambda(pack_documents).with_config(run_name="pack_documents")
+
+        # assigned ahead of the answer so that the rephrased query is an input of the combine_docs_chain
         if rephrased_question:
             retrieval_chain = retrieval_chain.assign(rephrased_query=rephrased_question)
 
+        retrieval_chain = retrieval_chain.assign(answer=combine_docs_chain)
+
         return retrieval_chain.with_config(run_name="retrieval_chain")
 
     def get_chain(self) -> RunnableWithMessageHistory:
@@ -365,23 +522,29 @@ class RetrievalLLM(BaseLangChainModel):
             RunnableWithMessageHistory: A runnable that manages chat message history
         """
 
+        request_retriever = RunnableLambda(self.retrieve_documents).with_config(run_name="request_retriever")
+
         if self.disambiguation_prompt_enabled:
             retrieve_documents_with_rephrased_question = self.enhanced_create_history_aware_retriever(
-                self.disambiguation_llm, self.knowledge_base.retriever, self.disambiguation_prompt_template
+                self.disambiguation_llm, request_retriever, self.disambiguation_prompt_template
             )
+            # The question is rephrased and its documents retrieved once, ahead of the rest of the chain, which reads
+            # the results instead of running the rephrasing again for each of them
+            retrieval_results = RunnablePassthrough.assign(
+                retrieval_results=retrieve_documents_with_rephrased_question
+            ).with_config(run_name="retrieval_results")
 
-            history_aware_retriever = retrieve_documents_with_rephrased_question | itemgetter("retriever")
+            retriever = RunnableLambda(lambda x: x[RETRIEVAL_RESULTS_KEY][RETRIEVED_DOCUMENTS_KEY])
             if self.rephrase_question:
-                rephrased_question = retrieve_documents_with_rephrased_question | itemgetter(REPHRASED_QUERY_KEY)
+                rephrased_question = RunnableLambda(lambda x: x[RETRIEVAL_RESULTS_KEY][REPHRASED_QUERY_KEY])
             else:
                 rephrased_question = None
-
-            retriever = history_aware_retriever
         else:
             # Using enhanced methods for this case also allows usage of response_if_no_docs found case with
             # disambiguation enabled.
             # Note that when disambiguation is disabled, rephrased_question cannot be set.
-            retriever = self.knowledge_base.retriever
+            retrieval_results = None
+            retriever = itemgetter(INPUT_KEY) | request_retriever
             rephrased_question = None
 
         qa_chain = self.enhanced_create_stuff_documents_chain(
@@ -391,8 +554,13 @@ class RetrievalLLM(BaseLangChainModel):
             document_prompt=self.get_document_prompt(),
         )
 
-        qa_chain = qa_chain.with_config(RunnableConfig(callbacks=self.callbacks))
-        conversation_qa_chain = self.enhanced_create_retrieval_chain(retriever, qa_chain, rephrased_question)
+        qa_chain = bind_request_callbacks(qa_chain)
+        document_packer = DocumentPacker.from_environment(self.model_defaults.max_prompt_size)
+        conversation_qa_chain = self.enhanced_create_retrieval_chain(
+            retriever, qa_chain, rephrased_question, document_packer
+        )
+        if retrieval_results is not None:
+            conversation_qa_chain = retrieval_results | conversation_qa_chain
 
         return conversation_qa_chain
 
@@ -447,6 +615,7 @@ class RetrievalLLM(BaseLangChainModel):
              "answer": str,
              "source_documents": List[Dict],
              "rephrased_query": str, (only if disambiguation is enabled)
+             "dropped_source_documents": List[Dict], (only if document packing dropped any)
             }
 
         Child classes implement error handling (and flushing metrics) based on specific errors
@@ -456,19 +625,18 @@ class RetrievalLLM(BaseLangChainModel):
         if self.disambiguation_prompt_enabled:
             logger.debug(f"Disambiguation prompt for LLM: {self.disambiguation_prompt_template}")
 
-        invoke_configuration = {
-            "configurable": {
-                CONVERSATION_ID_KEY: self.conversation_history_params[CONVERSATION_ID_KEY],
-                USER_ID_KEY: self.conversation_history_params[USER_ID_KEY],
-                MESSAGE_ID_KEY: self.conversation_history_params[MESSAGE_ID_KEY],
-            }
-        }
+        answer_cache = self.get_answer_cache()
+        if answer_cache is not None:
+            cached_response = self.get_cached_response(answer_cache, question)
+            if cached_response is not None:
+                return cached_response
+
+        invoke_configuration = self.get_invoke_configuration()
 
         with tracer.provider.in_subsegment("## llm_chain") as subsegment:
             subsegment.put_annotation("library", "langchain")
             subsegment.put_annotation("operation", RAG_CONVERSATION_TRACER_KEY)
             metrics.add_metric(name=CloudWatchMetrics.LANGCHAIN_QUERY.value, unit=MetricUnit.Count, value=1)
-            metrics.flush_metrics()
             response = {}
             start_time = time.time()
             if self.streaming:
@@ -497,19 +665,122 @@ class RetrievalLLM(BaseLangChainModel):
                     response[SOURCE_DOCUMENTS_OUTPUT_KEY] = []
                     response[LLM_RESPONSE_KEY] = self.response_if_no_docs_found
 
+            dropped_documents = model_response.get(DROPPED_DOCUMENTS_KEY)
+            if dropped_documents:
+                metrics.add_metric(
+                    name=CloudWatchMetrics.PACKING_DROPPED_DOCUMENTS.value,
+                    unit=MetricUnit.Count,
+                    value=len(dropped_documents),
+                )
+                if self.return_source_docs:
+                    response[DROPPED_SOURCE_DOCUMENTS_OUTPUT_KEY] = self.knowledge_base.source_docs_formatter(
+                        dropped_documents
+                    )
+
             if self.disambiguation_prompt_enabled and REPHRASED_QUERY_KEY in model_response:
                 response[REPHRASED_QUERY_KEY] = model_response[REPHRASED_QUERY_KEY]
                 logger.debug(f"Disambiguated/rephrased question: {response[REPHRASED_QUERY_KEY]}")
 
+            # answers that depend on the conversation so far, or that no documents were found for, are not reused
+            if (
+                answer_cache is not None
+                and not model_response.get(HISTORY_KEY)
+                and model_response.get(SOURCE_DOCUMENTS_RECEIVED_KEY)
+            ):
+                answer_cache.put(question, response[LLM_RESPONSE_KEY], model_response[SOURCE_DOCUMENTS_RECEIVED_KEY])
+
             metrics.add_metric(
                 name=CloudWatchMetrics.LANGCHAIN_QUERY_PROCESSING_TIME.value,
                 unit=MetricUnit.Seconds,
                 value=(end_time - start_time),
             )
-            metrics.flush_metrics()
             logger.debug(f"LLM response: {response[LLM_RESPONSE_KEY]}")
             return response
 
+    def get_answer_cache(self) -> Optional[AnswerCache]:
+        """
+        Returns the answer cache for this use case and config, or None if ANSWER_CACHE_TTL is not set or the knowledge
+        base applies role based access control, in which case answers depend on who asks. The cache is scoped by the
+        use case, the effective config the runnable is built from and the retrieval parameters of the knowledge base,
+        so a config change starts with an empty cache.
+
+        Returns:
+            Optional[AnswerCache]: the answer cache, None if it is not used
+        """
+        if not get_answer_cache_ttl() or getattr(self.knowledge_base, "rag_rbac_enabled", False):
+            return None
+
+        retriever = self.knowledge_base.retriever
+        retrieval_scope = (
+            retriever.get_cache_key("") if hasattr(retriever, "get_cache_key") else type(retriever).__name__
+        )
+        scope = AnswerCache.get_scope(os.getenv(USE_CASE_UUID_ENV_VAR), self.get_runnable_cache_key(), retrieval_scope)
+        return AnswerCache.from_environment(scope=scope)
+
+    def get_cached_response(self, answer_cache: AnswerCache, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Answers the question from the answer cache if it, or a near-duplicate of it, was answered before and this is
+        the start of the conversation. The answer is sent through the streaming callbacks, when streaming, and saved
+        to the conversation history as a generated answer would be.
+
+        Args:
+            answer_cache (AnswerCache): the answer cache of this use case and config
+            question (str): the question asked by the user
+
+        Returns:
+            Optional[Dict[str, Any]]: the response in the form returned by generate, or None if it must be generated
+        """
+        cached_answer = answer_cache.get(question)
+        history = None
+        if cached_answer is not None:
+            # conversation history is only read when there is an answer to reuse
+            history = self.get_session_history(
+                self.conversation_history_params[USER_ID_KEY],
+                self.conversation_history_params[CONVERSATION_ID_KEY],
+                self.conversation_history_params[MESSAGE_ID_KEY],
+            )
+            if history.messages:
+                cached_answer = None
+
+        if cached_answer is None:
+            metrics.add_metric(name=CloudWatchMetrics.ANSWER_CACHE_MISSES.value, unit=MetricUnit.Count, value=1)
+            return None
+
+        metrics.add_metric(name=CloudWatchMetrics.ANSWER_CACHE_HITS.value, unit=MetricUnit.Count, value=1)
+        response = self.get_cached_answer_response(cached_answer, question)
+        if self.streaming:
+            for callback in self.callbacks or []:
+                if isinstance(callback, WebsocketStreamingCallbackHandler):
+                    callback.replay_response(
+                        response[LLM_RESPONSE_KEY],
+                        cached_answer.source_documents,
+                        response.get(REPHRASED_QUERY_KEY),
+                    )
+        history.add_messages([HumanMessage(content=question), AIMessage(content=response[LLM_RESPONSE_KEY])])
+        return response
+
+    def get_cached_answer_response(self, cached_answer: CachedAnswer, question: str) -> Dict[str, Any]:
+        """
+        Builds the response generate returns from a cached answer. Without history the question is not rephrased, so
+        the rephrased query, when one is returned, is the question itself.
+        """
+        response = {LLM_RESPONSE_KEY: cached_answer.answer}
+        if self.return_source_docs:
+            response[SOURCE_DOCUMENTS_OUTPUT_KEY] = self.knowledge_base.source_docs_formatter(
+                cached_answer.source_documents
+            )
+        if self.disambiguation_prompt_enabled and self.rephrase_question:
+            response[REPHRASED_QUERY_KEY] = question
+        return response
+
+    def get_invoke_configuration(self) -> RunnableConfig:
+        """
+        Adds the request's retriever to the per-request invoke configuration
+        """
+        invoke_configuration = super().get_invoke_configuration()
+        invoke_configuration["configurable"][REQUEST_RETRIEVER_KEY] = self.knowledge_base.retriever
+        return invoke_configuration
+
     def get_validated_disambiguation_prompt(
         self,
         disambiguation_prompt_template: Optional[str],
@@ -527,30 +798,22 @@ class RetrievalLLM(BaseLangChainModel):
         Returns:
             ChatPromptTemplate: the disambiguation/condensing prompt template object with the prompt template and placeholders set
         """
-        try:
-            if not disambiguation_prompt_enabled:
-                if disambiguation_prompt_template:
-                    logger.error(
-                        "DisambiguationEnabled is False and DisambiguationPromptTemplate is set. Proceeding without Disambiguation prompt template",
-                        xray_trace_id=os.environ[TRACE_ID_ENV_VAR],
-                    )
-
-                return None
-
-            if disambiguation_prompt_template and disambiguation_prompt_template_placeholders:
-                validate_prompt_placeholders(
-                    disambiguation_prompt_template, disambiguation_prompt_template_placeholders
+        if not disambiguation_prompt_enabled:
+            if disambiguation_prompt_template:
+                logger.error(
+                    "DisambiguationEnabled is False and DisambiguationPromptTemplate is set. Proceeding without Disambiguation prompt template",
+                    xray_trace_id=os.environ[TRACE_ID_ENV_VAR],
                 )
-                prompt_template_text = disambiguation_prompt_template
-                return ChatPromptTemplate.from_template(prompt_template_text)
 
-            else:
-                message = f"Disambiguation prompt template not provided."
-                logger.error(message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
-                metrics.add_metric(
-                    name=CloudWatchMetrics.INCORRECT_INPUT_FAILURES.value, unit=MetricUnit.Count, value=1
-                )
-                raise ValueError(message)
+            return None
 
-        finally:
-            metrics.flush_metrics()
+        if disambiguation_prompt_template and disambiguation_prompt_template_placeholders:
+            validate_prompt_placeholders(disambiguation_prompt_template, disambiguation_prompt_template_placeholders)
+            prompt_template_text = disambiguation_prompt_template
+            return ChatPromptTemplate.from_template(prompt_template_text)
+
+        else:
+            message = f"Disambiguation prompt template not provided."
+            logger.error(message, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+            metrics.add_metric(name=CloudWatchMetrics.INCORRECT_INPUT_FAILURES.value, unit=MetricUnit.Count, value=1)
+            raise ValueError(message)
@@ -14,7 +14,6 @@ from langchain_classic.chains.combine_documents.base import (
     DEFAULT_DOCUMENT_SEPARATOR,
     _validate_prompt,
 )
-from langchain_aws.llms.sagemaker_endpoint import SagemakerEndpoint
 from langchain_core.documents import Document
 from langchain_core.language_models import LanguageModelLike
 from langchain_core.output_parsers import BaseOutputParser, StrOutputParser
@@ -24,7 +23,9 @@ from pydantic_core import ValidationError
 
 from llms.models.model_provider_inputs import SageMakerInputs
 from llms.models.sagemaker.content_handler import SageMakerContentHandler
+from llms.models.sagemaker.streaming_endpoint import SageMakerStreamingEndpoint
 from llms.rag.retrieval_llm import RetrievalLLM
+from shared.callbacks.websocket_gone_exception import WebSocketGoneException
 from shared.defaults.model_defaults import ModelDefaults
 from utils.constants import (
     CONTEXT_KEY,
@@ -105,6 +106,9 @@ class SageMakerRetrievalLLM(RetrievalLLM):
         self.input_schema = model_inputs.input_schema
         self.response_jsonpath = model_inputs.response_jsonpath
         self.model_params, self.endpoint_params = self.get_clean_model_params(model_inputs.model_params)
+        self.set_runnable()
+
+    def create_runnable(self) -> None:
         self.llm = self.get_llm()
         self.disambiguation_llm = self.get_llm(condense_prompt_model=True)
         self.chain = RunnableLambda(self.format_chat_history) | self.get_chain()
@@ -145,13 +149,13 @@ class SageMakerRetrievalLLM(RetrievalLLM):
     def endpoint_params(self, endpoint_params) -> None:
         self._endpoint_params = endpoint_params
 
-    def get_llm(self, condense_prompt_model: bool = False, *args, **kwargs) -> SagemakerEndpoint:
+    def get_llm(self, condense_prompt_model: bool = False, *args, **kwargs) -> SageMakerStreamingEndpoint:
         """
-        Creates a SagemakerEndpoint LLM based on supplied params
+        Creates a SageMakerStreamingEndpoint LLM based on supplied params
         Args: None
 
         Returns:
-            (SagemakerEndpoint) The created LangChain LLM object that can be invoked in a conversation chain
+            (SageMakerStreamingEndpoint) The created LangChain LLM object that can be invoked in a conversation chain
         """
         sagemaker_client = get_service_client("sagemaker-runtime")
         content_handler = SageMakerContentHandler(
@@ -160,7 +164,7 @@ class SageMakerRetrievalLLM(RetrievalLLM):
         )
         streaming = False if condense_prompt_model else self.streaming
 
-        return SagemakerEndpoint(
+        return SageMakerStreamingEndpoint(
             endpoint_name=self.sagemaker_endpoint_name,
             client=sagemaker_client,
             model_kwargs=self.model_params,
@@ -218,6 +222,9 @@ class SageMakerRetrievalLLM(RetrievalLLM):
             response = super().generate(question)
             logger.debug(f"Model response: {response}")
             return response
+        except WebSocketGoneException:
+            # not a model failure: the client went away and generation was stopped
+            raise
         except ValidationError as ve:
             error_message = (
                 error_message
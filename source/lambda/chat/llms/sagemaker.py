@@ -9,7 +9,6 @@ from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.metrics import MetricUnit
 from botocore.exceptions import ClientError, EndpointConnectionError
 from helper import get_service_client
-from langchain_aws.llms.sagemaker_endpoint import SagemakerEndpoint
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
@@ -19,6 +18,8 @@ from pydantic_core import ValidationError
 from llms.base_langchain import BaseLangChainModel
 from llms.models.model_provider_inputs import SageMakerInputs
 from llms.models.sagemaker.content_handler import SageMakerContentHandler
+from llms.models.sagemaker.streaming_endpoint import SageMakerStreamingEndpoint
+from shared.callbacks.websocket_gone_exception import WebSocketGoneException
 from shared.defaults.model_defaults import ModelDefaults
 from utils.constants import SAGEMAKER_ENDPOINT_ARGS, TEMPERATURE_PLACEHOLDER_STR, TRACE_ID_ENV_VAR
 from utils.custom_exceptions import LLMInvocationError
@@ -78,9 +79,7 @@ class SageMakerLLM(BaseLangChainModel):
         self._input_schema = model_inputs.input_schema
         self._response_jsonpath = model_inputs.response_jsonpath
         self.model_params, self.endpoint_params = self.get_clean_model_params(model_inputs.model_params)
-        self.llm = self.get_llm()
-        self.chain = self.get_chain()
-        self.runnable_with_history = self.get_runnable()
+        self.set_runnable()
 
     @property
     def prompt_template(self) -> ChatPromptTemplate:
@@ -121,12 +120,12 @@ class SageMakerLLM(BaseLangChainModel):
         chain = RunnableLambda(self.format_chat_history) | self.prompt_template | self.llm | StrOutputParser()
         return chain
 
-    def get_llm(self, *args, **kwargs) -> SagemakerEndpoint:
+    def get_llm(self, *args, **kwargs) -> SageMakerStreamingEndpoint:
         """
-        Creates a SagemakerEndpoint LLM based on supplied params
+        Creates a SageMakerStreamingEndpoint LLM based on supplied params
 
         Returns:
-            (SagemakerEndpoint) The created LangChain LLM object that can be invoked in a conversation chain
+            (SageMakerStreamingEndpoint) The created LangChain LLM object that can be invoked in a conversation chain
         """
         sagemaker_client = get_service_client("sagemaker-runtime")
         content_handler = SageMakerContentHandler(
@@ -134,7 +133,7 @@ class SageMakerLLM(BaseLangChainModel):
             output_path_expression=self.response_jsonpath,
         )
 
-        return SagemakerEndpoint(
+        return SageMakerStreamingEndpoint(
             endpoint_name=self.sagemaker_endpoint_name,
             client=sagemaker_client,
             model_kwargs=self.model_params,
@@ -160,6 +159,9 @@ class SageMakerLLM(BaseLangChainModel):
             response = super().generate(question)
             logger.debug(f"Model response: {response}")
             return response
+        except WebSocketGoneException:
+            # not a model failure: the client went away and generation was stopped
+            raise
         except ValidationError as ve:
             error_message = (
                 error_message
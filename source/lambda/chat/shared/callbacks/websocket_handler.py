@@ -129,23 +129,30 @@ class WebsocketHandler(BaseCallbackHandler):
             input_tokens = usage_metadata.get("input_tokens", 0)
             output_tokens = usage_metadata.get("output_tokens", 0)
             total_tokens = usage_metadata.get("total_tokens", 0)
+            # tokens of the prompt prefix read from or written to the Bedrock prompt cache
+            input_token_details = usage_metadata.get("input_token_details", {}) or {}
 
             token_metrics = {
                 CloudWatchMetrics.LLM_INPUT_TOKEN_COUNT.value: input_tokens,
                 CloudWatchMetrics.LLM_OUTPUT_TOKEN_COUNT.value: output_tokens,
                 CloudWatchMetrics.LLM_TOTAL_TOKEN_COUNT.value: total_tokens,
+                CloudWatchMetrics.LLM_CACHE_READ_INPUT_TOKEN_COUNT.value: input_token_details.get("cache_read", 0),
+                CloudWatchMetrics.LLM_CACHE_WRITE_INPUT_TOKEN_COUNT.value: input_token_details.get("cache_creation", 0),
             }
 
             for metric_name, token_count in token_metrics.items():
                 if token_count:
                     metrics.add_metric(name=metric_name, unit=MetricUnit.Count, value=int(token_count))
-            metrics.flush_metrics()
 
+            # Only chunks carrying usage or a stop reason record anything, so there is nothing to flush per token.
+            # The recorded metrics are published with the rest of the request's metrics.
             if stop_reason:
+                # closes the current dimension set so that the stop reason dimension is not applied to the token counts
+                metrics.flush_metrics()
                 stop_reason_pascal_format = "".join(word.capitalize() for word in stop_reason.split("_"))
                 metrics.add_dimension(name="StopReasonType", value=stop_reason_pascal_format)
                 metrics.add_metric(name=CloudWatchMetrics.LLM_STOP_REASON.value, unit=MetricUnit.Count, value=1)
-            metrics.flush_metrics()
+                metrics.flush_metrics()
 
     def post_response_to_connection(self, payload: dict) -> None:
         """
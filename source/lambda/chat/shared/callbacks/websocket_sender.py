@@ -0,0 +1,130 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import queue
+import threading
+from typing import Optional
+
+import botocore
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+
+from shared.callbacks.websocket_gone_exception import WebSocketGoneException, is_gone_exception
+from utils.constants import DEFAULT_WEBSOCKET_SENDER_IDLE_TIMEOUT, TRACE_ID_ENV_VAR
+
+logger = Logger(utc=True)
+
+
+class WebsocketSender:
+    """
+    Posts payloads to a websocket connection from a background thread so that the caller (the LLM token loop) does
+    not block on each post_to_connection round trip. Payloads are sent in the order they are queued. The queue is
+    bounded, so a caller producing faster than API Gateway accepts is slowed down rather than buffering without limit.
+
+    The worker thread is started on demand and exits after idling for DEFAULT_WEBSOCKET_SENDER_IDLE_TIMEOUT seconds,
+    so a sender that is never drained (for example, when generation fails) does not leave a thread behind.
+
+    Attributes:
+        client (botocore.client): apigatewaymanagementapi client used to post the payloads
+        connection_id (str): The connection ID for the websocket client
+        max_queue_size (int): Maximum number of payloads waiting to be sent
+
+    Methods:
+        send(data): Queues the payload, raising the error of an earlier failed post if there was one
+        drain(): Blocks until every queued payload has been posted, raising the error of a failed post if any
+    """
+
+    def __init__(self, client: botocore.client, connection_id: str, max_queue_size: int) -> None:
+        self._client = client
+        self._connection_id = connection_id
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._error: Optional[Exception] = None
+        self._connection_gone = False
+
+    @property
+    def connection_id(self) -> str:
+        return self._connection_id
+
+    @property
+    def client(self) -> botocore.client:
+        return self._client
+
+    def send(self, data: str) -> None:
+        """
+        Queues the payload to be posted to the connection. Blocks while the queue is full.
+
+        Args:
+            data (str): the formatted payload to post
+
+        Raises:
+            WebSocketGoneException: If an earlier post found the connection permanently gone
+            Exception: the error of an earlier failed post, raised once
+        """
+        self.raise_if_failed()
+        # The worker takes the lock before exiting on an empty queue, so holding it here guarantees a live worker
+        # for this payload. The worker does not need the lock while the queue is non-empty, so blocking on a full
+        # queue cannot deadlock.
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="websocket-sender", daemon=True)
+                self._worker.start()
+            self._queue.put(data)
+
+    def drain(self) -> None:
+        """
+        Blocks until every queued payload has been posted.
+
+        Raises:
+            WebSocketGoneException: If the connection is permanently gone
+            Exception: the error of a failed post, if any
+        """
+        self._queue.join()
+        self.raise_if_failed()
+
+    def raise_if_failed(self) -> None:
+        if self._connection_gone:
+            raise self._error
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            try:
+                data = self._queue.get(timeout=DEFAULT_WEBSOCKET_SENDER_IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+
+            try:
+                # once the connection is gone the remaining payloads are discarded
+                if not self._connection_gone:
+                    self._post(data)
+            finally:
+                self._queue.task_done()
+
+    def _post(self, data: str) -> None:
+        try:
+            self.client.post_to_connection(ConnectionId=self.connection_id, Data=data)
+        except ClientError as e:
+            if is_gone_exception(e):
+                self._connection_gone = True
+                self._error = WebSocketGoneException(self.connection_id, original_error=e)
+                return
+            logger.error(
+                f"Error sending token to connection {self.connection_id}: {e}",
+                xray_trace_id=os.environ.get(TRACE_ID_ENV_VAR),
+            )
+            self._error = e
+        except Exception as ex:
+            logger.error(
+                f"Error sending token to connection {self.connection_id}: {ex}",
+                xray_trace_id=os.environ.get(TRACE_ID_ENV_VAR),
+            )
+            self._error = ex
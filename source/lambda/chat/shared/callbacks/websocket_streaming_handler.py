@@ -3,6 +3,7 @@
 
 import json
 import os
+import time
 from typing import Any, Callable, Dict, List, Optional
 from uuid import UUID
 
@@ -16,15 +17,22 @@ from langchain_core.messages import BaseMessage
 from langchain_core.messages.ai import AIMessageChunk
 
 from shared.callbacks.websocket_gone_exception import WebSocketGoneException, is_gone_exception
+from shared.callbacks.websocket_sender import WebsocketSender
 from utils.constants import (
     CONTEXT_KEY,
     CONVERSATION_ID_EVENT_KEY,
+    DEFAULT_STREAMING_COALESCE_MAX_BYTES,
+    DEFAULT_STREAMING_COALESCE_WINDOW_MS,
+    DEFAULT_STREAMING_SEND_QUEUE_SIZE,
     MESSAGE_ID_EVENT_KEY,
     OUTPUT_KEY,
     PAYLOAD_DATA_KEY,
     PAYLOAD_SOURCE_DOCUMENT_KEY,
     REPHRASED_QUERY_KEY,
     SOURCE_DOCUMENTS_RECEIVED_KEY,
+    STREAMING_COALESCE_MAX_BYTES_ENV_VAR,
+    STREAMING_COALESCE_WINDOW_MS_ENV_VAR,
+    STREAMING_SEND_QUEUE_SIZE_ENV_VAR,
     TRACE_ID_ENV_VAR,
     WEBSOCKET_CALLBACK_URL_ENV_VAR,
 )
@@ -48,9 +56,19 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
         client (botocore.client): client that establishes the connection to the websocket API
         source_documents_formatter(Callable): Function that formats the source documents per the specific
             knowledge base on_chain_end
+        coalesce_window_ms (int): When greater than 0, tokens are buffered and sent together once this many
+            milliseconds have passed since the first buffered token. Defaults to STREAMING_COALESCE_WINDOW_MS.
+        coalesce_max_bytes (int): Size of buffered tokens (in UTF-8 bytes) at which the buffer is sent regardless of
+            the window. Defaults to STREAMING_COALESCE_MAX_BYTES.
+        send_queue_size (int): When greater than 0, payloads are posted by a background WebsocketSender through a
+            queue of this size instead of on the LLM's thread. Defaults to STREAMING_SEND_QUEUE_SIZE.
 
     Methods:
         post_token_to_connection(payload): Sends a payload to the client that is connected to a websocket.
+        stream_token(token): Sends a token to the client, or buffers it when coalescing is enabled
+        flush_tokens(): Sends any buffered tokens to the client as a single payload
+        drain(): Sends buffered tokens and waits for the background sender to post everything queued
+        replay_response(answer, source_documents, rephrased_query): Sends an answer that was not generated by the LLM
         on_llm_new_token(token, **kwargs): Executed when the llm creates a new token
         on_llm_end(self, payload: any, **kwargs: any): Executes once the LLM completes generating a payload
         on_llm_error(self, error: Exception, **kwargs: any): Executes when the underlying llm errors out.
@@ -76,6 +94,9 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
         rag_enabled: bool = False,
         response_if_no_docs_found: str = None,
         return_source_docs: bool = True,
+        coalesce_window_ms: Optional[int] = None,
+        coalesce_max_bytes: Optional[int] = None,
+        send_queue_size: Optional[int] = None,
     ) -> None:
         self._connection_url = os.environ.get(WEBSOCKET_CALLBACK_URL_ENV_VAR)
         self._connection_id = connection_id
@@ -91,8 +112,35 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
         self.streamed_rephrase_query = False
         self.return_source_docs = return_source_docs
         self._connection_gone = False
+        self._coalesce_window_ms = (
+            coalesce_window_ms
+            if coalesce_window_ms is not None
+            else self._get_int_env_var(STREAMING_COALESCE_WINDOW_MS_ENV_VAR, DEFAULT_STREAMING_COALESCE_WINDOW_MS)
+        )
+        self._coalesce_max_bytes = (
+            coalesce_max_bytes
+            if coalesce_max_bytes is not None
+            else self._get_int_env_var(STREAMING_COALESCE_MAX_BYTES_ENV_VAR, DEFAULT_STREAMING_COALESCE_MAX_BYTES)
+        )
+        self._token_buffer: List[str] = []
+        self._token_buffer_bytes = 0
+        self._token_buffer_started_at: Optional[float] = None
+        send_queue_size = (
+            send_queue_size
+            if send_queue_size is not None
+            else self._get_int_env_var(STREAMING_SEND_QUEUE_SIZE_ENV_VAR, DEFAULT_STREAMING_SEND_QUEUE_SIZE)
+        )
+        self._sender = WebsocketSender(self._client, connection_id, send_queue_size) if send_queue_size > 0 else None
         super().__init__()
 
+    @staticmethod
+    def _get_int_env_var(env_var: str, default: int) -> int:
+        try:
+            return int(os.getenv(env_var, default))
+        except ValueError:
+            logger.warning(f"Invalid value for {env_var}, defaulting to {default}.")
+            return default
+
     @property
     def is_streaming(self) -> str:
         return self._is_streaming
@@ -145,6 +193,28 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
     def source_documents_formatter(self) -> str:
         return self._source_documents_formatter
 
+    @property
+    def coalesce_window_ms(self) -> int:
+        return self._coalesce_window_ms
+
+    @property
+    def coalesce_max_bytes(self) -> int:
+        return self._coalesce_max_bytes
+
+    @property
+    def coalescing_enabled(self) -> bool:
+        return self._coalesce_window_ms > 0
+
+    @property
+    def sender(self) -> Optional[WebsocketSender]:
+        return self._sender
+
+    @property
+    def raise_error(self) -> bool:
+        # LangChain logs and swallows callback errors unless raise_error is set. A gone connection is let through
+        # so that generation stops instead of producing tokens nobody will receive.
+        return self._connection_gone
+
     def on_chat_model_start(
         self,
         serialized: Dict[str, Any],
@@ -156,17 +226,25 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
 
     def post_token_to_connection(self, payload: str, payload_key: str = PAYLOAD_DATA_KEY) -> None:
         """
-        Sends a payload to the client that is connected to a websocket.
+        Sends a payload to the client that is connected to a websocket, or queues it on the background sender.
 
         Args:
             payload (str): payload to send to the client.
 
         Raises:
-            WebSocketGoneException: If the connection is permanently gone (HTTP 410)
+            WebSocketGoneException: If the connection is permanently gone (HTTP 410). With the background sender,
+                this is raised by the first call after a post found the connection gone.
             Exception: if there is another error posting the payload to the connection
         """
         if self._connection_gone:
             return
+        if self.sender is not None:
+            try:
+                self.sender.send(self.format_response(payload, payload_key))
+            except WebSocketGoneException:
+                self._connection_gone = True
+                raise
+            return
         try:
             self.client.post_to_connection(
                 ConnectionId=self.connection_id, Data=self.format_response(payload, payload_key)
@@ -175,7 +253,10 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
             if is_gone_exception(e):
                 self._connection_gone = True
                 raise WebSocketGoneException(self.connection_id, original_error=e) from e
-            logger.error(f"Error sending token to connection {self.connection_id}: {e}", xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+            logger.error(
+                f"Error sending token to connection {self.connection_id}: {e}",
+                xray_trace_id=os.environ[TRACE_ID_ENV_VAR],
+            )
             raise e
         except Exception as ex:
             logger.error(
@@ -190,20 +271,81 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
         It is used to send tokens to the client connected, as a post request, to the websocket using the aws-sdk.
         It also publishes token usage and llm stop reason metrics to cloudwatch
         Args:
-            token (str): Token to send to the client.
+            token (str): Token to send to the client. Chat models send a list of content blocks, while text completion
+                models such as SageMaker endpoints send the text itself.
         """
-        for content in token:
-            # at this moment, Chat UI only supports the rendering of text, so stream that back
-            if content.get("type") == "text":
-                self.post_token_to_connection(content["text"])
-                self.has_streamed = True
+        if isinstance(token, str):
+            if token:
+                self.stream_token(token)
+        else:
+            for content in token:
+                # at this moment, Chat UI only supports the rendering of text, so stream that back
+                if content.get("type") == "text":
+                    self.stream_token(content["text"])
 
         chunk = kwargs.get("chunk")
         self._update_cw_dashboard(chunk)
 
+    def stream_token(self, token: str) -> None:
+        """
+        Sends the token to the client. When coalescing is enabled, the token is buffered instead and the buffer is
+        sent as one payload once it reaches coalesce_max_bytes or has been open for coalesce_window_ms. The window is
+        checked as tokens arrive; whatever remains is sent by flush_tokens at the end of the LLM run or chain.
+
+        Args:
+            token (str): Token to send to the client.
+        """
+        if not self.coalescing_enabled:
+            self.post_token_to_connection(token)
+            self.has_streamed = True
+            return
+
+        if self._token_buffer_started_at is None:
+            self._token_buffer_started_at = time.monotonic()
+        self._token_buffer.append(token)
+        self._token_buffer_bytes += len(token.encode("utf-8"))
+
+        window_elapsed = (time.monotonic() - self._token_buffer_started_at) * 1000 >= self.coalesce_window_ms
+        if window_elapsed or self._token_buffer_bytes >= self.coalesce_max_bytes:
+            self.flush_tokens()
+
+    def flush_tokens(self) -> None:
+        """
+        Sends the buffered tokens, if any, to the client as a single payload.
+        """
+        if not self._token_buffer:
+            return
+
+        payload = "".join(self._token_buffer)
+        self._token_buffer = []
+        self._token_buffer_bytes = 0
+        self._token_buffer_started_at = None
+        self.post_token_to_connection(payload)
+        self.has_streamed = True
+
+    def drain(self) -> None:
+        """
+        Sends any buffered tokens and, when the background sender is used, waits until everything queued has been
+        posted. Must be called before anything else (such as END_CONVERSATION_TOKEN) is posted to the connection.
+
+        Raises:
+            WebSocketGoneException: If the connection is permanently gone
+        """
+        self.flush_tokens()
+        if self.sender is not None and not self._connection_gone:
+            try:
+                self.sender.drain()
+            except WebSocketGoneException:
+                self._connection_gone = True
+                raise
+
     def on_llm_start(self, serialized, prompts, **kwargs):
         logger.debug(f"Prompt sent to the LLM: {prompts}")
 
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        """Run when LLM ends running. Sends the tokens still buffered for this generation."""
+        self.flush_tokens()
+
     def _update_cw_dashboard(self, generation: AIMessageChunk):
         if generation and hasattr(generation, "message"):
             response_metadata = getattr(generation.message, "response_metadata", {}) or {}
@@ -213,23 +355,30 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
             input_tokens = usage_metadata.get("input_tokens", 0)
             output_tokens = usage_metadata.get("output_tokens", 0)
             total_tokens = usage_metadata.get("total_tokens", 0)
+            # tokens of the prompt prefix read from or written to the Bedrock prompt cache
+            input_token_details = usage_metadata.get("input_token_details", {}) or {}
 
             token_metrics = {
                 CloudWatchMetrics.LLM_INPUT_TOKEN_COUNT.value: input_tokens,
                 CloudWatchMetrics.LLM_OUTPUT_TOKEN_COUNT.value: output_tokens,
                 CloudWatchMetrics.LLM_TOTAL_TOKEN_COUNT.value: total_tokens,
+                CloudWatchMetrics.LLM_CACHE_READ_INPUT_TOKEN_COUNT.value: input_token_details.get("cache_read", 0),
+                CloudWatchMetrics.LLM_CACHE_WRITE_INPUT_TOKEN_COUNT.value: input_token_details.get("cache_creation", 0),
             }
 
             for metric_name, token_count in token_metrics.items():
                 if token_count:
                     metrics.add_metric(name=metric_name, unit=MetricUnit.Count, value=int(token_count))
-            metrics.flush_metrics()
 
+            # Only chunks carrying usage or a stop reason record anything, so there is nothing to flush per token.
+            # The recorded metrics are published with the rest of the request's metrics.
             if stop_reason:
+                # closes the current dimension set so that the stop reason dimension is not applied to the token counts
+                metrics.flush_metrics()
                 stop_reason_pascal_format = "".join(word.capitalize() for word in stop_reason.split("_"))
                 metrics.add_dimension(name="StopReasonType", value=stop_reason_pascal_format)
                 metrics.add_metric(name=CloudWatchMetrics.LLM_STOP_REASON.value, unit=MetricUnit.Count, value=1)
-            metrics.flush_metrics()
+                metrics.flush_metrics()
 
     def _handle_fallback_or_output_response(self, outputs: Dict) -> None:
         """
@@ -266,6 +415,27 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
         for document in payload:
             self.post_token_to_connection(document, PAYLOAD_SOURCE_DOCUMENT_KEY)
 
+    def replay_response(self, answer: str, source_documents: List, rephrased_query: Optional[str] = None) -> None:
+        """
+        Sends a complete answer, such as one reused from the answer cache, to the client in the same way as a
+        generated one: the answer text, then the references and the rephrased query.
+
+        Args:
+            answer (str): the answer to send
+            source_documents (List): the unformatted documents the answer is based on
+            rephrased_query (Optional[str]): the rephrased query to send, if any
+        """
+        self.stream_token(answer)
+        self.flush_tokens()
+
+        if not self.has_streamed_references and self.return_source_docs and source_documents:
+            self.send_references(source_documents)
+            self.has_streamed_references = True
+
+        if not self.streamed_rephrase_query and rephrased_query is not None:
+            self.post_token_to_connection(rephrased_query, REPHRASED_QUERY_KEY)
+            self.streamed_rephrase_query = True
+
     def on_chain_end(
         self,
         outputs: Any,
@@ -277,6 +447,9 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
     ) -> None:
         """Run when chain ends running."""
 
+        # buffered tokens must reach the client before the fallback response, references and rephrased query
+        self.flush_tokens()
+
         if not isinstance(outputs, dict):
             return
 
@@ -304,6 +477,8 @@ class WebsocketStreamingCallbackHandler(AsyncIteratorCallbackHandler):
         """
         tracer_id = os.environ[TRACE_ID_ENV_VAR]
         logger.error(f"LLM Error: {error}", xray_trace_id=tracer_id)
+        # tokens generated before the error would already have been sent without coalescing
+        self.flush_tokens()
 
     def format_response(self, payload: str, payload_key: str = PAYLOAD_DATA_KEY) -> str:
         """
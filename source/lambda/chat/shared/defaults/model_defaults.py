@@ -3,16 +3,59 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+from copy import deepcopy
+from typing import Any, Dict, Optional
 
 from aws_lambda_powertools import Logger, Tracer
 from botocore.exceptions import ClientError
 from helper import get_service_resource
-from utils.constants import CHAT_IDENTIFIER, MODEL_INFO_TABLE_NAME_ENV_VAR, RAG_CHAT_IDENTIFIER, TRACE_ID_ENV_VAR
+from utils.cache import TTLCache
+from utils.constants import (
+    CHAT_IDENTIFIER,
+    DEFAULT_MODEL_DEFAULTS_CACHE_TTL,
+    DEFAULT_MODEL_DEFAULTS_NEGATIVE_CACHE_TTL,
+    MODEL_DEFAULTS_BATCH_GET_MAX_ATTEMPTS,
+    MODEL_DEFAULTS_CACHE_TTL_ENV_VAR,
+    MODEL_INFO_TABLE_NAME_ENV_VAR,
+    RAG_CHAT_IDENTIFIER,
+    TRACE_ID_ENV_VAR,
+)
 from utils.enum_types import LLMProviderTypes
 
 logger = Logger(utc=True)
 tracer = Tracer()
 
+# Resolved model-info records keyed by (table name, use case, provider, model). A cached value of None records that
+# neither the model specific nor the provider default record exists.
+_model_defaults_cache = TTLCache()
+
+
+def get_model_defaults_cache_ttl() -> int:
+    """
+    Returns the number of seconds a resolved model-info record is cached for. 0 disables caching.
+    """
+    try:
+        return max(int(os.getenv(MODEL_DEFAULTS_CACHE_TTL_ENV_VAR, DEFAULT_MODEL_DEFAULTS_CACHE_TTL)), 0)
+    except ValueError:
+        logger.warning(
+            f"Invalid value for {MODEL_DEFAULTS_CACHE_TTL_ENV_VAR}, defaulting to {DEFAULT_MODEL_DEFAULTS_CACHE_TTL}."
+        )
+        return DEFAULT_MODEL_DEFAULTS_CACHE_TTL
+
+
+def clear_model_defaults_cache() -> None:
+    """
+    Drops all cached model-info records
+    """
+    _model_defaults_cache.clear()
+
+
+def expire_model_defaults_cache() -> None:
+    """
+    Marks all cached model-info records as expired, so that each is read again when next needed
+    """
+    _model_defaults_cache.expire_all()
+
 
 class ModelDefaults:
     """
@@ -36,16 +79,7 @@ class ModelDefaults:
         record_not_found_error = f"No records found for UseCase: '{self.use_case}' and SortKey: '{self.model_provider}#{self.model_name}' in the DynamoDB defaults table."
 
         try:
-            ddb_resource = get_service_resource("dynamodb")
-            defaults_table = ddb_resource.Table(table_name)
-            # Try model-specific defaults first, then fall back to default
-            model_defaults = defaults_table.get_item(
-                Key={"UseCase": self.use_case, "SortKey": self.model_provider + "#" + self.model_name}
-            ).get("Item", {}) or defaults_table.get_item(
-                Key={"UseCase": self.use_case, "SortKey": self.model_provider + "#default"}
-            ).get(
-                "Item", {}
-            )
+            model_defaults = deepcopy(self.get_model_defaults_record(table_name))
 
             if not model_defaults:
                 logger.error(record_not_found_error, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
@@ -106,3 +140,62 @@ class ModelDefaults:
                 raise ValueError(
                     f"Records not found for UseCase: '{self.use_case}' and SortKey: '{self.model_provider}#{self.model_name}'."
                 )
+
+    def get_model_defaults_record(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the model-info record for the use case, provider and model, falling back to the provider's default
+        record. Records (including the absence of one) are cached in-process; callers must not mutate the result.
+
+        Args:
+            table_name (str): name of the model-info table
+
+        Returns:
+            (Dict): the resolved record, or None if neither record exists
+        """
+        cache_ttl = get_model_defaults_cache_ttl()
+        cache_key = (table_name, self.use_case, self.model_provider, self.model_name)
+        entry = _model_defaults_cache.get_entry(cache_key) if cache_ttl > 0 else None
+        if entry is not None and not entry.expired:
+            return entry.value
+
+        model_defaults = self.fetch_model_defaults_record(table_name)
+        if cache_ttl > 0:
+            _model_defaults_cache.put(
+                cache_key,
+                model_defaults,
+                cache_ttl if model_defaults else min(cache_ttl, DEFAULT_MODEL_DEFAULTS_NEGATIVE_CACHE_TTL),
+            )
+        return model_defaults
+
+    def fetch_model_defaults_record(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads the model specific and the provider default records in a single batch_get_item call and returns the
+        model specific one if present, else the default one.
+
+        Args:
+            table_name (str): name of the model-info table
+
+        Returns:
+            (Dict): the resolved record, or None if neither record exists
+        """
+        model_sort_key = f"{self.model_provider}#{self.model_name}"
+        default_sort_key = f"{self.model_provider}#default"
+        # batch_get_item rejects duplicate keys, which is what a model named 'default' would produce
+        sort_keys = list(dict.fromkeys([model_sort_key, default_sort_key]))
+
+        ddb_resource = get_service_resource("dynamodb")
+        request_items = {table_name: {"Keys": [{"UseCase": self.use_case, "SortKey": key} for key in sort_keys]}}
+        items = []
+        for _ in range(MODEL_DEFAULTS_BATCH_GET_MAX_ATTEMPTS):
+            response = ddb_resource.batch_get_item(RequestItems=request_items)
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                break
+        else:
+            raise ValueError(
+                f"Unable to read records for UseCase: '{self.use_case}' and SortKey: '{model_sort_key}' from the DynamoDB defaults table."
+            )
+
+        records = {item["SortKey"]: item for item in items}
+        return records.get(model_sort_key) or records.get(default_sort_key)
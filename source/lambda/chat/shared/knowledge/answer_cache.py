@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import json
+import os
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aws_lambda_powertools import Logger
+from langchain_core.documents import Document
+
+from shared.knowledge.retrieval_cache import RetrievalCache
+from utils.cache import TTLCache
+from utils.constants import (
+    ANSWER_CACHE_LSH_BANDS,
+    ANSWER_CACHE_MINHASH_PERMUTATIONS,
+    ANSWER_CACHE_SHINGLE_SIZE,
+    ANSWER_CACHE_SIMILARITY_ENV_VAR,
+    ANSWER_CACHE_TTL_ENV_VAR,
+    DEFAULT_ANSWER_CACHE_SIMILARITY,
+    DEFAULT_ANSWER_CACHE_SIZE,
+    DEFAULT_ANSWER_CACHE_TTL,
+)
+
+logger = Logger(utc=True)
+
+# Cached answers keyed by (scope, normalised question), shared by all invocations served by this container
+_answer_cache = TTLCache(max_size=DEFAULT_ANSWER_CACHE_SIZE)
+
+# Locality sensitive hashing index over the MinHash signatures of the cached questions: (scope, band, band values)
+# maps to the keys of _answer_cache whose signature has those values in that band. Keys evicted from _answer_cache
+# are dropped from the index when they are next looked up, or when the index is pruned.
+_answer_cache_index: Dict[Tuple[str, int, Tuple[int, ...]], Set[Tuple[str, str]]] = {}
+_answer_cache_index_lock = threading.Lock()
+
+# MinHash permutations h(x) = (a * x + b) mod p, fixed so that signatures are stable within and across containers
+MINHASH_PRIME = (1 << 61) - 1
+_minhash_random = random.Random(ANSWER_CACHE_MINHASH_PERMUTATIONS)
+MINHASH_PERMUTATIONS = tuple(
+    (_minhash_random.randrange(1, MINHASH_PRIME), _minhash_random.randrange(0, MINHASH_PRIME))
+    for _ in range(ANSWER_CACHE_MINHASH_PERMUTATIONS)
+)
+LSH_ROWS_PER_BAND = ANSWER_CACHE_MINHASH_PERMUTATIONS // ANSWER_CACHE_LSH_BANDS
+
+
+def get_answer_cache_ttl() -> int:
+    """
+    Returns the number of seconds a generated answer is reused. 0 disables the answer cache.
+    """
+    try:
+        return max(int(os.getenv(ANSWER_CACHE_TTL_ENV_VAR, DEFAULT_ANSWER_CACHE_TTL)), 0)
+    except ValueError:
+        logger.warning(f"Invalid value for {ANSWER_CACHE_TTL_ENV_VAR}, defaulting to {DEFAULT_ANSWER_CACHE_TTL}.")
+        return DEFAULT_ANSWER_CACHE_TTL
+
+
+def get_answer_cache_similarity() -> float:
+    """
+    Returns the estimated Jaccard similarity, between 0 and 1, at which a cached question is taken as a near-duplicate
+    """
+    try:
+        similarity = float(os.getenv(ANSWER_CACHE_SIMILARITY_ENV_VAR, DEFAULT_ANSWER_CACHE_SIMILARITY))
+    except ValueError:
+        similarity = -1
+    if not 0 < similarity <= 1:
+        logger.warning(
+            f"Invalid value for {ANSWER_CACHE_SIMILARITY_ENV_VAR}, defaulting to {DEFAULT_ANSWER_CACHE_SIMILARITY}."
+        )
+        return DEFAULT_ANSWER_CACHE_SIMILARITY
+    return similarity
+
+
+def clear_answer_cache() -> None:
+    """
+    Drops all cached answers held by this container
+    """
+    _answer_cache.clear()
+    with _answer_cache_index_lock:
+        _answer_cache_index.clear()
+
+
+@dataclass
+class CachedAnswer:
+    """
+    An answer generated for a question asked at the start of a conversation, with the documents it was based on.
+    """
+
+    question: str
+    signature: Tuple[int, ...]
+    answer: str
+    source_documents: List[Document]
+
+
+class AnswerCache:
+    """
+    Caches the answers generated for questions asked without conversation history, so that a question asked again in
+    the same scope is answered without disambiguation, retrieval or generation. Questions are normalised as for the
+    retrieval cache. A question that does not match a cached one exactly can still be answered from the cache when it
+    is a near-duplicate: the estimated Jaccard similarity of their character shingles, computed from MinHash signatures
+    and found through an LSH index, is at least similarity_threshold.
+
+    Near-duplicate matching is lexical: questions differing in a single word or number can be similar enough to
+    match, so the threshold should be set for the use case. A threshold of 1 effectively limits reuse to questions
+    that are equal once normalised.
+
+    Answers are kept by this container in an LRU cache of DEFAULT_ANSWER_CACHE_SIZE entries for ttl seconds. The
+    caller is responsible for only using the cache where an answer does not depend on who asks (no RBAC filters) or on
+    the conversation so far (no history).
+
+    Attributes:
+        scope (str): identifies the use case and config the answers were generated with; answers are not shared
+            between scopes
+        ttl (int): seconds an answer is reused
+        similarity_threshold (float): estimated Jaccard similarity at which a cached question is a near-duplicate
+
+    Methods:
+        from_environment(scope): Returns the cache configured with ANSWER_CACHE_TTL and ANSWER_CACHE_SIMILARITY
+        get_scope(*parts): Returns the scope identifying the given use case and config
+        get_shingles(question): Returns the character shingles of the normalised question
+        get_signature(question): Returns the MinHash signature of the normalised question
+        get(question): Returns the answer cached for the question or a near-duplicate of it
+        put(question, answer, source_documents): Stores the answer generated for the question
+    """
+
+    def __init__(self, scope: str, ttl: int, similarity_threshold: float = DEFAULT_ANSWER_CACHE_SIMILARITY) -> None:
+        self.scope = scope
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+
+    @classmethod
+    def from_environment(cls, scope: str) -> Optional["AnswerCache"]:
+        """
+        Returns the cache configured with ANSWER_CACHE_TTL and ANSWER_CACHE_SIMILARITY, or None if disabled
+        """
+        ttl = get_answer_cache_ttl()
+        if not ttl:
+            return None
+        return cls(scope=scope, ttl=ttl, similarity_threshold=get_answer_cache_similarity())
+
+    @staticmethod
+    def get_scope(*parts: Any) -> str:
+        """
+        Returns a hex digest identifying the use case and config, given everything the answers depend on
+        """
+        serialized_parts = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(serialized_parts.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_shingles(question: str) -> Set[str]:
+        """
+        Returns the overlapping ANSWER_CACHE_SHINGLE_SIZE character substrings of the normalised question. A question
+        shorter than that is its own single shingle.
+        """
+        normalized_question = RetrievalCache.normalize_query(question)
+        if len(normalized_question) <= ANSWER_CACHE_SHINGLE_SIZE:
+            return {normalized_question}
+        return {
+            normalized_question[i : i + ANSWER_CACHE_SHINGLE_SIZE]
+            for i in range(len(normalized_question) - ANSWER_CACHE_SHINGLE_SIZE + 1)
+        }
+
+    @classmethod
+    def get_signature(cls, question: str) -> Tuple[int, ...]:
+        """
+        Returns the MinHash signature of the question's shingles. The fraction of positions at which the signatures
+        of two questions are equal estimates the Jaccard similarity of their shingles.
+        """
+        shingle_hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in cls.get_shingles(question)
+        ]
+        return tuple(
+            min((a * shingle_hash + b) % MINHASH_PRIME for shingle_hash in shingle_hashes)
+            for a, b in MINHASH_PERMUTATIONS
+        )
+
+    @staticmethod
+    def estimate_similarity(signature: Tuple[int, ...], other_signature: Tuple[int, ...]) -> float:
+        """Returns the estimated Jaccard similarity of the questions with the given MinHash signatures"""
+        return sum(1 for value, other in zip(signature, other_signature) if value == other) / len(signature)
+
+    def get_bands(self, signature: Tuple[int, ...]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        """Returns the LSH index keys of the signature, one per band"""
+        return [
+            (self.scope, band, signature[band * LSH_ROWS_PER_BAND : (band + 1) * LSH_ROWS_PER_BAND])
+            for band in range(ANSWER_CACHE_LSH_BANDS)
+        ]
+
+    def get(self, question: str) -> Optional[CachedAnswer]:
+        """
+        Returns the answer cached for the question, or else for the most similar near-duplicate of it.
+
+        Args:
+            question (str): the question as asked by the user
+
+        Returns:
+            Optional[CachedAnswer]: the cached answer, with copies of its source documents, or None on a miss
+        """
+        normalized_question = RetrievalCache.normalize_query(question)
+        cached_answer = _answer_cache.get((self.scope, normalized_question))
+
+        if cached_answer is None:
+            signature = self.get_signature(question)
+            best_similarity = self.similarity_threshold
+            for band_key in self.get_bands(signature):
+                with _answer_cache_index_lock:
+                    candidate_keys = list(_answer_cache_index.get(band_key, ()))
+                for candidate_key in candidate_keys:
+                    candidate = _answer_cache.get(candidate_key)
+                    if candidate is None:
+                        self._unindex(candidate_key, band_key)
+                        continue
+                    similarity = self.estimate_similarity(signature, candidate.signature)
+                    if similarity >= best_similarity:
+                        cached_answer, best_similarity = candidate, similarity
+
+        if cached_answer is None:
+            return None
+
+        logger.debug(f"Reusing the answer cached for the question: {cached_answer.question}")
+        return CachedAnswer(
+            question=cached_answer.question,
+            signature=cached_answer.signature,
+            answer=cached_answer.answer,
+            source_documents=RetrievalCache.copy_documents(cached_answer.source_documents),
+        )
+
+    def put(self, question: str, answer: str, source_documents: List[Document]) -> None:
+        """
+        Stores the answer generated for the question and indexes the question for near-duplicate lookups.
+
+        Args:
+            question (str): the question as asked by the user
+            answer (str): the generated answer
+            source_documents (List[Document]): the retrieved documents the answer was generated from
+        """
+        normalized_question = RetrievalCache.normalize_query(question)
+        signature = self.get_signature(question)
+        cache_key = (self.scope, normalized_question)
+        _answer_cache.put(
+            cache_key,
+            CachedAnswer(
+                question=normalized_question,
+                signature=signature,
+                answer=answer,
+                source_documents=RetrievalCache.copy_documents(source_documents),
+            ),
+            ttl=self.ttl,
+        )
+        with _answer_cache_index_lock:
+            for band_key in self.get_bands(signature):
+                _answer_cache_index.setdefault(band_key, set()).add(cache_key)
+            if len(_answer_cache_index) > ANSWER_CACHE_LSH_BANDS * DEFAULT_ANSWER_CACHE_SIZE * 2:
+                self._prune_index()
+
+    @staticmethod
+    def _unindex(cache_key: Tuple[str, str], band_key: Tuple[str, int, Tuple[int, ...]]) -> None:
+        with _answer_cache_index_lock:
+            keys = _answer_cache_index.get(band_key)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del _answer_cache_index[band_key]
+
+    @staticmethod
+    def _prune_index() -> None:
+        """Drops the keys no longer cached from the index. Must be called holding _answer_cache_index_lock."""
+        for band_key in list(_answer_cache_index):
+            keys = {key for key in _answer_cache_index[band_key] if _answer_cache.get(key) is not None}
+            if keys:
+                _answer_cache_index[band_key] = keys
+            else:
+                del _answer_cache_index[band_key]
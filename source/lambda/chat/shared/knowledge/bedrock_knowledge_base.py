@@ -28,6 +28,9 @@ class BedrockKnowledgeBase(KnowledgeBase):
 
     Args:
         knowledge_base_params (Dict):
+        user_context_token (str): The JWT token of the user [Optional]
+        knowledge_base_id (str): The Bedrock knowledge base to query, instead of the one in the
+            BEDROCK_KNOWLEDGE_BASE_ID env variable [Optional]
 
     Methods:
         _check_env_variables(): Checks if the bedrock knowledge base id exists in the environment variables
@@ -40,10 +43,12 @@ class BedrockKnowledgeBase(KnowledgeBase):
         self,
         knowledge_base_params: Dict[str, Any] = {},
         user_context_token: Optional[str] = None,
+        knowledge_base_id: Optional[str] = None,
     ) -> None:
-        self._check_env_variables()
+        if not knowledge_base_id:
+            self._check_env_variables()
 
-        self.knowledge_base_id = os.environ[BEDROCK_KNOWLEDGE_BASE_ID_ENV_VAR]
+        self.knowledge_base_id = knowledge_base_id or os.environ[BEDROCK_KNOWLEDGE_BASE_ID_ENV_VAR]
         self.number_of_docs = knowledge_base_params.get(
             "NumberOfDocs",
             DEFAULT_BEDROCK_KNOWLEDGE_BASE_NUMBER_OF_DOCS,
@@ -12,6 +12,7 @@ from botocore.exceptions import ClientError
 from helper import get_service_client
 from langchain_aws.retrievers.bedrock import AmazonKnowledgeBasesRetriever, RetrievalConfig
 from langchain_core.documents import Document
+from shared.knowledge.retrieval_cache import RetrievalCache
 from utils.constants import TRACE_ID_ENV_VAR
 from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
 from utils.helpers import get_metrics_client
@@ -33,7 +34,9 @@ class CustomBedrockRetriever(AmazonKnowledgeBasesRetriever):
         min_score_confidence (Optional[float]): Minimum score confidence for retrieved documents
 
     Methods:
-        get_relevant_documents(query): Run search on bedrock knowledge base and get documents as configured
+        get_relevant_documents(query): Run search on bedrock knowledge base and get documents as configured, or the
+            cached ones
+        get_cache_key(query): Returns the retrieval cache key of the query
 
     """
 
@@ -58,7 +61,6 @@ class CustomBedrockRetriever(AmazonKnowledgeBasesRetriever):
         )
 
     @tracer.capture_method(capture_response=True)
-    @metrics.log_metrics
     def _get_relevant_documents(self, query: str) -> List[Document]:
         """
         @overrides AmazonKnowledgeBasesRetriever._get_relevant_documents
@@ -71,6 +73,13 @@ class CustomBedrockRetriever(AmazonKnowledgeBasesRetriever):
         Returns:
             List[Document]: List of LangChain document objects.
         """
+        retrieval_cache = RetrievalCache.from_environment()
+        if retrieval_cache:
+            cache_key = self.get_cache_key(query)
+            cached_docs = retrieval_cache.get(cache_key, metrics)
+            if cached_docs is not None:
+                return cached_docs
+
         with tracer.provider.in_subsegment("## bedrock_knowledge_base_query") as subsegment:
             subsegment.put_annotation("service", "bedrock-agent-runtime")
             subsegment.put_annotation("operation", "retrieve")
@@ -103,6 +112,8 @@ class CustomBedrockRetriever(AmazonKnowledgeBasesRetriever):
                 else:
                     logger.debug(f"Bedrock knowledge base retrieved {len(docs)} docs: {docs}")
 
+                if retrieval_cache:
+                    retrieval_cache.put(cache_key, docs)
                 return docs
 
             except ClientError as ce:
@@ -122,3 +133,22 @@ class CustomBedrockRetriever(AmazonKnowledgeBasesRetriever):
                 name=CloudWatchMetrics.BEDROCK_KNOWLEDGE_BASE_FAILURES.value, unit=MetricUnit.Count, value=1
             )
             return []
+
+    def get_cache_key(self, query: str) -> str:
+        """
+        Returns the retrieval cache key of the query. The retrieval config includes the number of results and the
+        retrieval filter.
+
+        Args:
+            query (str): Query to search for in the knowledge base
+
+        Returns:
+            str: the key of the documents retrieved for the query
+        """
+        return RetrievalCache.get_cache_key(
+            query,
+            knowledge_base_id=self.knowledge_base_id,
+            retrieval_config=self.retrieval_config.model_dump(exclude_none=True),
+            min_score_confidence=self.min_score_confidence,
+            return_source_documents=self.return_source_documents,
+        )
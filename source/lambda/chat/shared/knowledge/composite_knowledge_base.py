@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Any, Dict, List
+
+from aws_lambda_powertools import Logger
+from langchain_core.documents import Document
+
+from shared.knowledge.composite_retriever import CompositeRetriever, get_knowledge_base_deadline
+from shared.knowledge.knowledge_base import KnowledgeBase
+from utils.constants import KNOWLEDGE_BASE_ORIGIN_KEY
+
+logger = Logger(utc=True)
+
+
+class CompositeKnowledgeBase(KnowledgeBase):
+    """
+    CompositeKnowledgeBase adds context to the LLM memory from several knowledge bases at once. Its retriever queries
+    the knowledge bases concurrently, each within KNOWLEDGE_BASE_DEADLINE_MS, and fuses their results with reciprocal
+    rank fusion. See CompositeRetriever.
+
+    Args:
+        knowledge_bases (List[KnowledgeBase]): the knowledge bases to query, the one configured by KnowledgeBaseParams
+            first followed by its AdditionalKnowledgeBases
+        knowledge_base_params (Dict): the KnowledgeBaseParams of the use case, whose NumberOfDocs is the number of
+            fused documents returned
+
+    Methods:
+        source_docs_formatter(source_documents): Formats each document with the knowledge base it came from
+    """
+
+    def __init__(self, knowledge_bases: List[KnowledgeBase], knowledge_base_params: Dict[str, Any] = {}) -> None:
+        if not knowledge_bases:
+            raise ValueError("A composite knowledge base needs at least one knowledge base")
+
+        self.knowledge_bases = knowledge_bases
+        self.knowledge_base_type = knowledge_bases[0].knowledge_base_type
+        self.rag_rbac_enabled = any(knowledge_base.rag_rbac_enabled for knowledge_base in knowledge_bases)
+        self.number_of_docs = knowledge_base_params.get("NumberOfDocs", knowledge_bases[0].number_of_docs)
+        self.return_source_documents = knowledge_bases[0].return_source_documents
+
+        self.retriever = CompositeRetriever(
+            retrievers=[knowledge_base.retriever for knowledge_base in knowledge_bases],
+            top_k=self.number_of_docs,
+            deadline=get_knowledge_base_deadline(),
+        )
+
+    def source_docs_formatter(self, source_documents: List[Document]) -> List[Dict]:
+        """
+        Formats the source documents in a format to send to the websocket, each with the formatter of the knowledge
+        base it was retrieved from
+        Args:
+            source_documents (list): list of source documents.
+        Returns:
+            list: list of formatted source documents, in the order given.
+        """
+        return [
+            self.knowledge_bases[doc.metadata.get(KNOWLEDGE_BASE_ORIGIN_KEY, 0)].source_docs_formatter([doc])[0]
+            for doc in source_documents
+        ]
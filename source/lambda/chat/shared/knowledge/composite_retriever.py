@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List
+
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from shared.knowledge.retrieval_cache import RetrievalCache
+from utils.constants import (
+    DEFAULT_KNOWLEDGE_BASE_DEADLINE_MS,
+    KNOWLEDGE_BASE_DEADLINE_MS_ENV_VAR,
+    KNOWLEDGE_BASE_ORIGIN_KEY,
+    RANK_FUSION_SCORE_KEY,
+    RECIPROCAL_RANK_FUSION_CONSTANT,
+    TRACE_ID_ENV_VAR,
+)
+from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
+from utils.helpers import get_metrics_client
+
+logger = Logger(utc=True)
+tracer = Tracer()
+metrics = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
+
+
+def get_knowledge_base_deadline() -> float:
+    """
+    Returns the seconds each knowledge base of a composite knowledge base is given to return its documents
+    """
+    try:
+        deadline_ms = int(os.getenv(KNOWLEDGE_BASE_DEADLINE_MS_ENV_VAR, DEFAULT_KNOWLEDGE_BASE_DEADLINE_MS))
+    except ValueError:
+        deadline_ms = 0
+    if deadline_ms <= 0:
+        logger.warning(
+            f"Invalid value for {KNOWLEDGE_BASE_DEADLINE_MS_ENV_VAR}, defaulting to {DEFAULT_KNOWLEDGE_BASE_DEADLINE_MS}."
+        )
+        deadline_ms = DEFAULT_KNOWLEDGE_BASE_DEADLINE_MS
+    return deadline_ms / 1000
+
+
+class CompositeRetriever(BaseRetriever):
+    """
+    Retrieves documents from several knowledge bases at once. Every retriever is queried concurrently and given
+    deadline seconds, so retrieval takes as long as the slowest retriever rather than all of them in turn. The
+    documents of the retrievers that answered in time are merged with reciprocal rank fusion: a document scores
+    1 / (RECIPROCAL_RANK_FUSION_CONSTANT + rank) for its rank in each retriever's results, summed over the retrievers
+    that returned it, and the top_k highest scored documents are returned.
+
+    Each returned document is a copy carrying the position of the retriever it came from under
+    KNOWLEDGE_BASE_ORIGIN_KEY and its fused score under RANK_FUSION_SCORE_KEY.
+
+    Attributes:
+        retrievers (List[BaseRetriever]): the retrievers of the knowledge bases, in configured order
+        top_k (int): number of documents to return
+        deadline (float): seconds each retriever is given to return its documents
+
+    Methods:
+        get_relevant_documents(query): Queries all retrievers concurrently and returns their fused documents
+        get_cache_key(query): Returns a key identifying the query and the retrieval parameters of all retrievers
+        fuse(results): Merges the documents returned by each retriever with reciprocal rank fusion
+    """
+
+    retrievers: List[BaseRetriever]
+    top_k: int
+    deadline: float
+
+    @tracer.capture_method(capture_response=True)
+    def _get_relevant_documents(self, query: str) -> List[Document]:
+        """
+        @overrides BaseRetriever._get_relevant_documents
+        Queries all retrievers concurrently and returns the fused documents of the ones that answered in time.
+
+        Returns:
+            List[Document]: List of LangChain document objects.
+        """
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=len(self.retrievers), thread_name_prefix="knowledge-base")
+        try:
+            # each retriever runs in a copy of this context so that its metrics are recorded for this request
+            futures = [
+                executor.submit(contextvars.copy_context().run, retriever.invoke, query)
+                for retriever in self.retrievers
+            ]
+            wait(futures, timeout=self.deadline)
+        finally:
+            # retrievers still running past the deadline are left to finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        for origin, future in enumerate(futures):
+            if not future.done():
+                logger.warning(
+                    f"Knowledge base {origin} did not return documents within {self.deadline} seconds, skipping it.",
+                    xray_trace_id=os.environ.get(TRACE_ID_ENV_VAR),
+                )
+                metrics.add_metric(
+                    name=CloudWatchMetrics.KNOWLEDGE_BASE_DEADLINE_EXCEEDED.value, unit=MetricUnit.Count, value=1
+                )
+                results.append([])
+            elif future.exception() is not None:
+                logger.error(
+                    f"Knowledge base {origin} failed, skipping it. Query received: '{query}'\nException: {future.exception()}",
+                    xray_trace_id=os.environ.get(TRACE_ID_ENV_VAR),
+                )
+                results.append([])
+            else:
+                results.append(future.result())
+
+        metrics.add_metric(
+            name=CloudWatchMetrics.COMPOSITE_RETRIEVAL_TIME.value,
+            unit=MetricUnit.Seconds,
+            value=(time.time() - start_time),
+        )
+        return self.fuse(results)
+
+    def get_cache_key(self, query: str) -> str:
+        """
+        Returns a key identifying the query and the retrieval parameters of all retrievers
+
+        Args:
+            query (str): Query to search for in the knowledge bases
+
+        Returns:
+            str: the key of the documents retrieved for the query
+        """
+        return RetrievalCache.get_cache_key(
+            query,
+            retrievers=[
+                retriever.get_cache_key(query) if hasattr(retriever, "get_cache_key") else type(retriever).__name__
+                for retriever in self.retrievers
+            ],
+            top_k=self.top_k,
+        )
+
+    def fuse(self, results: List[List[Document]]) -> List[Document]:
+        """
+        Merges the documents returned by each retriever with reciprocal rank fusion. Documents with the same content
+        returned by several retrievers are merged into the first one returned, with their scores summed.
+
+        Args:
+            results (List[List[Document]]): the documents returned by each retriever, in retriever order
+
+        Returns:
+            List[Document]: the top_k documents with the highest fused score, highest first
+        """
+        fused_documents: Dict[str, Document] = {}
+        for origin, documents in enumerate(results):
+            for rank, document in enumerate(documents, start=1):
+                score = 1 / (RECIPROCAL_RANK_FUSION_CONSTANT + rank)
+                fused_document = fused_documents.get(document.page_content)
+                if fused_document is None:
+                    fused_documents[document.page_content] = Document(
+                        page_content=document.page_content,
+                        metadata={**document.metadata, KNOWLEDGE_BASE_ORIGIN_KEY: origin, RANK_FUSION_SCORE_KEY: score},
+                    )
+                else:
+                    fused_document.metadata[RANK_FUSION_SCORE_KEY] += score
+
+        return sorted(
+            fused_documents.values(), key=lambda document: document.metadata[RANK_FUSION_SCORE_KEY], reverse=True
+        )[: self.top_k]
@@ -38,6 +38,7 @@ class KendraKnowledgeBase(KnowledgeBase):
         return_source_documents (bool): if the source of documents should be returned or not [Optional]
         attribute_filter (dict): Additional filtering of results based on metadata. See: https://docs.aws.amazon.com/kendra/latest/APIReference
         user_context_token (str): The JWT token to use for user context by Kendra
+        index_id (str): The Kendra index to query, instead of the one in the KENDRA_INDEX_ID env variable [Optional]
 
     Methods:
         _check_env_variables(): Checks if the Kendra index id exists in the environment variables
@@ -50,8 +51,12 @@ class KendraKnowledgeBase(KnowledgeBase):
         self,
         knowledge_base_params: Optional[Dict[str, Any]] = {},
         user_context_token: Optional[str] = None,
+        index_id: Optional[str] = None,
     ) -> None:
-        self._check_env_variables()
+        if index_id:
+            self.kendra_index_id = index_id
+        else:
+            self._check_env_variables()
 
         self.number_of_docs = knowledge_base_params.get(
             "NumberOfDocs",
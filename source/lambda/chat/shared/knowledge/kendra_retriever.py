@@ -13,6 +13,7 @@ from cognito_jwt_verifier import CognitoJWTVerifier
 from helper import get_service_client
 from langchain_aws.retrievers.kendra import AmazonKendraRetriever, ResultItem, clean_excerpt
 from langchain_core.documents import Document
+from shared.knowledge.retrieval_cache import RetrievalCache
 from utils.constants import DEFAULT_KENDRA_NUMBER_OF_DOCS, TRACE_ID_ENV_VAR
 from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
 from utils.helpers import get_metrics_client
@@ -35,7 +36,8 @@ class CustomKendraRetriever(AmazonKendraRetriever):
         user_context (dict): Provides information about the user context. See: https://docs.aws.amazon.com/kendra/latest/APIReference/API_UserContext.html
 
     Methods:
-        get_relevant_documents(query): Run search on Kendra index and get top k documents.
+        get_relevant_documents(query): Run search on Kendra index and get top k documents, or the cached ones.
+        get_cache_key(query): Returns the retrieval cache key of the query.
         kendra_query(query, top_k, attribute_filter): Execute a query on the Kendra index and return a list of processed responses.
         get_clean_docs(docs): Parses the documents returned from Kendra and cleans them.
 
@@ -72,7 +74,6 @@ class CustomKendraRetriever(AmazonKendraRetriever):
         )
 
     @tracer.capture_method(capture_response=True)
-    @metrics.log_metrics
     def _get_relevant_documents(self, query: str) -> List[Document]:
         """
         @overrides AmazonKendraRetriever._get_relevant_documents
@@ -84,6 +85,13 @@ class CustomKendraRetriever(AmazonKendraRetriever):
         Returns:
             List[Document]: List of LangChain document objects.
         """
+        retrieval_cache = RetrievalCache.from_environment()
+        if retrieval_cache:
+            cache_key = self.get_cache_key(query)
+            cached_docs = retrieval_cache.get(cache_key, metrics)
+            if cached_docs is not None:
+                return cached_docs
+
         with tracer.provider.in_subsegment("## kendra_query") as subsegment:
             subsegment.put_annotation("service", "kendra")
             subsegment.put_annotation("operation", "retrieve/query")
@@ -99,6 +107,8 @@ class CustomKendraRetriever(AmazonKendraRetriever):
                     unit=MetricUnit.Seconds,
                     value=(end_time - start_time),
                 )
+                if retrieval_cache:
+                    retrieval_cache.put(cache_key, kendra_response)
                 return kendra_response
 
             except ClientError as ce:
@@ -115,6 +125,26 @@ class CustomKendraRetriever(AmazonKendraRetriever):
             metrics.add_metric(name=CloudWatchMetrics.KENDRA_FAILURES.value, unit=MetricUnit.Count, value=1)
             return []
 
+    def get_cache_key(self, query: str) -> str:
+        """
+        Returns the retrieval cache key of the query. The attribute filter includes the user context filter (user ID
+        and groups) when RBAC is enabled, so cached documents are only reused for the same user context.
+
+        Args:
+            query (str): Query to search for in the Kendra index
+
+        Returns:
+            str: the key of the documents retrieved for the query
+        """
+        return RetrievalCache.get_cache_key(
+            query,
+            index_id=self.index_id,
+            top_k=self.top_k,
+            attribute_filter=self.attribute_filter,
+            min_score_confidence=self.min_score_confidence,
+            return_source_documents=self.return_source_documents,
+        )
+
     @tracer.capture_method(capture_response=True)
     def _kendra_query(self, query: str) -> Sequence[ResultItem]:
         """
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Any, List, Optional
+
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
+from botocore.exceptions import ClientError
+from helper import get_service_resource
+from langchain_core.documents import Document
+
+from utils.cache import TTLCache
+from utils.constants import (
+    DEFAULT_RETRIEVAL_CACHE_SIZE,
+    DEFAULT_RETRIEVAL_CACHE_TTL,
+    RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR,
+    RETRIEVAL_CACHE_TTL_ENV_VAR,
+    TRACE_ID_ENV_VAR,
+)
+from utils.enum_types import CloudWatchMetrics
+from utils.request_metrics import RequestScopedMetrics
+
+logger = Logger(utc=True)
+tracer = Tracer()
+
+# Retrieved documents keyed by RetrievalCache.get_cache_key, shared by all invocations served by this container
+_retrieval_cache = TTLCache(max_size=DEFAULT_RETRIEVAL_CACHE_SIZE)
+
+# punctuation around a question that does not change what is retrieved for it
+QUERY_TRIM_CHARACTERS = " ?!.,;:'\""
+
+
+def get_retrieval_cache_ttl() -> int:
+    """
+    Returns the number of seconds a retrieval result is reused. 0 disables the retrieval cache.
+    """
+    try:
+        return max(int(os.getenv(RETRIEVAL_CACHE_TTL_ENV_VAR, DEFAULT_RETRIEVAL_CACHE_TTL)), 0)
+    except ValueError:
+        logger.warning(f"Invalid value for {RETRIEVAL_CACHE_TTL_ENV_VAR}, defaulting to {DEFAULT_RETRIEVAL_CACHE_TTL}.")
+        return DEFAULT_RETRIEVAL_CACHE_TTL
+
+
+def clear_retrieval_cache() -> None:
+    """
+    Drops all cached retrieval results held by this container
+    """
+    _retrieval_cache.clear()
+
+
+class RetrievalCache:
+    """
+    Caches the documents retrieved for a query so that repeated questions do not call the knowledge base again.
+    Results are kept by this container in an LRU cache of DEFAULT_RETRIEVAL_CACHE_SIZE entries for ttl seconds. When
+    a table name is given, they are also stored in that DynamoDB table (partition key `CacheKey`, with a `TTL`
+    attribute), which shares them between containers.
+
+    Only successful retrievals should be stored; a failed retrieval is retried on the next request.
+
+    Attributes:
+        ttl (int): seconds a retrieval result is reused
+        table_name (Optional[str]): name of the DynamoDB table of the shared tier, if any
+
+    Methods:
+        from_environment(): Returns the cache configured with RETRIEVAL_CACHE_TTL and RETRIEVAL_CACHE_TABLE_NAME
+        normalize_query(query): Returns the query in the form used in cache keys
+        get_cache_key(query, **retrieval_params): Returns the key of the documents retrieved for the query
+        get(cache_key, metrics): Returns the cached documents, recording a hit or a miss
+        put(cache_key, documents): Stores the documents
+    """
+
+    def __init__(self, ttl: int, table_name: Optional[str] = None) -> None:
+        self.ttl = ttl
+        self.table_name = table_name
+
+    @classmethod
+    def from_environment(cls) -> Optional["RetrievalCache"]:
+        """
+        Returns the cache configured with RETRIEVAL_CACHE_TTL and RETRIEVAL_CACHE_TABLE_NAME, or None if disabled
+        """
+        ttl = get_retrieval_cache_ttl()
+        if not ttl:
+            return None
+        return cls(ttl=ttl, table_name=os.getenv(RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR) or None)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Returns the query case folded, with whitespace collapsed and surrounding punctuation removed, so that
+        questions differing only in those respects share a cache entry.
+        """
+        query = unicodedata.normalize("NFKC", query or "").casefold()
+        return re.sub(r"\s+", " ", query).strip(QUERY_TRIM_CHARACTERS)
+
+    @classmethod
+    def get_cache_key(cls, query: str, **retrieval_params: Any) -> str:
+        """
+        Returns the key of the documents retrieved for the query with the given parameters.
+
+        Args:
+            query (str): the query sent to the knowledge base
+            retrieval_params: everything else the retrieved documents depend on, such as the index, top-k, attribute
+                filter and, with RBAC, the user context filter
+
+        Returns:
+            str: hex digest identifying the retrieval
+        """
+        key = {"query": cls.normalize_query(query), **retrieval_params}
+        serialized_key = json.dumps(key, sort_keys=True, default=str)
+        return hashlib.sha256(serialized_key.encode("utf-8")).hexdigest()
+
+    def get(self, cache_key: str, metrics: RequestScopedMetrics) -> Optional[List[Document]]:
+        """
+        Returns the documents cached for the key by this container, or else by the shared tier.
+
+        Args:
+            cache_key (str): key returned by get_cache_key
+            metrics (RequestScopedMetrics): metrics client on which the hit or miss is recorded
+
+        Returns:
+            Optional[List[Document]]: copies of the cached documents, or None on a miss
+        """
+        documents = _retrieval_cache.get(cache_key)
+        if documents is None and self.table_name:
+            documents = self.get_shared(cache_key)
+            if documents is not None:
+                metrics.add_metric(
+                    name=CloudWatchMetrics.RETRIEVAL_CACHE_SHARED_HITS.value, unit=MetricUnit.Count, value=1
+                )
+                _retrieval_cache.put(cache_key, documents, ttl=self.ttl)
+
+        if documents is None:
+            metrics.add_metric(name=CloudWatchMetrics.RETRIEVAL_CACHE_MISSES.value, unit=MetricUnit.Count, value=1)
+            return None
+
+        metrics.add_metric(name=CloudWatchMetrics.RETRIEVAL_CACHE_HITS.value, unit=MetricUnit.Count, value=1)
+        logger.debug(f"Reusing {len(documents)} cached retrieved docs")
+        return self.copy_documents(documents)
+
+    def put(self, cache_key: str, documents: List[Document]) -> None:
+        """
+        Stores the documents retrieved for the key, in this container and in the shared tier if configured.
+
+        Args:
+            cache_key (str): key returned by get_cache_key
+            documents (List[Document]): the retrieved documents
+        """
+        documents = self.copy_documents(documents)
+        _retrieval_cache.put(cache_key, documents, ttl=self.ttl)
+        if self.table_name:
+            self.put_shared(cache_key, documents)
+
+    def get_shared(self, cache_key: str) -> Optional[List[Document]]:
+        """Reads the documents for the key from the shared tier. Errors are logged and treated as a miss."""
+        with tracer.provider.in_subsegment("## retrieval_cache") as subsegment:
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "get_item")
+            try:
+                response = get_service_resource("dynamodb").Table(self.table_name).get_item(Key={"CacheKey": cache_key})
+            except ClientError as err:
+                logger.warning(
+                    f"Failed to read the shared retrieval cache: {err}", xray_trace_id=os.getenv(TRACE_ID_ENV_VAR)
+                )
+                return None
+
+        item = response.get("Item")
+        # DynamoDB deletes expired items eventually, so expiry is checked on read
+        if not item or int(item.get("TTL", 0)) <= time.time():
+            return None
+        return [Document(**document) for document in json.loads(item["Documents"])]
+
+    def put_shared(self, cache_key: str, documents: List[Document]) -> None:
+        """Writes the documents for the key to the shared tier. Errors are logged, the result is just not shared."""
+        serialized_documents = json.dumps(
+            [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents], default=str
+        )
+        with tracer.provider.in_subsegment("## retrieval_cache") as subsegment:
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "put_item")
+            try:
+                get_service_resource("dynamodb").Table(self.table_name).put_item(
+                    Item={
+                        "CacheKey": cache_key,
+                        "Documents": serialized_documents,
+                        "TTL": int(time.time()) + self.ttl,
+                    }
+                )
+            except ClientError as err:
+                logger.warning(
+                    f"Failed to write the shared retrieval cache: {err}", xray_trace_id=os.getenv(TRACE_ID_ENV_VAR)
+                )
+
+    @staticmethod
+    def copy_documents(documents: List[Document]) -> List[Document]:
+        """Copies the documents, so callers changing them do not change the cached ones"""
+        return [Document(page_content=doc.page_content, metadata=copy.deepcopy(doc.metadata)) for doc in documents]
@@ -4,7 +4,7 @@
 
 import os
 import time
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from aws_lambda_powertools import Logger, Tracer
 from botocore.exceptions import ClientError
@@ -23,7 +23,15 @@ from langchain_core.messages import (
     messages_to_dict,
 )
 
-from utils.constants import DDB_MESSAGE_TTL_ENV_VAR, DEFAULT_DDB_MESSAGE_TTL, TRACE_ID_ENV_VAR
+from utils.constants import (
+    CHAT_HISTORY_MAX_WRITE_ATTEMPTS,
+    CHAT_HISTORY_MESSAGE_TOKEN_OVERHEAD,
+    CHAT_HISTORY_VERSION_FIELD_NAME,
+    DDB_MESSAGE_TTL_ENV_VAR,
+    DEFAULT_DDB_MESSAGE_TTL,
+    TRACE_ID_ENV_VAR,
+)
+from utils.helpers import estimate_tokens
 
 logger = Logger(utc=True)
 tracer = Tracer()
@@ -34,12 +42,25 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
     This class expects that a DynamoDB table with name `table_name`
     and a partition Key of `UserId` and a sort Key of `ConversationId` are present.
 
+    An instance is scoped to a single conversation turn. The history read at the start of the turn is kept as a
+    snapshot along with the record's version, so the messages added at the end of the turn are appended with a single
+    conditional list_append write instead of another read and a rewrite of the whole history. If the record was
+    changed since the snapshot was taken, the snapshot is refreshed and the write retried.
+
+    When max_history_tokens is set, the messages returned are the most recent ones whose estimated token count fits
+    within it, instead of the last max_history_length messages.
+
     Args:
         table_name: name of the DynamoDB table
         user_id (str): Id of the user who the current chat belongs to. Used as partition key in table.
         conversation_id (str): The key that is used to store the messages of a single chat session for a given user. Used as the sort key in the table.
+        max_history_length (Optional[int]): The number of most recent messages returned
+        max_history_tokens (Optional[int]): The estimated number of tokens the returned messages may use in total
     """
 
+    # attributes of the conversation's record read by load_history
+    HISTORY_ATTRIBUTES = ("History", CHAT_HISTORY_VERSION_FIELD_NAME)
+
     def __init__(
         self,
         table_name: str,
@@ -49,6 +70,7 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
         max_history_length: Optional[int] = None,
         human_prefix: Optional[str] = "Human",
         ai_prefix: Optional[str] = "AI",
+        max_history_tokens: Optional[int] = None,
     ) -> None:
         ddb_resource = get_service_resource("dynamodb")
         self.table = ddb_resource.Table(table_name)
@@ -56,13 +78,23 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
         self.user_id = user_id
         self.message_id = message_id
         self.max_history_length = int(max_history_length) if max_history_length else None
+        self.max_history_tokens = int(max_history_tokens) if max_history_tokens is not None else None
         self.human_prefix = human_prefix
         self.ai_prefix = ai_prefix
+        self._history_snapshot: Optional[List[Dict[str, Any]]] = None
+        self._history_version: Optional[int] = None
 
     @property
     @tracer.capture_method(capture_response=True)
     def raw_messages(self) -> List[BaseMessage]:  # type: ignore
-        """Retrieve the full set of messages from DynamoDB"""
+        """Retrieve the full set of messages, reading them from DynamoDB the first time"""
+        if self._history_snapshot is None:
+            self.load_history()
+        return messages_from_dict(self._history_snapshot)
+
+    @tracer.capture_method
+    def load_history(self) -> None:
+        """Reads the history and its version from DynamoDB into the snapshot"""
 
         response = None
         # fmt: off
@@ -74,7 +106,8 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
             try:
                 response = self.table.get_item(
                     Key={"UserId": self.user_id, "ConversationId": self.conversation_id},
-                    ProjectionExpression="History",
+                    ProjectionExpression=", ".join(f"#{name}" for name in self.HISTORY_ATTRIBUTES),
+                    ExpressionAttributeNames={f"#{name}": name for name in self.HISTORY_ATTRIBUTES},
                     ConsistentRead=True,
                 )
             except ClientError as err:
@@ -83,24 +116,70 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
                 else:
                     logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR],)
 
-            if response and "Item" in response:
-                items = response["Item"]["History"]
-            else:
-                items = []
+            self.set_history_item(response.get("Item", {}) if response else {})
 
-            messages = messages_from_dict(items)
-            return messages
+    def set_history_item(self, item: Dict[str, Any]) -> None:
+        """
+        Sets the snapshot from the HISTORY_ATTRIBUTES of the conversation's record.
+
+        Args:
+            item (Dict[str, Any]): the attributes read by load_history, empty if there is no record
+        """
+        self._history_snapshot = list(item.get("History", []))
+        version = item.get(CHAT_HISTORY_VERSION_FIELD_NAME)
+        self._history_version = int(version) if version is not None else None
 
     @property
     @tracer.capture_method(capture_response=True)
     def messages(self) -> List[BaseMessage]:  # type: ignore
-        """Retrieve the messages from DynamoDB adhering to max_history_length"""
+        """Retrieve the messages from DynamoDB adhering to max_history_tokens, or else max_history_length"""
+
+        return self.window_messages(self.raw_messages)
+
+    def window_messages(self, messages: List[BaseMessage], max_tokens: Optional[int] = None) -> List[BaseMessage]:
+        """
+        Returns the most recent messages that fit within max_history_tokens, or else the last max_history_length.
+
+        Args:
+            messages (List[BaseMessage]): the messages of the conversation, oldest first
+            max_tokens (Optional[int]): budget to use instead of max_history_tokens, when that is set
 
-        messages = self.raw_messages
+        Returns:
+            List[BaseMessage]: the messages sent to the LLM, oldest first
+        """
+        if self.max_history_tokens is not None:
+            return self.get_messages_within_budget(messages, max_tokens)
         if self.max_history_length is not None:
             messages = messages[-self.max_history_length :]
         return messages
 
+    @staticmethod
+    def estimate_message_tokens(message: BaseMessage) -> int:
+        """Returns the estimated number of tokens the message adds to the prompt"""
+        return estimate_tokens(message.text) + CHAT_HISTORY_MESSAGE_TOKEN_OVERHEAD
+
+    def get_messages_within_budget(
+        self, messages: List[BaseMessage], max_tokens: Optional[int] = None
+    ) -> List[BaseMessage]:
+        """
+        Takes messages from the end of the conversation until the next one would exceed max_history_tokens.
+
+        Args:
+            messages (List[BaseMessage]): the messages of the conversation, oldest first
+            max_tokens (Optional[int]): budget to use instead of max_history_tokens
+
+        Returns:
+            List[BaseMessage]: the most recent messages that fit the budget, oldest first
+        """
+        remaining_tokens = self.max_history_tokens if max_tokens is None else max_tokens
+        start = len(messages)
+        while start > 0:
+            remaining_tokens -= self.estimate_message_tokens(messages[start - 1])
+            if remaining_tokens < 0:
+                break
+            start -= 1
+        return messages[start:]
+
     def get_role_prepended_message(self, message: BaseMessage) -> BaseMessage:
         """Convert a message to string with pre-pended role.
         Modification of langchain_core.messages.get_buffer_string method
@@ -139,36 +218,79 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
     @tracer.capture_method
     def add_message(self, message: BaseMessage) -> None:
         """Append the message to the record in DynamoDB"""
+        self.add_messages([message])
 
-        message = self.get_role_prepended_message(message)
-
-        messages = messages_to_dict(self.raw_messages)
-        _message = message_to_dict(message)
-        _message["data"]["id"] = self.message_id
-        messages.append(_message)
+    @tracer.capture_method
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append the messages (the human and AI messages of a turn) to the record in DynamoDB with a single write"""
+        new_items = []
+        for message in messages:
+            _message = message_to_dict(self.get_role_prepended_message(message))
+            _message["data"]["id"] = self.message_id
+            new_items.append(_message)
+        if not new_items:
+            return
 
         # fmt: off
         with tracer.provider.in_subsegment("## chat_history") as subsegment: # NOSONAR python:S1192 - subsegment name for x-ray tracing
         # fmt: on
             subsegment.put_annotation("service", "dynamodb")
             subsegment.put_annotation("operation", "update_item")
-            try:
 
-                # calculate a TTL 24 hours from now
-                expiry_period = int(os.getenv(DDB_MESSAGE_TTL_ENV_VAR, DEFAULT_DDB_MESSAGE_TTL))
-                ttl = int(time.time()) + expiry_period
-                # update_item will put item if key does not exist
-                self.table.update_item(
-                    Key={
-                        "UserId": self.user_id,
-                        "ConversationId": self.conversation_id,
-                    },
-                    UpdateExpression="SET #History = :messages, #TTL = :ttl",
-                    ExpressionAttributeNames={"#History": "History", "#TTL": "TTL"},
-                    ExpressionAttributeValues={":messages": messages, ":ttl": ttl},
-                )
-            except ClientError as err:
-                logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR],)
+            for attempt in range(1, CHAT_HISTORY_MAX_WRITE_ATTEMPTS + 1):
+                try:
+                    self.append_history(new_items)
+                    return
+                except ClientError as err:
+                    if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR],)
+                        return
+                    logger.warning(
+                        f"History of conversation {self.conversation_id} changed since it was read (attempt {attempt}), refreshing it"
+                    )
+                    self.load_history()
+
+            logger.error(
+                f"Failed to append to the history of conversation {self.conversation_id} after {CHAT_HISTORY_MAX_WRITE_ATTEMPTS} attempts",
+                xray_trace_id=os.environ[TRACE_ID_ENV_VAR],
+            )
+
+    def append_history(self, new_items: List[Dict[str, Any]]) -> None:
+        """
+        Appends the items to the history with list_append. When a snapshot was read, the write only succeeds if the
+        record's version is still the one read with it.
+
+        Raises:
+            ClientError: ConditionalCheckFailedException if the record changed since the snapshot was read
+        """
+        # calculate a TTL 24 hours from now
+        expiry_period = int(os.getenv(DDB_MESSAGE_TTL_ENV_VAR, DEFAULT_DDB_MESSAGE_TTL))
+        ttl = int(time.time()) + expiry_period
+        update_params = {
+            "Key": {"UserId": self.user_id, "ConversationId": self.conversation_id},
+            # update_item will put item if key does not exist
+            "UpdateExpression": "SET #History = list_append(if_not_exists(#History, :empty), :messages), #TTL = :ttl "
+            "ADD #Version :one",
+            "ExpressionAttributeNames": {
+                "#History": "History",
+                "#TTL": "TTL",
+                "#Version": CHAT_HISTORY_VERSION_FIELD_NAME,
+            },
+            "ExpressionAttributeValues": {":messages": new_items, ":empty": [], ":ttl": ttl, ":one": 1},
+            "ReturnValues": "UPDATED_NEW",
+        }
+        if self._history_snapshot is not None:
+            if self._history_version is None:
+                update_params["ConditionExpression"] = "attribute_not_exists(#Version)"
+            else:
+                update_params["ConditionExpression"] = "#Version = :version"
+                update_params["ExpressionAttributeValues"][":version"] = self._history_version
+
+        response = self.table.update_item(**update_params)
+
+        if self._history_snapshot is not None:
+            self._history_snapshot.extend(new_items)
+            self._history_version = int(response["Attributes"][CHAT_HISTORY_VERSION_FIELD_NAME])
 
     @tracer.capture_method
     def clear(self) -> None:
@@ -183,5 +305,7 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
 
             try:
                 self.table.delete_item(Key={"UserId": self.user_id, "ConversationId": self.conversation_id})
+                self._history_snapshot = None
+                self._history_version = None
             except ClientError as err:
                 logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
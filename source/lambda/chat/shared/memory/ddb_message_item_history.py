@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+from itertools import count
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aws_lambda_powertools import Logger, Tracer
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
+from utils.constants import (
+    CHAT_HISTORY_QUERY_PAGE_SIZE,
+    DDB_MESSAGE_TTL_ENV_VAR,
+    DEFAULT_DDB_MESSAGE_TTL,
+    MESSAGE_ITEM_SORT_KEY_SEPARATOR,
+    MESSAGE_ITEMS_TTL_FIELD_NAME,
+    TRACE_ID_ENV_VAR,
+)
+
+logger = Logger(utc=True)
+tracer = Tracer()
+
+# orders messages written by this container within the same nanosecond
+_message_sequence = count()
+
+
+class DynamoDBMessageItemHistory(DynamoDBChatMessageHistory):
+    """Chat message history that stores every message as its own item, so adding a message is a single put of that
+    message instead of a rewrite of the whole conversation, and conversations are not bound by the item size limit.
+
+    The messages of a turn are written in a single batch. Message items share the partition key (`UserId`) of the
+    conversation and use a sort key of `<ConversationId>#<turn key>`, where the turn key sorts in the order the
+    messages were added. The last max_history_length messages are read with a single descending Query. With
+    max_history_tokens, pages of CHAT_HISTORY_QUERY_PAGE_SIZE messages are read, newest first, until the token budget
+    is filled. Conversations stored by DynamoDBChatMessageHistory as one item (sort key `<ConversationId>`) are still
+    read, with their messages placed before the newer message items. That record sorts after every message item in
+    the descending Query, so it is read by the same Query once the message items run out.
+
+    Like DynamoDBChatMessageHistory, every write extends the TTL of the whole conversation. The conversation's record
+    is updated with the new TTL on every write and keeps the TTL of the oldest message item, so the message items are
+    only rewritten with a new TTL once half of DDB_MESSAGE_TTL has passed since they were last written. Message items
+    therefore expire between DDB_MESSAGE_TTL and 1.5 times DDB_MESSAGE_TTL after the last write.
+
+    Args:
+        table_name: name of the DynamoDB table
+        user_id (str): Id of the user who the current chat belongs to. Used as partition key in table.
+        conversation_id (str): The key that is used to store the messages of a single chat session for a given user.
+            Used as the prefix of the sort key of every message item.
+    """
+
+    @property
+    def message_key_prefix(self) -> str:
+        return f"{self.conversation_id}{MESSAGE_ITEM_SORT_KEY_SEPARATOR}"
+
+    @property
+    def conversation_key_range(self) -> Tuple[str, str]:
+        """The sort keys of the conversation's record and message items lie within this range"""
+        return (
+            self.conversation_id,
+            f"{self.conversation_id}{chr(ord(MESSAGE_ITEM_SORT_KEY_SEPARATOR) + 1)}",
+        )
+
+    @staticmethod
+    def get_turn_key() -> str:
+        """Returns a sort key suffix that orders after every key generated before it by this container"""
+        return f"{time.time_ns():020d}{MESSAGE_ITEM_SORT_KEY_SEPARATOR}{next(_message_sequence) % 10000:04d}"
+
+    @property
+    @tracer.capture_method(capture_response=True)
+    def raw_messages(self) -> List[BaseMessage]:  # type: ignore
+        """Retrieve the full set of messages from DynamoDB"""
+        # reading every message item also reads the single-item history
+        messages = messages_from_dict(self.query_message_items())
+        return self.get_legacy_messages() + messages
+
+    @property
+    @tracer.capture_method(capture_response=True)
+    def messages(self) -> List[BaseMessage]:  # type: ignore
+        """Retrieve the last max_history_length messages, or the messages within max_history_tokens, from DynamoDB"""
+        if self.max_history_tokens is not None:
+            messages = messages_from_dict(self.query_message_items(max_tokens=self.max_history_tokens))
+            window = self.get_messages_within_budget(messages)
+            # the query only stops short of the conversation's record once the budget is exceeded
+            if len(window) == len(messages):
+                window = self.get_messages_within_budget(self.get_legacy_messages() + messages)
+            return window
+
+        items = self.query_message_items(self.max_history_length)
+        messages = messages_from_dict(items)
+
+        # older messages may still be in the single-item history this conversation started with, which the query read
+        # once it ran out of message items
+        if self.max_history_length is None or len(messages) < self.max_history_length:
+            messages = self.get_legacy_messages() + messages
+            if self.max_history_length is not None:
+                messages = messages[-self.max_history_length :]
+        return messages
+
+    def query_message_items(
+        self, limit: Optional[int] = None, max_tokens: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Reads the message items of the conversation, newest first, and returns them oldest first. When the query
+        reaches the conversation's record, its single-item history is kept for get_legacy_messages.
+
+        Args:
+            limit (Optional[int]): the number of most recent messages to read. All messages are read if None.
+            max_tokens (Optional[int]): stop reading once the messages read exceed this estimated number of tokens.
+                The message that exceeds it is included.
+
+        Returns:
+            List[Dict[str, Any]]: the stored messages, as produced by message_to_dict
+        """
+        if limit is not None and limit <= 0:
+            return []
+
+        self.set_history_item({})
+        items = []
+        attributes = ("ConversationId", "Message") + self.HISTORY_ATTRIBUTES
+        query_params = {
+            "KeyConditionExpression": Key("UserId").eq(self.user_id)
+            & Key("ConversationId").between(*self.conversation_key_range),
+            "ProjectionExpression": ", ".join(f"#{name}" for name in attributes),
+            "ExpressionAttributeNames": {f"#{name}": name for name in attributes},
+            "ScanIndexForward": False,
+            "ConsistentRead": True,
+        }
+        tokens = 0
+        # fmt: off
+        with tracer.provider.in_subsegment("## chat_history") as subsegment: # NOSONAR python:S1192 - subsegment name for x-ray tracing
+        # fmt: on
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "query")
+
+            try:
+                while True:
+                    if limit is not None:
+                        query_params["Limit"] = limit - len(items)
+                    elif max_tokens is not None:
+                        query_params["Limit"] = CHAT_HISTORY_QUERY_PAGE_SIZE
+                    response = self.table.query(**query_params)
+                    for item in response.get("Items", []):
+                        if item["ConversationId"] == self.conversation_id:
+                            self.set_history_item(item)
+                            continue
+                        if not item["ConversationId"].startswith(self.message_key_prefix):
+                            continue
+                        items.append(item["Message"])
+                        if max_tokens is not None:
+                            tokens += self.estimate_message_tokens(messages_from_dict([item["Message"]])[0])
+                            if tokens > max_tokens:
+                                break
+                    if (
+                        "LastEvaluatedKey" not in response
+                        or (limit is not None and len(items) >= limit)
+                        or (max_tokens is not None and tokens > max_tokens)
+                    ):
+                        break
+                    query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            except ClientError as err:
+                logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+
+        items.reverse()
+        return items
+
+    def get_legacy_messages(self) -> List[BaseMessage]:
+        """Returns the messages of the single-item history read by query_message_items, if it reached it"""
+        return messages_from_dict(self._history_snapshot or [])
+
+    @tracer.capture_method
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Write each message to DynamoDB as a new item, in a single batch"""
+        expiry_period = int(os.getenv(DDB_MESSAGE_TTL_ENV_VAR, DEFAULT_DDB_MESSAGE_TTL))
+        refresh_period = expiry_period // 2
+        ttl = int(time.time()) + expiry_period + refresh_period
+        items = []
+        for message in messages:
+            _message = message_to_dict(self.get_role_prepended_message(message))
+            _message["data"]["id"] = self.message_id
+            items.append(
+                {
+                    "UserId": self.user_id,
+                    "ConversationId": f"{self.message_key_prefix}{self.get_turn_key()}",
+                    "Message": _message,
+                    "TTL": ttl,
+                }
+            )
+
+        # fmt: off
+        with tracer.provider.in_subsegment("## chat_history") as subsegment: # NOSONAR python:S1192 - subsegment name for x-ray tracing
+        # fmt: on
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "batch_write_item")
+            try:
+                with self.table.batch_writer() as batch:
+                    for item in items:
+                        batch.put_item(Item=item)
+            except ClientError as err:
+                logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+                return
+
+        self.extend_ttl(ttl, refresh_period)
+
+    @tracer.capture_method
+    def extend_ttl(self, ttl: int, refresh_period: int) -> None:
+        """
+        Sets the TTL of the conversation's record, and rewrites the message items with that TTL once the oldest of
+        them would expire within refresh_period of it.
+
+        Args:
+            ttl (int): the new TTL of the conversation, in seconds since the epoch
+            refresh_period (int): how much sooner than ttl the oldest message item may expire before it is rewritten
+        """
+        # fmt: off
+        with tracer.provider.in_subsegment("## chat_history") as subsegment: # NOSONAR python:S1192 - subsegment name for x-ray tracing
+        # fmt: on
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "update_item")
+
+            update_params = {
+                "Key": {"UserId": self.user_id, "ConversationId": self.conversation_id},
+                "ExpressionAttributeNames": {"#TTL": "TTL", "#MessageItemsTTL": MESSAGE_ITEMS_TTL_FIELD_NAME},
+            }
+            try:
+                self.table.update_item(
+                    UpdateExpression="SET #TTL = :ttl, #MessageItemsTTL = if_not_exists(#MessageItemsTTL, :ttl)",
+                    ConditionExpression="attribute_not_exists(#MessageItemsTTL) OR #MessageItemsTTL >= :refresh_after",
+                    ExpressionAttributeValues={":ttl": ttl, ":refresh_after": ttl - refresh_period},
+                    **update_params,
+                )
+                return
+            except ClientError as err:
+                if err.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+                    return
+
+            # the oldest message item expires too soon, so all of them are rewritten with the new TTL
+            subsegment.put_annotation("operation", "batch_write_item")
+            try:
+                query_params = {
+                    "KeyConditionExpression": Key("UserId").eq(self.user_id)
+                    & Key("ConversationId").begins_with(self.message_key_prefix),
+                    "ConsistentRead": True,
+                }
+                with self.table.batch_writer() as batch:
+                    while True:
+                        response = self.table.query(**query_params)
+                        for item in response.get("Items", []):
+                            batch.put_item(Item={**item, "TTL": ttl})
+                        if "LastEvaluatedKey" not in response:
+                            break
+                        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+                self.table.update_item(
+                    UpdateExpression="SET #TTL = :ttl, #MessageItemsTTL = :ttl",
+                    ExpressionAttributeValues={":ttl": ttl},
+                    **update_params,
+                )
+            except ClientError as err:
+                logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+
+    @tracer.capture_method
+    def clear(self) -> None:
+        """Clear session memory from DynamoDB, including the single-item history if there is one"""
+        super().clear()
+
+        query_params = {
+            "KeyConditionExpression": Key("UserId").eq(self.user_id)
+            & Key("ConversationId").begins_with(self.message_key_prefix),
+            "ProjectionExpression": "UserId, ConversationId",
+        }
+        # fmt: off
+        with tracer.provider.in_subsegment("## chat_history") as subsegment: # NOSONAR python:S1192 - subsegment name for x-ray tracing
+        # fmt: on
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "batch_write_item")
+
+            try:
+                with self.table.batch_writer() as batch:
+                    while True:
+                        response = self.table.query(**query_params)
+                        for key in response.get("Items", []):
+                            batch.delete_item(Key=key)
+                        if "LastEvaluatedKey" not in response:
+                            break
+                        query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            except ClientError as err:
+                logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
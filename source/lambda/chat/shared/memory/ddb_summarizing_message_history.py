@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from aws_lambda_powertools import Logger, Tracer
+from botocore.exceptions import ClientError
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
+from utils.constants import (
+    CHAT_HISTORY_SUMMARIZED_COUNT_FIELD_NAME,
+    CHAT_HISTORY_SUMMARY_FIELD_NAME,
+    DEFAULT_CONVERSATION_SUMMARY_KEEP_MESSAGES,
+    TRACE_ID_ENV_VAR,
+)
+
+logger = Logger(utc=True)
+tracer = Tracer()
+
+SUMMARY_PROMPT = """Progressively summarize the lines of conversation provided, adding onto the previous summary and \
+returning a new summary. Keep every name, number, fact and decision the conversation may refer back to.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+SUMMARY_MESSAGE_PREFIX = "Summary of the earlier conversation: "
+
+
+class SummarizingChatMessageHistory(DynamoDBChatMessageHistory):
+    """Chat message history that keeps a rolling summary of the older turns of a conversation, so the history sent
+    to the LLM stays roughly the same size however long the conversation gets.
+
+    The summary and the number of History messages it covers are stored on the conversation's record, next to the
+    History, which is kept as is. The messages returned are the summary, as a system message, followed by the messages
+    it does not cover, windowed as by DynamoDBChatMessageHistory. Once more than summary_threshold messages are not
+    covered, compact() folds all but the last summary_keep_messages of them into the summary. Compaction calls the
+    LLM, so it is run after the response has been sent rather than while the user is waiting.
+
+    Args:
+        table_name: name of the DynamoDB table
+        user_id (str): Id of the user who the current chat belongs to. Used as partition key in table.
+        conversation_id (str): The key that is used to store the messages of a single chat session for a given user.
+        summary_threshold (int): Number of messages not covered by the summary above which compact() summarises
+        summary_keep_messages (int): Number of most recent messages compact() leaves out of the summary
+    """
+
+    HISTORY_ATTRIBUTES = DynamoDBChatMessageHistory.HISTORY_ATTRIBUTES + (
+        CHAT_HISTORY_SUMMARY_FIELD_NAME,
+        CHAT_HISTORY_SUMMARIZED_COUNT_FIELD_NAME,
+    )
+
+    def __init__(
+        self,
+        *args: Any,
+        summary_threshold: int,
+        summary_keep_messages: int = DEFAULT_CONVERSATION_SUMMARY_KEEP_MESSAGES,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.summary_threshold = int(summary_threshold)
+        self.summary_keep_messages = int(summary_keep_messages)
+        self._summary: Optional[str] = None
+        self._summarized_count = 0
+
+    @property
+    def summary(self) -> Optional[str]:
+        if self._history_snapshot is None:
+            self.load_history()
+        return self._summary
+
+    @property
+    def unsummarized_messages(self) -> List[BaseMessage]:
+        """The messages of the conversation that are not covered by the summary"""
+        messages = self.raw_messages
+        return messages[self._summarized_count :]
+
+    def set_history_item(self, item: Dict[str, Any]) -> None:
+        super().set_history_item(item)
+        self._summary = item.get(CHAT_HISTORY_SUMMARY_FIELD_NAME)
+        self._summarized_count = int(item.get(CHAT_HISTORY_SUMMARIZED_COUNT_FIELD_NAME, 0))
+
+    @property
+    @tracer.capture_method(capture_response=True)
+    def messages(self) -> List[BaseMessage]:  # type: ignore
+        """Retrieve the summary of the older messages followed by the messages it does not cover"""
+        messages = self.unsummarized_messages
+        if not self._summary:
+            return self.window_messages(messages)
+
+        summary_message = SystemMessage(content=f"{SUMMARY_MESSAGE_PREFIX}{self._summary}")
+        max_tokens = None
+        if self.max_history_tokens is not None:
+            max_tokens = max(self.max_history_tokens - self.estimate_message_tokens(summary_message), 0)
+        return [summary_message] + self.window_messages(messages, max_tokens)
+
+    @tracer.capture_method
+    def compact(self, summarize: Callable[[str], str]) -> bool:
+        """
+        Folds the older messages not yet covered by the summary into it, once there are more than summary_threshold.
+
+        Args:
+            summarize (Callable[[str], str]): returns the LLM's completion of the summarisation prompt
+
+        Returns:
+            bool: True if a new summary was stored
+        """
+        messages = self.unsummarized_messages
+        if len(messages) <= self.summary_threshold:
+            return False
+
+        to_summarize = messages[: len(messages) - self.summary_keep_messages]
+        if not to_summarize:
+            return False
+
+        prompt = SUMMARY_PROMPT.format(
+            summary=self._summary or "", new_lines="\n".join(message.text for message in to_summarize)
+        )
+        summary = summarize(prompt).strip()
+        if not summary:
+            logger.warning(f"Empty summary generated for conversation {self.conversation_id}, keeping the messages")
+            return False
+        return self.store_summary(summary, self._summarized_count + len(to_summarize))
+
+    def store_summary(self, summary: str, summarized_count: int) -> bool:
+        """
+        Stores the summary, unless another request stored one since the history was read.
+
+        Args:
+            summary (str): the new summary
+            summarized_count (int): number of History messages, from the oldest, covered by the summary
+
+        Returns:
+            bool: True if the summary was stored
+        """
+        update_params = {
+            "Key": {"UserId": self.user_id, "ConversationId": self.conversation_id},
+            "UpdateExpression": "SET #Summary = :summary, #SummarizedCount = :count",
+            "ExpressionAttributeNames": {
+                "#Summary": CHAT_HISTORY_SUMMARY_FIELD_NAME,
+                "#SummarizedCount": CHAT_HISTORY_SUMMARIZED_COUNT_FIELD_NAME,
+                "#History": "History",
+            },
+            "ExpressionAttributeValues": {":summary": summary, ":count": summarized_count},
+        }
+        # the record must still exist, and no other summary may have been stored since it was read
+        if self._summarized_count:
+            update_params["ConditionExpression"] = "attribute_exists(#History) AND #SummarizedCount = :previous"
+            update_params["ExpressionAttributeValues"][":previous"] = self._summarized_count
+        else:
+            update_params["ConditionExpression"] = (
+                "attribute_exists(#History) AND attribute_not_exists(#SummarizedCount)"
+            )
+
+        # fmt: off
+        with tracer.provider.in_subsegment("## chat_history") as subsegment: # NOSONAR python:S1192 - subsegment name for x-ray tracing
+        # fmt: on
+            subsegment.put_annotation("service", "dynamodb")
+            subsegment.put_annotation("operation", "update_item")
+            try:
+                self.table.update_item(**update_params)
+            except ClientError as err:
+                if err.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    logger.warning(f"Summary of conversation {self.conversation_id} changed since it was read")
+                else:
+                    logger.error(err, xray_trace_id=os.environ[TRACE_ID_ENV_VAR])
+                return False
+
+        self._summary = summary
+        self._summarized_count = summarized_count
+        return True
+
+    def clear(self) -> None:
+        """Clear session memory, and its summary, from DynamoDB"""
+        super().clear()
+        self._summary = None
+        self._summarized_count = 0
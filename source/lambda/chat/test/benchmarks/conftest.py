@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+import timeit
+import warnings
+from pathlib import Path
+
+import pytest
+
+# the fastest time of each benchmark relative to the calibration workload, and how much slower it may get unreported
+BENCHMARK_BASELINES_PATH = Path(__file__).parent / "benchmark_baselines.json"
+# set to "true" to record the fastest times of the run as the new baselines instead of comparing them
+UPDATE_BENCHMARK_BASELINES_ENV_VAR = "UPDATE_BENCHMARK_BASELINES"
+# set to "true" to report the benchmarks slower than their baselines. Only meaningful when the benchmarks run on their
+# own, as in deployment/run-unit-tests.sh, since the state left by the rest of the suite slows them down.
+CHECK_BENCHMARK_BASELINES_ENV_VAR = "CHECK_BENCHMARK_BASELINES"
+
+
+class BenchmarkRegressionWarning(UserWarning):
+    """Warns of a benchmark slower than its baseline, listed in the warnings summary of the run"""
+
+
+def calibration_workload():
+    """
+    A fixed pure Python workload timed on the machine running the benchmarks. The benchmark times are compared in
+    multiples of it, so that the baselines recorded on one machine apply to faster or slower ones.
+    """
+    messages = [{"type": "human", "data": {"content": f"Message {i} of the conversation. " * 4}} for i in range(100)]
+    return sorted(json.loads(json.dumps(messages)), key=lambda message: message["data"]["content"])
+
+
+class FakeApiGatewayManagementClient:
+    """
+    In-process stand-in for the apigatewaymanagementapi client, recording the frames posted to each connection
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    def post_to_connection(self, ConnectionId: str, Data: str) -> dict:
+        self.frames.append((ConnectionId, Data))
+        return {}
+
+
+@pytest.fixture
+def apigateway_client():
+    return FakeApiGatewayManagementClient()
+
+
+@pytest.fixture(scope="session")
+def benchmark_baselines():
+    baselines = json.loads(BENCHMARK_BASELINES_PATH.read_text())
+    yield baselines
+
+    if os.getenv(UPDATE_BENCHMARK_BASELINES_ENV_VAR, "false").lower() == "true":
+        baselines["benchmarks"] = dict(sorted(baselines["benchmarks"].items()))
+        BENCHMARK_BASELINES_PATH.write_text(json.dumps(baselines, indent=4) + "\n")
+
+
+def time_calibration_workload() -> float:
+    """
+    Returns the fastest time of the calibration workload, in microseconds. It is timed right after each benchmark, so
+    that both are measured under the same load of the machine.
+    """
+    timer = timeit.Timer(calibration_workload)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+@pytest.fixture
+def baseline_benchmark(benchmark, benchmark_baselines, request):
+    """
+    The pytest-benchmark fixture, with the fastest time of the benchmark compared to its baseline once it has run. Both
+    are measured in multiples of the calibration workload timed on the same machine. A BenchmarkRegressionWarning is
+    reported if it is more than regression_threshold_percent slower than its baseline. Timings vary too much between
+    runs of the same code for this to fail the run. Benchmarks are only compared with CHECK_BENCHMARK_BASELINES set,
+    and not without a baseline or when benchmarking is disabled (as with pytest-xdist).
+    """
+    yield benchmark
+
+    if benchmark.stats is None:
+        return
+
+    name = f"{request.node.path.stem}::{request.node.name}"
+    min_us = benchmark.stats.stats.min * 1e6
+    relative_min = min_us / time_calibration_workload()
+    if os.getenv(UPDATE_BENCHMARK_BASELINES_ENV_VAR, "false").lower() == "true":
+        benchmark_baselines["benchmarks"][name] = {"relative_min": round(relative_min, 3)}
+        return
+
+    baseline = benchmark_baselines["benchmarks"].get(name)
+    if baseline is None or os.getenv(CHECK_BENCHMARK_BASELINES_ENV_VAR, "false").lower() != "true":
+        return
+
+    threshold_percent = benchmark_baselines["regression_threshold_percent"]
+    allowed_relative_min = baseline["relative_min"] * (1 + threshold_percent / 100)
+    if relative_min > allowed_relative_min:
+        warnings.warn(
+            f"{name} regressed: fastest round of {min_us:.3f} us ({relative_min:.3f} calibration runs) is more than "
+            f"{threshold_percent}% above its baseline of {baseline['relative_min']:.3f} calibration runs",
+            BenchmarkRegressionWarning,
+        )
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, message_to_dict
+
+from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
+from utils.constants import CHAT_HISTORY_VERSION_FIELD_NAME
+
+TABLE_NAME = "benchmark-conversation-table"
+USER_ID = "fake-user-id"
+CONVERSATION_ID = "fake-conversation-id"
+MESSAGE_ID = "fake-message-id"
+HISTORY_LENGTHS = [10, 100, 500]
+
+
+def history_items(length):
+    # about 120 KB at 500 messages, so that appending a turn stays under the 400 KB item limit of DynamoDB (moto also
+    # counts the replaced history against it). add_messages only logs a failed write, which the benchmark would time.
+    messages = [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=f"Message {i} of the conversation. " * 4, id=MESSAGE_ID)
+        for i in range(length)
+    ]
+    return [message_to_dict(message) for message in messages]
+
+
+@pytest.fixture
+def conversation_table(dynamodb_resource, setup_environment):
+    table = dynamodb_resource.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "UserId", "KeyType": "HASH"},
+            {"AttributeName": "ConversationId", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "ConversationId", "AttributeType": "S"},
+            {"AttributeName": "UserId", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    yield table
+
+
+def put_history(table, items):
+    table.put_item(
+        Item={
+            "UserId": USER_ID,
+            "ConversationId": CONVERSATION_ID,
+            "History": items,
+            CHAT_HISTORY_VERSION_FIELD_NAME: 1,
+        }
+    )
+
+
+@pytest.mark.benchmark(group="ddb-chat-history-read")
+@pytest.mark.parametrize("history_length", HISTORY_LENGTHS)
+def test_read_history(baseline_benchmark, conversation_table, history_length):
+    put_history(conversation_table, history_items(history_length))
+
+    def read_history():
+        return DynamoDBChatMessageHistory(TABLE_NAME, USER_ID, CONVERSATION_ID, MESSAGE_ID).messages
+
+    assert len(baseline_benchmark(read_history)) == history_length
+
+
+@pytest.mark.benchmark(group="ddb-chat-history-append")
+@pytest.mark.parametrize("history_length", HISTORY_LENGTHS)
+def test_append_turn(baseline_benchmark, conversation_table, history_length):
+    items = history_items(history_length)
+
+    def setup():
+        # every round appends a turn to a history of the same length, read the way a request reads it
+        put_history(conversation_table, items)
+        history = DynamoDBChatMessageHistory(TABLE_NAME, USER_ID, CONVERSATION_ID, MESSAGE_ID)
+        history.load_history()
+        turn = [HumanMessage(content="What is next?"), AIMessage(content="The next step. " * 20)]
+        return (history, turn), {}
+
+    baseline_benchmark.pedantic(lambda history, turn: history.add_messages(turn), setup=setup, rounds=20)
+
+    assert len(DynamoDBChatMessageHistory(TABLE_NAME, USER_ID, CONVERSATION_ID, MESSAGE_ID).raw_messages) == (
+        history_length + 2
+    )
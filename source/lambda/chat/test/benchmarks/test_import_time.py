@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import pytest
+
+CHAT_LAMBDA_DIR = Path(__file__).resolve().parents[2]
+# the cold start import time allowed for each handler, and the modules it must leave for the first request needing them.
+# Each budget is about 1.2x the p90 of its measured_ms, taken over 40 serial runs with warm bytecode before and after
+# the optional modules were deferred. deferred_modules is what keeps those modules out of the cold start, the budget
+# catches a new slow import at module level while leaving headroom for the noise between runs.
+IMPORT_TIME_BUDGET = json.loads((Path(__file__).parent / "import_time_budget.json").read_text())
+# import times vary from run to run, so the fastest of a few fresh interpreters is compared to the budget. The first run
+# also writes the bytecode the later ones load, as the pip built Lambda layers do, instead of compiling every module.
+IMPORT_TIME_RUNS = 3
+# set by pytest-xdist in its workers, whose imports compete for the CPU with the tests of the other workers
+XDIST_WORKER_ENV_VAR = "PYTEST_XDIST_WORKER"
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(importtime_output: str) -> List[ImportTime]:
+    """
+    Parses the lines python -X importtime writes to stderr, eg:
+            import time: self [us] | cumulative | imported package
+            import time:       152 |        152 |   _io
+    """
+    import_times = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        import_times.append(ImportTime(fields[2].strip(), int(fields[0]), int(fields[1])))
+    return import_times
+
+
+def measure_import(module: str) -> List[ImportTime]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=CHAT_LAMBDA_DIR,
+        env={name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    return parse_import_times(result.stderr)
+
+
+def test_parse_import_times():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       152 |        152 |   _io\n"
+        "import time:      1024 |       2048 | bedrock_handler\n"
+    )
+
+    assert parse_import_times(output) == [ImportTime("_io", 152, 152), ImportTime("bedrock_handler", 1024, 2048)]
+
+
+@pytest.mark.parametrize("handler", sorted(IMPORT_TIME_BUDGET))
+def test_handler_defers_optional_modules(handler, setup_environment):
+    imported_modules = {import_time.module for import_time in measure_import(handler)}
+
+    assert imported_modules.isdisjoint(IMPORT_TIME_BUDGET[handler]["deferred_modules"])
+
+
+@pytest.mark.skipif(
+    XDIST_WORKER_ENV_VAR in os.environ,
+    reason="import times are only measured without parallel workers, eg with pytest test/benchmarks -p no:xdist",
+)
+@pytest.mark.parametrize("handler", sorted(IMPORT_TIME_BUDGET))
+def test_handler_import_time_budget(handler, setup_environment):
+    budget_ms = IMPORT_TIME_BUDGET[handler]["budget_ms"]
+
+    runs = [measure_import(handler) for _ in range(IMPORT_TIME_RUNS)]
+    fastest_run = min(runs, key=lambda import_times: import_times[-1].cumulative_us)
+    handler_import_time = fastest_run[-1]
+    slowest_modules = sorted(fastest_run, key=lambda import_time: import_time.self_us, reverse=True)[:10]
+
+    assert handler_import_time.module == handler
+    assert handler_import_time.cumulative_us / 1000 <= budget_ms, (
+        f"Importing {handler} took {handler_import_time.cumulative_us / 1000:.0f} ms, over its budget of "
+        f"{budget_ms} ms. Slowest modules: "
+        + ", ".join(f"{import_time.module} ({import_time.self_us / 1000:.0f} ms)" for import_time in slowest_modules)
+    )
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from copy import deepcopy
+from io import BytesIO
+
+import pytest
+
+from llms.models.sagemaker.content_handler import SageMakerContentHandler
+from utils.helpers import count_keys, pop_null_values
+
+# a chat schema with a long system prompt, few-shot examples and many fixed generation parameters, as written for
+# multi-turn instruction tuned models
+LARGE_INPUT_SCHEMA = {
+    "inputs": [
+        [
+            {"role": "system", "content": "You are a helpful assistant. " * 50},
+            *[{"role": "user" if i % 2 == 0 else "assistant", "content": f"Example turn {i} " * 20} for i in range(40)],
+            {"role": "user", "content": "<<prompt>>"},
+        ]
+    ],
+    "parameters": {
+        "temperature": "<<temperature>>",
+        "max_new_tokens": "<<max_new_tokens>>",
+        **{f"fixed_param_{i}": i for i in range(100)},
+    },
+}
+MODEL_KWARGS = {"temperature": 0.2, "max_new_tokens": 512}
+PROMPT = "What is the maximum duration of a Lambda function?"
+
+
+@pytest.fixture
+def content_handler():
+    return SageMakerContentHandler(input_schema=LARGE_INPUT_SCHEMA, output_path_expression="$[0].generated_text")
+
+
+@pytest.mark.benchmark(group="sagemaker-transform-input")
+def test_transform_input_large_schema(baseline_benchmark, content_handler):
+    payload = baseline_benchmark(content_handler.transform_input, PROMPT, MODEL_KWARGS)
+
+    assert json.loads(payload)["inputs"][0][-1]["content"] == PROMPT
+
+
+@pytest.mark.benchmark(group="sagemaker-transform-input")
+def test_replace_placeholders_large_schema(baseline_benchmark, content_handler):
+    # the per-call schema walk transform_input did before the schema was compiled, for comparison
+    def transform_input():
+        payload = deepcopy(content_handler.input_schema)
+        content_handler.replace_placeholders(payload, {**MODEL_KWARGS, "prompt": PROMPT})
+        count_keys(payload)
+        return json.dumps(pop_null_values(payload)).encode("utf-8")
+
+    assert baseline_benchmark(transform_input) == content_handler.transform_input(PROMPT, MODEL_KWARGS)
+
+
+@pytest.mark.benchmark(group="sagemaker-transform-output")
+def test_transform_output(baseline_benchmark, content_handler):
+    output = json.dumps([{"generated_text": "Fifteen minutes. " * 100, "details": {"tokens": list(range(500))}}])
+
+    response = baseline_benchmark(lambda: content_handler.transform_output(BytesIO(output.encode("utf-8"))))
+
+    assert response.startswith("Fifteen minutes.")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from shared.knowledge.bedrock_knowledge_base import BedrockKnowledgeBase
+from shared.knowledge.kendra_knowledge_base import KendraKnowledgeBase
+from shared.knowledge.kendra_retriever import CustomKendraRetriever
+
+NUMBER_OF_DOCS = 20
+KENDRA_DOCUMENTS = [
+    Document(
+        page_content=f"Excerpt {i} from a Kendra index. " * 20,
+        metadata={
+            "result_id": f"fakeid{i}",
+            "document_id": f"some.doc.{i}",
+            # every other document is stored in S3 and is linked to the S3 console
+            "source": f"s3://fake-bucket/documents/report {i}.pdf" if i % 2 else f"https://example.com/doc{i}.html",
+            "title": f"Fake Doc Title {i}",
+            "excerpt": f"Excerpt {i} from a Kendra index. " * 20,
+            "document_attributes": {"_source_uri": f"https://example.com/doc{i}.html", "_category": "guide"},
+            "score": "HIGH",
+        },
+    )
+    for i in range(NUMBER_OF_DOCS)
+]
+BEDROCK_DOCUMENTS = [
+    Document(
+        page_content=f"Excerpt {i} from a Bedrock knowledge base. " * 20,
+        metadata={
+            "location": (
+                {"type": "S3", "s3Location": {"uri": f"s3://fake-bucket/documents/report {i}.pdf"}}
+                if i % 2
+                else {"type": "WEB", "webLocation": {"url": f"https://example.com/doc{i}.html"}}
+            ),
+            "score": 0.8,
+        },
+    )
+    for i in range(NUMBER_OF_DOCS)
+]
+
+
+@pytest.mark.benchmark(group="source-docs-formatter")
+def test_kendra_source_docs_formatter(baseline_benchmark, setup_environment):
+    with patch.object(CustomKendraRetriever, "_add_user_context_to_attribute_filter", return_value=None):
+        knowledge_base = KendraKnowledgeBase(
+            {"NumberOfDocs": NUMBER_OF_DOCS, "ReturnSourceDocs": True, "KendraKnowledgeBaseParams": {}}
+        )
+
+    formatted_docs = baseline_benchmark(knowledge_base.source_docs_formatter, KENDRA_DOCUMENTS)
+
+    assert len(formatted_docs) == NUMBER_OF_DOCS
+    assert formatted_docs[1]["location"].startswith("https://s3.console.aws.amazon.com/")
+
+
+@pytest.mark.benchmark(group="source-docs-formatter")
+def test_bedrock_source_docs_formatter(baseline_benchmark, setup_environment):
+    knowledge_base = BedrockKnowledgeBase(
+        {"KnowledgeBaseType": "Bedrock", "NumberOfDocs": NUMBER_OF_DOCS, "ReturnSourceDocs": True}
+    )
+
+    formatted_docs = baseline_benchmark(knowledge_base.source_docs_formatter, BEDROCK_DOCUMENTS)
+
+    assert len(formatted_docs) == NUMBER_OF_DOCS
+    assert formatted_docs[1]["location"].startswith("https://s3.console.aws.amazon.com/")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from handlers.use_case_handler import UseCaseHandler
+from utils.constants import (
+    CONVERSATION_ID_EVENT_KEY,
+    MESSAGE_KEY,
+    RECORD_PROCESSING_CONCURRENCY_ENV_VAR,
+    REQUEST_CONTEXT_KEY,
+)
+
+CONNECTIONS_PER_BATCH = 5
+RECORDS_PER_CONNECTION = 2
+
+
+class FakeChat:
+    """Answers every question at once, so that only the handler's own work is measured"""
+
+    def generate(self, question):
+        return {"answer": f"The answer to: {question}"}
+
+    def compact_conversation_history(self):
+        pass
+
+
+class FakeLLMChatClient:
+    """In-process stand-in for the LLMChatClient built for each record"""
+
+    use_case_config = {"LlmParams": {"RAGEnabled": False, "Streaming": False}}
+
+    def __init__(self, connection_id):
+        self.connection_id = connection_id
+        self.builder = SimpleNamespace(callbacks=[], message_id="fake-message-id", is_streaming=False)
+
+    def get_event_conversation_id(self, event_body):
+        return event_body[MESSAGE_KEY][CONVERSATION_ID_EVENT_KEY]
+
+    def check_env(self):
+        pass
+
+    def check_event(self, event_body, conversation_id):
+        return event_body
+
+    def get_model(self, event_message, user_id):
+        return FakeChat()
+
+
+def sqs_batch(connections, records_per_connection):
+    records = []
+    for connection in range(connections):
+        connection_id = f"fake-connection-{connection}"
+        for record in range(records_per_connection):
+            body = {
+                REQUEST_CONTEXT_KEY: {"connectionId": connection_id, "authorizer": {"UserId": "fake-user-id"}},
+                MESSAGE_KEY: {
+                    "action": "sendMessage",
+                    "question": f"Question {record}",
+                    CONVERSATION_ID_EVENT_KEY: f"fake-conversation-{connection}",
+                },
+            }
+            records.append(
+                {
+                    "messageId": f"msg-{connection}-{record}",
+                    "body": json.dumps(body),
+                    "messageAttributes": {"connectionId": {"stringValue": connection_id, "dataType": "String"}},
+                }
+            )
+    return {"Records": records}
+
+
+@pytest.fixture
+def lambda_context():
+    context = MagicMock(spec=LambdaContext)
+    context.get_remaining_time_in_millis.return_value = 300000
+    return context
+
+
+@pytest.mark.benchmark(group="use-case-handler")
+@pytest.mark.parametrize("concurrency", ["1", "4"])
+def test_handle_event(baseline_benchmark, setup_environment, apigateway_client, lambda_context, concurrency):
+    event = sqs_batch(CONNECTIONS_PER_BATCH, RECORDS_PER_CONNECTION)
+    handler = UseCaseHandler(FakeLLMChatClient)
+
+    with (
+        patch("shared.callbacks.websocket_handler.get_service_client", return_value=apigateway_client),
+        patch.dict(os.environ, {RECORD_PROCESSING_CONCURRENCY_ENV_VAR: concurrency}),
+    ):
+        response = baseline_benchmark(handler.handle_event, event, lambda_context)
+
+    assert response == {"batchItemFailures": []}
+    # each record posts its answer and the end of conversation token
+    assert len(apigateway_client.frames) % (2 * len(event["Records"])) == 0
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest.mock import patch
+
+import pytest
+
+from shared.callbacks.websocket_streaming_handler import WebsocketStreamingCallbackHandler
+
+TOKENS_PER_ANSWER = 500
+# chat models stream content blocks, text completion models such as SageMaker endpoints stream the text itself
+CONTENT_BLOCK_TOKENS = [[{"type": "text", "text": f" token{i}", "index": 0}] for i in range(TOKENS_PER_ANSWER)]
+TEXT_TOKENS = [f" token{i}" for i in range(TOKENS_PER_ANSWER)]
+
+
+def stream_answer(apigateway_client, tokens, coalesce_window_ms):
+    with patch("shared.callbacks.websocket_streaming_handler.get_service_client", return_value=apigateway_client):
+        handler = WebsocketStreamingCallbackHandler(
+            connection_id="fake-connection-id",
+            conversation_id="fake-conversation-id",
+            message_id="fake-message-id",
+            source_docs_formatter=None,
+            is_streaming=True,
+            coalesce_window_ms=coalesce_window_ms,
+            send_queue_size=0,
+        )
+    for token in tokens:
+        handler.on_llm_new_token(token)
+    handler.on_llm_end(None)
+    return handler
+
+
+@pytest.mark.benchmark(group="websocket-streaming-tokens")
+@pytest.mark.parametrize("tokens", [CONTENT_BLOCK_TOKENS, TEXT_TOKENS], ids=["content-blocks", "text"])
+def test_on_llm_new_token(baseline_benchmark, setup_environment, apigateway_client, tokens):
+    handler = baseline_benchmark(stream_answer, apigateway_client, tokens, 0)
+
+    assert handler.has_streamed
+    assert len(apigateway_client.frames) % TOKENS_PER_ANSWER == 0
+
+
+@pytest.mark.benchmark(group="websocket-streaming-tokens")
+def test_on_llm_new_token_coalesced(baseline_benchmark, setup_environment, apigateway_client):
+    handler = baseline_benchmark(stream_answer, apigateway_client, CONTENT_BLOCK_TOKENS, 50)
+
+    assert handler.has_streamed
+    assert apigateway_client.frames
@@ -14,6 +14,7 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 from clients.builders.bedrock_builder import BedrockBuilder
 from llms.bedrock import BedrockLLM
+from llms.models.bedrock.caching_chat_model import CachingChatBedrockConverse
 from llms.models.model_provider_inputs import BedrockInputs
 from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
 from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
@@ -192,6 +193,7 @@ def test_set_llm(
         "human_prefix": "User",
     }
     assert type(builder.model_inputs) == BedrockInputs
+    assert builder.model_inputs.disambiguation_params == config["LlmParams"].get("DisambiguationParams")
 
     assert builder.callbacks
 
@@ -407,6 +409,46 @@ def test_returned_bedrock_model(
         assert type(builder.llm) == model
 
 
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id",
+    [(CHAT_IDENTIFIER, BEDROCK_PROMPT, False, False, None, False, model_id)],
+)
+def test_set_llm_with_prompt_caching(
+    use_case,
+    model_id,
+    prompt,
+    bedrock_llm_config,
+    chat_event,
+    rag_enabled,
+    return_source_docs,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+):
+    config = deepcopy(bedrock_llm_config)
+    config["LlmParams"]["BedrockLlmParams"]["PromptCaching"] = {"Enabled": True, "CacheHistory": True}
+    chat_event_body = json.loads(chat_event["Records"][0]["body"])
+    builder = BedrockBuilder(
+        connection_id="fake-connection-id",
+        conversation_id="fake-conversation-id",
+        use_case_config=config,
+        rag_enabled=rag_enabled,
+        message_id="fake-message-id",
+    )
+    user_id = chat_event.get("requestContext", {}).get("authorizer", {}).get(USER_ID_EVENT_KEY, {})
+
+    builder.set_model_defaults(LLMProviderTypes.BEDROCK, model_id)
+    builder.set_knowledge_base()
+    builder.set_conversation_memory(user_id, chat_event_body[MESSAGE_KEY][CONVERSATION_ID_EVENT_KEY])
+    with patch(
+        "clients.builders.llm_builder.WebsocketHandler",
+        return_value=BaseCallbackHandler(),
+    ):
+        builder.set_llm()
+
+    assert builder.model_inputs.prompt_caching == {"Enabled": True, "CacheHistory": True}
+    assert isinstance(builder.llm.llm, CachingChatBedrockConverse)
+
+
 @pytest.mark.parametrize(
     "use_case, prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model, model_id",
     [
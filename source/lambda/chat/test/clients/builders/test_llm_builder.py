@@ -166,6 +166,7 @@ def test_conversation_memory_builder(
         "ai_prefix": "Bot",
         "human_prefix": "User",
     }
+    assert builder.get_reserved_prompt_size() == len(prompt) + builder.model_defaults.max_chat_message_size
 
 
 @pytest.mark.parametrize(
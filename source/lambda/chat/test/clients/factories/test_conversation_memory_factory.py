@@ -9,7 +9,16 @@ import pytest
 
 from clients.factories.conversation_memory_factory import ConversationMemoryFactory
 from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
-from utils.constants import CONVERSATION_TABLE_NAME_ENV_VAR
+from shared.memory.ddb_message_item_history import DynamoDBMessageItemHistory
+from shared.memory.ddb_summarizing_message_history import SummarizingChatMessageHistory
+from utils.constants import (
+    CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR,
+    CONVERSATION_HISTORY_LAYOUT_ENV_VAR,
+    CONVERSATION_HISTORY_WINDOW_ENV_VAR,
+    CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR,
+    CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR,
+    CONVERSATION_TABLE_NAME_ENV_VAR,
+)
 from unittest.mock import patch
 
 TEST_PROMPT = """\n\n{history}\n\n{input}"""
@@ -125,3 +134,118 @@ def test_get_ddb_memory_missing_memory_type(bedrock_llm_config, model_id):
     assert errors_list == [
         "Missing required field ConversationMemoryType in the config which is required for constructing conversation memory for the LLM."
     ]
+
+
+@pytest.mark.parametrize(
+    "layout, expected_class",
+    [
+        (None, DynamoDBChatMessageHistory),
+        ("SingleItem", DynamoDBChatMessageHistory),
+        ("MessageItems", DynamoDBMessageItemHistory),
+        ("unsupported", DynamoDBChatMessageHistory),
+    ],
+)
+def test_get_dynamodb_history_class(layout, expected_class):
+    with patch.dict(os.environ, {CONVERSATION_HISTORY_LAYOUT_ENV_VAR: layout} if layout else {}):
+        if layout is None:
+            os.environ.pop(CONVERSATION_HISTORY_LAYOUT_ENV_VAR, None)
+        assert ConversationMemoryFactory.get_dynamodb_history_class() == expected_class
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id",
+    [(TEST_PROMPT, False, False, None, False, "google/flan-t5-xxl")],
+)
+@patch.dict(
+    os.environ, {CONVERSATION_TABLE_NAME_ENV_VAR: "fake-table", CONVERSATION_HISTORY_WINDOW_ENV_VAR: "TokenBudget"}
+)
+def test_get_ddb_memory_with_token_budget(bedrock_llm_config, model_id):
+    _, memory_inputs = ConversationMemoryFactory().get_conversation_memory(
+        bedrock_llm_config,
+        MODEL_INFO_CONFIG,
+        "fake-user-id",
+        "fake-conversation-id",
+        "fake-message-id",
+        [],
+        max_prompt_size=2000,
+        reserved_prompt_size=400,
+    )
+    assert memory_inputs["max_history_tokens"] == 400
+    assert memory_inputs["max_history_length"] == 10
+
+
+@pytest.mark.parametrize(
+    "window, max_prompt_size, reserved_prompt_size, rag_enabled, budget_percent, expected_budget",
+    [
+        (None, 2000, 0, False, None, None),
+        ("MessageCount", 2000, 0, False, None, None),
+        ("TokenBudget", 2000, 0, False, None, 500),
+        ("TokenBudget", 2000, 400, False, None, 400),
+        ("TokenBudget", 2000, 400, True, None, 200),
+        ("TokenBudget", 2000, 400, True, "25", 100),
+        ("TokenBudget", 2000, 400, True, "not-a-number", 200),
+        ("TokenBudget", 2000, 2400, False, None, 0),
+        ("TokenBudget", None, 0, False, None, None),
+        ("unsupported", 2000, 0, False, None, None),
+    ],
+)
+def test_get_history_token_budget(
+    window, max_prompt_size, reserved_prompt_size, rag_enabled, budget_percent, expected_budget
+):
+    env = {CONVERSATION_HISTORY_WINDOW_ENV_VAR: window} if window else {}
+    if budget_percent:
+        env[CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR] = budget_percent
+    with patch.dict(os.environ, env):
+        if window is None:
+            os.environ.pop(CONVERSATION_HISTORY_WINDOW_ENV_VAR, None)
+        if budget_percent is None:
+            os.environ.pop(CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR, None)
+        assert (
+            ConversationMemoryFactory.get_history_token_budget(max_prompt_size, reserved_prompt_size, rag_enabled)
+            == expected_budget
+        )
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id, layout, expected_class",
+    [
+        (TEST_PROMPT, False, False, None, False, "google/flan-t5-xxl", "SingleItem", SummarizingChatMessageHistory),
+        (TEST_PROMPT, False, False, None, False, "google/flan-t5-xxl", "MessageItems", DynamoDBMessageItemHistory),
+    ],
+)
+def test_get_ddb_memory_with_summary(bedrock_llm_config, model_id, layout, expected_class):
+    env = {
+        CONVERSATION_TABLE_NAME_ENV_VAR: "fake-table",
+        CONVERSATION_HISTORY_LAYOUT_ENV_VAR: layout,
+        CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR: "20",
+        CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR: "6",
+    }
+    with patch.dict(os.environ, env):
+        memory_type, memory_inputs = ConversationMemoryFactory().get_conversation_memory(
+            bedrock_llm_config, MODEL_INFO_CONFIG, "fake-user-id", "fake-conversation-id", "fake-message-id", []
+        )
+    assert memory_type == expected_class
+    if expected_class == SummarizingChatMessageHistory:
+        assert memory_inputs["summary_threshold"] == 20
+        assert memory_inputs["summary_keep_messages"] == 6
+    else:
+        assert "summary_threshold" not in memory_inputs
+
+
+@pytest.mark.parametrize(
+    "threshold, keep_messages, expected_params",
+    [
+        (None, None, {}),
+        ("0", None, {}),
+        ("10", None, {"summary_threshold": 10, "summary_keep_messages": 4}),
+        ("10", "2", {"summary_threshold": 10, "summary_keep_messages": 2}),
+        ("ten", None, {}),
+    ],
+)
+def test_get_summary_params(threshold, keep_messages, expected_params):
+    env = {CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR: threshold, CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR: keep_messages}
+    with patch.dict(os.environ, {key: value for key, value in env.items() if value is not None}):
+        for key, value in env.items():
+            if value is None:
+                os.environ.pop(key, None)
+        assert ConversationMemoryFactory.get_summary_params() == expected_params
@@ -6,7 +6,10 @@ import os
 from copy import deepcopy
 
 import pytest
-from clients.factories.knowledge_base_factory import KNOWLEDGE_BASE_MAP, KnowledgeBaseFactory
+from clients.factories.knowledge_base_factory import KnowledgeBaseFactory, get_knowledge_base_class
+from shared.knowledge.bedrock_knowledge_base import BedrockKnowledgeBase
+from shared.knowledge.composite_knowledge_base import CompositeKnowledgeBase
+from shared.knowledge.kendra_knowledge_base import KendraKnowledgeBase
 from utils.constants import BEDROCK_KNOWLEDGE_BASE_ID_ENV_VAR, KENDRA_INDEX_ID_ENV_VAR
 from utils.enum_types import KnowledgeBaseTypes
 from unittest.mock import patch
@@ -31,7 +34,7 @@ def test_get_kb_memory_success(
     config = bedrock_llm_config
     errors_list = []
     response = KnowledgeBaseFactory().get_knowledge_base(config, errors_list, user_context_token)
-    assert type(response) == KNOWLEDGE_BASE_MAP.get(knowledge_base_type)
+    assert type(response) == get_knowledge_base_class(knowledge_base_type)
     if knowledge_base_type == KnowledgeBaseTypes.KENDRA.value:
         assert response.kendra_index_id == "fake-kendra-index-id"
     elif knowledge_base_type == KnowledgeBaseTypes.BEDROCK.value:
@@ -130,3 +133,68 @@ def test_get_kb_missing_type(bedrock_llm_config, model_id, user_context_token):
     response = KnowledgeBaseFactory().get_knowledge_base(config, errors_list, user_context_token)
     assert response is None
     assert errors_list == ["Missing required field (KnowledgeBaseType) in the configuration"]
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id",
+    [(TEST_PROMPT, False, True, KnowledgeBaseTypes.KENDRA.value, True, "google/flan-t5-xxl")],
+)
+def test_get_kb_with_additional_knowledge_bases(bedrock_llm_config, setup_environment, model_id, user_context_token):
+    errors_list = []
+    config = deepcopy(bedrock_llm_config)
+    config["KnowledgeBaseParams"]["AdditionalKnowledgeBases"] = [
+        {
+            "KnowledgeBaseType": KnowledgeBaseTypes.BEDROCK.value,
+            "NumberOfDocs": 4,
+            "BedrockKnowledgeBaseParams": {"BedrockKnowledgeBaseId": "other-bedrock-knowledge-base-id"},
+        },
+        {
+            "KnowledgeBaseType": KnowledgeBaseTypes.KENDRA.value,
+            "KendraKnowledgeBaseParams": {"ExistingKendraIndexId": "other-kendra-index-id"},
+        },
+    ]
+
+    response = KnowledgeBaseFactory().get_knowledge_base(config, errors_list, user_context_token)
+
+    assert type(response) == CompositeKnowledgeBase
+    assert errors_list == []
+    assert [type(knowledge_base) for knowledge_base in response.knowledge_bases] == [
+        KendraKnowledgeBase,
+        BedrockKnowledgeBase,
+        KendraKnowledgeBase,
+    ]
+    assert response.knowledge_bases[0].kendra_index_id == "fake-kendra-index-id"
+    assert response.knowledge_bases[1].knowledge_base_id == "other-bedrock-knowledge-base-id"
+    assert response.knowledge_bases[1].number_of_docs == 4
+    assert response.knowledge_bases[2].kendra_index_id == "other-kendra-index-id"
+    assert all(knowledge_base.return_source_documents for knowledge_base in response.knowledge_bases)
+    assert response.knowledge_base_type == KnowledgeBaseTypes.KENDRA.value
+    assert response.retriever.top_k == 2
+    assert len(response.retriever.retrievers) == 3
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id",
+    [(TEST_PROMPT, False, True, KnowledgeBaseTypes.KENDRA.value, False, "google/flan-t5-xxl")],
+)
+def test_get_kb_additional_knowledge_base_missing_id(
+    bedrock_llm_config, setup_environment, model_id, user_context_token
+):
+    errors_list = []
+    config = deepcopy(bedrock_llm_config)
+    config["KnowledgeBaseParams"]["AdditionalKnowledgeBases"] = [
+        {"KnowledgeBaseType": KnowledgeBaseTypes.BEDROCK.value, "BedrockKnowledgeBaseParams": {}}
+    ]
+
+    response = KnowledgeBaseFactory().get_knowledge_base(config, errors_list, user_context_token)
+
+    assert response is None
+    assert errors_list == [
+        "Missing required field (BedrockKnowledgeBaseParams.BedrockKnowledgeBaseId) in the configuration of an additional Knowledge Base"
+    ]
+
+
+def test_get_knowledge_base_class():
+    assert get_knowledge_base_class(KnowledgeBaseTypes.KENDRA.value) is KendraKnowledgeBase
+    assert get_knowledge_base_class(KnowledgeBaseTypes.BEDROCK.value) is BedrockKnowledgeBase
+    assert get_knowledge_base_class("Unsupported") is None
@@ -10,12 +10,14 @@ from unittest.mock import patch
 
 import pytest
 from clients.bedrock_client import BedrockClient
+from clients.llm_chat_client import _use_case_config_cache
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from utils.constants import (
     CHAT_IDENTIFIER,
     CONVERSATION_ID_EVENT_KEY,
     MESSAGE_KEY,
     QUESTION_EVENT_KEY,
+    USE_CASE_CONFIG_CACHE_TTL_ENV_VAR,
     USE_CASE_CONFIG_RECORD_KEY_ENV_VAR,
     USE_CASE_CONFIG_TABLE_NAME_ENV_VAR,
     USER_ID_EVENT_KEY,
@@ -447,3 +449,90 @@ def test_construct_chat_model_new_prompt(
             ("human", "{input}"),
         ]
     )
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id, table_name",
+    [(BASIC_PROMPT, False, False, "Kendra", False, "google/flan-t5-xxl", "fake-table")],
+)
+def test_retrieve_llm_config_served_from_cache(
+    table_name,
+    setup_test_table,
+    dynamodb_resource,
+    rag_enabled,
+    model_id,
+    bedrock_llm_config,
+    setup_environment,
+    llm_client,
+):
+    mock_table = dynamodb_resource.Table(table_name)
+    mock_table.put_item(Item={"key": "fake-key", "config": {"key": "value"}})
+
+    response = llm_client.retrieve_use_case_config()
+    response["key"] = "mutated"
+    mock_table.delete_item(Key={"key": "fake-key"})
+
+    # a warm container keeps serving an unmodified copy without going back to DynamoDB
+    assert llm_client.retrieve_use_case_config() == {"key": "value"}
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id, table_name",
+    [(BASIC_PROMPT, False, False, "Kendra", False, "google/flan-t5-xxl", "fake-table")],
+)
+def test_retrieve_llm_config_cache_revalidation(
+    table_name,
+    setup_test_table,
+    dynamodb_resource,
+    rag_enabled,
+    model_id,
+    bedrock_llm_config,
+    setup_environment,
+    llm_client,
+):
+    mock_table = dynamodb_resource.Table(table_name)
+    mock_table.put_item(Item={"key": "fake-key", "config": {"key": "value"}})
+    assert llm_client.retrieve_use_case_config() == {"key": "value"}
+
+    # expired entry whose version marker is unchanged is revalidated without re-reading the config
+    mock_table.put_item(Item={"key": "fake-key", "config": {"key": "unversioned-change"}})
+    _use_case_config_cache.get_entry(("fake-table", "fake-key")).expires_at = 0
+    assert llm_client.retrieve_use_case_config() == {"key": "value"}
+    assert not _use_case_config_cache.get_entry(("fake-table", "fake-key")).expired
+
+    # a changed version marker forces a full re-read
+    mock_table.put_item(Item={"key": "fake-key", "config": {"key": "new-value"}, "TTL": 1700000000})
+    _use_case_config_cache.get_entry(("fake-table", "fake-key")).expires_at = 0
+    assert llm_client.retrieve_use_case_config() == {"key": "new-value"}
+
+    # a record that disappeared is re-read and reported as missing
+    mock_table.delete_item(Key={"key": "fake-key"})
+    _use_case_config_cache.get_entry(("fake-table", "fake-key")).expires_at = 0
+    with pytest.raises(ValueError) as error:
+        llm_client.retrieve_use_case_config()
+    assert error.value.args[0] == "No usecase config found with key fake-key."
+    assert _use_case_config_cache.get_entry(("fake-table", "fake-key")) is None
+
+
+@pytest.mark.parametrize(
+    "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id, table_name",
+    [(BASIC_PROMPT, False, False, "Kendra", False, "google/flan-t5-xxl", "fake-table")],
+)
+def test_retrieve_llm_config_cache_disabled(
+    table_name,
+    setup_test_table,
+    dynamodb_resource,
+    rag_enabled,
+    model_id,
+    bedrock_llm_config,
+    setup_environment,
+    llm_client,
+):
+    mock_table = dynamodb_resource.Table(table_name)
+    mock_table.put_item(Item={"key": "fake-key", "config": {"key": "value"}})
+
+    with patch.dict(os.environ, {USE_CASE_CONFIG_CACHE_TTL_ENV_VAR: "0"}):
+        assert llm_client.retrieve_use_case_config() == {"key": "value"}
+        mock_table.put_item(Item={"key": "fake-key", "config": {"key": "new-value"}})
+        assert llm_client.retrieve_use_case_config() == {"key": "new-value"}
+    assert len(_use_case_config_cache) == 0
@@ -9,11 +9,16 @@ from unittest.mock import Mock
 import boto3
 import pytest
 from botocore.stub import Stubber
+from clients.llm_chat_client import clear_use_case_config_cache
 from cognito_jwt_verifier import CognitoJWTVerifier
 from custom_config import custom_usr_agent_config
 from helper import get_service_client
 from jwt import PyJWKClient
+from llms.base_langchain import clear_runnable_cache
 from moto import mock_aws
+from shared.defaults.model_defaults import clear_model_defaults_cache
+from shared.knowledge.answer_cache import clear_answer_cache
+from shared.knowledge.retrieval_cache import clear_retrieval_cache
 
 from utils.constants import (
     BEDROCK_KNOWLEDGE_BASE_ID_ENV_VAR,
@@ -82,6 +87,17 @@ def kendra_stubber():
         stubber.assert_no_pending_responses()
 
 
+@pytest.fixture(autouse=True)
+def clear_warm_container_caches():
+    # process-level caches outlive a single test the same way they outlive a single invocation
+    yield
+    clear_use_case_config_cache()
+    clear_model_defaults_cache()
+    clear_runnable_cache()
+    clear_retrieval_cache()
+    clear_answer_cache()
+
+
 @pytest.fixture(autouse=True)
 def dynamodb_resource():
     with mock_aws():
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import sys
+from copy import deepcopy
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from helper import get_service_client
+
+from clients.bedrock_client import BedrockClient
+from clients.llm_chat_client import LLMChatClient
+from handlers.container_priming import (
+    is_container_priming_enabled,
+    prime_container,
+    prime_container_on_init,
+    refresh_after_restore,
+)
+from llms.base_langchain import _runnable_cache
+from llms.bedrock import BedrockLLM
+from shared.defaults.model_defaults import ModelDefaults
+from utils.constants import (
+    CHAT_IDENTIFIER,
+    CONTAINER_PRIMING_ENV_VAR,
+    LAMBDA_INITIALIZATION_TYPE_ENV_VAR,
+    LLM_CONFIG_VERSION_FIELD_NAME,
+    MESSAGE_KEY,
+    TRACE_ID_ENV_VAR,
+    USE_CASE_CONFIG_TABLE_NAME_ENV_VAR,
+    WEBSOCKET_CALLBACK_URL_ENV_VAR,
+)
+
+BEDROCK_PROMPT = """{history}\n\n{input}"""
+MODEL_ID = "amazon.fake-model"
+USE_CASE_CONFIG_TABLE_NAME = "fake-table"
+BEDROCK_PARAMS = "prompt, is_streaming, rag_enabled, knowledge_base_type, return_source_docs, model_id, use_case"
+BEDROCK_CHAT = [(BEDROCK_PROMPT, False, False, None, False, MODEL_ID, CHAT_IDENTIFIER)]
+
+
+@pytest.fixture
+def use_case_config_table(monkeypatch, dynamodb_resource, setup_environment, bedrock_llm_config):
+    # priming creates the API Gateway client of the websocket callbacks, which needs a valid endpoint
+    monkeypatch.setenv(WEBSOCKET_CALLBACK_URL_ENV_VAR, "wss://test")
+    dynamodb_resource.create_table(
+        TableName=USE_CASE_CONFIG_TABLE_NAME,
+        KeySchema=[{"AttributeName": "key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    dynamodb_resource.Table(USE_CASE_CONFIG_TABLE_NAME).put_item(
+        Item={
+            "key": "fake-key",
+            "config": json.loads(json.dumps(deepcopy(bedrock_llm_config)), parse_float=Decimal),
+            LLM_CONFIG_VERSION_FIELD_NAME: 1,
+        }
+    )
+    yield dynamodb_resource
+
+
+@pytest.mark.parametrize(
+    "initialization_type, container_priming, expected",
+    [
+        (None, None, False),
+        ("on-demand", None, False),
+        ("snap-start", "true", True),
+        ("provisioned-concurrency", "false", False),
+        ("on-demand", "invalid", False),
+    ],
+)
+def test_is_container_priming_enabled(monkeypatch, initialization_type, container_priming, expected):
+    for env, value in [
+        (LAMBDA_INITIALIZATION_TYPE_ENV_VAR, initialization_type),
+        (CONTAINER_PRIMING_ENV_VAR, container_priming),
+    ]:
+        if value is None:
+            monkeypatch.delenv(env, raising=False)
+        else:
+            monkeypatch.setenv(env, value)
+
+    assert is_container_priming_enabled() == expected
+
+
+@pytest.mark.parametrize(BEDROCK_PARAMS, BEDROCK_CHAT)
+def test_first_request_reuses_primed_container(
+    monkeypatch, use_case_config_table, bedrock_dynamodb_defaults_table, chat_event
+):
+    # no trace ID is set while Lambda initializes the container
+    monkeypatch.delenv(TRACE_ID_ENV_VAR, raising=False)
+    assert prime_container(BedrockClient)
+    assert len(_runnable_cache) == 1
+
+    monkeypatch.setenv(TRACE_ID_ENV_VAR, "fake-trace-id")
+    with (
+        patch.object(LLMChatClient, "_get_use_case_config_item") as mocked_config_read,
+        patch.object(ModelDefaults, "fetch_model_defaults_record") as mocked_model_defaults_read,
+        patch.object(BedrockLLM, "create_runnable") as mocked_create_runnable,
+    ):
+        llm_client = BedrockClient(connection_id="fake-connection-id")
+        event_body = json.loads(chat_event["Records"][0]["body"])
+        llm_chat = llm_client.get_model(event_body[MESSAGE_KEY], "fake-user-id")
+
+    mocked_config_read.assert_not_called()
+    mocked_model_defaults_read.assert_not_called()
+    mocked_create_runnable.assert_not_called()
+    assert llm_chat.runnable_with_history is not None
+
+
+@pytest.mark.parametrize(BEDROCK_PARAMS, BEDROCK_CHAT)
+def test_refresh_after_restore_revalidates_config(use_case_config_table, bedrock_dynamodb_defaults_table):
+    assert prime_container(BedrockClient)
+    snapshot_client = get_service_client("bedrock-runtime")
+    snapshot_runnable = next(iter(_runnable_cache._entries.values())).value
+
+    with (
+        patch.object(
+            LLMChatClient,
+            "_get_use_case_config_item",
+            autospec=True,
+            side_effect=LLMChatClient._get_use_case_config_item,
+        ) as mocked_config_read,
+        patch.object(
+            ModelDefaults,
+            "fetch_model_defaults_record",
+            autospec=True,
+            side_effect=ModelDefaults.fetch_model_defaults_record,
+        ) as mocked_model_defaults_read,
+    ):
+        assert refresh_after_restore(BedrockClient)
+
+    # the unchanged config is only revalidated with a projection of its version marker
+    assert mocked_config_read.call_count == 1
+    assert LLM_CONFIG_VERSION_FIELD_NAME in mocked_config_read.call_args.args[3]
+    assert "config" not in mocked_config_read.call_args.args[3]
+    mocked_model_defaults_read.assert_called_once()
+    # the clients of the snapshot and the runnables holding them are created again
+    assert get_service_client("bedrock-runtime") is not snapshot_client
+    assert next(iter(_runnable_cache._entries.values())).value is not snapshot_runnable
+
+
+def test_prime_container_failures_are_left_to_the_first_request(dynamodb_resource, setup_environment):
+    # the use case config table does not exist
+    assert not prime_container(BedrockClient)
+    assert len(_runnable_cache) == 0
+
+
+def test_prime_container_skipped_without_environment(monkeypatch, setup_environment):
+    monkeypatch.delenv(USE_CASE_CONFIG_TABLE_NAME_ENV_VAR)
+
+    with patch.object(BedrockClient, "get_model") as mocked_get_model:
+        assert not prime_container(BedrockClient)
+
+    mocked_get_model.assert_not_called()
+
+
+def test_prime_container_on_init_registers_restore_hook(monkeypatch):
+    monkeypatch.setenv(LAMBDA_INITIALIZATION_TYPE_ENV_VAR, "snap-start")
+    monkeypatch.setenv(CONTAINER_PRIMING_ENV_VAR, "true")
+    snapshot_restore_py = SimpleNamespace(register_after_restore=Mock())
+    monkeypatch.setitem(sys.modules, "snapshot_restore_py", snapshot_restore_py)
+
+    with patch("handlers.container_priming.prime_container") as mocked_prime_container:
+        prime_container_on_init(BedrockClient)
+
+    snapshot_restore_py.register_after_restore.assert_called_once_with(refresh_after_restore, BedrockClient)
+    mocked_prime_container.assert_called_once_with(BedrockClient)
+
+
+def test_prime_container_on_init_outside_lambda(monkeypatch):
+    monkeypatch.delenv(LAMBDA_INITIALIZATION_TYPE_ENV_VAR, raising=False)
+    monkeypatch.setenv(CONTAINER_PRIMING_ENV_VAR, "true")
+
+    with patch("handlers.container_priming.prime_container") as mocked_prime_container:
+        prime_container_on_init(BedrockClient)
+
+    mocked_prime_container.assert_not_called()
@@ -4,6 +4,7 @@
 
 import json
 import os
+import threading
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
@@ -11,12 +12,18 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from handlers.use_case_handler import UseCaseHandler
 from shared.callbacks.websocket_gone_exception import WebSocketGoneException
+from shared.callbacks.websocket_streaming_handler import WebsocketStreamingCallbackHandler
+from utils.enum_types import CloudWatchNamespaces
+from utils.helpers import get_metrics_client
 from utils.constants import (
+    END_CONVERSATION_TOKEN,
     MESSAGE_KEY,
+    RECORD_PROCESSING_CONCURRENCY_ENV_VAR,
     REQUEST_CONTEXT_KEY,
     TRACE_ID_ENV_VAR,
     WEBSOCKET_CALLBACK_URL_ENV_VAR,
 )
+from utils.request_metrics import get_request_metrics
 
 
 @pytest.fixture
@@ -160,3 +167,251 @@ class TestUseCaseHandlerGoneException:
 
 
 
+
+
+class TestUseCaseHandlerStreamingDrain:
+
+    @staticmethod
+    def _llm_client_type(callbacks):
+        mock_llm_client_type = Mock()
+        mock_llm_client_instance = mock_llm_client_type.return_value
+        mock_llm_client_instance.get_event_conversation_id.return_value = "conv-1"
+        mock_llm_client_instance.check_env.return_value = None
+        mock_llm_client_instance.check_event.return_value = {MESSAGE_KEY: {"question": "Hello"}}
+        mock_llm_client_instance.use_case_config = {"LlmParams": {"RAGEnabled": False}}
+        mock_llm_client_instance.builder = Mock()
+        mock_llm_client_instance.builder.is_streaming = True
+        mock_llm_client_instance.builder.callbacks = callbacks
+        mock_llm_client_instance.builder.message_id = "test-msg-id"
+        mock_llm_client_instance.get_model.return_value.generate.return_value = "Success response"
+        return mock_llm_client_type
+
+    @patch.dict(os.environ, {TRACE_ID_ENV_VAR: "test-trace-id", WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test"})
+    def test_streaming_callbacks_drained_before_end_token(self, sqs_event, lambda_context):
+        calls = []
+        streaming_callback = Mock(spec=WebsocketStreamingCallbackHandler)
+        streaming_callback.has_streamed = True
+        streaming_callback.drain.side_effect = lambda: calls.append("drain")
+
+        handler = UseCaseHandler(self._llm_client_type([streaming_callback]))
+        with patch("handlers.use_case_handler.WebsocketHandler") as mock_socket_handler:
+            mock_socket_handler.return_value.post_token_to_connection.side_effect = lambda token: calls.append(token)
+            result = handler.handle_event(sqs_event, lambda_context)
+
+        assert result == {"batchItemFailures": []}
+        assert calls == ["drain", END_CONVERSATION_TOKEN]
+
+    @patch.dict(os.environ, {TRACE_ID_ENV_VAR: "test-trace-id", WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test"})
+    def test_history_compacted_after_end_token(self, sqs_event, lambda_context):
+        calls = []
+        llm_client_type = self._llm_client_type([])
+        llm_chat = llm_client_type.return_value.get_model.return_value
+
+        handler = UseCaseHandler(llm_client_type)
+        with patch("handlers.use_case_handler.WebsocketHandler") as mock_socket_handler:
+            mock_socket_handler.return_value.post_token_to_connection.side_effect = lambda token: calls.append(token)
+            llm_chat.compact_conversation_history.side_effect = lambda: calls.append("compact")
+            result = handler.handle_event(sqs_event, lambda_context)
+
+            assert result == {"batchItemFailures": []}
+            assert calls == [END_CONVERSATION_TOKEN, "compact"]
+
+            # a failed summary does not fail the record
+            llm_chat.compact_conversation_history.side_effect = Exception("summary failed")
+            assert handler.handle_event(sqs_event, lambda_context) == {"batchItemFailures": []}
+
+            # nor is it attempted without time to spare
+            llm_chat.compact_conversation_history.reset_mock()
+            lambda_context.get_remaining_time_in_millis.return_value = 10000
+            assert handler.handle_event(sqs_event, lambda_context) == {"batchItemFailures": []}
+            llm_chat.compact_conversation_history.assert_not_called()
+
+    @patch.dict(os.environ, {TRACE_ID_ENV_VAR: "test-trace-id", WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test"})
+    def test_history_compacted_once_every_record_is_answered(self, multi_record_event, lambda_context):
+        calls = []
+        llm_client_type = self._llm_client_type([])
+        llm_chat = llm_client_type.return_value.get_model.return_value
+        llm_chat.compact_conversation_history.side_effect = lambda: calls.append("compact")
+
+        handler = UseCaseHandler(llm_client_type)
+        with patch("handlers.use_case_handler.WebsocketHandler") as mock_socket_handler:
+            mock_socket_handler.return_value.post_token_to_connection.side_effect = lambda token: calls.append(token)
+            result = handler.handle_event(multi_record_event, lambda_context)
+
+        assert result == {"batchItemFailures": []}
+        # every record belongs to conv-1, which is compacted once after the last answer
+        assert calls == [END_CONVERSATION_TOKEN] * 3 + ["compact"]
+
+    @patch.dict(os.environ, {TRACE_ID_ENV_VAR: "test-trace-id", WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test"})
+    def test_gone_while_draining_returns_success(self, sqs_event, lambda_context):
+        streaming_callback = Mock(spec=WebsocketStreamingCallbackHandler)
+        streaming_callback.drain.side_effect = WebSocketGoneException("conn-123")
+
+        handler = UseCaseHandler(self._llm_client_type([streaming_callback]))
+        with patch("handlers.use_case_handler.WebsocketHandler") as mock_socket_handler:
+            result = handler.handle_event(sqs_event, lambda_context)
+
+        assert result == {"batchItemFailures": []}
+        mock_socket_handler.return_value.post_token_to_connection.assert_not_called()
+
+
+class TestUseCaseHandlerMetrics:
+
+    @patch.dict(os.environ, {TRACE_ID_ENV_VAR: "test-trace-id", WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test"})
+    def test_metrics_emitted_once_per_record(self, multi_record_event, lambda_context, capsys):
+        metrics = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
+        scopes = []
+
+        def generate(question):
+            scopes.append(get_request_metrics())
+            for _ in range(10):
+                metrics.add_metric(name="LangchainQueries", unit="Count", value=1)
+                metrics.flush_metrics()
+            return "Success response"
+
+        mock_llm_client_type = Mock()
+        mock_llm_client_instance = mock_llm_client_type.return_value
+        mock_llm_client_instance.get_event_conversation_id.return_value = "conv-1"
+        mock_llm_client_instance.check_event.return_value = {MESSAGE_KEY: {"question": "Hello"}}
+        mock_llm_client_instance.use_case_config = {"LlmParams": {"RAGEnabled": False}}
+        mock_llm_client_instance.builder.is_streaming = False
+        mock_llm_client_instance.builder.callbacks = []
+        mock_llm_client_instance.get_model.return_value.generate.side_effect = generate
+
+        handler = UseCaseHandler(mock_llm_client_type)
+        with patch("handlers.use_case_handler.WebsocketHandler"):
+            result = handler.handle_event(multi_record_event, lambda_context)
+
+        assert result == {"batchItemFailures": []}
+        assert len(scopes) == 3 and None not in scopes and len(set(map(id, scopes))) == 3
+        documents = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+        assert [document["LangchainQueries"] for document in documents] == [10, 10, 10]
+
+
+def make_record(message_id, connection_id, question):
+    return {
+        "messageId": message_id,
+        "body": json.dumps(
+            {
+                REQUEST_CONTEXT_KEY: {"connectionId": connection_id, "authorizer": {"UserId": "test-user"}},
+                MESSAGE_KEY: {"question": question},
+            }
+        ),
+        "messageAttributes": {"connectionId": {"stringValue": connection_id, "dataType": "String"}},
+    }
+
+
+class TestUseCaseHandlerConcurrentRecords:
+
+    @staticmethod
+    def _llm_client_type(generate):
+        def create_client(connection_id):
+            client = Mock()
+            client.connection_id = connection_id
+            client.get_event_conversation_id.return_value = "conv-1"
+            client.check_event.side_effect = lambda event_body, conversation_id: event_body
+            client.use_case_config = {"LlmParams": {"RAGEnabled": False}}
+            client.builder.is_streaming = False
+            client.builder.callbacks = []
+            client.get_model.return_value.generate.side_effect = lambda question: generate(connection_id, question)
+            return client
+
+        return Mock(side_effect=create_client)
+
+    def test_record_concurrency_from_env(self):
+        with patch.dict(os.environ, {RECORD_PROCESSING_CONCURRENCY_ENV_VAR: "4"}):
+            assert UseCaseHandler.get_record_concurrency() == 4
+        with patch.dict(os.environ, {RECORD_PROCESSING_CONCURRENCY_ENV_VAR: "many"}):
+            assert UseCaseHandler.get_record_concurrency() == 1
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(RECORD_PROCESSING_CONCURRENCY_ENV_VAR, None)
+            assert UseCaseHandler.get_record_concurrency() == 1
+
+    def test_group_records_by_connection(self):
+        records = [
+            make_record("msg-1", "conn-a", "a1"),
+            make_record("msg-2", "conn-b", "b1"),
+            make_record("msg-3", "conn-a", "a2"),
+        ]
+        groups = UseCaseHandler.group_records_by_connection(records)
+        assert [[record["messageId"] for record in group] for group in groups] == [["msg-1", "msg-3"], ["msg-2"]]
+
+    @patch.dict(
+        os.environ,
+        {
+            TRACE_ID_ENV_VAR: "test-trace-id",
+            WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test",
+            RECORD_PROCESSING_CONCURRENCY_ENV_VAR: "4",
+        },
+    )
+    def test_connections_processed_concurrently_in_order(self, lambda_context):
+        # both connections must be generating at the same time for the barrier to open
+        barrier = threading.Barrier(2, timeout=5)
+        answered = {}
+
+        def generate(connection_id, question):
+            if question.endswith("1"):
+                barrier.wait()
+            answered.setdefault(connection_id, []).append(question)
+            return "Success response"
+
+        event = {
+            "Records": [
+                make_record("msg-1", "conn-a", "a1"),
+                make_record("msg-2", "conn-a", "a2"),
+                make_record("msg-3", "conn-b", "b1"),
+                make_record("msg-4", "conn-a", "a3"),
+            ]
+        }
+        handler = UseCaseHandler(self._llm_client_type(generate))
+        with patch("handlers.use_case_handler.WebsocketHandler"):
+            result = handler.handle_event(event, lambda_context)
+
+        assert result == {"batchItemFailures": []}
+        assert answered == {"conn-a": ["a1", "a2", "a3"], "conn-b": ["b1"]}
+
+    @patch.dict(
+        os.environ,
+        {
+            TRACE_ID_ENV_VAR: "test-trace-id",
+            WEBSOCKET_CALLBACK_URL_ENV_VAR: "wss://test",
+            RECORD_PROCESSING_CONCURRENCY_ENV_VAR: "2",
+        },
+    )
+    def test_failures_and_timeout_per_connection(self, lambda_context):
+        answered = []
+
+        def generate(connection_id, question):
+            if question == "b1":
+                raise ValueError("generation failed")
+            answered.append(question)
+            return "Success response"
+
+        # the lambda is close to its timeout once conn-a has answered its first record
+        lambda_context.get_remaining_time_in_millis.side_effect = lambda: 10000 if answered else 30000
+        event = {
+            "Records": [
+                make_record("msg-1", "conn-a", "a1"),
+                make_record("msg-2", "conn-b", "b1"),
+                make_record("msg-3", "conn-a", "a2"),
+                make_record("msg-4", "conn-b", "b2"),
+                make_record("msg-5", "conn-a", "a3"),
+            ]
+        }
+        handler = UseCaseHandler(self._llm_client_type(generate))
+        with (
+            patch("handlers.use_case_handler.WebsocketHandler"),
+            patch("handlers.use_case_handler.WebsocketErrorHandler"),
+        ):
+            result = handler.handle_event(event, lambda_context)
+
+        # conn-b fails as a whole, conn-a returns the records left after its first one; failures are in batch order
+        assert answered == ["a1"]
+        assert result == {
+            "batchItemFailures": [
+                {"itemIdentifier": "msg-2"},
+                {"itemIdentifier": "msg-3"},
+                {"itemIdentifier": "msg-4"},
+                {"itemIdentifier": "msg-5"},
+            ]
+        }
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from llms.models.bedrock.caching_chat_model import CachingChatBedrockConverse
+
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+
+@pytest.fixture
+def caching_llm(setup_environment):
+    return CachingChatBedrockConverse(
+        model_id="anthropic.claude-3-5-haiku-20241022-v1:0", region_name="us-east-1", cache_history=False
+    )
+
+
+def test_cache_point_after_system_prompt(caching_llm):
+    messages = [SystemMessage(content="system prompt"), HumanMessage(content="question")]
+
+    cached_messages = caching_llm.add_cache_points(messages)
+
+    assert cached_messages[0].content == [{"type": "text", "text": "system prompt"}, CACHE_POINT]
+    assert cached_messages[1] is messages[1]
+    # the messages given are not modified
+    assert messages[0].content == "system prompt"
+
+
+def test_cache_point_after_history(caching_llm):
+    caching_llm.cache_history = True
+    messages = [
+        SystemMessage(content="system prompt"),
+        HumanMessage(content="first question"),
+        AIMessage(content="first answer"),
+        HumanMessage(content="second question"),
+    ]
+
+    cached_messages = caching_llm.add_cache_points(messages)
+
+    assert cached_messages[0].content[-1] == CACHE_POINT
+    assert cached_messages[1] is messages[1]
+    assert cached_messages[2].content == [{"type": "text", "text": "first answer"}, CACHE_POINT]
+    assert cached_messages[3] is messages[3]
+
+
+def test_no_history_cache_point_on_first_turn(caching_llm):
+    caching_llm.cache_history = True
+    messages = [SystemMessage(content="system prompt"), HumanMessage(content="question")]
+
+    cached_messages = caching_llm.add_cache_points(messages)
+
+    assert cached_messages[0].content[-1] == CACHE_POINT
+    assert cached_messages[1] is messages[1]
+
+
+def test_no_cache_point_without_system_prompt(caching_llm):
+    messages = [HumanMessage(content="question")]
+
+    assert caching_llm.add_cache_points(messages) == messages
+
+
+def test_cache_point_after_system_prompt_prefix(caching_llm):
+    caching_llm.cache_history = True
+    caching_llm.system_prompt_prefix = "system prompt\n\n"
+    messages = [
+        SystemMessage(content="system prompt\n\nretrieved context"),
+        HumanMessage(content="first question"),
+        AIMessage(content="first answer"),
+        HumanMessage(content="second question"),
+    ]
+
+    cached_messages = caching_llm.add_cache_points(messages)
+
+    assert cached_messages[0].content == [
+        {"type": "text", "text": "system prompt\n\n"},
+        CACHE_POINT,
+        {"type": "text", "text": "retrieved context"},
+    ]
+    # the history follows the context, which changes with every question
+    assert cached_messages[1:] == messages[1:]
+
+
+@pytest.mark.parametrize("system_prompt_prefix", ["", "another prompt"])
+def test_no_cache_point_without_system_prompt_prefix(caching_llm, system_prompt_prefix):
+    caching_llm.system_prompt_prefix = system_prompt_prefix
+    messages = [SystemMessage(content="system prompt\n\nretrieved context"), HumanMessage(content="question")]
+
+    assert caching_llm.add_cache_points(messages) == messages
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from copy import deepcopy
+
+import pytest
+
+from llms.models.sagemaker.content_handler import SageMakerContentHandler
+from llms.models.sagemaker.input_schema_renderer import InputSchemaRenderer, StaticNode
+from utils.helpers import count_keys, pop_null_values
+
+PLACEHOLDERS = {"prompt": "test-prompt", "temperature": 0.2, "top_p": 0, "stop": ["</s>"], "options": {"seed": None}}
+
+
+def render_with_replace_placeholders(input_schema, placeholders):
+    payload = deepcopy(input_schema)
+    SageMakerContentHandler(input_schema={}, output_path_expression="$.text").replace_placeholders(
+        payload, placeholders
+    )
+    original_keys_len = count_keys(payload)
+    payload = pop_null_values(payload)
+    return json.dumps(payload), original_keys_len > count_keys(payload)
+
+
+@pytest.mark.parametrize(
+    "input_schema",
+    [
+        {"inputs": "<<prompt>>", "parameters": {"temperature": "<<temperature>>", "max_new_tokens": 100}},
+        {"inputs": "<<prompt>>", "parameters": {"top_p": "<<top_p>>", "missing": "<<missing>>"}},
+        {"inputs": "<<prompt>>", "parameters": {"stop": "<<stop>>", "options": "<<options>>"}},
+        {"inputs": [[{"role": "system", "content": ""}, {"role": "user", "content": "<<prompt>>"}]], "stream": False},
+        {"inputs": ["<<prompt>>", {"text": "<<prompt>>"}], "parameters": {"unused": "<<missing>>"}},
+        [{"text": "<<missing>>"}, {"text": "<<prompt>>", "extra": {}}],
+        {"parameters": {"nested": {"value": "<<missing>>"}}},
+        {"inputs": "fixed prompt", "parameters": {"temperature": 0.5}},
+    ],
+)
+def test_render_matches_replace_placeholders(input_schema):
+    assert InputSchemaRenderer(input_schema).render(PLACEHOLDERS) == render_with_replace_placeholders(
+        input_schema, PLACEHOLDERS
+    )
+
+
+def test_static_parts_are_serialized_once():
+    renderer = InputSchemaRenderer(
+        {"inputs": "<<prompt>>", "parameters": {"max_new_tokens": 100, "details": {"best_of": 1}}}
+    )
+
+    static_nodes = [node for _, node in renderer.plan.items if isinstance(node, StaticNode)]
+    assert [node.fragment for node in static_nodes] == ['{"max_new_tokens": 100, "details": {"best_of": 1}}']
+
+
+def test_render_does_not_depend_on_schema_changes():
+    input_schema = {"inputs": "<<prompt>>", "parameters": {"max_new_tokens": 100}}
+    renderer = InputSchemaRenderer(input_schema)
+
+    input_schema["parameters"]["max_new_tokens"] = 5
+
+    assert renderer.render({"prompt": "hi"}) == ('{"inputs": "hi", "parameters": {"max_new_tokens": 100}}', False)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import jsonpath_ng as jp
+import pytest
+
+from llms.models.sagemaker.response_stream_parser import ResponseStreamParser
+
+
+@pytest.fixture
+def parser():
+    return ResponseStreamParser(jp.parse("$.token.text"))
+
+
+def test_feed_line_delimited_json(parser):
+    assert parser.feed(b'{"token": {"text": "Hello"}}\n{"token": {"text": " world"}}\n') == ["Hello", " world"]
+    assert parser.finish() == []
+
+
+def test_feed_server_sent_events(parser):
+    payload = (
+        b'event: token\ndata:{"token": {"text": "Hello"}}\n\ndata: {"token": {"text": " world"}}\n\ndata: [DONE]\n\n'
+    )
+
+    assert parser.feed(payload) == ["Hello", " world"]
+
+
+def test_feed_lines_split_across_payload_parts(parser):
+    line = '{"token": {"text": "café"}}\n'.encode("utf-8")
+
+    assert parser.feed(line[:5]) == []
+    # the payload part ends in the middle of the multi-byte character
+    assert parser.feed(line[5:-4]) == []
+    assert parser.feed(line[-4:]) == ["café"]
+
+
+def test_finish_parses_unterminated_last_line(parser):
+    assert parser.feed(b'{"token": {"text": "Hello"}}') == []
+    assert parser.finish() == ["Hello"]
+
+
+def test_lines_without_a_token_are_skipped(parser):
+    payload = b'{"token": {"text": ""}}\nnot json\n{"generated_text": "Hello world", "token": null}\n'
+
+    assert parser.feed(payload) == []
+
+
+def test_finish_warns_when_nothing_matches(parser):
+    parser.feed(b'{"outputs": ["Hello"]}\n')
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        warnings = []
+        monkeypatch.setattr(
+            "llms.models.sagemaker.response_stream_parser.logger.warning",
+            lambda message, **kwargs: warnings.append(message),
+        )
+        assert parser.finish() == []
+
+    assert len(warnings) == 1
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+
+from llms.models.sagemaker.content_handler import SageMakerContentHandler
+from llms.models.sagemaker.streaming_endpoint import SageMakerStreamingEndpoint
+
+INPUT_SCHEMA = {"inputs": "<<prompt>>", "parameters": {"temperature": "<<temperature>>"}, "stream": True}
+
+
+class TokenCollector(BaseCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+
+def event_stream(*payload_parts):
+    body = MagicMock()
+    body.__iter__.return_value = iter([{"PayloadPart": {"Bytes": part}} for part in payload_parts])
+    return body
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.invoke_endpoint_with_response_stream.return_value = {
+        "Body": event_stream(
+            b'data:{"token": {"text": "Lambda"}}\n\ndata:{"token": {"text": " runs"}}\n\n',
+            b'data:{"token": {"text": " for"}}\n\ndata:{"token": {"text": " 15 minutes"}',
+            b"}\n\n",
+        )
+    }
+    return client
+
+
+def get_endpoint(client, streaming=True):
+    return SageMakerStreamingEndpoint(
+        endpoint_name="fake-endpoint",
+        client=client,
+        model_kwargs={"temperature": 0.2},
+        content_handler=SageMakerContentHandler(input_schema=INPUT_SCHEMA, output_path_expression="$.token.text"),
+        streaming=streaming,
+        endpoint_kwargs={"CustomAttributes": "accept_eula=true"},
+    )
+
+
+def test_stream(client):
+    chunks = list(get_endpoint(client).stream("How long can Lambda run?"))
+
+    assert chunks == ["Lambda", " runs", " for", " 15 minutes"]
+    client.invoke_endpoint_with_response_stream.assert_called_once_with(
+        EndpointName="fake-endpoint",
+        Body=json.dumps(
+            {"inputs": "How long can Lambda run?", "parameters": {"temperature": 0.2}, "stream": True}
+        ).encode("utf-8"),
+        ContentType="application/json",
+        Accept="application/json",
+        CustomAttributes="accept_eula=true",
+    )
+    client.invoke_endpoint.assert_not_called()
+
+
+def test_invoke_streams_tokens_to_callbacks(client):
+    callback = TokenCollector()
+
+    response = get_endpoint(client).invoke("How long can Lambda run?", {"callbacks": [callback]})
+
+    assert response == "Lambda runs for 15 minutes"
+    assert callback.tokens == ["Lambda", " runs", " for", " 15 minutes"]
+
+
+def test_stream_stops_at_stop_sequence(client):
+    chunks = list(get_endpoint(client).stream("How long can Lambda run?", stop=[" 15"]))
+
+    assert "".join(chunks) == "Lambda runs for"
+    client.invoke_endpoint_with_response_stream.return_value["Body"].close.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "completion, token, stop, expected",
+    [
+        ("Hello", " world", ["Human:"], (" world", False)),
+        ("Hello", " wor\nHuman: hi", ["Human:"], (" wor\n", True)),
+        ("Hello Hu", "man: hi", ["Human:"], ("", True)),
+        ("", "AI: Hello", ["Human:", "AI:"], ("", True)),
+    ],
+)
+def test_truncate_at_stop(completion, token, stop, expected):
+    assert SageMakerStreamingEndpoint.truncate_at_stop(completion, token, stop) == expected
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+from dataclasses import replace
 from unittest import mock
 
 import pytest
@@ -10,6 +11,7 @@ from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
 
+from llms.models.bedrock.caching_chat_model import CachingChatBedrockConverse
 from llms.models.model_provider_inputs import BedrockInputs
 from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
 from shared.defaults.model_defaults import ModelDefaults
@@ -539,3 +541,189 @@ def test_successful_model_invocation_params(
             ]
         else:
             assert SOURCE_DOCUMENTS_OUTPUT_KEY not in response
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [
+        (RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, True, MODEL_ID, False, None, RESPONSE_IF_NO_DOCS_FOUND),
+        (
+            RAG_CHAT_IDENTIFIER,
+            BEDROCK_RAG_PROMPT,
+            False,
+            True,
+            MODEL_ID,
+            True,
+            DISAMBIGUATION_PROMPT,
+            RESPONSE_IF_NO_DOCS_FOUND,
+        ),
+    ],
+)
+def test_runnable_reused_with_request_retriever(
+    use_case,
+    prompt,
+    is_streaming,
+    return_source_docs,
+    model_id,
+    setup_environment,
+    bedrock_stubber,
+    bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    model_inputs,
+):
+    first_chat = BedrockRetrievalLLM(
+        model_inputs=model_inputs,
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+    second_chat = BedrockRetrievalLLM(
+        model_inputs=replace(
+            model_inputs, knowledge_base=KendraKnowledgeBase({"NumberOfDocs": 2, "UserContext": None})
+        ),
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+    assert second_chat.runnable_with_history is first_chat.runnable_with_history
+    assert second_chat.knowledge_base.retriever is not first_chat.knowledge_base.retriever
+
+    bedrock_stubber.add_response(
+        "converse",
+        service_response={
+            "output": {"message": {"content": [{"text": "Lambda is serverless."}], "role": "assistant"}},
+            "stopReason": "end_turn",
+            "usage": {"inputTokens": 25, "outputTokens": 4, "totalTokens": 29},
+            "metrics": {"latencyMs": 800},
+        },
+    )
+
+    # each request retrieves through its own knowledge base, even though the chain was built by the first one
+    with mock.patch.object(first_chat.knowledge_base.retriever, "_get_relevant_documents", return_value=[]):
+        with mock.patch.object(
+            second_chat.knowledge_base.retriever, "_get_relevant_documents", return_value=MOCKED_SOURCE_DOCS
+        ):
+            assert first_chat.generate("What is lambda?")["answer"] == RESPONSE_IF_NO_DOCS_FOUND
+
+            response = second_chat.generate("What is lambda?")
+            assert response["answer"] == "Lambda is serverless."
+            assert response[SOURCE_DOCUMENTS_OUTPUT_KEY] == MOCKED_SOURCE_DOCS_DICT
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, False, MODEL_ID, True, DISAMBIGUATION_PROMPT, None)],
+)
+@pytest.mark.parametrize(
+    "disambiguation_params, expected_model_id, expected_provider, expected_max_tokens, expected_temperature",
+    [
+        (None, MODEL_ID, "amazon", None, 0.25),
+        ({"ModelId": "amazon.nova-micro-v1:0"}, "amazon.nova-micro-v1:0", "amazon", None, 0.25),
+        (
+            {"InferenceProfileId": "us.anthropic.claude-3-haiku-20240307-v1:0", "MaxTokens": 128, "Temperature": 0},
+            "us.anthropic.claude-3-haiku-20240307-v1:0",
+            "anthropic",
+            128,
+            0.0,
+        ),
+    ],
+)
+def test_disambiguation_model(
+    use_case,
+    prompt,
+    is_streaming,
+    model_id,
+    setup_environment,
+    model_inputs,
+    return_source_docs,
+    temp_bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    disambiguation_params,
+    expected_model_id,
+    expected_provider,
+    expected_max_tokens,
+    expected_temperature,
+):
+    model_inputs.disambiguation_params = disambiguation_params
+    chat = BedrockRetrievalLLM(
+        model_inputs=model_inputs,
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+
+    assert chat.llm.model_id == MODEL_ID
+    assert chat.disambiguation_llm.model_id == expected_model_id
+    assert chat.disambiguation_llm.provider == expected_provider
+    assert chat.disambiguation_llm.max_tokens == expected_max_tokens
+    assert chat.disambiguation_llm.temperature == expected_temperature
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, False, MODEL_ID, True, DISAMBIGUATION_PROMPT, None)],
+)
+def test_disambiguation_model_unsupported_family(
+    use_case,
+    prompt,
+    is_streaming,
+    model_id,
+    setup_environment,
+    model_inputs,
+    return_source_docs,
+    temp_bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+):
+    model_inputs.disambiguation_params = {"ModelId": "unknown.fake-model"}
+    with pytest.raises(ValueError) as error:
+        BedrockRetrievalLLM(
+            model_inputs=model_inputs,
+            model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+        )
+
+    assert "unknown.fake-model" in str(error.value)
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, False, MODEL_ID, True, DISAMBIGUATION_PROMPT, None)],
+)
+@pytest.mark.parametrize(
+    "prompt_template, expected_system_prompt_prefix",
+    [
+        ("Answer from the documents.\n\n{context}", "Answer from the documents.\n\n"),
+        ("Answer from the {{documents}}: {context}", "Answer from the {documents}: "),
+        (BEDROCK_RAG_PROMPT, ""),
+        # the text before the context changes with the question as well
+        ("Answer {input} from {context}", ""),
+    ],
+)
+def test_prompt_caching(
+    use_case,
+    prompt,
+    is_streaming,
+    model_id,
+    setup_environment,
+    model_inputs,
+    return_source_docs,
+    temp_bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    prompt_template,
+    expected_system_prompt_prefix,
+):
+    chat = BedrockRetrievalLLM(
+        model_inputs=replace(
+            model_inputs,
+            prompt_template=prompt_template,
+            prompt_caching={"Enabled": True, "CacheHistory": True},
+        ),
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+
+    assert isinstance(chat.llm, CachingChatBedrockConverse)
+    assert chat.llm.system_prompt_prefix == expected_system_prompt_prefix
+    # the chat model disambiguates the question without the checkpoints it places for the chat prompt
+    assert chat.disambiguation_llm.model_id == MODEL_ID
+    assert not isinstance(chat.disambiguation_llm, CachingChatBedrockConverse)
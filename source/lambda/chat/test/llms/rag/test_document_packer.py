@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from llms.rag.document_packer import DocumentPacker, get_document_packing_similarity
+from utils.constants import DOCUMENT_PACKING_SIMILARITY_ENV_VAR, RANK_FUSION_SCORE_KEY
+
+PASSAGE = "Lambda functions can run for up to fifteen minutes before they time out"
+
+
+@pytest.mark.parametrize(
+    "env_value, expected_similarity", [(None, 0), ("0.8", 0.8), ("1", 1.0), ("-1", 0), ("invalid", 0)]
+)
+def test_get_document_packing_similarity(env_value, expected_similarity):
+    env = {} if env_value is None else {DOCUMENT_PACKING_SIMILARITY_ENV_VAR: env_value}
+    with patch.dict(os.environ, env):
+        assert get_document_packing_similarity() == expected_similarity
+
+
+@pytest.mark.parametrize(
+    "env_value, max_prompt_size, expected_max_tokens",
+    [(None, 2000, None), ("0.8", 2000, 500), ("0.8", None, None)],
+)
+def test_from_environment(env_value, max_prompt_size, expected_max_tokens):
+    env = {} if env_value is None else {DOCUMENT_PACKING_SIMILARITY_ENV_VAR: env_value}
+    with patch.dict(os.environ, env):
+        packer = DocumentPacker.from_environment(max_prompt_size)
+
+    if env_value is None:
+        assert packer is None
+    else:
+        assert packer.similarity_threshold == 0.8
+        assert packer.max_tokens == expected_max_tokens
+
+
+@pytest.mark.parametrize(
+    "score, expected_score", [(0.75, 0.75), ("VERY_HIGH", 4), ("medium", 2), ("NOT_AVAILABLE", 0), (None, 0)]
+)
+def test_get_score(score, expected_score):
+    assert DocumentPacker.get_score(Document(page_content=PASSAGE, metadata={"score": score})) == expected_score
+
+
+def test_get_score_prefers_rank_fusion_score():
+    document = Document(page_content=PASSAGE, metadata={"score": "VERY_HIGH", RANK_FUSION_SCORE_KEY: 0.03})
+    assert DocumentPacker.get_score(document) == 0.03
+
+
+def test_pack_orders_by_score():
+    low = Document(page_content="Amazon S3 stores objects in buckets", metadata={"score": 0.2})
+    high = Document(page_content=PASSAGE, metadata={"score": 0.9})
+    unscored = Document(page_content="DynamoDB is a key value database", metadata={})
+
+    documents, dropped_documents = DocumentPacker(similarity_threshold=0.8).pack([low, unscored, high])
+
+    assert documents == [high, low, unscored]
+    assert dropped_documents == []
+
+
+def test_pack_drops_near_duplicates():
+    original = Document(page_content=PASSAGE, metadata={"score": "HIGH"})
+    near_duplicate = Document(page_content=f"{PASSAGE}.", metadata={"score": "MEDIUM"})
+    other = Document(page_content="Amazon S3 stores objects in buckets", metadata={"score": "LOW"})
+
+    documents, dropped_documents = DocumentPacker(similarity_threshold=0.8).pack([near_duplicate, other, original])
+
+    assert documents == [original, other]
+    assert dropped_documents == [near_duplicate]
+
+
+def test_pack_truncates_to_token_budget():
+    first = Document(page_content="a" * 40, metadata={"score": 0.9})
+    second = Document(page_content="b" * 40, metadata={"score": 0.8})
+    third = Document(page_content="c" * 8, metadata={"score": 0.7})
+
+    documents, dropped_documents = DocumentPacker(similarity_threshold=1, max_tokens=12).pack([first, second, third])
+
+    # the second document does not fit after the first, but the shorter third one does
+    assert documents == [first, third]
+    assert dropped_documents == [second]
+
+
+def test_pack_keeps_highest_scored_document_over_budget():
+    document = Document(page_content=PASSAGE * 10, metadata={"score": 0.9})
+
+    assert DocumentPacker(similarity_threshold=1, max_tokens=1).pack([document]) == ([document], [])
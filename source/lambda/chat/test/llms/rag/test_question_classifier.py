@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from llms.rag.question_classifier import HeuristicQuestionClassifier, get_question_classifier
+from utils.constants import DISAMBIGUATION_CLASSIFIER_ENV_VAR
+
+HISTORY = [HumanMessage(content="What is AWS Lambda?"), AIMessage(content="A serverless compute service.")]
+
+
+@pytest.mark.parametrize(
+    "env_value, expected_classifier",
+    [(None, None), ("None", None), ("Heuristic", HeuristicQuestionClassifier), ("invalid", None)],
+)
+def test_get_question_classifier(env_value, expected_classifier):
+    env = {} if env_value is None else {DISAMBIGUATION_CLASSIFIER_ENV_VAR: env_value}
+    with patch.dict(os.environ, env):
+        classifier = get_question_classifier()
+    if expected_classifier is None:
+        assert classifier is None
+    else:
+        assert isinstance(classifier, expected_classifier)
+
+
+@pytest.mark.parametrize(
+    "question, expected_self_contained",
+    [
+        ("How do I configure a VPC for an Amazon RDS database?", True),
+        ("What are the pricing tiers of Amazon S3 storage classes?", True),
+        ("How much does it cost?", False),
+        ("Can those be encrypted at rest?", False),
+        ("What did you say about pricing earlier?", False),
+        ("And for DynamoDB tables in another region?", False),
+        ("What about cold starts?", False),
+        ("Why?", False),
+        ("Explain more", False),
+    ],
+)
+def test_heuristic_question_classifier(question, expected_self_contained):
+    assert HeuristicQuestionClassifier().is_self_contained(question, HISTORY) == expected_self_contained
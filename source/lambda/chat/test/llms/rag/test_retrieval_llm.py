@@ -2,29 +2,44 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import os
 from unittest import mock
 
 import pytest
+from aws_lambda_powertools.metrics import MetricUnit
+from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.runnables.utils import AddableDict
 
 from llms.models.model_provider_inputs import BedrockInputs
 from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
+from llms.rag.retrieval_llm import get_speculative_retrieval_similarity
+from shared.callbacks.websocket_streaming_handler import WebsocketStreamingCallbackHandler
 from shared.defaults.model_defaults import ModelDefaults
 from shared.knowledge.kendra_knowledge_base import KendraKnowledgeBase
 from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
 from utils.constants import (
+    ANSWER_CACHE_SIMILARITY_ENV_VAR,
+    ANSWER_CACHE_TTL_ENV_VAR,
     CONTEXT_KEY,
     DEFAULT_REPHRASE_RAG_QUESTION,
     DISAMBIGUATION_PROMPT_PLACEHOLDERS,
+    HISTORY_KEY,
+    INPUT_KEY,
     OUTPUT_KEY,
     RAG_CHAT_IDENTIFIER,
     REPHRASED_QUERY_KEY,
+    DISAMBIGUATION_CLASSIFIER_ENV_VAR,
+    DOCUMENT_PACKING_SIMILARITY_ENV_VAR,
+    DROPPED_SOURCE_DOCUMENTS_OUTPUT_KEY,
     SOURCE_DOCUMENTS_OUTPUT_KEY,
+    SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR,
 )
-from utils.enum_types import BedrockModelProviders, LLMProviderTypes
+from utils.enum_types import BedrockModelProviders, CloudWatchMetrics, LLMProviderTypes, RetrievalPaths
 
 RAG_ENABLED = True
 model_id = "amazon.fake-model"
@@ -58,6 +73,30 @@ MOCKED_SOURCE_DOCS_DICT = [
 ]
 
 
+def session_history_stub(chat_history):
+    """
+    Returns a stand-in for get_session_history. RunnableWithMessageHistory matches its parameter names against the
+    history factory config, so a Mock cannot be used in its place.
+    """
+
+    def get_session_history(user_id, conversation_id, message_id):
+        return chat_history
+
+    return get_session_history
+
+
+def llm_call_spy():
+    """
+    Spies on the calls of every FakeListChatModel. Its response index cannot count calls, as it goes back to 0 once
+    all the responses were used.
+    """
+    return mock.patch.object(FakeListChatModel, "_call", autospec=True, side_effect=FakeListChatModel._call)
+
+
+def calls_of(spy, llm):
+    return sum(1 for call in spy.call_args_list if call.args[0] is llm)
+
+
 @pytest.fixture
 def model_inputs(disambiguation_enabled, disambiguation_prompt, return_source_docs, response_if_no_docs_found):
     return BedrockInputs(
@@ -788,3 +827,323 @@ def test_format_source_document_empty_content(
 
     expected_format = "Document Content: "
     assert formatted_doc == expected_format
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found, is_streaming",
+    [
+        (RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, True, model_id, True, DISAMBIGUATION_PROMPT_TEMPLATE, None, False),
+        (RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, True, model_id, True, DISAMBIGUATION_PROMPT_TEMPLATE, None, True),
+    ],
+)
+def test_generate_with_answer_cache(
+    use_case,
+    prompt,
+    return_source_docs,
+    model_id,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    is_streaming,
+    model_inputs,
+):
+    model_inputs.streaming = is_streaming
+    chat = BedrockRetrievalLLM(
+        model_inputs=model_inputs,
+        model_defaults=ModelDefaults(model_provider, model_id, RAG_ENABLED),
+    )
+    streaming_callback = mock.Mock(spec=WebsocketStreamingCallbackHandler)
+    chat.callbacks = [streaming_callback]
+    history = mock.Mock(messages=[])
+    chain_output = AddableDict(
+        {
+            INPUT_KEY: "What is lambda?",
+            HISTORY_KEY: [],
+            CONTEXT_KEY: MOCKED_SOURCE_DOCS,
+            OUTPUT_KEY: "Lambda is a serverless compute service. ",
+            REPHRASED_QUERY_KEY: "What is lambda?",
+        }
+    )
+    method_name = "stream" if is_streaming else "invoke"
+
+    with (
+        mock.patch.dict(os.environ, {ANSWER_CACHE_TTL_ENV_VAR: "60", ANSWER_CACHE_SIMILARITY_ENV_VAR: "0.8"}),
+        mock.patch(
+            f"langchain_core.runnables.RunnableWithMessageHistory.{method_name}",
+            return_value=[chain_output] if is_streaming else chain_output,
+        ) as mocked_chain,
+        mock.patch.object(chat, "get_session_history", return_value=history),
+    ):
+        generated_response = chat.generate("What is lambda?")
+        cached_response = chat.generate("what is Lambda")
+        near_duplicate_response = chat.generate("What is lambdas?")
+
+        assert mocked_chain.call_count == 1
+        assert cached_response == {**generated_response, REPHRASED_QUERY_KEY: "what is Lambda"}
+        assert near_duplicate_response == {**generated_response, REPHRASED_QUERY_KEY: "What is lambdas?"}
+        assert cached_response == {
+            OUTPUT_KEY: "Lambda is a serverless compute service.",
+            SOURCE_DOCUMENTS_OUTPUT_KEY: MOCKED_SOURCE_DOCS_DICT,
+            REPHRASED_QUERY_KEY: "what is Lambda",
+        }
+        assert history.add_messages.call_count == 2
+        assert history.add_messages.call_args.args[0][0].content == "What is lambdas?"
+        assert history.add_messages.call_args.args[0][1].content == "Lambda is a serverless compute service."
+        if is_streaming:
+            streaming_callback.replay_response.assert_called_with(
+                "Lambda is a serverless compute service.", MOCKED_SOURCE_DOCS, "What is lambdas?"
+            )
+        else:
+            streaming_callback.replay_response.assert_not_called()
+
+        # answers are not reused once the conversation has history
+        history.messages = [HumanMessage(content="What is lambda?")]
+        chat.generate("What is lambda?")
+        assert mocked_chain.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, True, model_id, True, DISAMBIGUATION_PROMPT_TEMPLATE, None)],
+)
+def test_answer_cache_skipped(
+    use_case,
+    is_streaming,
+    prompt,
+    return_source_docs,
+    model_id,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    model_inputs,
+):
+    chat = BedrockRetrievalLLM(
+        model_inputs=model_inputs,
+        model_defaults=ModelDefaults(model_provider, model_id, RAG_ENABLED),
+    )
+    assert chat.get_answer_cache() is None
+
+    with mock.patch.dict(os.environ, {ANSWER_CACHE_TTL_ENV_VAR: "60"}):
+        assert chat.get_answer_cache() is not None
+
+        # answers generated with conversation history are not cached
+        chain_output = AddableDict(
+            {
+                HISTORY_KEY: [HumanMessage(content="What is lambda?")],
+                CONTEXT_KEY: MOCKED_SOURCE_DOCS,
+                OUTPUT_KEY: "It is a serverless compute service.",
+            }
+        )
+        with mock.patch("langchain_core.runnables.RunnableWithMessageHistory.invoke", return_value=chain_output):
+            chat.generate("Which service is it?")
+        assert chat.get_answer_cache().get("Which service is it?") is None
+
+        chat.knowledge_base.rag_rbac_enabled = True
+        assert chat.get_answer_cache() is None
+
+
+@pytest.mark.parametrize(
+    "env_value, expected_similarity", [(None, 0), ("0.5", 0.5), ("1", 1.0), ("1.5", 0), ("invalid", 0)]
+)
+def test_get_speculative_retrieval_similarity(env_value, expected_similarity):
+    env = {} if env_value is None else {SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR: env_value}
+    with mock.patch.dict(os.environ, env):
+        assert get_speculative_retrieval_similarity() == expected_similarity
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, True, model_id, True, DISAMBIGUATION_PROMPT_TEMPLATE, None)],
+)
+@pytest.mark.parametrize(
+    "speculative_similarity, history, expected_queries, expected_path",
+    [
+        ("0", [], ["What is it?"], RetrievalPaths.DIRECT),
+        (
+            "0",
+            [HumanMessage(content="Tell me about lambda"), AIMessage(content="Sure")],
+            ["What is lambda?"],
+            RetrievalPaths.SEQUENTIAL,
+        ),
+        (
+            "0.5",
+            [HumanMessage(content="Tell me about lambda"), AIMessage(content="Sure")],
+            ["What is it?"],
+            RetrievalPaths.SPECULATIVE_KEPT,
+        ),
+        (
+            "0.9",
+            [HumanMessage(content="Tell me about lambda"), AIMessage(content="Sure")],
+            ["What is it?", "What is lambda?"],
+            RetrievalPaths.SPECULATIVE_RETRIED,
+        ),
+    ],
+)
+def test_speculative_retrieval(
+    use_case,
+    prompt,
+    is_streaming,
+    return_source_docs,
+    model_id,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    model_inputs,
+    speculative_similarity,
+    history,
+    expected_queries,
+    expected_path,
+):
+    model_inputs.rephrase_question = True
+    with mock.patch.dict(os.environ, {SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR: speculative_similarity}):
+        chat = BedrockRetrievalLLM(
+            model_inputs=model_inputs,
+            model_defaults=ModelDefaults(model_provider, model_id, RAG_ENABLED),
+        )
+        chat.llm = FakeListChatModel(responses=["Lambda is a serverless compute service."])
+        chat.disambiguation_llm = FakeListChatModel(responses=["What is lambda?"])
+        chat.get_session_history = session_history_stub(InMemoryChatMessageHistory(messages=history))
+        chat.chain = chat.get_chain()
+        chat.runnable_with_history = chat.get_runnable()
+
+    with (
+        mock.patch.object(
+            chat.knowledge_base.retriever, "_get_relevant_documents", return_value=MOCKED_SOURCE_DOCS
+        ) as mocked_retrieval,
+        mock.patch("llms.rag.retrieval_llm.metrics") as mocked_metrics,
+        llm_call_spy() as spy,
+    ):
+        response = chat.generate("What is it?")
+
+    assert [call.args[0] for call in mocked_retrieval.call_args_list] == expected_queries
+    # the question is rephrased once per turn, and only when there is history to rephrase it with
+    assert calls_of(spy, chat.disambiguation_llm) == (1 if history else 0)
+    assert response == {
+        OUTPUT_KEY: "Lambda is a serverless compute service.",
+        SOURCE_DOCUMENTS_OUTPUT_KEY: MOCKED_SOURCE_DOCS_DICT,
+        REPHRASED_QUERY_KEY: "What is lambda?" if history else "What is it?",
+    }
+    mocked_metrics.add_dimension.assert_called_once_with(name="RetrievalPath", value=expected_path.value)
+    recorded_metrics = [call.kwargs["name"] for call in mocked_metrics.add_metric.call_args_list]
+    assert CloudWatchMetrics.RETRIEVAL_PIPELINE_TIME.value in recorded_metrics
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, True, model_id, True, DISAMBIGUATION_PROMPT_TEMPLATE, None)],
+)
+@pytest.mark.parametrize(
+    "question, expected_query, expected_metric, expected_path",
+    [
+        (
+            "What is the maximum timeout of a Lambda function?",
+            "What is the maximum timeout of a Lambda function?",
+            CloudWatchMetrics.DISAMBIGUATION_SKIPPED,
+            RetrievalPaths.SELF_CONTAINED,
+        ),
+        (
+            "How much does it cost?",
+            "What is lambda?",
+            CloudWatchMetrics.DISAMBIGUATION_INVOKED,
+            RetrievalPaths.SEQUENTIAL,
+        ),
+    ],
+)
+def test_disambiguation_skipped_for_self_contained_question(
+    use_case,
+    prompt,
+    is_streaming,
+    return_source_docs,
+    model_id,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    model_inputs,
+    question,
+    expected_query,
+    expected_metric,
+    expected_path,
+):
+    model_inputs.rephrase_question = True
+    with mock.patch.dict(os.environ, {DISAMBIGUATION_CLASSIFIER_ENV_VAR: "Heuristic"}):
+        chat = BedrockRetrievalLLM(
+            model_inputs=model_inputs,
+            model_defaults=ModelDefaults(model_provider, model_id, RAG_ENABLED),
+        )
+        chat.llm = FakeListChatModel(responses=["Lambda is a serverless compute service."])
+        chat.disambiguation_llm = FakeListChatModel(responses=["What is lambda?"])
+        chat.get_session_history = session_history_stub(
+            InMemoryChatMessageHistory(
+                messages=[HumanMessage(content="Tell me about lambda"), AIMessage(content="Sure")]
+            )
+        )
+        chat.chain = chat.get_chain()
+        chat.runnable_with_history = chat.get_runnable()
+
+    with (
+        mock.patch.object(
+            chat.knowledge_base.retriever, "_get_relevant_documents", return_value=MOCKED_SOURCE_DOCS
+        ) as mocked_retrieval,
+        mock.patch("llms.rag.retrieval_llm.metrics") as mocked_metrics,
+        llm_call_spy() as spy,
+    ):
+        response = chat.generate(question)
+
+    assert [call.args[0] for call in mocked_retrieval.call_args_list] == [expected_query]
+    assert calls_of(spy, chat.disambiguation_llm) == (0 if expected_path == RetrievalPaths.SELF_CONTAINED else 1)
+    assert response[REPHRASED_QUERY_KEY] == expected_query
+    recorded_metrics = [call.kwargs["name"] for call in mocked_metrics.add_metric.call_args_list]
+    assert expected_metric.value in recorded_metrics
+    assert CloudWatchMetrics.RETRIEVAL_PIPELINE_TIME.value in recorded_metrics
+    mocked_metrics.add_dimension.assert_called_once_with(name="RetrievalPath", value=expected_path.value)
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, return_source_docs, model_id, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(RAG_CHAT_IDENTIFIER, BEDROCK_RAG_PROMPT, False, True, model_id, False, None, None)],
+)
+def test_document_packing(
+    use_case,
+    prompt,
+    is_streaming,
+    return_source_docs,
+    model_id,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    model_inputs,
+):
+    duplicate_docs = MOCKED_SOURCE_DOCS + [
+        Document(**{"page_content": "some-content-1", "metadata": {"source": "https://fake-url-3.com"}})
+    ]
+    with mock.patch.dict(os.environ, {DOCUMENT_PACKING_SIMILARITY_ENV_VAR: "0.8"}):
+        chat = BedrockRetrievalLLM(
+            model_inputs=model_inputs,
+            model_defaults=ModelDefaults(model_provider, model_id, RAG_ENABLED),
+        )
+        chat.llm = FakeListChatModel(responses=["Lambda is a serverless compute service."])
+        chat.get_session_history = session_history_stub(InMemoryChatMessageHistory())
+        chat.chain = chat.get_chain()
+        chat.runnable_with_history = chat.get_runnable()
+
+    with (
+        mock.patch.object(chat.knowledge_base.retriever, "_get_relevant_documents", return_value=duplicate_docs),
+        mock.patch("llms.rag.retrieval_llm.metrics") as mocked_metrics,
+    ):
+        response = chat.generate("What is lambda?")
+
+    assert response[SOURCE_DOCUMENTS_OUTPUT_KEY] == MOCKED_SOURCE_DOCS_DICT
+    assert [doc["location"] for doc in response[DROPPED_SOURCE_DOCUMENTS_OUTPUT_KEY]] == ["https://fake-url-3.com"]
+    mocked_metrics.add_metric.assert_any_call(
+        name=CloudWatchMetrics.PACKING_DROPPED_DOCUMENTS.value, unit=MetricUnit.Count, value=1
+    )
@@ -2,6 +2,8 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+from unittest.mock import MagicMock, patch
+
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -12,6 +14,7 @@ from llms.rag.bedrock_retrieval import BedrockRetrievalLLM
 from shared.defaults.model_defaults import ModelDefaults
 from shared.knowledge.kendra_knowledge_base import KendraKnowledgeBase
 from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
+from shared.memory.ddb_summarizing_message_history import SummarizingChatMessageHistory
 from utils.constants import CHAT_IDENTIFIER, DEFAULT_REPHRASE_RAG_QUESTION, HISTORY_KEY, INPUT_KEY, RAG_CHAT_IDENTIFIER
 from utils.enum_types import BedrockModelProviders, LLMProviderTypes
 
@@ -544,3 +547,54 @@ def test_format_chat_history(
         model_defaults=ModelDefaults(LLMProviderTypes.BEDROCK.value, model_id, False),
     )
     assert chat.format_chat_history(expected_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "use_case, model_id, prompt, is_streaming, return_source_docs, disambiguation_enabled, disambiguation_prompt, response_if_no_docs_found",
+    [(CHAT_IDENTIFIER, MODEL_ID, PROMPT, False, False, False, None, None)],
+)
+def test_compact_conversation_history(
+    use_case,
+    model_id,
+    prompt,
+    is_streaming,
+    return_source_docs,
+    disambiguation_enabled,
+    disambiguation_prompt,
+    response_if_no_docs_found,
+    setup_environment,
+    bedrock_dynamodb_defaults_table,
+    model_inputs,
+):
+    chat = BedrockLLM(
+        model_inputs=model_inputs,
+        model_defaults=ModelDefaults(LLMProviderTypes.BEDROCK.value, model_id, False),
+    )
+    with patch.object(chat, "get_session_history") as mock_get_session_history:
+        chat.compact_conversation_history()
+        # conversations without a summary are left alone
+        mock_get_session_history.assert_not_called()
+
+        chat.conversation_history_cls = SummarizingChatMessageHistory
+        chat.compact_conversation_history()
+    mock_get_session_history.assert_called_once_with("fake-user-id", "fake-conversation-id", "fake-message-id")
+    compact = mock_get_session_history.return_value.compact
+    compact.assert_called_once_with(chat.summarize)
+
+    # the history read while answering is compacted without being read again
+    chat.conversation_history_params = {**chat.conversation_history_params, "summary_threshold": 4}
+    history = chat.get_session_history("fake-user-id", "fake-conversation-id", "fake-message-id")
+    with (
+        patch.object(chat, "get_session_history") as mock_get_session_history,
+        patch.object(history, "compact") as mock_compact,
+        patch.object(history, "load_history") as mock_load_history,
+    ):
+        chat.compact_conversation_history()
+    mock_get_session_history.assert_not_called()
+    mock_compact.assert_called_once_with(chat.summarize)
+    mock_load_history.assert_not_called()
+
+    chat.llm = MagicMock()
+    chat.llm.invoke.return_value = AIMessage(content="a summary")
+    assert chat.summarize("summarize this") == "a summary"
+    chat.llm.invoke.assert_called_once_with("summarize this")
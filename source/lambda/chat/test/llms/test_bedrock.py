@@ -3,12 +3,15 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+from dataclasses import replace
 from unittest import mock
 
 import pytest
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 from llms.bedrock import BedrockLLM
+from llms.models.bedrock.caching_chat_model import CachingChatBedrockConverse
 from llms.models.model_provider_inputs import BedrockInputs
 from shared.defaults.model_defaults import ModelDefaults
 from shared.memory.ddb_enhanced_message_history import DynamoDBChatMessageHistory
@@ -323,3 +326,94 @@ def test_bedrock_provisioned_model(
     assert chat.model == model_id
     assert chat.model_arn == test_provisioned_arn
     assert chat.model_family == BedrockModelProviders.AMAZON.value
+
+
+class RecordingCallbackHandler(BaseCallbackHandler):
+    def __init__(self):
+        self.responses = []
+
+    def on_llm_end(self, response, **kwargs):
+        self.responses.append(response.generations[0][0].text)
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, model_id",
+    [(CHAT_IDENTIFIER, BEDROCK_PROMPT, False, MODEL_ID)],
+)
+def test_runnable_reused_across_requests(
+    use_case,
+    prompt,
+    is_streaming,
+    model_id,
+    setup_environment,
+    bedrock_stubber,
+    bedrock_dynamodb_defaults_table,
+):
+    for answer in ["first answer", "second answer"]:
+        bedrock_stubber.add_response(
+            "converse",
+            service_response={
+                "output": {"message": {"content": [{"text": answer}], "role": "assistant"}},
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": 10, "outputTokens": 2, "totalTokens": 12},
+                "metrics": {"latencyMs": 100},
+            },
+        )
+
+    chats = []
+    for request_id in ["1", "2"]:
+        request_inputs = replace(
+            model_inputs,
+            streaming=False,
+            callbacks=[RecordingCallbackHandler()],
+            conversation_history_params={
+                **model_inputs.conversation_history_params,
+                "conversation_id": f"fake-conversation-id-{request_id}",
+                "message_id": f"fake-message-id-{request_id}",
+            },
+        )
+        chats.append(
+            BedrockLLM(model_inputs=request_inputs, model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED))
+        )
+
+    first_chat, second_chat = chats
+    assert second_chat.runnable_with_history is first_chat.runnable_with_history
+    assert second_chat.llm is first_chat.llm
+
+    assert first_chat.generate("What is the weather in Seattle?") == {"answer": "first answer"}
+    assert second_chat.generate("What is the weather in Seattle?") == {"answer": "second answer"}
+
+    # callbacks and IDs are bound per request even though the graph is shared
+    assert first_chat.callbacks[0].responses == ["first answer"]
+    assert second_chat.callbacks[0].responses == ["second answer"]
+    assert first_chat.conversation_history_params["conversation_id"] == "fake-conversation-id-1"
+
+    changed_params_chat = BedrockLLM(
+        model_inputs=replace(model_inputs, streaming=False, temperature=0.7),
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+    assert changed_params_chat.runnable_with_history is not first_chat.runnable_with_history
+
+
+@pytest.mark.parametrize(
+    "use_case, prompt, is_streaming, model_id",
+    [(CHAT_IDENTIFIER, BEDROCK_PROMPT, False, MODEL_ID)],
+)
+def test_get_llm_with_prompt_caching(
+    use_case, prompt, is_streaming, model_id, setup_environment, bedrock_dynamodb_defaults_table
+):
+    chat = BedrockLLM(
+        model_inputs=replace(
+            model_inputs, model_arn=None, streaming=False, prompt_caching={"Enabled": True, "CacheHistory": True}
+        ),
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+
+    assert isinstance(chat.llm, CachingChatBedrockConverse)
+    assert chat.llm.cache_history is True
+
+    uncached_chat = BedrockLLM(
+        model_inputs=replace(model_inputs, model_arn=None, streaming=False, prompt_caching={"Enabled": False}),
+        model_defaults=ModelDefaults(MODEL_PROVIDER, model_id, RAG_ENABLED),
+    )
+    assert not isinstance(uncached_chat.llm, CachingChatBedrockConverse)
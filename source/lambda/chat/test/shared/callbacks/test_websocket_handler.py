@@ -204,6 +204,28 @@ def test_update_cw_dashboard(
             mock_metrics.add_dimension.assert_not_called()
 
 
+def test_update_cw_dashboard_with_prompt_cache_tokens(websocket_handler):
+    with patch("shared.callbacks.websocket_handler.metrics") as mock_metrics:
+        message = Mock()
+        message.response_metadata = {}
+        message.usage_metadata = {
+            "input_tokens": 1200,
+            "output_tokens": 50,
+            "total_tokens": 1250,
+            "input_token_details": {"cache_read": 1024, "cache_creation": 0},
+        }
+        generation = AIMessageChunk(content="test content")
+        generation.message = message
+
+        websocket_handler._update_cw_dashboard(generation)
+
+        mock_metrics.add_metric.assert_any_call(
+            name=CloudWatchMetrics.LLM_CACHE_READ_INPUT_TOKEN_COUNT.value, unit=MetricUnit.Count, value=1024
+        )
+        assert CloudWatchMetrics.LLM_CACHE_WRITE_INPUT_TOKEN_COUNT.value not in [
+            metric_call.kwargs["name"] for metric_call in mock_metrics.add_metric.call_args_list
+        ]
+
 def test_update_cw_dashboard_without_metadata(websocket_handler):
     with patch("shared.callbacks.websocket_handler.metrics") as mock_metrics:
         message = Mock()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+from unittest.mock import Mock, call, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from shared.callbacks.websocket_gone_exception import WebSocketGoneException
+from shared.callbacks.websocket_sender import WebsocketSender
+
+MOCK_CONNECTION_ID = "fake-connection-id"
+
+
+def gone_error():
+    return ClientError({"Error": {"Code": "GoneException", "Message": "Gone"}}, "PostToConnection")
+
+
+@pytest.fixture
+def sender():
+    yield WebsocketSender(Mock(), MOCK_CONNECTION_ID, max_queue_size=4)
+
+
+def test_send_posts_in_order(sender):
+    for i in range(10):
+        sender.send(f"payload-{i}")
+    sender.drain()
+
+    assert sender.client.post_to_connection.call_args_list == [
+        call(ConnectionId=MOCK_CONNECTION_ID, Data=f"payload-{i}") for i in range(10)
+    ]
+
+
+def test_send_does_not_block_on_post(sender):
+    release = threading.Event()
+    sender.client.post_to_connection.side_effect = lambda **kwargs: release.wait(5)
+
+    # the first payload is being posted while the rest wait in the queue
+    for i in range(4):
+        sender.send(f"payload-{i}")
+    assert sender.client.post_to_connection.call_count <= 1
+
+    release.set()
+    sender.drain()
+    assert sender.client.post_to_connection.call_count == 4
+
+
+def test_gone_connection_is_sticky(sender):
+    sender.client.post_to_connection.side_effect = gone_error()
+    sender.send("first")
+
+    with pytest.raises(WebSocketGoneException):
+        sender.drain()
+    with pytest.raises(WebSocketGoneException):
+        sender.send("second")
+    with pytest.raises(WebSocketGoneException):
+        sender.drain()
+    sender.client.post_to_connection.assert_called_once()
+
+
+def test_payloads_queued_after_gone_are_discarded(sender):
+    posted = threading.Event()
+    release = threading.Event()
+
+    def post(**kwargs):
+        posted.set()
+        release.wait(5)
+        raise gone_error()
+
+    sender.client.post_to_connection.side_effect = post
+    sender.send("first")
+    posted.wait(5)
+    sender.send("second")
+    release.set()
+
+    with pytest.raises(WebSocketGoneException):
+        sender.drain()
+    sender.client.post_to_connection.assert_called_once()
+
+
+def test_other_errors_are_raised_once(sender):
+    error = ClientError({"Error": {"Code": "InternalServerError", "Message": "Error"}}, "PostToConnection")
+    sender.client.post_to_connection.side_effect = [error, None]
+    sender.send("first")
+
+    with pytest.raises(ClientError):
+        sender.drain()
+
+    sender.send("second")
+    sender.drain()
+    assert sender.client.post_to_connection.call_count == 2
+
+
+def test_idle_worker_exits_and_restarts(sender):
+    with patch("shared.callbacks.websocket_sender.DEFAULT_WEBSOCKET_SENDER_IDLE_TIMEOUT", 0.01):
+        sender.send("first")
+        sender.drain()
+        worker = sender._worker
+        if worker is not None:
+            worker.join(5)
+        assert sender._worker is None
+
+        sender.send("second")
+        sender.drain()
+
+    assert sender.client.post_to_connection.call_count == 2
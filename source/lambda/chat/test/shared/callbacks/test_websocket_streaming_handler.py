@@ -15,12 +15,16 @@ from shared.callbacks.websocket_streaming_handler import WebsocketStreamingCallb
 from utils.constants import (
     CONTEXT_KEY,
     CONVERSATION_ID_EVENT_KEY,
+    DEFAULT_STREAMING_COALESCE_MAX_BYTES,
     MESSAGE_ID_EVENT_KEY,
     OUTPUT_KEY,
     PAYLOAD_DATA_KEY,
     PAYLOAD_SOURCE_DOCUMENT_KEY,
     REPHRASED_QUERY_KEY,
     SOURCE_DOCUMENTS_RECEIVED_KEY,
+    STREAMING_COALESCE_MAX_BYTES_ENV_VAR,
+    STREAMING_COALESCE_WINDOW_MS_ENV_VAR,
+    STREAMING_SEND_QUEUE_SIZE_ENV_VAR,
     TRACE_ID_ENV_VAR,
     WEBSOCKET_CALLBACK_URL_ENV_VAR,
 )
@@ -101,6 +105,22 @@ def test_on_llm_new_token(websocket_handler):
     assert websocket_handler.has_streamed == True
 
 
+def test_on_llm_new_token_text_completion(websocket_handler):
+    websocket_handler.on_llm_new_token("test message")
+
+    websocket_handler.client.post_to_connection.assert_called_once_with(
+        ConnectionId=MOCK_CONNECTION_ID,
+        Data=json.dumps(
+            {
+                PAYLOAD_DATA_KEY: "test message",
+                CONVERSATION_ID_EVENT_KEY: MOCK_CONVERSATION_ID,
+                MESSAGE_ID_EVENT_KEY: MOCK_MESSAGE_ID,
+            }
+        ),
+    )
+    assert websocket_handler.has_streamed == True
+
+
 def test_on_llm_new_token_non_text(websocket_handler):
     test_token = [{"type": "other", "data": "test"}]
 
@@ -164,6 +184,32 @@ def test_on_chain_end_with_docs(websocket_handler):
         assert websocket_handler.has_streamed_references == True
 
 
+def test_replay_response(websocket_handler):
+    with patch.object(websocket_handler, "post_token_to_connection") as mocked_post:
+        websocket_handler.replay_response("cached answer", [{"content": "doc1"}], "cached question")
+
+        mocked_post.assert_has_calls(
+            [
+                call("cached answer"),
+                call({"content": "doc1"}, PAYLOAD_SOURCE_DOCUMENT_KEY),
+                call("cached question", REPHRASED_QUERY_KEY),
+            ],
+            any_order=False,
+        )
+        assert websocket_handler.has_streamed
+        assert websocket_handler.has_streamed_references
+        assert websocket_handler.streamed_rephrase_query
+
+
+def test_replay_response_without_references(websocket_handler):
+    websocket_handler.return_source_docs = False
+
+    with patch.object(websocket_handler, "post_token_to_connection") as mocked_post:
+        websocket_handler.replay_response("cached answer", [{"content": "doc1"}])
+
+        mocked_post.assert_called_once_with("cached answer")
+
+
 @pytest.mark.parametrize(
     "stop_reason,input_tokens,output_tokens,total_tokens,expected_stop_reason_type",
     [
@@ -225,8 +271,31 @@ def test_update_cw_dashboard(
             ]
             assert not calls  # Ensure stop reason metric was not added
 
-        assert mock_metrics.flush_metrics.call_count == 2
+        # metrics are only flushed to separate the stop reason dimension, never per token
+        assert mock_metrics.flush_metrics.call_count == (2 if expected_stop_reason_type else 0)
+
 
+def test_update_cw_dashboard_with_prompt_cache_tokens(websocket_handler):
+    with patch("shared.callbacks.websocket_streaming_handler.metrics") as mock_metrics:
+        message = Mock()
+        message.response_metadata = {}
+        message.usage_metadata = {
+            "input_tokens": 1200,
+            "output_tokens": 50,
+            "total_tokens": 1250,
+            "input_token_details": {"cache_read": 1024, "cache_creation": 0},
+        }
+        generation = AIMessageChunk(content="test content")
+        generation.message = message
+
+        websocket_handler._update_cw_dashboard(generation)
+
+        mock_metrics.add_metric.assert_any_call(
+            name=CloudWatchMetrics.LLM_CACHE_READ_INPUT_TOKEN_COUNT.value, unit=MetricUnit.Count, value=1024
+        )
+        assert CloudWatchMetrics.LLM_CACHE_WRITE_INPUT_TOKEN_COUNT.value not in [
+            metric_call.kwargs["name"] for metric_call in mock_metrics.add_metric.call_args_list
+        ]
 
 def test_update_cw_dashboard_without_metadata(websocket_handler):
     with patch("shared.callbacks.websocket_streaming_handler.metrics") as mock_metrics:
@@ -240,6 +309,7 @@ def test_update_cw_dashboard_without_metadata(websocket_handler):
 
         mock_metrics.add_metric.assert_not_called()
         mock_metrics.add_dimension.assert_not_called()
+        mock_metrics.flush_metrics.assert_not_called()
 
 
 def test_post_token_to_connection_client_error_non_gone(websocket_handler):
@@ -295,3 +365,176 @@ def test_connection_gone_flag_prevents_further_api_calls(websocket_handler):
 
     # No further API calls should have been made
     websocket_handler._client.post_to_connection.assert_not_called()
+
+
+@pytest.fixture
+def coalescing_handler():
+    os.environ[WEBSOCKET_CALLBACK_URL_ENV_VAR] = MOCK_WEBSOCKET_URL
+    os.environ[TRACE_ID_ENV_VAR] = MOCK_TRACE_ID
+
+    with patch("shared.callbacks.websocket_streaming_handler.get_service_client"):
+        handler = WebsocketStreamingCallbackHandler(
+            connection_id=MOCK_CONNECTION_ID,
+            conversation_id=MOCK_CONVERSATION_ID,
+            message_id=MOCK_MESSAGE_ID,
+            source_docs_formatter=lambda x: x,
+            is_streaming=True,
+            rag_enabled=True,
+            return_source_docs=True,
+            coalesce_window_ms=40,
+            coalesce_max_bytes=16,
+        )
+        yield handler
+
+
+def test_coalescing_defaults_from_env():
+    os.environ[WEBSOCKET_CALLBACK_URL_ENV_VAR] = MOCK_WEBSOCKET_URL
+    with (
+        patch("shared.callbacks.websocket_streaming_handler.get_service_client"),
+        patch.dict(
+            os.environ,
+            {STREAMING_COALESCE_WINDOW_MS_ENV_VAR: "30", STREAMING_COALESCE_MAX_BYTES_ENV_VAR: "not-a-number"},
+        ),
+    ):
+        handler = WebsocketStreamingCallbackHandler(
+            connection_id=MOCK_CONNECTION_ID,
+            conversation_id=MOCK_CONVERSATION_ID,
+            message_id=MOCK_MESSAGE_ID,
+            source_docs_formatter=lambda x: x,
+        )
+
+    assert handler.coalescing_enabled
+    assert handler.coalesce_window_ms == 30
+    assert handler.coalesce_max_bytes == DEFAULT_STREAMING_COALESCE_MAX_BYTES
+
+
+def test_coalescing_disabled_by_default(websocket_handler):
+    assert not websocket_handler.coalescing_enabled
+
+
+def test_coalescing_flushes_on_time_window(coalescing_handler):
+    with patch("shared.callbacks.websocket_streaming_handler.time.monotonic", side_effect=[0, 0, 0.01, 0.05]):
+        coalescing_handler.on_llm_new_token([{"type": "text", "text": "a"}])
+        coalescing_handler.on_llm_new_token([{"type": "text", "text": "b"}])
+        coalescing_handler.client.post_to_connection.assert_not_called()
+        assert coalescing_handler.has_streamed == False
+
+        coalescing_handler.on_llm_new_token([{"type": "text", "text": "c"}])
+
+    coalescing_handler.client.post_to_connection.assert_called_once_with(
+        ConnectionId=MOCK_CONNECTION_ID, Data=coalescing_handler.format_response("abc")
+    )
+    assert coalescing_handler.has_streamed == True
+
+
+def test_coalescing_flushes_on_byte_threshold(coalescing_handler):
+    with patch("shared.callbacks.websocket_streaming_handler.time.monotonic", return_value=0):
+        coalescing_handler.on_llm_new_token([{"type": "text", "text": "0123456789"}])
+        coalescing_handler.on_llm_new_token([{"type": "text", "text": "abcdef"}])
+        coalescing_handler.on_llm_new_token([{"type": "text", "text": "tail"}])
+
+    coalescing_handler.client.post_to_connection.assert_called_once_with(
+        ConnectionId=MOCK_CONNECTION_ID, Data=coalescing_handler.format_response("0123456789abcdef")
+    )
+
+    coalescing_handler.on_llm_end(None)
+    assert coalescing_handler.client.post_to_connection.call_count == 2
+    coalescing_handler.client.post_to_connection.assert_called_with(
+        ConnectionId=MOCK_CONNECTION_ID, Data=coalescing_handler.format_response("tail")
+    )
+
+    # nothing left to send
+    coalescing_handler.flush_tokens()
+    assert coalescing_handler.client.post_to_connection.call_count == 2
+
+
+def test_coalescing_flushes_before_references(coalescing_handler):
+    outputs = {
+        OUTPUT_KEY: "partial answer",
+        CONTEXT_KEY: ["doc1"],
+        SOURCE_DOCUMENTS_RECEIVED_KEY: [{"content": "doc1"}],
+        REPHRASED_QUERY_KEY: "rephrased question",
+    }
+    coalescing_handler.on_llm_new_token([{"type": "text", "text": "partial answer"}])
+
+    with patch.object(coalescing_handler, "post_token_to_connection") as mocked_post:
+        coalescing_handler.on_chain_end(outputs, run_id=None)
+
+    mocked_post.assert_has_calls(
+        [
+            call("partial answer"),
+            call({"content": "doc1"}, PAYLOAD_SOURCE_DOCUMENT_KEY),
+            call("rephrased question", REPHRASED_QUERY_KEY),
+        ],
+        any_order=False,
+    )
+    assert mocked_post.call_count == 3
+
+
+@pytest.fixture
+def sender_handler():
+    os.environ[WEBSOCKET_CALLBACK_URL_ENV_VAR] = MOCK_WEBSOCKET_URL
+    os.environ[TRACE_ID_ENV_VAR] = MOCK_TRACE_ID
+
+    with patch("shared.callbacks.websocket_streaming_handler.get_service_client"):
+        handler = WebsocketStreamingCallbackHandler(
+            connection_id=MOCK_CONNECTION_ID,
+            conversation_id=MOCK_CONVERSATION_ID,
+            message_id=MOCK_MESSAGE_ID,
+            source_docs_formatter=lambda x: x,
+            is_streaming=True,
+            rag_enabled=False,
+            send_queue_size=8,
+        )
+        yield handler
+
+
+def test_sender_disabled_by_default(websocket_handler):
+    assert websocket_handler.sender is None
+    assert websocket_handler.raise_error == False
+
+
+def test_sender_defaults_from_env():
+    os.environ[WEBSOCKET_CALLBACK_URL_ENV_VAR] = MOCK_WEBSOCKET_URL
+    with (
+        patch("shared.callbacks.websocket_streaming_handler.get_service_client"),
+        patch.dict(os.environ, {STREAMING_SEND_QUEUE_SIZE_ENV_VAR: "16"}),
+    ):
+        handler = WebsocketStreamingCallbackHandler(
+            connection_id=MOCK_CONNECTION_ID,
+            conversation_id=MOCK_CONVERSATION_ID,
+            message_id=MOCK_MESSAGE_ID,
+            source_docs_formatter=lambda x: x,
+        )
+
+    assert handler.sender is not None
+    assert handler.sender.connection_id == MOCK_CONNECTION_ID
+
+
+def test_sender_posts_tokens_in_order_on_drain(sender_handler):
+    for token in ["a", "b", "c"]:
+        sender_handler.on_llm_new_token([{"type": "text", "text": token}])
+    sender_handler.drain()
+
+    sender_handler.client.post_to_connection.assert_has_calls(
+        [call(ConnectionId=MOCK_CONNECTION_ID, Data=sender_handler.format_response(token)) for token in "abc"]
+    )
+    assert sender_handler.client.post_to_connection.call_count == 3
+
+
+def test_sender_gone_connection_stops_generation(sender_handler):
+    sender_handler.client.post_to_connection.side_effect = ClientError(
+        {"Error": {"Code": "GoneException", "Message": "Gone"}}, "PostToConnection"
+    )
+    sender_handler.on_llm_new_token([{"type": "text", "text": "a"}])
+
+    with pytest.raises(WebSocketGoneException):
+        sender_handler.drain()
+    assert sender_handler._connection_gone == True
+    # LangChain re-raises callback errors from handlers with raise_error set, which cancels the generation
+    assert sender_handler.raise_error == True
+
+    # nothing else is sent once the connection is gone
+    sender_handler.on_llm_new_token([{"type": "text", "text": "b"}])
+    sender_handler.drain()
+    sender_handler.client.post_to_connection.assert_called_once()
@@ -2,9 +2,20 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import time
+from unittest.mock import patch
+
 import pytest
-from shared.defaults.model_defaults import ModelDefaults
-from utils.constants import CHAT_IDENTIFIER, RAG_CHAT_IDENTIFIER
+from helper import get_service_resource
+from shared.defaults.model_defaults import ModelDefaults, _model_defaults_cache
+from utils.constants import (
+    CHAT_IDENTIFIER,
+    DEFAULT_MODEL_DEFAULTS_NEGATIVE_CACHE_TTL,
+    MODEL_DEFAULTS_CACHE_TTL_ENV_VAR,
+    MODEL_INFO_TABLE_NAME_ENV_VAR,
+    RAG_CHAT_IDENTIFIER,
+)
 from utils.enum_types import LLMProviderTypes
 
 PROMPT = """\n\n{history}\n\n{input}"""
@@ -224,3 +235,73 @@ def test_model_defaults_missing_values(
         error.value.args[0]
         == f"DynamoDB defaults missing for UseCase: '{CHAT_IDENTIFIER}' and SortKey: 'Bedrock#claude-1'"
     )
+
+
+@pytest.mark.parametrize(
+    "use_case, model_id, prompt, is_streaming, rag_enabled",
+    [(CHAT_IDENTIFIER, "claude-1", PROMPT, False, False)],
+)
+def test_model_defaults_cached(
+    use_case,
+    model_id,
+    prompt,
+    is_streaming,
+    rag_enabled,
+    setup_environment,
+    dynamodb_resource,
+    bedrock_dynamodb_defaults_table,
+):
+    ModelDefaults(LLMProviderTypes.BEDROCK, model_id, rag_enabled).memory_config["ai_prefix"] = "mutated"
+
+    table = dynamodb_resource.Table(os.environ[MODEL_INFO_TABLE_NAME_ENV_VAR])
+    table.delete_item(Key={"UseCase": use_case, "SortKey": f"Bedrock#{model_id}"})
+
+    model_defaults = ModelDefaults(LLMProviderTypes.BEDROCK, model_id, rag_enabled)
+    assert model_defaults.display_name == "Claude 1"
+    assert model_defaults.memory_config == MEMORY_CONFIG[use_case]
+
+    with patch.dict(os.environ, {MODEL_DEFAULTS_CACHE_TTL_ENV_VAR: "0"}):
+        with pytest.raises(ValueError):
+            ModelDefaults(LLMProviderTypes.BEDROCK, model_id, rag_enabled)
+
+
+@pytest.mark.parametrize(
+    "use_case, model_id, prompt, is_streaming, rag_enabled",
+    [(CHAT_IDENTIFIER, "default", PROMPT, False, False)],
+)
+def test_model_defaults_fallback_single_round_trip(
+    use_case, model_id, prompt, is_streaming, rag_enabled, setup_environment, bedrock_dynamodb_defaults_table
+):
+    with patch("shared.defaults.model_defaults.get_service_resource", wraps=get_service_resource) as mocked_resource:
+        model_defaults = ModelDefaults(LLMProviderTypes.BEDROCK, "some-unlisted-model", rag_enabled)
+        assert model_defaults.model_name == "some-unlisted-model"
+        assert model_defaults.display_name == "default"
+        assert mocked_resource.call_count == 1
+
+        # a model literally named 'default' must not produce duplicate keys in the batch request
+        assert ModelDefaults(LLMProviderTypes.BEDROCK, "default", rag_enabled).display_name == "default"
+
+
+@pytest.mark.parametrize(
+    "use_case, model_id, prompt, is_streaming, rag_enabled",
+    [(CHAT_IDENTIFIER, "claude-1", PROMPT, False, False)],
+)
+def test_model_defaults_negative_cache(
+    use_case, model_id, prompt, is_streaming, rag_enabled, setup_environment, bedrock_dynamodb_defaults_table
+):
+    expected_error_message = f"No records found for UseCase: '{CHAT_IDENTIFIER}' and SortKey: 'new_provider#some-new-model' in the DynamoDB defaults table."
+    with pytest.raises(ValueError) as error:
+        ModelDefaults("new_provider", "some-new-model", rag_enabled)
+    assert error.value.args[0] == expected_error_message
+
+    entry = _model_defaults_cache.get_entry(
+        ("fake-model-info-table-name", CHAT_IDENTIFIER, "new_provider", "some-new-model")
+    )
+    assert entry.value is None
+    assert entry.expires_at - time.monotonic() <= DEFAULT_MODEL_DEFAULTS_NEGATIVE_CACHE_TTL
+
+    with patch("shared.defaults.model_defaults.get_service_resource") as mocked_resource:
+        with pytest.raises(ValueError) as error:
+            ModelDefaults("new_provider", "some-new-model", rag_enabled)
+        assert error.value.args[0] == expected_error_message
+        mocked_resource.assert_not_called()
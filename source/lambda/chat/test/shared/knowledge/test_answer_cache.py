@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from shared.knowledge import answer_cache as answer_cache_module
+from shared.knowledge.answer_cache import AnswerCache, get_answer_cache_similarity, get_answer_cache_ttl
+from utils.constants import (
+    ANSWER_CACHE_SIMILARITY_ENV_VAR,
+    ANSWER_CACHE_TTL_ENV_VAR,
+    DEFAULT_ANSWER_CACHE_SIMILARITY,
+)
+
+DOCUMENTS = [Document(page_content="excerpt 1", metadata={"score": 0.9, "location": {"type": "S3"}})]
+QUESTION = "How do I reset the password of my account?"
+
+
+@pytest.mark.parametrize("env_value, expected_ttl", [(None, 0), ("300", 300), ("-5", 0), ("invalid", 0)])
+def test_get_answer_cache_ttl(env_value, expected_ttl):
+    env = {} if env_value is None else {ANSWER_CACHE_TTL_ENV_VAR: env_value}
+    with patch.dict(os.environ, env):
+        assert get_answer_cache_ttl() == expected_ttl
+
+
+@pytest.mark.parametrize(
+    "env_value, expected_similarity",
+    [
+        (None, DEFAULT_ANSWER_CACHE_SIMILARITY),
+        ("0.75", 0.75),
+        ("1", 1.0),
+        ("0", DEFAULT_ANSWER_CACHE_SIMILARITY),
+        ("1.5", DEFAULT_ANSWER_CACHE_SIMILARITY),
+        ("invalid", DEFAULT_ANSWER_CACHE_SIMILARITY),
+    ],
+)
+def test_get_answer_cache_similarity(env_value, expected_similarity):
+    env = {} if env_value is None else {ANSWER_CACHE_SIMILARITY_ENV_VAR: env_value}
+    with patch.dict(os.environ, env):
+        assert get_answer_cache_similarity() == expected_similarity
+
+
+def test_from_environment():
+    with patch.dict(os.environ, {ANSWER_CACHE_TTL_ENV_VAR: "0"}):
+        assert AnswerCache.from_environment(scope="fake-scope") is None
+
+    with patch.dict(os.environ, {ANSWER_CACHE_TTL_ENV_VAR: "60", ANSWER_CACHE_SIMILARITY_ENV_VAR: "0.8"}):
+        cache = AnswerCache.from_environment(scope="fake-scope")
+        assert cache.scope == "fake-scope"
+        assert cache.ttl == 60
+        assert cache.similarity_threshold == 0.8
+
+
+def test_signature_similarity():
+    signature = AnswerCache.get_signature(QUESTION)
+    assert len(signature) == len(answer_cache_module.MINHASH_PERMUTATIONS)
+    assert AnswerCache.get_signature("  how do I reset the PASSWORD of my account ") == signature
+
+    near_duplicate = AnswerCache.get_signature("How do I reset the passwords of my account?")
+    different = AnswerCache.get_signature("What is the refund policy for annual plans?")
+    assert AnswerCache.estimate_similarity(signature, near_duplicate) >= 0.8
+    assert AnswerCache.estimate_similarity(signature, different) < 0.3
+
+
+def test_get_exact_and_normalized_match():
+    cache = AnswerCache(scope="fake-scope", ttl=60)
+    assert cache.get(QUESTION) is None
+
+    cache.put(QUESTION, "Use the forgot password link.", DOCUMENTS)
+    cached_answer = cache.get("how do i reset the password of my account")
+
+    assert cached_answer.answer == "Use the forgot password link."
+    assert cached_answer.source_documents == DOCUMENTS
+    # callers get copies of the cached documents
+    cached_answer.source_documents[0].metadata["score"] = 0.1
+    assert cache.get(QUESTION).source_documents[0].metadata["score"] == 0.9
+
+
+def test_get_near_duplicate():
+    cache = AnswerCache(scope="fake-scope", ttl=60, similarity_threshold=0.8)
+    cache.put(QUESTION, "Use the forgot password link.", DOCUMENTS)
+
+    assert cache.get("How do I reset the passwords of my account?").answer == "Use the forgot password link."
+    assert cache.get("How do I delete my account?") is None
+
+
+def test_get_is_scoped():
+    AnswerCache(scope="fake-scope", ttl=60).put(QUESTION, "Use the forgot password link.", DOCUMENTS)
+
+    assert AnswerCache(scope="other-scope", ttl=60).get(QUESTION) is None
+
+
+def test_get_expired():
+    cache = AnswerCache(scope="fake-scope", ttl=60)
+    cache.put(QUESTION, "Use the forgot password link.", DOCUMENTS)
+
+    with patch("utils.cache.time.monotonic", return_value=float("inf")):
+        assert cache.get(QUESTION) is None
+        assert cache.get("How do I reset the passwords of my account?") is None
+
+
+def test_evicted_answers_are_unindexed():
+    cache = AnswerCache(scope="fake-scope", ttl=60, similarity_threshold=0.8)
+    cache.put(QUESTION, "Use the forgot password link.", DOCUMENTS)
+    assert answer_cache_module._answer_cache_index
+
+    answer_cache_module._answer_cache.clear()
+    assert cache.get(QUESTION) is None
+    assert not answer_cache_module._answer_cache_index
@@ -3,11 +3,15 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import json
+import os
+from copy import deepcopy
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from langchain_core.documents import Document
 from shared.knowledge.bedrock_retriever import CustomBedrockRetriever
+from utils.constants import RETRIEVAL_CACHE_TTL_ENV_VAR
 
 BEDROCK_KNOWLEDGE_BASE_RESPONSE = None
 
@@ -30,7 +34,8 @@ def bedrock_retriever(bedrock_agent_stubber):
 
 
 def get_bedrock_result_stubbed(bedrock_agent_stubber):
-    responses = load_bedrock_response()
+    # the retriever modifies the results it receives, so each stub gets its own copy
+    responses = deepcopy(load_bedrock_response())
     bedrock_agent_stubber.add_response(
         "retrieve",
         expected_params={
@@ -97,3 +102,23 @@ def test_bedrock_throws_client_error(bedrock_retriever, bedrock_agent_stubber, s
     with bedrock_agent_stubber:
         response = bedrock_retriever._get_relevant_documents("sample query")
     assert response == []
+
+
+@patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: "60"})
+def test_get_relevant_documents_reuses_cached_docs(bedrock_retriever, bedrock_agent_stubber, setup_environment):
+    # a single retrieve response is stubbed, so a second call to the knowledge base would fail and return no docs
+    bedrock_agent_stubber = get_bedrock_result_stubbed(bedrock_agent_stubber)
+    with bedrock_agent_stubber:
+        response = bedrock_retriever._get_relevant_documents("sample query")
+        assert bedrock_retriever._get_relevant_documents("Sample query?") == response
+    bedrock_agent_stubber.assert_no_pending_responses()
+    assert len(response) == 1
+
+
+@patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: "60"})
+def test_failed_retrieval_is_not_cached(bedrock_retriever, bedrock_agent_stubber, setup_environment):
+    bedrock_agent_stubber.add_client_error("retrieve")
+    bedrock_agent_stubber = get_bedrock_result_stubbed(bedrock_agent_stubber)
+    with bedrock_agent_stubber:
+        assert bedrock_retriever._get_relevant_documents("sample query") == []
+        assert len(bedrock_retriever._get_relevant_documents("sample query")) == 1
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from langchain_core.documents import Document
+
+from shared.knowledge.bedrock_knowledge_base import BedrockKnowledgeBase
+from shared.knowledge.composite_knowledge_base import CompositeKnowledgeBase
+from shared.knowledge.kendra_knowledge_base import KendraKnowledgeBase
+from utils.constants import KNOWLEDGE_BASE_ORIGIN_KEY
+
+
+def test_knowledge_base_construction_fails():
+    with pytest.raises(ValueError) as error:
+        CompositeKnowledgeBase([])
+
+    assert error.value.args[0] == "A composite knowledge base needs at least one knowledge base"
+
+
+def test_source_docs_formatter_uses_origin_formatter(setup_environment):
+    knowledge_base = CompositeKnowledgeBase(
+        [
+            KendraKnowledgeBase({"ReturnSourceDocs": True}),
+            BedrockKnowledgeBase({"ReturnSourceDocs": True}, knowledge_base_id="other-bedrock-knowledge-base-id"),
+        ],
+        {"NumberOfDocs": 3},
+    )
+    source_documents = [
+        Document(
+            page_content="bedrock passage",
+            metadata={
+                "location": {"type": "WEB", "webLocation": {"url": "https://example.com/bedrock"}},
+                "score": 0.8,
+                KNOWLEDGE_BASE_ORIGIN_KEY: 1,
+            },
+        ),
+        Document(
+            page_content="kendra passage",
+            metadata={
+                "excerpt": "kendra excerpt",
+                "source": "https://example.com/kendra",
+                "score": "HIGH",
+                "title": "kendra title",
+                KNOWLEDGE_BASE_ORIGIN_KEY: 0,
+            },
+        ),
+    ]
+
+    formatted_source_docs = knowledge_base.source_docs_formatter(source_documents)
+
+    assert knowledge_base.retriever.top_k == 3
+    assert [doc["location"] for doc in formatted_source_docs] == [
+        "https://example.com/bedrock",
+        "https://example.com/kendra",
+    ]
+    assert formatted_source_docs[0]["excerpt"] == "bedrock passage"
+    assert formatted_source_docs[1]["excerpt"] == "kendra excerpt"
+    assert formatted_source_docs[1]["document_title"] == "kendra title"
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from shared.knowledge.composite_retriever import CompositeRetriever, get_knowledge_base_deadline
+from utils.constants import KNOWLEDGE_BASE_DEADLINE_MS_ENV_VAR, KNOWLEDGE_BASE_ORIGIN_KEY, RANK_FUSION_SCORE_KEY
+
+os.environ["_X_AMZN_TRACE_ID"] = "Root=1-12345678-123456789abcdef0;Parent=123456789abcdef0;Sampled=1"
+
+
+class StaticRetriever(BaseRetriever):
+    documents: List[Document]
+    delay: float = 0
+    fails: bool = False
+
+    def _get_relevant_documents(self, query: str) -> List[Document]:
+        time.sleep(self.delay)
+        if self.fails:
+            raise ValueError("fake retrieval failure")
+        return self.documents
+
+
+def documents(*contents):
+    return [Document(page_content=content, metadata={"source": content}) for content in contents]
+
+
+@pytest.mark.parametrize("env_value, expected_deadline", [(None, 5), ("250", 0.25), ("0", 5), ("invalid", 5)])
+def test_get_knowledge_base_deadline(env_value, expected_deadline):
+    env = {} if env_value is None else {KNOWLEDGE_BASE_DEADLINE_MS_ENV_VAR: env_value}
+    with patch.dict(os.environ, env):
+        assert get_knowledge_base_deadline() == expected_deadline
+
+
+def test_fuse_ranks_documents_found_by_several_retrievers_first():
+    retriever = CompositeRetriever(retrievers=[], top_k=3, deadline=1)
+
+    fused = retriever.fuse([documents("a", "b", "c"), documents("d", "b")])
+
+    assert [doc.page_content for doc in fused] == ["b", "a", "d"]
+    assert [doc.metadata[KNOWLEDGE_BASE_ORIGIN_KEY] for doc in fused] == [0, 0, 1]
+    assert fused[0].metadata[RANK_FUSION_SCORE_KEY] == pytest.approx(2 / 62)
+    assert fused[1].metadata[RANK_FUSION_SCORE_KEY] == pytest.approx(1 / 61)
+
+
+def test_fuse_does_not_modify_retrieved_documents():
+    retrieved = documents("a")
+
+    CompositeRetriever(retrievers=[], top_k=1, deadline=1).fuse([retrieved])
+
+    assert retrieved[0].metadata == {"source": "a"}
+
+
+def test_retrieval_runs_concurrently():
+    retriever = CompositeRetriever(
+        retrievers=[
+            StaticRetriever(documents=documents("a"), delay=0.3),
+            StaticRetriever(documents=documents("b"), delay=0.3),
+        ],
+        top_k=2,
+        deadline=1,
+    )
+
+    start_time = time.time()
+    fused = retriever.invoke("query")
+
+    assert time.time() - start_time < 0.55
+    assert [doc.page_content for doc in fused] == ["a", "b"]
+
+
+def test_retrieval_skips_slow_and_failing_retrievers():
+    retriever = CompositeRetriever(
+        retrievers=[
+            StaticRetriever(documents=documents("a"), delay=1),
+            StaticRetriever(documents=documents("b"), fails=True),
+            StaticRetriever(documents=documents("c")),
+        ],
+        top_k=2,
+        deadline=0.1,
+    )
+
+    start_time = time.time()
+    fused = retriever.invoke("query")
+
+    assert time.time() - start_time < 0.5
+    assert [doc.page_content for doc in fused] == ["c"]
+    assert fused[0].metadata[KNOWLEDGE_BASE_ORIGIN_KEY] == 2
+
+
+def test_get_cache_key_depends_on_all_retrievers():
+    first = CompositeRetriever(retrievers=[StaticRetriever(documents=[])], top_k=2, deadline=1)
+    second = CompositeRetriever(
+        retrievers=[StaticRetriever(documents=[]), StaticRetriever(documents=[])], top_k=2, deadline=1
+    )
+
+    assert first.get_cache_key("query") == first.get_cache_key("Query?")
+    assert first.get_cache_key("query") != second.get_cache_key("query")
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import json
+import os
 from pathlib import Path
 from unittest import mock
 from unittest.mock import Mock, patch
@@ -18,6 +19,7 @@ from langchain_aws.retrievers.kendra import (
 )
 from langchain_core.documents import Document
 from shared.knowledge.kendra_retriever import CustomKendraRetriever
+from utils.constants import RETRIEVAL_CACHE_TTL_ENV_VAR
 
 KENDRA_RESPONSE = None
 attribute_filter = {
@@ -152,6 +154,28 @@ def test_get_relevant_documents(
     assert type(response[0]) == Document
 
 
+@patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: "60"})
+def test_get_relevant_documents_reuses_cached_docs(
+    kendra_retriever, kendra_stubber, user_context_token, rag_rbac_enabled, setup_environment
+):
+    kendra_stubber = get_kendra_result_stubbed(kendra_stubber)
+    with kendra_stubber:
+        response = kendra_retriever._get_relevant_documents("sample query")
+        assert kendra_retriever._get_relevant_documents("Sample  query") == response
+    kendra_stubber.assert_no_pending_responses()
+    assert len(response) == 1
+
+
+def test_cache_key_includes_user_context(kendra_retriever, user_context_token, rag_rbac_enabled):
+    other_user_retriever = CustomKendraRetriever(
+        index_id=kendra_retriever.index_id,
+        top_k=kendra_retriever.top_k,
+        attribute_filter={"OrAllFilters": [{"EqualsTo": {"Key": "_user_id", "Value": {"StringValue": "user2"}}}]},
+    )
+    assert kendra_retriever.get_cache_key("sample query") == kendra_retriever.get_cache_key("Sample query")
+    assert kendra_retriever.get_cache_key("sample query") != other_user_retriever.get_cache_key("sample query")
+
+
 def test_kendra_throws_client_error(kendra_retriever, user_context_token, rag_rbac_enabled, setup_environment):
     with mock.patch("shared.knowledge.kendra_retriever.CustomKendraRetriever._kendra_query") as mocked_query:
         mocked_query.side_effect = ClientError(
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.documents import Document
+
+from shared.knowledge.retrieval_cache import RetrievalCache, get_retrieval_cache_ttl
+from utils.constants import RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR, RETRIEVAL_CACHE_TTL_ENV_VAR
+from utils.enum_types import CloudWatchMetrics
+
+CACHE_TABLE_NAME = "fake-retrieval-cache-table"
+DOCUMENTS = [
+    Document(page_content="excerpt 1", metadata={"score": 0.9, "location": {"type": "S3"}}),
+    Document(page_content="excerpt 2", metadata={"score": 0.8}),
+]
+
+
+@pytest.fixture
+def cache_table(dynamodb_resource):
+    yield dynamodb_resource.create_table(
+        TableName=CACHE_TABLE_NAME,
+        KeySchema=[{"AttributeName": "CacheKey", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "CacheKey", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def recorded_metrics(metrics):
+    return [call.kwargs["name"] for call in metrics.add_metric.call_args_list]
+
+
+@pytest.mark.parametrize(
+    "env_value, expected_ttl",
+    [(None, 0), ("300", 300), ("-1", 0), ("invalid", 0)],
+)
+def test_get_retrieval_cache_ttl(env_value, expected_ttl):
+    with patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: env_value} if env_value else {}):
+        if env_value is None:
+            os.environ.pop(RETRIEVAL_CACHE_TTL_ENV_VAR, None)
+        assert get_retrieval_cache_ttl() == expected_ttl
+
+
+def test_from_environment():
+    with patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: "0"}):
+        assert RetrievalCache.from_environment() is None
+
+    with patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: "60", RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR: ""}):
+        retrieval_cache = RetrievalCache.from_environment()
+        assert retrieval_cache.ttl == 60
+        assert retrieval_cache.table_name is None
+
+    with patch.dict(os.environ, {RETRIEVAL_CACHE_TTL_ENV_VAR: "60", RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR: "table"}):
+        assert RetrievalCache.from_environment().table_name == "table"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("What is Amazon S3?", "what is amazon s3"),
+        ("  what   is\tAmazon S3 ", "what is amazon s3"),
+        ('"What is Amazon S3"?!', "what is amazon s3"),
+        ("What is Ａmazon S3", "what is amazon s3"),
+        ("What is S3.5?", "what is s3.5"),
+        (None, ""),
+    ],
+)
+def test_normalize_query(query, expected):
+    assert RetrievalCache.normalize_query(query) == expected
+
+
+def test_cache_key():
+    key = RetrievalCache.get_cache_key("What is S3?", index_id="index", top_k=2, attribute_filter={"a": 1, "b": 2})
+    assert key == RetrievalCache.get_cache_key(
+        "what is s3", top_k=2, attribute_filter={"b": 2, "a": 1}, index_id="index"
+    )
+    different_retrievals = [
+        ("What is S3?", 3, {"a": 1, "b": 2}),
+        ("What is EC2?", 2, {"a": 1, "b": 2}),
+        ("What is S3?", 2, {"a": 1}),
+    ]
+    for query, top_k, attribute_filter in different_retrievals:
+        assert key != RetrievalCache.get_cache_key(
+            query, index_id="index", top_k=top_k, attribute_filter=attribute_filter
+        )
+
+
+def test_get_and_put_in_container():
+    retrieval_cache = RetrievalCache(ttl=60)
+    metrics = Mock()
+    key = RetrievalCache.get_cache_key("query")
+
+    assert retrieval_cache.get(key, metrics) is None
+    retrieval_cache.put(key, DOCUMENTS)
+    documents = retrieval_cache.get(key, metrics)
+    assert documents == DOCUMENTS
+    assert recorded_metrics(metrics) == [
+        CloudWatchMetrics.RETRIEVAL_CACHE_MISSES.value,
+        CloudWatchMetrics.RETRIEVAL_CACHE_HITS.value,
+    ]
+
+    # callers get copies, so changing them does not change the cached documents
+    documents[0].metadata["score"] = 0
+    assert retrieval_cache.get(key, metrics) == DOCUMENTS
+
+
+def test_entries_expire():
+    retrieval_cache = RetrievalCache(ttl=60)
+    key = RetrievalCache.get_cache_key("query")
+    retrieval_cache.put(key, DOCUMENTS)
+
+    with patch("utils.cache.time.monotonic", return_value=time.monotonic() + 61):
+        assert retrieval_cache.get(key, Mock()) is None
+
+
+def test_shared_tier(cache_table):
+    key = RetrievalCache.get_cache_key("query")
+    RetrievalCache(ttl=60, table_name=CACHE_TABLE_NAME).put(key, DOCUMENTS)
+
+    item = cache_table.get_item(Key={"CacheKey": key})["Item"]
+    assert json.loads(item["Documents"])[0] == {"page_content": "excerpt 1", "metadata": DOCUMENTS[0].metadata}
+    assert int(time.time()) < item["TTL"] <= int(time.time()) + 60
+
+    # another container only finds the documents in the shared tier, and keeps them for the next request
+    with patch("shared.knowledge.retrieval_cache._retrieval_cache.get", return_value=None):
+        metrics = Mock()
+        assert RetrievalCache(ttl=60, table_name=CACHE_TABLE_NAME).get(key, metrics) == DOCUMENTS
+    assert recorded_metrics(metrics) == [
+        CloudWatchMetrics.RETRIEVAL_CACHE_SHARED_HITS.value,
+        CloudWatchMetrics.RETRIEVAL_CACHE_HITS.value,
+    ]
+
+
+def test_shared_tier_ignores_expired_items(cache_table):
+    key = RetrievalCache.get_cache_key("query")
+    cache_table.put_item(Item={"CacheKey": key, "Documents": "[]", "TTL": int(time.time()) - 1})
+
+    metrics = Mock()
+    assert RetrievalCache(ttl=60, table_name=CACHE_TABLE_NAME).get(key, metrics) is None
+    assert recorded_metrics(metrics) == [CloudWatchMetrics.RETRIEVAL_CACHE_MISSES.value]
+
+
+def test_shared_tier_errors_are_misses(caplog, setup_environment):
+    retrieval_cache = RetrievalCache(ttl=60, table_name="missing-table")
+    key = RetrievalCache.get_cache_key("query")
+
+    retrieval_cache.put(key, DOCUMENTS)
+    assert "Failed to write the shared retrieval cache" in caplog.text
+
+    with patch("shared.knowledge.retrieval_cache._retrieval_cache.get", return_value=None):
+        assert retrieval_cache.get(key, Mock()) is None
+    assert "Failed to read the shared retrieval cache" in caplog.text
@@ -80,6 +80,25 @@ def test_adding_multiple_messages_with_limit(setup_test_table):
     assert len(memory.raw_messages) == 3
 
 
+def test_messages_with_token_budget(setup_test_table):
+    # "Human: message N" is estimated at 6 tokens, plus 4 for the message
+    memory = DynamoDBChatMessageHistory(
+        table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, max_history_length=1, max_history_tokens=25
+    )
+    messages = [HumanMessage(content=f"message {i}", id=MOCK_MESSAGE_ID) for i in range(4)]
+    memory.add_messages(messages)
+
+    # the budget replaces the message count
+    assert memory.messages == messages[-2:]
+
+    long_message = AIMessage(content="word " * 100, id=MOCK_MESSAGE_ID)
+    memory.add_message(long_message)
+    assert memory.messages == []
+
+    memory.max_history_tokens = 1000
+    assert memory.messages == messages + [long_message]
+
+
 def test_getting_different_messages_for_different_conversations(setup_test_table):
     memory1 = DynamoDBChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
     message1 = HumanMessage(content="Hello AI!", id=MOCK_MESSAGE_ID)
@@ -192,3 +211,61 @@ def test_clear_error(caplog, setup_environment):
         )
         memory.clear()
         assert "delete error" in caplog.text
+
+
+def test_turn_reads_once_and_appends_with_one_write(setup_test_table):
+    memory = DynamoDBChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    memory.add_message(HumanMessage(content="first question", id=MOCK_MESSAGE_ID))
+
+    # a turn: the history is read once, then the human and AI messages are appended together
+    turn = DynamoDBChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    with (
+        patch.object(turn.table, "get_item", wraps=turn.table.get_item) as mock_get_item,
+        patch.object(turn.table, "update_item", wraps=turn.table.update_item) as mock_update_item,
+    ):
+        assert len(turn.messages) == 1
+        human_message = HumanMessage(content="second question", id=MOCK_MESSAGE_ID)
+        ai_message = AIMessage(content="second answer", id=MOCK_MESSAGE_ID)
+        turn.add_messages([human_message, ai_message])
+        assert turn.messages[-2:] == [human_message, ai_message]
+
+    mock_get_item.assert_called_once()
+    mock_update_item.assert_called_once()
+    assert "list_append" in mock_update_item.call_args.kwargs["UpdateExpression"]
+    assert mock_update_item.call_args.kwargs["ExpressionAttributeValues"][":version"] == 1
+
+    stored = setup_test_table.Table(table_name).get_item(
+        Key={"UserId": MOCK_USER_ID, "ConversationId": MOCK_CONVERSATION_ID}
+    )["Item"]
+    assert [message["data"]["content"] for message in stored["History"]] == [
+        "Human: first question",
+        "Human: second question",
+        "AI: second answer",
+    ]
+    assert stored["Version"] == 2
+
+
+def test_append_refreshes_snapshot_on_concurrent_write(setup_test_table):
+    memory = DynamoDBChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    other = DynamoDBChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    assert memory.messages == []
+
+    other.add_message(HumanMessage(content="concurrent message", id=MOCK_MESSAGE_ID))
+    with patch.object(memory, "load_history", wraps=memory.load_history) as mock_load_history:
+        memory.add_message(AIMessage(content="my message", id=MOCK_MESSAGE_ID))
+
+    mock_load_history.assert_called_once()
+    assert [message.content for message in memory.messages] == ["Human: concurrent message", "AI: my message"]
+    other.load_history()
+    assert memory.messages == other.messages
+
+
+def test_append_gives_up_after_repeated_conflicts(caplog, setup_test_table):
+    memory = DynamoDBChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    memory.messages
+    conflict = ClientError({"Error": {"Code": "ConditionalCheckFailedException", "Message": "conflict"}}, "update_item")
+    with patch.object(memory.table, "update_item", side_effect=conflict) as mock_update_item:
+        memory.add_message(HumanMessage(content="Hello world!"))
+
+    assert mock_update_item.call_count == 3
+    assert "Failed to append to the history" in caplog.text
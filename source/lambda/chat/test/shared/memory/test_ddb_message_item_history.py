@@ -0,0 +1,237 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from shared.memory.ddb_message_item_history import DynamoDBMessageItemHistory
+
+table_name = "my-test-table"
+MOCK_MESSAGE_ID = "fake-message-id"
+MOCK_CONVERSATION_ID = "fake-conversation-id"
+MOCK_USER_ID = "fake-user-id"
+
+
+@pytest.fixture
+def setup_test_table(dynamodb_resource):
+    dynamodb_resource.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {"AttributeName": "UserId", "KeyType": "HASH"},
+            {"AttributeName": "ConversationId", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "ConversationId", "AttributeType": "S"},
+            {"AttributeName": "UserId", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    yield dynamodb_resource
+
+
+def test_add_message_writes_one_item_per_message(setup_test_table):
+    memory = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    human_message = HumanMessage(content="Hello world!", id=MOCK_MESSAGE_ID)
+    ai_message = AIMessage(content="Bye World!", id=MOCK_MESSAGE_ID)
+
+    with patch.object(memory.table, "get_item") as mock_get_item:
+        memory.add_message(human_message)
+        memory.add_message(ai_message)
+
+        assert memory.messages == [human_message, ai_message]
+        assert memory.messages[0].content == "Human: Hello world!"
+        assert memory.messages[1].content == "AI: Bye World!"
+    mock_get_item.assert_not_called()
+
+    record, *items = setup_test_table.Table(table_name).scan()["Items"]
+    assert record["ConversationId"] == MOCK_CONVERSATION_ID
+    assert "History" not in record
+    assert len(items) == 2
+    assert all(item["ConversationId"].startswith(f"{MOCK_CONVERSATION_ID}#") for item in items)
+    assert all(item["Message"]["data"]["id"] == MOCK_MESSAGE_ID for item in items)
+    # the record of the conversation carries its TTL, and the TTL of its oldest message item
+    assert record["TTL"] == items[-1]["TTL"]
+    assert record["MessageItemsTTL"] == items[0]["TTL"]
+
+
+def test_add_message_extends_ttl_of_conversation(setup_test_table):
+    table = setup_test_table.Table(table_name)
+    memory = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+
+    with patch("shared.memory.ddb_message_item_history.time.time", return_value=1000000):
+        memory.add_message(HumanMessage(content="first"))
+    # 1000000 + 86400 + 43200
+    first_ttl = 1129600
+
+    # until half of DDB_MESSAGE_TTL has passed, only the record of the conversation is updated
+    with patch("shared.memory.ddb_message_item_history.time.time", return_value=1000000 + 43200):
+        memory.add_message(HumanMessage(content="second"))
+    record, first, second = table.scan()["Items"]
+    assert record["TTL"] == first_ttl + 43200
+    assert record["MessageItemsTTL"] == first_ttl
+    assert first["TTL"] == first_ttl
+    assert second["TTL"] == first_ttl + 43200
+
+    # after that, the oldest message would expire within DDB_MESSAGE_TTL of the write, so every message is rewritten
+    with patch("shared.memory.ddb_message_item_history.time.time", return_value=1000000 + 43201):
+        memory.add_message(HumanMessage(content="third"))
+    record, *items = table.scan()["Items"]
+    assert record["TTL"] == first_ttl + 43201
+    assert record["MessageItemsTTL"] == first_ttl + 43201
+    assert [item["TTL"] for item in items] == [first_ttl + 43201] * 3
+    assert [item["Message"]["data"]["content"] for item in items] == ["Human: first", "Human: second", "Human: third"]
+
+
+def test_messages_reads_last_turns_with_limit(setup_test_table):
+    memory = DynamoDBMessageItemHistory(
+        table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, max_history_length=2
+    )
+    messages = [HumanMessage(content=f"message {i}", id=MOCK_MESSAGE_ID) for i in range(5)]
+    for message in messages:
+        memory.add_message(message)
+
+    with (
+        patch.object(memory.table, "query", wraps=memory.table.query) as mock_query,
+        patch.object(memory.table, "get_item") as mock_get_item,
+    ):
+        assert memory.messages == messages[-2:]
+
+    mock_query.assert_called_once()
+    assert mock_query.call_args.kwargs["Limit"] == 2
+    assert mock_query.call_args.kwargs["ScanIndexForward"] == False
+    # the window is filled by message items, so the single-item history is not read
+    mock_get_item.assert_not_called()
+    assert memory.raw_messages == messages
+
+
+def test_reads_existing_single_item_history(setup_test_table):
+    table = setup_test_table.Table(table_name)
+    table.put_item(
+        Item={
+            "UserId": MOCK_USER_ID,
+            "ConversationId": MOCK_CONVERSATION_ID,
+            "History": [
+                {"type": "system", "data": {"content": "some system message", "additional_kwargs": {}}},
+                {"type": "human", "data": {"content": "Human: old question", "additional_kwargs": {}}},
+            ],
+        }
+    )
+    memory = DynamoDBMessageItemHistory(
+        table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, max_history_length=2
+    )
+    new_message = AIMessage(content="new answer", id=MOCK_MESSAGE_ID)
+    memory.add_message(new_message)
+
+    with (
+        patch.object(memory.table, "query", wraps=memory.table.query) as mock_query,
+        patch.object(memory.table, "get_item") as mock_get_item,
+    ):
+        assert memory.messages == [HumanMessage(content="Human: old question"), new_message]
+    # the single-item history is read by the same query as the message items
+    mock_query.assert_called_once()
+    mock_get_item.assert_not_called()
+    assert memory.raw_messages == [
+        SystemMessage(content="some system message"),
+        HumanMessage(content="Human: old question"),
+        new_message,
+    ]
+
+
+def test_messages_reads_pages_until_token_budget_is_filled(setup_test_table):
+    # "Human: message N" is estimated at 6 tokens, plus 4 for the message
+    memory = DynamoDBMessageItemHistory(
+        table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, max_history_tokens=35
+    )
+    messages = [HumanMessage(content=f"message {i}", id=MOCK_MESSAGE_ID) for i in range(45)]
+    memory.add_messages(messages)
+
+    with (
+        patch.object(memory.table, "query", wraps=memory.table.query) as mock_query,
+        patch.object(memory.table, "get_item") as mock_get_item,
+    ):
+        assert memory.messages == messages[-3:]
+
+    mock_query.assert_called_once()
+    assert mock_query.call_args.kwargs["Limit"] == 20
+    mock_get_item.assert_not_called()
+
+    memory.max_history_tokens = 10 * 43
+    with patch.object(memory.table, "query", wraps=memory.table.query) as mock_query:
+        assert memory.messages == messages[-43:]
+    assert mock_query.call_count == 3
+
+
+def test_token_budget_includes_single_item_history(setup_test_table):
+    setup_test_table.Table(table_name).put_item(
+        Item={
+            "UserId": MOCK_USER_ID,
+            "ConversationId": MOCK_CONVERSATION_ID,
+            "History": [
+                {"type": "human", "data": {"content": "Human: very old question", "additional_kwargs": {}}},
+                {"type": "ai", "data": {"content": "AI: old answer", "additional_kwargs": {}}},
+            ],
+        }
+    )
+    memory = DynamoDBMessageItemHistory(
+        table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, max_history_tokens=20
+    )
+    new_message = AIMessage(content="new answer", id=MOCK_MESSAGE_ID)
+    memory.add_message(new_message)
+
+    assert memory.messages == [AIMessage(content="AI: old answer"), new_message]
+
+
+def test_messages_are_separated_by_conversation(setup_test_table):
+    memory1 = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, "conversation", MOCK_MESSAGE_ID)
+    memory2 = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, "conversation-2", MOCK_MESSAGE_ID)
+    # sorts between the record and the message items of the first conversation
+    memory3 = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, "conversation 3", MOCK_MESSAGE_ID)
+    message1 = HumanMessage(content="Hello AI!", id=MOCK_MESSAGE_ID)
+    message2 = HumanMessage(content="Hello from the other conversation!", id=MOCK_MESSAGE_ID)
+    message3 = HumanMessage(content="Hello from the third conversation!", id=MOCK_MESSAGE_ID)
+    memory1.add_message(message1)
+    memory2.add_message(message2)
+    memory3.add_message(message3)
+
+    assert memory1.raw_messages == [message1]
+    assert memory2.raw_messages == [message2]
+    assert memory3.raw_messages == [message3]
+
+
+def test_clear(setup_test_table):
+    setup_test_table.Table(table_name).put_item(
+        Item={"UserId": MOCK_USER_ID, "ConversationId": MOCK_CONVERSATION_ID, "History": []}
+    )
+    memory = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    other_memory = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, "other-conversation", MOCK_MESSAGE_ID)
+    for i in range(3):
+        memory.add_message(HumanMessage(content=f"message {i}", id=MOCK_MESSAGE_ID))
+    other_memory.add_message(HumanMessage(content="kept"))
+
+    memory.clear()
+
+    assert memory.raw_messages == []
+    items = setup_test_table.Table(table_name).scan()["Items"]
+    assert [item["ConversationId"] for item in items][0] == "other-conversation"
+    assert all(item["ConversationId"].startswith("other-conversation") for item in items)
+
+
+def test_query_error(caplog, setup_environment):
+    memory = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, 2)
+    with patch.object(memory.table, "query") as mock_query, patch.object(memory.table, "get_item"):
+        mock_query.side_effect = ClientError({"Error": {"Code": "GenericException", "Message": "query error"}}, "query")
+        assert memory.messages == []
+        assert "query error" in caplog.text
+
+
+def test_add_message_error(caplog, setup_environment):
+    memory = DynamoDBMessageItemHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID)
+    with patch.object(memory.table, "batch_writer") as mock_batch_writer:
+        mock_batch_writer.side_effect = ClientError(
+            {"Error": {"Code": "GenericException", "Message": "put error"}}, "batch_write_item"
+        )
+        memory.add_message(HumanMessage(content="Hello world!"))
+        assert "put error" in caplog.text
@@ -0,0 +1,147 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest.mock import Mock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from shared.memory.ddb_summarizing_message_history import SUMMARY_MESSAGE_PREFIX, SummarizingChatMessageHistory
+
+table_name = "my-test-table"
+MOCK_MESSAGE_ID = "fake-message-id"
+MOCK_CONVERSATION_ID = "fake-conversation-id"
+MOCK_USER_ID = "fake-user-id"
+
+
+@pytest.fixture
+def setup_test_table(dynamodb_resource):
+    dynamodb_resource.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {"AttributeName": "UserId", "KeyType": "HASH"},
+            {"AttributeName": "ConversationId", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "ConversationId", "AttributeType": "S"},
+            {"AttributeName": "UserId", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    yield dynamodb_resource
+
+
+def get_memory(**kwargs):
+    params = {"summary_threshold": 4, "summary_keep_messages": 2, **kwargs}
+    return SummarizingChatMessageHistory(table_name, MOCK_USER_ID, MOCK_CONVERSATION_ID, MOCK_MESSAGE_ID, **params)
+
+
+def add_turns(memory, count, start=0):
+    messages = []
+    for i in range(start, start + count):
+        messages.append(HumanMessage(content=f"question {i}", id=MOCK_MESSAGE_ID))
+        messages.append(AIMessage(content=f"answer {i}", id=MOCK_MESSAGE_ID))
+    memory.add_messages(messages)
+    return messages
+
+
+def test_compact_below_threshold_does_not_summarize(setup_test_table):
+    memory = get_memory()
+    messages = add_turns(memory, 2)
+    summarize = Mock()
+
+    assert memory.compact(summarize) == False
+    summarize.assert_not_called()
+    assert memory.messages == messages
+
+
+def test_compact_replaces_older_messages_with_summary(setup_test_table):
+    memory = get_memory()
+    messages = add_turns(memory, 3)
+    summarize = Mock(return_value=" the user asked questions 0 and 1 ")
+
+    assert get_memory().compact(summarize) == True
+
+    prompt = summarize.call_args.args[0]
+    assert "Human: question 0\nAI: answer 0\nHuman: question 1\nAI: answer 1" in prompt
+    assert "question 2" not in prompt
+
+    memory = get_memory()
+    assert memory.messages == [
+        SystemMessage(content=f"{SUMMARY_MESSAGE_PREFIX}the user asked questions 0 and 1"),
+        *messages[-2:],
+    ]
+    # the stored history is kept as is
+    assert memory.raw_messages == messages
+
+
+def test_compact_extends_previous_summary(setup_test_table):
+    memory = get_memory()
+    add_turns(memory, 3)
+    get_memory().compact(Mock(return_value="first summary"))
+
+    memory = get_memory()
+    messages = add_turns(memory, 2, start=3)
+    summarize = Mock(return_value="second summary")
+    assert get_memory().compact(summarize) == True
+
+    prompt = summarize.call_args.args[0]
+    assert "first summary" in prompt
+    assert "Human: question 2\nAI: answer 2\nHuman: question 3\nAI: answer 3" in prompt
+    assert "question 1" not in prompt
+    assert get_memory().messages == [SystemMessage(content=f"{SUMMARY_MESSAGE_PREFIX}second summary"), *messages[-2:]]
+
+
+def test_compact_does_not_overwrite_concurrent_summary(caplog, setup_test_table):
+    add_turns(get_memory(), 3)
+    memory = get_memory()
+    other = get_memory()
+    assert len(memory.messages) == len(other.messages) == 6
+
+    assert other.compact(Mock(return_value="other summary")) == True
+    assert memory.compact(Mock(return_value="stale summary")) == False
+    assert "changed since it was read" in caplog.text
+    assert get_memory().summary == "other summary"
+
+
+def test_compact_without_record_does_not_create_one(setup_test_table):
+    memory = get_memory(summary_threshold=1, summary_keep_messages=0)
+    # the record was deleted after this history was read
+    memory.set_history_item({"History": [{"type": "human", "data": {"content": "Human: hello"}}] * 2})
+    assert memory.compact(Mock(return_value="summary")) == False
+    assert setup_test_table.Table(table_name).scan()["Items"] == []
+
+
+def test_messages_fit_token_budget_with_summary(setup_test_table):
+    add_turns(get_memory(), 3)
+    get_memory().compact(Mock(return_value="short"))
+
+    # the summary message is estimated at 11 tokens, and every remaining message at 10
+    memory = get_memory(max_history_tokens=25)
+    assert memory.messages == [
+        SystemMessage(content=f"{SUMMARY_MESSAGE_PREFIX}short"),
+        AIMessage(content="AI: answer 2", id=MOCK_MESSAGE_ID),
+    ]
+
+
+def test_store_summary_error(caplog, setup_environment, setup_test_table):
+    memory = get_memory()
+    add_turns(memory, 3)
+    with patch.object(memory.table, "update_item") as mock_update_item:
+        mock_update_item.side_effect = ClientError(
+            {"Error": {"Code": "GenericException", "Message": "update error"}}, "update_item"
+        )
+        assert memory.compact(Mock(return_value="summary")) == False
+    assert "update error" in caplog.text
+    assert memory.summary is None
+
+
+def test_clear_removes_summary(setup_test_table):
+    memory = get_memory()
+    add_turns(memory, 3)
+    memory.compact(Mock(return_value="summary"))
+
+    memory.clear()
+    assert memory.messages == []
+    assert get_memory().summary is None
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from unittest.mock import patch
+
+from utils.cache import TTLCache
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache(ttl=10)
+    with patch("utils.cache.time.monotonic", return_value=100):
+        cache.put("key", "value")
+        assert cache.get("key") == "value"
+
+    with patch("utils.cache.time.monotonic", return_value=110):
+        assert cache.get("key") is None
+        assert cache.get("key", "default") == "default"
+        entry = cache.get_entry("key")
+        assert entry.value == "value"
+        assert entry.expired
+
+        cache.touch("key", ttl=5)
+        assert cache.get("key") == "value"
+
+
+def test_ttl_cache_per_entry_ttl():
+    cache = TTLCache(ttl=10)
+    with patch("utils.cache.time.monotonic", return_value=100):
+        cache.put("short", "value", ttl=1)
+        cache.put("long", "value")
+
+    with patch("utils.cache.time.monotonic", return_value=105):
+        assert cache.get("short") is None
+        assert cache.get("long") == "value"
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(ttl=10, max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_invalidate_and_clear():
+    cache = TTLCache(ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get_entry("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_ttl_cache_expire_all():
+    cache = TTLCache(ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2, ttl=60)
+
+    cache.expire_all()
+
+    assert cache.get("a") is None
+    assert cache.get_entry("b").expired
+    assert cache.get_entry("b").value == 2
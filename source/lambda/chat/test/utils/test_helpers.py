@@ -3,7 +3,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import pytest
-from utils.helpers import count_keys, pop_null_values, type_cast, validate_prompt_placeholders
+from utils.helpers import (
+    count_keys,
+    estimate_tokens,
+    lexical_similarity,
+    pop_null_values,
+    type_cast,
+    validate_prompt_placeholders,
+)
 
 
 @pytest.mark.parametrize(
@@ -128,6 +135,35 @@ def test_count_keys(input_dict, expected_count):
     assert count_keys(input_dict) == expected_count
 
 
+@pytest.mark.parametrize(
+    "text,expected_tokens",
+    [
+        ("", 0),
+        (None, 0),
+        ("Hello", 2),
+        ("Hello world!", 5),
+        ("  spaces\n\tdo not count  ", 6),
+        ("a-b", 3),
+    ],
+)
+def test_estimate_tokens(text, expected_tokens):
+    assert estimate_tokens(text) == expected_tokens
+
+
+@pytest.mark.parametrize(
+    "text,other_text,expected_similarity",
+    [
+        ("", None, 1.0),
+        ("What is Lambda?", "what is lambda", 1.0),
+        ("What is it?", "What is Lambda?", 0.5),
+        ("What is it?", "How much does S3 cost", 0.0),
+        ("Is it free", "", 0.0),
+    ],
+)
+def test_lexical_similarity(text, other_text, expected_similarity):
+    assert lexical_similarity(text, other_text) == expected_similarity
+
+
 @pytest.mark.parametrize(
     "input_dict,expected_dict",
     [
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import contextvars
+import json
+import threading
+from unittest.mock import Mock
+
+from aws_lambda_powertools.metrics import MetricUnit
+from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
+from utils.helpers import get_metrics_client
+from utils.request_metrics import RequestMetrics, RequestScopedMetrics, get_request_metrics, request_metrics_scope
+
+
+def emitted_documents(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+
+
+def test_metrics_are_summed_per_dimension_set():
+    request_metrics = RequestMetrics(service="test-service")
+    namespace = CloudWatchNamespaces.AWS_BEDROCK.value
+    for _ in range(3):
+        request_metrics.add_metric(namespace, "OutputTokenCount", MetricUnit.Count, 10)
+    request_metrics.add_dimension(namespace, "StopReasonType", "EndTurn")
+    request_metrics.add_metric(namespace, "StopReason", MetricUnit.Count, 1)
+    request_metrics.close_dimensions(namespace)
+    request_metrics.add_metric(CloudWatchNamespaces.LANGCHAIN_LLM.value, "LangchainQueries", "Count", 1)
+
+    documents = request_metrics.serialize()
+
+    assert len(request_metrics) == 3
+    assert len(documents) == 1
+    document = documents[0]
+    assert document["service"] == "test-service"
+    assert document["OutputTokenCount"] == 30
+    assert document["StopReason"] == 1
+    assert document["StopReasonType"] == "EndTurn"
+    assert document["LangchainQueries"] == 1
+    assert document["_aws"]["CloudWatchMetrics"] == [
+        {
+            "Namespace": namespace,
+            "Dimensions": [["service"]],
+            "Metrics": [{"Name": "OutputTokenCount", "Unit": "Count"}],
+        },
+        {
+            "Namespace": namespace,
+            "Dimensions": [["service", "StopReasonType"]],
+            "Metrics": [{"Name": "StopReason", "Unit": "Count"}],
+        },
+        {
+            "Namespace": CloudWatchNamespaces.LANGCHAIN_LLM.value,
+            "Dimensions": [["service"]],
+            "Metrics": [{"Name": "LangchainQueries", "Unit": "Count"}],
+        },
+    ]
+
+
+def test_repeated_values_are_kept_for_metrics_other_than_counts():
+    request_metrics = RequestMetrics(service="test-service")
+    namespace = CloudWatchNamespaces.LANGCHAIN_LLM.value
+    for latency in [0.5, 1.5]:
+        request_metrics.add_metric(namespace, "RetrievalPipelineTime", MetricUnit.Seconds, latency)
+    request_metrics.add_metric(namespace, "LangchainQueryProcessingTime", MetricUnit.Seconds, 2.0)
+
+    document = request_metrics.serialize()[0]
+
+    assert document["RetrievalPipelineTime"] == [0.5, 1.5]
+    assert document["LangchainQueryProcessingTime"] == 2.0
+
+
+def test_conflicting_dimension_sets_are_split():
+    request_metrics = RequestMetrics(service="test-service")
+    namespace = CloudWatchNamespaces.AWS_BEDROCK.value
+    for stop_reason in ["EndTurn", "MaxTokens"]:
+        request_metrics.add_dimension(namespace, "StopReasonType", stop_reason)
+        request_metrics.add_metric(namespace, "StopReason", MetricUnit.Count, 1)
+        request_metrics.close_dimensions(namespace)
+
+    documents = request_metrics.serialize()
+
+    assert [document["StopReasonType"] for document in documents] == ["EndTurn", "MaxTokens"]
+
+
+def test_scope_emits_one_document(capsys):
+    client = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
+    with request_metrics_scope() as request_metrics:
+        assert get_request_metrics() is request_metrics
+        for _ in range(5):
+            client.add_metric(name=CloudWatchMetrics.LANGCHAIN_QUERY.value, unit=MetricUnit.Count, value=1)
+            client.flush_metrics()
+        assert emitted_documents(capsys) == []
+
+    assert get_request_metrics() is None
+    documents = emitted_documents(capsys)
+    assert len(documents) == 1
+    assert documents[0][CloudWatchMetrics.LANGCHAIN_QUERY.value] == 5
+
+    # nothing is recorded, nothing is emitted
+    with request_metrics_scope():
+        pass
+    assert emitted_documents(capsys) == []
+
+
+def test_scope_is_shared_with_context_copies(capsys):
+    client = get_metrics_client(CloudWatchNamespaces.AWS_BEDROCK)
+    with request_metrics_scope() as request_metrics:
+        context = contextvars.copy_context()
+        worker = threading.Thread(
+            target=context.run,
+            args=(client.add_metric,),
+            kwargs={"name": "InputTokenCount", "unit": MetricUnit.Count, "value": 7},
+        )
+        worker.start()
+        worker.join()
+        assert len(request_metrics) == 1
+
+    assert emitted_documents(capsys)[0]["InputTokenCount"] == 7
+
+
+def test_client_outside_scope_uses_powertools_metrics():
+    powertools_metrics = Mock()
+    client = RequestScopedMetrics(powertools_metrics, CloudWatchNamespaces.AWS_BEDROCK)
+
+    client.add_dimension(name="StopReasonType", value="EndTurn")
+    client.add_metric(name="StopReason", unit=MetricUnit.Count, value=1)
+    client.flush_metrics()
+
+    powertools_metrics.add_dimension.assert_called_once_with(name="StopReasonType", value="EndTurn")
+    powertools_metrics.add_metric.assert_called_once_with(name="StopReason", unit=MetricUnit.Count, value=1)
+    powertools_metrics.flush_metrics.assert_called_once_with(raise_on_empty_metrics=False)
+
+
+def test_close_dimensions(capsys):
+    client = get_metrics_client(CloudWatchNamespaces.LANGCHAIN_LLM)
+    with request_metrics_scope():
+        client.add_dimension(name="RetrievalPath", value="Direct")
+        client.add_metric(name=CloudWatchMetrics.RETRIEVAL_PIPELINE_TIME.value, unit=MetricUnit.Seconds, value=1)
+        client.close_dimensions()
+        client.add_metric(name=CloudWatchMetrics.LANGCHAIN_QUERY.value, unit=MetricUnit.Count, value=1)
+
+    directives = emitted_documents(capsys)[0]["_aws"]["CloudWatchMetrics"]
+    metric_dimensions = {
+        metric["Name"]: directive["Dimensions"] for directive in directives for metric in directive["Metrics"]
+    }
+    assert metric_dimensions == {
+        CloudWatchMetrics.RETRIEVAL_PIPELINE_TIME.value: [["service", "RetrievalPath"]],
+        CloudWatchMetrics.LANGCHAIN_QUERY.value: [["service"]],
+    }
+
+
+def test_close_dimensions_outside_scope_flushes():
+    powertools_metrics = Mock()
+    client = RequestScopedMetrics(powertools_metrics, CloudWatchNamespaces.AWS_BEDROCK)
+
+    client.close_dimensions()
+
+    powertools_metrics.flush_metrics.assert_called_once_with()
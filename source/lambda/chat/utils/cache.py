@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+
+@dataclass
+class CacheEntry:
+    """
+    A single value held by the TTLCache along with the time (as per time.monotonic) at which it stops being fresh.
+    Expired entries are still returned by TTLCache.get_entry so that callers can revalidate them cheaply instead of
+    rebuilding the value from scratch.
+    """
+
+    value: Any
+    expires_at: float
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class TTLCache:
+    """
+    Thread-safe, process-level cache with a per-entry time-to-live and an optional LRU size bound. Instances are meant
+    to be created at module level so that warm Lambda containers can reuse values across invocations.
+
+    Attributes:
+        ttl (float): Default time-to-live in seconds, used when put() is not given an explicit ttl
+        max_size (Optional[int]): Maximum number of entries to hold. Least recently used entries are evicted first.
+            None means the cache is unbounded.
+
+    Methods:
+        get(key, default): Returns the value for key if present and not expired, else default
+        get_entry(key): Returns the CacheEntry for key, including expired entries, or None if absent
+        put(key, value, ttl): Stores value for key for ttl seconds
+        touch(key, ttl): Extends the expiry of an existing entry without replacing its value
+        invalidate(key): Removes the entry for key
+        expire_all(): Marks all entries as expired, keeping their values for revalidation
+        clear(): Removes all entries
+    """
+
+    def __init__(self, ttl: float = 0, max_size: Optional[int] = None) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        if entry is None or entry.expired:
+            return default
+        return entry.value
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, expires_at=time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def touch(self, key: Hashable, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + ttl
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def expire_all(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry.expires_at = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -17,6 +17,28 @@ DDB_MESSAGE_TTL_ENV_VAR = "DDB_MESSAGE_TTL"
 USE_CASE_UUID_ENV_VAR = "USE_CASE_UUID"
 TRACE_ID_ENV_VAR = "_X_AMZN_TRACE_ID"
 MODEL_INFO_TABLE_NAME_ENV_VAR = "MODEL_INFO_TABLE_NAME"
+USE_CASE_CONFIG_CACHE_TTL_ENV_VAR = "USE_CASE_CONFIG_CACHE_TTL"
+MODEL_DEFAULTS_CACHE_TTL_ENV_VAR = "MODEL_DEFAULTS_CACHE_TTL"
+STREAMING_COALESCE_WINDOW_MS_ENV_VAR = "STREAMING_COALESCE_WINDOW_MS"
+STREAMING_COALESCE_MAX_BYTES_ENV_VAR = "STREAMING_COALESCE_MAX_BYTES"
+STREAMING_SEND_QUEUE_SIZE_ENV_VAR = "STREAMING_SEND_QUEUE_SIZE"
+RECORD_PROCESSING_CONCURRENCY_ENV_VAR = "RECORD_PROCESSING_CONCURRENCY"
+CONVERSATION_HISTORY_LAYOUT_ENV_VAR = "CONVERSATION_HISTORY_LAYOUT"
+CONVERSATION_HISTORY_WINDOW_ENV_VAR = "CONVERSATION_HISTORY_WINDOW"
+CONVERSATION_HISTORY_BUDGET_PERCENT_ENV_VAR = "CONVERSATION_HISTORY_BUDGET_PERCENT"
+CONVERSATION_SUMMARY_THRESHOLD_ENV_VAR = "CONVERSATION_SUMMARY_THRESHOLD"
+CONVERSATION_SUMMARY_KEEP_MESSAGES_ENV_VAR = "CONVERSATION_SUMMARY_KEEP_MESSAGES"
+RETRIEVAL_CACHE_TTL_ENV_VAR = "RETRIEVAL_CACHE_TTL"
+RETRIEVAL_CACHE_TABLE_NAME_ENV_VAR = "RETRIEVAL_CACHE_TABLE_NAME"
+ANSWER_CACHE_TTL_ENV_VAR = "ANSWER_CACHE_TTL"
+ANSWER_CACHE_SIMILARITY_ENV_VAR = "ANSWER_CACHE_SIMILARITY"
+SPECULATIVE_RETRIEVAL_SIMILARITY_ENV_VAR = "SPECULATIVE_RETRIEVAL_SIMILARITY"
+DISAMBIGUATION_CLASSIFIER_ENV_VAR = "DISAMBIGUATION_CLASSIFIER"
+DOCUMENT_PACKING_SIMILARITY_ENV_VAR = "DOCUMENT_PACKING_SIMILARITY"
+KNOWLEDGE_BASE_DEADLINE_MS_ENV_VAR = "KNOWLEDGE_BASE_DEADLINE_MS"
+CONTAINER_PRIMING_ENV_VAR = "CONTAINER_PRIMING"
+# set by Lambda to on-demand, provisioned-concurrency or snap-start while the execution environment initializes
+LAMBDA_INITIALIZATION_TYPE_ENV_VAR = "AWS_LAMBDA_INITIALIZATION_TYPE"
 CHAT_REQUIRED_ENV_VARS = [
     USE_CASE_CONFIG_TABLE_NAME_ENV_VAR,
     USE_CASE_CONFIG_RECORD_KEY_ENV_VAR,
@@ -26,6 +48,9 @@ CHAT_REQUIRED_ENV_VARS = [
     MODEL_INFO_TABLE_NAME_ENV_VAR,
 ]
 LLM_CONFIG_RECORD_FIELD_NAME = "key"
+# Config records are immutable per key: updates write a new record and stamp a TTL on the old one, so the TTL
+# attribute doubles as the version marker used to revalidate a cached config
+LLM_CONFIG_VERSION_FIELD_NAME = "TTL"
 RAG_CHAT_IDENTIFIER = "RAGChat"
 CHAT_IDENTIFIER = "Chat"
 TEMPERATURE_PLACEHOLDER = "<<temperature>>"
@@ -47,6 +72,50 @@ MESSAGE_KEY = "message"
 END_CONVERSATION_TOKEN = "##END_CONVERSATION##"
 METRICS_SERVICE_NAME = f"GAABUseCase-{os.getenv(USE_CASE_UUID_ENV_VAR)}"
 DEFAULT_DDB_MESSAGE_TTL = 60 * 60 * 24  # 24 hours in seconds
+DEFAULT_CONVERSATION_HISTORY_LAYOUT = "SingleItem"
+CHAT_HISTORY_VERSION_FIELD_NAME = "Version"  # incremented on every append to a single-item history
+CHAT_HISTORY_MAX_WRITE_ATTEMPTS = 3
+MESSAGE_ITEM_SORT_KEY_SEPARATOR = "#"
+MESSAGE_ITEMS_TTL_FIELD_NAME = "MessageItemsTTL"  # earliest TTL of the message items, kept on the conversation's record
+DEFAULT_CONVERSATION_HISTORY_WINDOW = "MessageCount"
+DEFAULT_CONVERSATION_HISTORY_BUDGET_PERCENT = 50  # share of the room left by the template and question, with RAG
+CHARACTERS_PER_TOKEN = 4  # average for English text with the tokenizers of the supported models
+CHAT_HISTORY_MESSAGE_TOKEN_OVERHEAD = 4  # role and separator tokens added to every message in the prompt
+CHAT_HISTORY_QUERY_PAGE_SIZE = 20  # message items read per query when filling a token budget
+CHAT_HISTORY_SUMMARY_FIELD_NAME = "Summary"
+CHAT_HISTORY_SUMMARIZED_COUNT_FIELD_NAME = "SummarizedCount"  # number of History messages covered by the Summary
+DEFAULT_CONVERSATION_SUMMARY_THRESHOLD = 0  # 0 never summarises; otherwise the unsummarised messages that trigger it
+DEFAULT_CONVERSATION_SUMMARY_KEEP_MESSAGES = 4  # most recent messages always sent verbatim
+DEFAULT_USE_CASE_CONFIG_CACHE_TTL = 60  # seconds a warm container serves the use case config without revalidating
+DEFAULT_MODEL_DEFAULTS_CACHE_TTL = 60 * 15  # 15 minutes in seconds
+DEFAULT_MODEL_DEFAULTS_NEGATIVE_CACHE_TTL = 60  # seconds a missing model-info record is remembered
+MODEL_DEFAULTS_BATCH_GET_MAX_ATTEMPTS = 3
+DEFAULT_STREAMING_COALESCE_WINDOW_MS = 0  # 0 posts every token as it arrives; 30-50 ms is a good coalescing window
+DEFAULT_STREAMING_COALESCE_MAX_BYTES = 512
+DEFAULT_STREAMING_SEND_QUEUE_SIZE = 0  # 0 posts on the calling thread; a positive size enables the background sender
+DEFAULT_WEBSOCKET_SENDER_IDLE_TIMEOUT = 5  # seconds the background sender thread waits for payloads before exiting
+DEFAULT_RECORD_PROCESSING_CONCURRENCY = 1  # 1 processes the batch sequentially; more runs connections concurrently
+MIN_REMAINING_TIME_FOR_RECORD_MS = 20000  # records are returned as batch failures when less time than this is left
+DEFAULT_CONTAINER_PRIMING = "false"  # "true" builds the clients, config and runnable while Lambda initializes
+PRIMING_ID = "container-priming"  # connection, conversation and user ID of the model built while priming
+DEFAULT_RETRIEVAL_CACHE_TTL = 0  # 0 disables the retrieval cache; otherwise seconds a retrieval result is reused
+DEFAULT_RETRIEVAL_CACHE_SIZE = 256  # retrieval results a warm container keeps
+DEFAULT_ANSWER_CACHE_TTL = 0  # 0 disables the answer cache; otherwise seconds a generated answer is reused
+DEFAULT_ANSWER_CACHE_SIZE = 256  # answers a warm container keeps
+DEFAULT_ANSWER_CACHE_SIMILARITY = 0.9  # estimated Jaccard similarity at which two questions share an answer
+ANSWER_CACHE_SHINGLE_SIZE = 3  # characters per shingle of a normalised question
+ANSWER_CACHE_MINHASH_PERMUTATIONS = 64  # length of the MinHash signature of a question
+ANSWER_CACHE_LSH_BANDS = 16  # signature bands indexed to find candidate near-duplicate questions
+DEFAULT_SPECULATIVE_RETRIEVAL_SIMILARITY = 0  # 0 disables speculative retrieval; otherwise the similarity to keep it
+DEFAULT_DISAMBIGUATION_CLASSIFIER = "None"  # None disambiguates every question asked with history
+MIN_SELF_CONTAINED_QUESTION_WORDS = 4  # shorter questions are taken as fragments of the conversation
+DEFAULT_DOCUMENT_PACKING_SIMILARITY = 0  # 0 disables document packing; otherwise the similarity of near-duplicates
+DOCUMENT_PACKING_SHINGLE_SIZE = 3  # words per shingle of a retrieved passage
+DEFAULT_KNOWLEDGE_BASE_DEADLINE_MS = 5000  # milliseconds each knowledge base of a composite knowledge base is given
+RECIPROCAL_RANK_FUSION_CONSTANT = 60  # dampens the weight of the top ranks when fusing knowledge base results
+DEFAULT_JSONPATH_CACHE_SIZE = 32  # parsed JSONPath expressions a warm container keeps
+DEFAULT_RUNNABLE_CACHE_SIZE = 16  # distinct use case configs whose LangChain graphs a warm container keeps
+SESSION_HISTORY_CACHE_SIZE = 32  # histories of the requests of a batch kept until their conversations are compacted
 DEFAULT_RAG_CHAIN_TYPE = "stuff"
 DEFAULT_KENDRA_NUMBER_OF_DOCS = 2
 DEFAULT_BEDROCK_KNOWLEDGE_BASE_NUMBER_OF_DOCS = 2
@@ -64,6 +133,9 @@ DEFAULT_RETURN_GENERATED_RAG_QUESTION = True
 DEFAULT_REPHRASE_RAG_QUESTION = True
 SOURCE_DOCUMENTS_RECEIVED_KEY = "context"
 SOURCE_DOCUMENTS_OUTPUT_KEY = "source_documents"
+DROPPED_SOURCE_DOCUMENTS_OUTPUT_KEY = "dropped_source_documents"
+KNOWLEDGE_BASE_ORIGIN_KEY = "knowledge_base_origin"
+RANK_FUSION_SCORE_KEY = "rank_fusion_score"
 LLM_RESPONSE_KEY = "answer"
 DEFAULT_SAGEMAKER_MODEL_ID = "default"
 HISTORY_KEY = "history"
@@ -76,11 +148,19 @@ SYSTEM_PREFIX = "system"
 USER_ID_KEY = "user_id"
 CONVERSATION_ID_KEY = "conversation_id"
 MESSAGE_ID_KEY = "message_id"
+REQUEST_CALLBACKS_KEY = "request_callbacks"
+REQUEST_RETRIEVER_KEY = "request_retriever"
 RAG_CONVERSATION_TRACER_KEY = "retrievalAugmentedConversationInvocation"
 CONVERSATION_TRACER_KEY = "conversationInvocation"
 PAYLOAD_DATA_KEY = "data"
 PAYLOAD_SOURCE_DOCUMENT_KEY = "sourceDocument"
 REPHRASED_QUERY_KEY = "rephrased_query"
+RETRIEVED_DOCUMENTS_KEY = "retriever"
+RETRIEVAL_RESULTS_KEY = "retrieval_results"
+SPECULATIVE_DOCUMENTS_KEY = "speculative_documents"
+SELF_CONTAINED_KEY = "self_contained"
+DROPPED_DOCUMENTS_KEY = "dropped_documents"
+RETRIEVAL_PATH_DIMENSION = "RetrievalPath"
 
 SAGEMAKER_ENDPOINT_ARGS = [
     "CustomAttributes",
@@ -18,6 +18,37 @@ class ConversationMemoryTypes(str, Enum):
     DynamoDB = "DynamoDB"
 
 
+class ConversationHistoryLayouts(str, Enum):
+    """Supported ways of storing a conversation in the DynamoDB conversation table"""
+
+    SINGLE_ITEM = "SingleItem"  # the whole history in one item per conversation
+    MESSAGE_ITEMS = "MessageItems"  # one item per message
+
+
+class ConversationHistoryWindows(str, Enum):
+    """Supported ways of choosing the messages of a conversation history that are sent to the LLM"""
+
+    MESSAGE_COUNT = "MessageCount"  # the last ChatHistoryLength messages
+    TOKEN_BUDGET = "TokenBudget"  # the most recent messages that fit a token budget derived from MaxPromptSize
+
+
+class RetrievalPaths(str, Enum):
+    """Ways in which the documents for a RAG question are retrieved, used as the RetrievalPath metric dimension"""
+
+    DIRECT = "Direct"  # no history, the question is retrieved for as asked
+    SEQUENTIAL = "Sequential"  # the question is rephrased, then retrieved for
+    SPECULATIVE_KEPT = "SpeculativeKept"  # retrieved for as asked while rephrasing, and the rephrasing was close
+    SPECULATIVE_RETRIED = "SpeculativeRetried"  # retrieved for as asked while rephrasing, then for the rephrasing
+    SELF_CONTAINED = "SelfContained"  # history is available, but the question needs none and is retrieved for as asked
+
+
+class DisambiguationClassifiers(str, Enum):
+    """Supported ways of deciding which questions asked with history skip the disambiguation LLM call"""
+
+    NONE = "None"  # every question asked with history is disambiguated
+    HEURISTIC = "Heuristic"  # questions without pronouns or references to earlier turns skip disambiguation
+
+
 class LLMProviderTypes(str, Enum):
     """Supported provider types that can be used to create an LLM"""
 
@@ -79,12 +110,26 @@ class CloudWatchMetrics(str, Enum):
     BEDROCK_KNOWLEDGE_BASE_FETCHED_DOCUMENTS = "BedrockKnowledgeBaseFetchedDocuments"
     BEDROCK_KNOWLEDGE_BASE_FAILURES = "BedrockKnowledgeBaseFailures"
     BEDROCK_KNOWLEDGE_BASE_NO_HITS = "BedrockKnowledgeBaseRetrieveNoHits"
+    RETRIEVAL_CACHE_HITS = "RetrievalCacheHits"
+    RETRIEVAL_CACHE_SHARED_HITS = "RetrievalCacheSharedHits"
+    RETRIEVAL_CACHE_MISSES = "RetrievalCacheMisses"
+    ANSWER_CACHE_HITS = "AnswerCacheHits"
+    ANSWER_CACHE_MISSES = "AnswerCacheMisses"
+    RETRIEVAL_PIPELINE_TIME = "RetrievalPipelineTime"
+    DISAMBIGUATION_SKIPPED = "DisambiguationSkipped"
+    DISAMBIGUATION_INVOKED = "DisambiguationInvoked"
+    PACKING_DROPPED_DOCUMENTS = "PackingDroppedDocuments"
+    COMPOSITE_RETRIEVAL_TIME = "CompositeRetrievalTime"
+    KNOWLEDGE_BASE_DEADLINE_EXCEEDED = "KnowledgeBaseDeadlineExceeded"
     BEDROCK_MODEL_INVOCATION_FAILURE = "BedrockModelInvocationFailures"
     LLM_INPUT_TOKEN_COUNT = "InputTokenCount"
     LLM_OUTPUT_TOKEN_COUNT = "OutputTokenCount"
     LLM_TOTAL_TOKEN_COUNT = "TotalTokenCount"
+    LLM_CACHE_READ_INPUT_TOKEN_COUNT = "CacheReadInputTokenCount"
+    LLM_CACHE_WRITE_INPUT_TOKEN_COUNT = "CacheWriteInputTokenCount"
     LLM_STOP_REASON = "StopReason"
     SAGEMAKER_MODEL_INVOCATION_FAILURE = "SagemakerModelInvocationFailures"
+    SAGEMAKER_TIME_TO_FIRST_TOKEN = "SagemakerTimeToFirstToken"
     UC_INITIATION_SUCCESS = "UCInitiationSuccess"
     UC_INITIATION_FAILURE = "UCInitiationFailure"
     UC_UPDATE_SUCCESS = "UCUpdateSuccess"
@@ -9,8 +9,9 @@ from typing import Any, Dict, List, Optional, Union
 
 from aws_lambda_powertools import Logger, Metrics, Tracer
 from aws_lambda_powertools.metrics import MetricUnit
-from utils.constants import METRICS_SERVICE_NAME, TRACE_ID_ENV_VAR
+from utils.constants import CHARACTERS_PER_TOKEN, METRICS_SERVICE_NAME, TRACE_ID_ENV_VAR
 from utils.enum_types import CloudWatchMetrics, CloudWatchNamespaces
+from utils.request_metrics import RequestScopedMetrics
 
 logger = Logger(utc=True)
 tracer = Tracer()
@@ -27,12 +28,14 @@ TYPE_CASTING_MAP = {
 
 
 @tracer.capture_method
-def get_metrics_client(metric_namespace: CloudWatchNamespaces) -> Metrics:
+def get_metrics_client(metric_namespace: CloudWatchNamespaces) -> RequestScopedMetrics:
     global _metrics_var
 
     if metric_namespace not in _metrics_var:
         logger.debug(f"Cache miss for {metric_namespace}. Creating a new one and cache it")
-        _metrics_var[metric_namespace] = Metrics(namespace=metric_namespace.value, service=METRICS_SERVICE_NAME)
+        _metrics_var[metric_namespace] = RequestScopedMetrics(
+            Metrics(namespace=metric_namespace.value, service=METRICS_SERVICE_NAME), metric_namespace
+        )
 
     return _metrics_var[metric_namespace]
 
@@ -170,6 +173,41 @@ def enforce_stop_tokens(text: str, stop: List[str]) -> str:
     return re.split("|".join(stop), text, maxsplit=1)[0]
 
 
+# words and single punctuation characters, which tokenizers almost never merge with their neighbours
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens a model's tokenizer produces for the text, without calling the model. Every word
+    counts as one token per CHARACTERS_PER_TOKEN characters (rounded up) and every punctuation character as one token.
+    Args:
+        text (str): The text to estimate the token count of.
+    Returns:
+        int: The estimated number of tokens.
+    """
+    if not text:
+        return 0
+    return sum(-(-len(piece) // CHARACTERS_PER_TOKEN) for piece in TOKEN_PIECE_PATTERN.findall(text))
+
+
+def lexical_similarity(text: str, other_text: str) -> float:
+    """
+    Returns the Jaccard similarity of the case folded words of the two texts, from 0 (no word in common) to 1 (the same
+    words, in any order). Two empty texts are identical.
+    Args:
+        text (str): The first text.
+        other_text (str): The second text.
+    Returns:
+        float: The lexical similarity of the texts.
+    """
+    words = set(re.findall(r"\w+", (text or "").casefold()))
+    other_words = set(re.findall(r"\w+", (other_text or "").casefold()))
+    if not words and not other_words:
+        return 1.0
+    return len(words & other_words) / len(words | other_words)
+
+
 def count_keys(input_dict: Dict) -> int:
     """
     Counts the number of keys in a nested dictionary recursively
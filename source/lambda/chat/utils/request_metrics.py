@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from aws_lambda_powertools import Logger, Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.metrics.functions import is_metrics_disabled
+from utils.constants import METRICS_SERVICE_NAME
+from utils.enum_types import CloudWatchNamespaces
+
+logger = Logger(utc=True)
+
+_current_request_metrics: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+
+# (namespace, sorted dimension items)
+DimensionSetKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class RequestMetrics:
+    """
+    Accumulates the metrics recorded while processing a single request (one SQS record) and publishes them as a single
+    CloudWatch Embedded Metric Format (EMF) document, instead of serialising and printing a document every time a
+    metric is flushed.
+
+    Values recorded for the same count metric, namespace and dimensions are summed. Other metrics (e.g. latencies)
+    keep every value and are published as an array, as the powertools Metrics client does, so that their Average,
+    SampleCount and percentiles are unchanged. As with the powertools Metrics client, a dimension added for a namespace
+    applies to the metrics recorded after it until that namespace is flushed; here flushing only closes the dimension
+    set and nothing is printed until emit() is called.
+
+    Attributes:
+        service (str): Value of the "service" dimension added to every metric, matching the powertools Metrics client
+
+    Methods:
+        add_metric(namespace, name, unit, value): Records value for the metric under the namespace's current dimensions
+        add_dimension(namespace, name, value): Adds a dimension to the metrics recorded next for the namespace
+        close_dimensions(namespace): Clears the dimensions added for the namespace
+        serialize(): Returns the EMF documents for the accumulated metrics
+        emit(): Prints the EMF documents for the accumulated metrics and clears them
+        clear(): Drops the accumulated metrics without publishing them
+    """
+
+    def __init__(self, service: str = METRICS_SERVICE_NAME) -> None:
+        self.service = service
+        self._lock = threading.Lock()
+        self._values: Dict[DimensionSetKey, Dict[str, Dict[str, Any]]] = {}
+        self._dimensions: Dict[str, Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(metrics) for metrics in self._values.values())
+
+    def add_metric(self, namespace: str, name: str, unit: Union[MetricUnit, str], value: float) -> None:
+        unit = unit.value if isinstance(unit, MetricUnit) else unit
+        with self._lock:
+            dimensions = tuple(sorted(self._dimensions.get(namespace, {}).items()))
+            metrics = self._values.setdefault((namespace, dimensions), {})
+            metric = metrics.setdefault(name, {"Unit": unit, "Values": []})
+            if unit == MetricUnit.Count.value and metric["Values"]:
+                metric["Values"][0] += value
+            else:
+                metric["Values"].append(value)
+
+    def add_dimension(self, namespace: str, name: str, value: str) -> None:
+        with self._lock:
+            self._dimensions.setdefault(namespace, {})[name] = str(value)
+
+    def close_dimensions(self, namespace: str) -> None:
+        with self._lock:
+            self._dimensions.pop(namespace, None)
+
+    def serialize(self) -> List[Dict[str, Any]]:
+        """
+        Builds the EMF documents for the accumulated metrics. Every namespace and dimension set becomes one entry of
+        the document's CloudWatchMetrics directives, so a request normally produces a single document. A second
+        document is only started when two dimension sets would need different values for the same top level key
+        (e.g. the same metric name recorded with two different dimension values).
+
+        Returns:
+            List[Dict[str, Any]]: the EMF documents, empty if no metrics were recorded
+        """
+        with self._lock:
+            values = {
+                key: {
+                    name: {"Unit": metric["Unit"], "Values": list(metric["Values"])} for name, metric in metrics.items()
+                }
+                for key, metrics in self._values.items()
+            }
+
+        timestamp = int(time.time() * 1000)
+        documents: List[Dict[str, Any]] = []
+        for (namespace, dimensions), metrics in values.items():
+            members = {"service": self.service, **dict(dimensions)}
+            members.update(
+                {
+                    name: metric["Values"][0] if len(metric["Values"]) == 1 else metric["Values"]
+                    for name, metric in metrics.items()
+                }
+            )
+            directive = {
+                "Namespace": namespace,
+                "Dimensions": [["service", *[name for name, _ in dimensions]]],
+                "Metrics": [{"Name": name, "Unit": metric["Unit"]} for name, metric in metrics.items()],
+            }
+
+            document = next((doc for doc in documents if self._can_merge(doc, members, metrics)), None)
+            if document is None:
+                document = {"_aws": {"Timestamp": timestamp, "CloudWatchMetrics": []}}
+                documents.append(document)
+            document["_aws"]["CloudWatchMetrics"].append(directive)
+            document.update(members)
+        return documents
+
+    def emit(self) -> None:
+        """Prints the EMF documents for the accumulated metrics, unless metrics are disabled, and clears them."""
+        documents = self.serialize()
+        self.clear()
+
+        if not documents or is_metrics_disabled():
+            return
+        logger.debug(f"Publishing {len(documents)} request metrics document(s)")
+        for document in documents:
+            print(json.dumps(document, separators=(",", ":")))
+
+    def clear(self) -> None:
+        """Drops the accumulated metrics and dimensions without publishing them."""
+        with self._lock:
+            self._values.clear()
+            self._dimensions.clear()
+
+    @staticmethod
+    def _can_merge(document: Dict[str, Any], members: Dict[str, Any], metrics: Dict[str, Any]) -> bool:
+        for key, value in members.items():
+            if key not in document:
+                continue
+            # metric values are never shared between directives; dimension values can be, if they are equal
+            if key in metrics or document[key] != value:
+                return False
+        return True
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """Returns the RequestMetrics of the request being processed, or None outside of request_metrics_scope."""
+    return _current_request_metrics.get()
+
+
+@contextmanager
+def request_metrics_scope() -> Iterator[RequestMetrics]:
+    """
+    Collects every metric recorded through get_metrics_client clients within the block (including from threads
+    started with a copy of the current context, as LangChain does) and publishes them as one EMF document on exit.
+    """
+    request_metrics = RequestMetrics()
+    token = _current_request_metrics.set(request_metrics)
+    try:
+        yield request_metrics
+    finally:
+        _current_request_metrics.reset(token)
+        request_metrics.emit()
+
+
+class RequestScopedMetrics:
+    """
+    Metrics client returned by get_metrics_client. Within request_metrics_scope, metrics are accumulated by the
+    request's RequestMetrics and flush_metrics() only closes the current dimension set. Outside of a request it
+    behaves like the powertools Metrics client it wraps.
+
+    Attributes:
+        metrics (Metrics): the powertools Metrics client used outside of a request
+        namespace (CloudWatchNamespaces): namespace of the metrics recorded with this client
+    """
+
+    def __init__(self, metrics: Metrics, namespace: CloudWatchNamespaces) -> None:
+        self.metrics = metrics
+        self.namespace = namespace
+
+    def add_metric(self, name: str, unit: Union[MetricUnit, str], value: float, **kwargs: Any) -> None:
+        request_metrics = get_request_metrics()
+        if request_metrics is None:
+            self.metrics.add_metric(name=name, unit=unit, value=value, **kwargs)
+        else:
+            request_metrics.add_metric(self.namespace.value, name, unit, value)
+
+    def add_dimension(self, name: str, value: str) -> None:
+        request_metrics = get_request_metrics()
+        if request_metrics is None:
+            self.metrics.add_dimension(name=name, value=value)
+        else:
+            request_metrics.add_dimension(self.namespace.value, name, value)
+
+    def flush_metrics(self, raise_on_empty_metrics: bool = False) -> None:
+        request_metrics = get_request_metrics()
+        if request_metrics is None:
+            self.metrics.flush_metrics(raise_on_empty_metrics=raise_on_empty_metrics)
+        else:
+            request_metrics.close_dimensions(self.namespace.value)
+
+    def close_dimensions(self) -> None:
+        """
+        Closes the current dimension set, so that the dimensions added after it only apply to the metrics added after
+        them. Outside of a request, the powertools client only resets its dimensions when it flushes.
+        """
+        request_metrics = get_request_metrics()
+        if request_metrics is None:
+            self.metrics.flush_metrics()
+        else:
+            request_metrics.close_dimensions(self.namespace.value)
+
+    def log_metrics(self, lambda_handler: Optional[Callable] = None, **kwargs: Any) -> Callable:
+        return self.metrics.log_metrics(lambda_handler=lambda_handler, **kwargs)
@@ -85,6 +85,13 @@ def get_inference_identifier_from_ddb(table_name, record_key):
         if top_level_inference_profile_id:
             inference_profile_ids.add(top_level_inference_profile_id)
 
+        # RAG use cases may disambiguate questions with a separate model, which can also use an inference profile
+        disambiguation_inference_profile_id = top_level_llm_params.get("DisambiguationParams", {}).get(
+            "InferenceProfileId"
+        )
+        if disambiguation_inference_profile_id:
+            inference_profile_ids.add(disambiguation_inference_profile_id)
+
         # Additional check: if this is a Workflow with agents-as-tools orchestration, also check sub-agents
         if (
             config.get("UseCaseType") == "Workflow"
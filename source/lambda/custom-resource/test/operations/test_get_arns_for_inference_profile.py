@@ -361,6 +361,38 @@ def test_get_inference_identifier_non_workflow_use_case(setup_use_case_config):
     assert result == ["chat-profile"]  # Should return the single inference profile
 
 
+@mock_aws
+def test_get_inference_identifier_disambiguation_profile(setup_use_case_config):
+    lambda_event, ddb = setup_use_case_config
+
+    table_name = lambda_event[RESOURCE_PROPERTIES][USE_CASE_CONFIG_TABLE_NAME]
+    record_key = lambda_event[RESOURCE_PROPERTIES][USE_CASE_CONFIG_RECORD_KEY]
+
+    # A RAG chat use case disambiguating with a separate model through an inference profile
+    python_obj_to_be_inserted = {
+        LLM_CONFIG_RECORD_FIELD_NAME: record_key,
+        "config": {
+            "UseCaseType": "Chat",
+            "LlmParams": {
+                "BedrockLlmParams": {"ModelId": "some-model"},
+                "DisambiguationParams": {"InferenceProfileId": "disambiguation-profile"},
+            },
+        },
+    }
+    serializer = TypeSerializer()
+    ddb.put_item(TableName=table_name, Item={k: serializer.serialize(v) for k, v in python_obj_to_be_inserted.items()})
+
+    result = get_inference_identifier_from_ddb(table_name, record_key)
+    assert result == ["disambiguation-profile"]
+
+    # with the main model also using one, both are returned
+    python_obj_to_be_inserted["config"]["LlmParams"]["BedrockLlmParams"] = {"InferenceProfileId": "chat-profile"}
+    ddb.put_item(TableName=table_name, Item={k: serializer.serialize(v) for k, v in python_obj_to_be_inserted.items()})
+
+    result = get_inference_identifier_from_ddb(table_name, record_key)
+    assert set(result) == {"chat-profile", "disambiguation-profile"}
+
+
 @patch("operations.get_arns_for_inference_profile.send_response")
 @pytest.mark.parametrize("requestType", ["Create", "Update"])
 def test_execute_success(mock_send_response, lambda_event, mock_lambda_context, mock_bedrock_client, requestType):
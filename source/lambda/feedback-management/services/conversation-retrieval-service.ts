@@ -1,10 +1,11 @@
 // Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 // SPDX-License-Identifier: Apache-2.0
 
-import { DynamoDBClient, GetItemCommand } from '@aws-sdk/client-dynamodb';
+import { AttributeValue, DynamoDBClient, GetItemCommand, QueryCommand } from '@aws-sdk/client-dynamodb';
 import { unmarshall } from '@aws-sdk/util-dynamodb';
 import { AWSClientManager } from 'aws-sdk-lib';
 import { logger, tracer } from '../power-tools-init';
+import { MESSAGE_ITEM_SORT_KEY_SEPARATOR } from '../utils/constants';
 
 export interface ConversationMessage {
     id: string;
@@ -75,12 +76,13 @@ export class ConversationRetrievalService {
         tableName: string
     ): Promise<ConversationPair | null> {
         try {
-            const conversation = await this.getConversation(userId, conversationId, tableName);
-            if (!conversation) {
-                return null;
+            const history = await this.getConversationHistory(userId, conversationId, tableName);
+            let { aiMessage, userMessage } = this.findMessagePair(history, messageId);
+            if (!aiMessage) {
+                // conversations stored with one item per message keep their messages outside the History
+                const messageItems = await this.getMessageItems(userId, conversationId, messageId, tableName);
+                ({ aiMessage, userMessage } = this.findMessagePair(messageItems, messageId));
             }
-
-            const { aiMessage, userMessage } = this.findMessagePair(conversation.History, messageId);
             if (!aiMessage || !userMessage) {
                 logger.error(`Could not find matching conversation pair for messageId: ${messageId}`);
                 return null;
@@ -97,13 +99,13 @@ export class ConversationRetrievalService {
     }
 
     /**
-     * Retrieves a conversation from DynamoDB using the provided user ID and conversation ID
+     * Retrieves the History of a conversation from DynamoDB using the provided user ID and conversation ID
      * @param userId - The unique identifier of the user
      * @param conversationId - The unique identifier of the conversation
      * @param tableName - The name of the DynamoDB table containing conversations
-     * @returns The conversation object if found and valid, null otherwise
+     * @returns The messages of the conversation's History, empty if the conversation has none
      */
-    private async getConversation(userId: string, conversationId: string, tableName: string) {
+    private async getConversationHistory(userId: string, conversationId: string, tableName: string): Promise<any[]> {
         const getItemCommand = new GetItemCommand({
             TableName: tableName,
             Key: {
@@ -115,20 +117,61 @@ export class ConversationRetrievalService {
         const response = await this.dynamoDBClient.send(getItemCommand);
 
         if (!response.Item) {
-            logger.error(`No conversation found for userId: ${userId} and conversationId: ${conversationId}`);
-            return null;
+            logger.debug(`No conversation found for userId: ${userId} and conversationId: ${conversationId}`);
+            return [];
         }
 
         const conversation = unmarshall(response.Item);
 
         if (!conversation.History || !Array.isArray(conversation.History)) {
-            logger.error(
+            logger.debug(
                 `No history found in conversation for userId: ${userId} and conversationId: ${conversationId}`
             );
-            return null;
+            return [];
         }
 
-        return conversation;
+        return conversation.History;
+    }
+
+    /**
+     * Retrieves the messages of a turn from a conversation stored with one item per message. Both messages of a
+     * turn carry its message ID, so the items are read newest first until the user message of the turn is found.
+     * @param userId - The unique identifier of the user
+     * @param conversationId - The unique identifier of the conversation
+     * @param messageId - ID of the AI message to find
+     * @param tableName - The name of the DynamoDB table containing conversations
+     * @returns The messages with the given ID, oldest first
+     */
+    private async getMessageItems(
+        userId: string,
+        conversationId: string,
+        messageId: string,
+        tableName: string
+    ): Promise<any[]> {
+        const messages: any[] = [];
+        let exclusiveStartKey: Record<string, AttributeValue> | undefined;
+        do {
+            const response = await this.dynamoDBClient.send(
+                new QueryCommand({
+                    TableName: tableName,
+                    KeyConditionExpression: 'UserId = :userId AND begins_with(ConversationId, :messageKeyPrefix)',
+                    FilterExpression: '#Message.#data.#id = :messageId',
+                    ProjectionExpression: '#Message',
+                    ExpressionAttributeNames: { '#Message': 'Message', '#data': 'data', '#id': 'id' },
+                    ExpressionAttributeValues: {
+                        ':userId': { S: userId },
+                        ':messageKeyPrefix': { S: `${conversationId}${MESSAGE_ITEM_SORT_KEY_SEPARATOR}` },
+                        ':messageId': { S: messageId }
+                    },
+                    ScanIndexForward: false,
+                    ExclusiveStartKey: exclusiveStartKey
+                })
+            );
+            messages.push(...(response.Items ?? []).map((item) => unmarshall(item).Message));
+            exclusiveStartKey = response.LastEvaluatedKey;
+        } while (exclusiveStartKey && !messages.some((message) => message.type === ConversationMessageType.USER));
+
+        return messages.reverse();
     }
 
     /**
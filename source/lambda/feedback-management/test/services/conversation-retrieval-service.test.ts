@@ -5,7 +5,7 @@ jest.mock('aws-node-user-agent-config', () => ({
     customAwsConfig: jest.fn(() => ({ region: 'us-east-1' }))
 }));
 
-import { DynamoDBClient, GetItemCommand } from '@aws-sdk/client-dynamodb';
+import { DynamoDBClient, GetItemCommand, QueryCommand } from '@aws-sdk/client-dynamodb';
 import { mockClient } from 'aws-sdk-client-mock';
 import { ConversationRetrievalService } from '../../services/conversation-retrieval-service';
 
@@ -15,6 +15,7 @@ describe('ConversationRetrievalService', () => {
 
     beforeEach(() => {
         dynamoDBMock.reset();
+        dynamoDBMock.on(QueryCommand).resolves({ Items: [] });
     });
 
     it('should retrieve conversation pair successfully', async () => {
@@ -180,6 +181,81 @@ describe('ConversationRetrievalService', () => {
         expect(result).toBeNull();
     });
 
+    it('should retrieve conversation pair from message items', async () => {
+        const messageItem = (type: string, content: string) => ({
+            Message: {
+                M: {
+                    type: { S: type },
+                    data: {
+                        M: {
+                            id: { S: 'message-2' },
+                            content: { S: content },
+                            type: { S: type }
+                        }
+                    }
+                }
+            }
+        });
+
+        // the conversation's record only carries its TTL
+        dynamoDBMock.on(GetItemCommand).resolves({
+            Item: {
+                UserId: { S: 'test-user' },
+                ConversationId: { S: 'test-conversation' },
+                TTL: { N: '1800000000' }
+            }
+        });
+        // newest first, with the user message of the turn on the second page
+        dynamoDBMock
+            .on(QueryCommand)
+            .resolvesOnce({
+                Items: [messageItem('ai', 'I am doing well, thank you!')],
+                LastEvaluatedKey: {
+                    UserId: { S: 'test-user' },
+                    ConversationId: { S: 'test-conversation#00000000000000000002#0001' }
+                }
+            })
+            .resolvesOnce({
+                Items: [messageItem('human', 'Hello, how are you?')],
+                LastEvaluatedKey: {
+                    UserId: { S: 'test-user' },
+                    ConversationId: { S: 'test-conversation#00000000000000000001#0000' }
+                }
+            });
+
+        const service = new ConversationRetrievalService();
+        const result = await service.retrieveConversationPair(
+            'test-user',
+            'test-conversation',
+            'message-2',
+            TEST_TABLE_NAME
+        );
+
+        expect(result).toEqual({
+            userInput: 'Hello, how are you?',
+            llmResponse: 'I am doing well, thank you!'
+        });
+        const queries = dynamoDBMock.commandCalls(QueryCommand);
+        expect(queries).toHaveLength(2);
+        expect(queries[0].args[0].input).toEqual(
+            expect.objectContaining({
+                TableName: TEST_TABLE_NAME,
+                KeyConditionExpression: 'UserId = :userId AND begins_with(ConversationId, :messageKeyPrefix)',
+                FilterExpression: '#Message.#data.#id = :messageId',
+                ExpressionAttributeValues: {
+                    ':userId': { S: 'test-user' },
+                    ':messageKeyPrefix': { S: 'test-conversation#' },
+                    ':messageId': { S: 'message-2' }
+                },
+                ScanIndexForward: false
+            })
+        );
+        expect(queries[1].args[0].input.ExclusiveStartKey).toEqual({
+            UserId: { S: 'test-user' },
+            ConversationId: { S: 'test-conversation#00000000000000000002#0001' }
+        });
+    });
+
     it('should throw error when DynamoDB query fails', async () => {
         dynamoDBMock.on(GetItemCommand).rejects(new Error('DynamoDB error'));
 
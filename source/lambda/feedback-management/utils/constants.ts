@@ -69,3 +69,6 @@ export const DEFAULT_PARAMETER_MAPPING = {
 };
 
 export const AMZN_TRACE_ID_HEADER = '_X_AMZN_TRACE_ID';
+
+// Conversations stored with one item per message use sort keys of `<ConversationId>#<turn key>`
+export const MESSAGE_ITEM_SORT_KEY_SEPARATOR = '#';
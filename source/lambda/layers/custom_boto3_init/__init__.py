@@ -2,4 +2,4 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from custom_config import custom_usr_agent_config
-from helper import get_service_client, get_service_resource, get_session
+from helper import clear_service_clients, get_service_client, get_service_resource, get_session
@@ -2,10 +2,10 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import threading
 
 import boto3
 from aws_lambda_powertools import Logger, Tracer
-from cognito_jwt_verifier import CognitoJWTVerifier
 from custom_config import custom_usr_agent_config
 
 logger = Logger(utc=True)
@@ -15,13 +15,17 @@ _helpers_service_clients = dict()
 _helpers_service_resources = dict()
 _helpers_cognito_jwt_verifiers = dict()
 _session = None
+# boto3 sessions are not thread-safe, so clients and resources are created under a lock for handlers that process
+# records concurrently. Once created, clients are safe to share between threads.
+_helpers_lock = threading.RLock()
 
 
 @tracer.capture_method
 def get_session():
     global _session
-    if not _session:
-        _session = boto3.session.Session()
+    with _helpers_lock:
+        if not _session:
+            _session = boto3.session.Session()
     return _session
 
 
@@ -30,11 +34,12 @@ def get_service_client(service_name, **kwargs):
     global _helpers_service_clients
     session = get_session()
 
-    if service_name not in _helpers_service_clients:
-        logger.debug(f"Cache miss for {service_name}. Creating a new one and cache it")
-        _helpers_service_clients[service_name] = session.client(
-            service_name, config=custom_usr_agent_config(), **kwargs
-        )
+    with _helpers_lock:
+        if service_name not in _helpers_service_clients:
+            logger.debug(f"Cache miss for {service_name}. Creating a new one and cache it")
+            _helpers_service_clients[service_name] = session.client(
+                service_name, config=custom_usr_agent_config(), **kwargs
+            )
 
     return _helpers_service_clients[service_name]
 
@@ -44,16 +49,32 @@ def get_service_resource(service_name, **kwargs):
     global _helpers_service_resources
     session = get_session()
 
-    if service_name not in _helpers_service_resources:
-        logger.debug(f"Cache miss for {service_name}. Creating a new one and cache it")
-        _helpers_service_resources[service_name] = session.resource(
-            service_name, config=custom_usr_agent_config(), **kwargs
-        )
+    with _helpers_lock:
+        if service_name not in _helpers_service_resources:
+            logger.debug(f"Cache miss for {service_name}. Creating a new one and cache it")
+            _helpers_service_resources[service_name] = session.resource(
+                service_name, config=custom_usr_agent_config(), **kwargs
+            )
     return _helpers_service_resources[service_name]
 
 
+def clear_service_clients():
+    """
+    Drops the cached session, clients and resources, so that the next ones are created with new connections, eg after
+    a Lambda SnapStart restore, whose snapshot holds connections that do not survive it
+    """
+    global _session
+    with _helpers_lock:
+        _helpers_service_clients.clear()
+        _helpers_service_resources.clear()
+        _session = None
+
+
 @tracer.capture_method
 def get_cognito_jwt_verifier(user_pool_id: str, app_client_id: str):
+    # imported on first use, as only the handlers verifying tokens need it and the others load this module at init
+    from cognito_jwt_verifier import CognitoJWTVerifier
+
     global _helpers_cognito_jwt_verifiers
     if app_client_id not in _helpers_cognito_jwt_verifiers:
         _helpers_cognito_jwt_verifiers[app_client_id] = CognitoJWTVerifier(
@@ -6,7 +6,7 @@ import os
 
 import mock
 import pytest
-from custom_boto3_init import get_service_client, get_service_resource
+from custom_boto3_init import clear_service_clients, get_service_client, get_service_resource
 from helper import get_session
 
 
@@ -61,3 +61,22 @@ def test_get_service_client(aws_credentials, user_agent, service_name):
 @pytest.mark.parametrize("service_name", ["s3", "dynamodb", "sqs"])
 def test_get_service_resource(aws_credentials, user_agent, service_name):
     assert not None == get_service_resource(service_name)
+
+
+@pytest.mark.parametrize(
+    "aws_credentials, user_agent",
+    [
+        ("aws_credentials", "user_agent"),
+    ],
+    indirect=["aws_credentials", "user_agent"],
+)
+def test_clear_service_clients(aws_credentials, user_agent):
+    session = get_session()
+    client = get_service_client("s3")
+    resource = get_service_resource("dynamodb")
+
+    clear_service_clients()
+
+    assert get_session() is not session
+    assert get_service_client("s3") is not client
+    assert get_service_resource("dynamodb") is not resource
@@ -11,7 +11,9 @@ import {
     COGNITO_POLICY_TABLE_ENV_VAR,
     CfnParameterKeys,
     IS_INTERNAL_USER_ENV_VAR,
+    KnowledgeBaseTypes,
     MODEL_INFO_TABLE_NAME_ENV_VAR,
+    RetainedCfnParameterKeys,
     STACK_DEPLOYMENT_SOURCE_USE_CASE,
     USER_POOL_ID_ENV_VAR,
     USE_CASE_CONFIG_TABLE_NAME_ENV_VAR,
@@ -78,6 +80,22 @@ export class ChatUseCaseDeploymentAdapter extends UseCase {
             CfnParameterKeys.ExistingKendraIndexId,
             eventBody.KnowledgeBaseParams?.KendraKnowledgeBaseParams?.ExistingKendraIndexId
         );
+        // the chat lambda is granted the additional knowledge bases by their ids, one list per knowledge base type
+        const additionalKnowledgeBases: any[] | undefined = eventBody.KnowledgeBaseParams?.AdditionalKnowledgeBases;
+        ChatUseCaseDeploymentAdapter.setListParameterIfExists(
+            cfnParameters,
+            CfnParameterKeys.AdditionalKendraIndexIds,
+            additionalKnowledgeBases
+                ?.filter((knowledgeBase) => knowledgeBase.KnowledgeBaseType === KnowledgeBaseTypes.KENDRA)
+                .map((knowledgeBase) => knowledgeBase.KendraKnowledgeBaseParams.ExistingKendraIndexId)
+        );
+        ChatUseCaseDeploymentAdapter.setListParameterIfExists(
+            cfnParameters,
+            CfnParameterKeys.AdditionalBedrockKnowledgeBaseIds,
+            additionalKnowledgeBases
+                ?.filter((knowledgeBase) => knowledgeBase.KnowledgeBaseType === KnowledgeBaseTypes.BEDROCK)
+                .map((knowledgeBase) => knowledgeBase.BedrockKnowledgeBaseParams.BedrockKnowledgeBaseId)
+        );
         ChatUseCaseDeploymentAdapter.setParameterIfExists(
             cfnParameters,
             CfnParameterKeys.NewKendraIndexName,
@@ -118,10 +136,12 @@ export class ChatUseCaseDeploymentAdapter extends UseCase {
             eventBody.DeployUI
         );
 
+        // the model disambiguating RAG questions may use an inference profile even when the main model does not
         ChatUseCaseDeploymentAdapter.setBooleanParameterIfExists(
             cfnParameters,
             CfnParameterKeys.UseInferenceProfile,
-            eventBody.LlmParams?.BedrockLlmParams?.InferenceProfileId
+            eventBody.LlmParams?.BedrockLlmParams?.InferenceProfileId ??
+                eventBody.LlmParams?.DisambiguationParams?.InferenceProfileId
         );
 
         // VPC related params
@@ -247,7 +267,8 @@ export class ChatUseCaseDeploymentAdapter extends UseCase {
                 NoDocsFoundResponse: eventBody.KnowledgeBaseParams?.NoDocsFoundResponse,
                 ReturnSourceDocs: eventBody.KnowledgeBaseParams?.ReturnSourceDocs,
                 KendraKnowledgeBaseParams: eventBody.KnowledgeBaseParams?.KendraKnowledgeBaseParams,
-                BedrockKnowledgeBaseParams: eventBody.KnowledgeBaseParams?.BedrockKnowledgeBaseParams
+                BedrockKnowledgeBaseParams: eventBody.KnowledgeBaseParams?.BedrockKnowledgeBaseParams,
+                AdditionalKnowledgeBases: eventBody.KnowledgeBaseParams?.AdditionalKnowledgeBases
             },
             LlmParams: {
                 ModelProvider: eventBody.LlmParams.ModelProvider,
@@ -259,7 +280,8 @@ export class ChatUseCaseDeploymentAdapter extends UseCase {
                 MaxInputTextLength: eventBody.LlmParams.MaxInputTextLength,
                 RAGEnabled: eventBody.LlmParams.RAGEnabled,
                 Streaming: eventBody.LlmParams.Streaming,
-                Verbose: eventBody.LlmParams.Verbose
+                Verbose: eventBody.LlmParams.Verbose,
+                DisambiguationParams: eventBody.LlmParams.DisambiguationParams
             },
             AuthenticationParams: eventBody.AuthenticationParams,
             ProvisionedConcurrencyValue: eventBody.ProvisionedConcurrencyValue,
@@ -278,6 +300,21 @@ export class ChatUseCaseDeploymentAdapter extends UseCase {
 
         return config;
     }
+
+    /**
+     * Override parameter retention for chat use cases.
+     * An update that does not list the additional knowledge bases keeps them in the merged config, so it also keeps
+     * their ids in the stack parameters.
+     *
+     * @returns The default retained parameters, along with the ids of the additional knowledge bases
+     */
+    public getRetainedParameterKeys(): string[] {
+        return [
+            ...RetainedCfnParameterKeys,
+            CfnParameterKeys.AdditionalKendraIndexIds,
+            CfnParameterKeys.AdditionalBedrockKnowledgeBaseIds
+        ];
+    }
 }
 
 /**
@@ -45,6 +45,7 @@ export interface LlmParams {
     Streaming?: boolean;
     Verbose?: boolean;
     MultimodalParams?: MultimodalParams;
+    DisambiguationParams?: DisambiguationParams;
 }
 
 export interface FeedbackParams {
@@ -56,6 +57,21 @@ export interface MultimodalParams {
     MultimodalEnabled: boolean;
 }
 
+export interface DisambiguationParams {
+    ModelId?: string;
+    InferenceProfileId?: string;
+    MaxTokens?: number;
+    Temperature?: number;
+}
+
+export interface AdditionalKnowledgeBaseParams {
+    KnowledgeBaseType: string;
+    KendraKnowledgeBaseParams?: Object;
+    BedrockKnowledgeBaseParams?: Object;
+    NumberOfDocs?: number;
+    ScoreThreshold?: number;
+}
+
 export interface KnowledgeBaseParams {
     KnowledgeBaseType?: string;
     KendraKnowledgeBaseParams?: Object;
@@ -64,6 +80,7 @@ export interface KnowledgeBaseParams {
     ScoreThreshold?: number;
     ReturnSourceDocs?: boolean;
     NoDocsFoundResponse?: string;
+    AdditionalKnowledgeBases?: AdditionalKnowledgeBaseParams[];
 }
 
 export interface ConversationMemoryParams {
@@ -12,7 +12,7 @@ import { tracer } from '../../power-tools-init';
 export class ConfigMergeUtils {
     /**
      * Merge existing config with new config, replacing common parameters with the new values.
-     * ModelParams and ModelInputPayloadSchema are completely replaced rather than merged.
+     * ModelParams, ModelInputPayloadSchema and AdditionalKnowledgeBases are completely replaced rather than merged.
      * Async to ensure consistent behavior with tracer decorator across environments.
      *
      * @param existingConfigObj Existing config data object
@@ -27,6 +27,7 @@ export class ConfigMergeUtils {
             'LlmParams.SageMakerLlmParams.ModelInputPayloadSchema',
             undefined
         );
+        const additionalKnowledgeBases = _.get(newConfigObj, 'KnowledgeBaseParams.AdditionalKnowledgeBases', undefined);
         let mergedConfig = _.merge(existingConfigObj, newConfigObj);
 
         if (modelParams) {
@@ -35,6 +36,9 @@ export class ConfigMergeUtils {
         if (sageMakerModelInputPayloadSchema) {
             mergedConfig.LlmParams.SageMakerLlmParams.ModelInputPayloadSchema = sageMakerModelInputPayloadSchema;
         }
+        if (additionalKnowledgeBases) {
+            mergedConfig.KnowledgeBaseParams.AdditionalKnowledgeBases = additionalKnowledgeBases;
+        }
         mergedConfig = this.resolveKnowledgeBaseParamsOnUpdate(newConfigObj, mergedConfig);
         mergedConfig = this.resolveBedrockModelSourceOnUpdate(newConfigObj, mergedConfig);
 
@@ -598,6 +598,8 @@ describe('When creating StackCommandBuilders', () => {
                 { ParameterKey: CfnParameterKeys.ExistingPrivateSubnetIds, UsePreviousValue: true },
                 { ParameterKey: CfnParameterKeys.ExistingSecurityGroupIds, UsePreviousValue: true },
                 { ParameterKey: CfnParameterKeys.ExistingCognitoUserPoolClient, UsePreviousValue: true },
+                { ParameterKey: CfnParameterKeys.AdditionalKendraIndexIds, UsePreviousValue: true },
+                { ParameterKey: CfnParameterKeys.AdditionalBedrockKnowledgeBaseIds, UsePreviousValue: true }
             ]);
             expect(updateStackInput.Capabilities).toEqual([
                 'CAPABILITY_IAM',
@@ -651,7 +653,9 @@ describe('When creating StackCommandBuilders', () => {
                 { ParameterKey: CfnParameterKeys.VpcEnabled, UsePreviousValue: true },
                 { ParameterKey: CfnParameterKeys.CreateNewVpc, UsePreviousValue: true },
                 { ParameterKey: CfnParameterKeys.ExistingVpcId, UsePreviousValue: true },
-                { ParameterKey: CfnParameterKeys.ExistingCognitoUserPoolClient, UsePreviousValue: true }
+                { ParameterKey: CfnParameterKeys.ExistingCognitoUserPoolClient, UsePreviousValue: true },
+                { ParameterKey: CfnParameterKeys.AdditionalKendraIndexIds, UsePreviousValue: true },
+                { ParameterKey: CfnParameterKeys.AdditionalBedrockKnowledgeBaseIds, UsePreviousValue: true }
             ]);
             expect(updateStackInput2.Capabilities).toEqual([
                 'CAPABILITY_IAM',
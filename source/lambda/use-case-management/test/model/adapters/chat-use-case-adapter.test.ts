@@ -3,6 +3,7 @@
 
 import { APIGatewayEvent } from 'aws-lambda';
 import { ChatUseCaseDeploymentAdapter } from '../../../model/adapters/chat-use-case-adapter';
+import { UseCaseConfiguration } from '../../../model/types';
 
 import { createUseCaseApiEvent, createUseCaseApiEventBedrockKnowledgeBaseNoOverride } from '../../event-test-data';
 import { CfnParameterKeys, STACK_DEPLOYMENT_SOURCE_USE_CASE } from '../../../utils/constants';
@@ -91,6 +92,49 @@ describe('Test ChatUseCaseDeploymentAdapter', () => {
         expect(useCase.cfnParameters!.get('StackDeploymentSource')).toEqual(STACK_DEPLOYMENT_SOURCE_USE_CASE);
     });
 
+    it('should keep DisambiguationParams and grant its inference profile', () => {
+        const body = JSON.parse(createUseCaseApiEvent.body);
+        body.LlmParams.DisambiguationParams = { InferenceProfileId: 'us.amazon.nova-micro-v1:0', MaxTokens: 128 };
+        const event = { ...createUseCaseApiEvent, body: JSON.stringify(body) };
+
+        const useCase = new ChatUseCaseDeploymentAdapter(event as any as APIGatewayEvent);
+        expect((useCase.configuration as UseCaseConfiguration).LlmParams!.DisambiguationParams).toEqual({
+            InferenceProfileId: 'us.amazon.nova-micro-v1:0',
+            MaxTokens: 128
+        });
+        // the main model uses an on-demand model ID, the disambiguation model an inference profile
+        expect(useCase.cfnParameters!.get(CfnParameterKeys.UseInferenceProfile)).toBe('Yes');
+    });
+
+    it('should keep AdditionalKnowledgeBases and pass their ids by type', () => {
+        const body = JSON.parse(createUseCaseApiEvent.body);
+        const additionalKnowledgeBases = [
+            { KnowledgeBaseType: 'Bedrock', BedrockKnowledgeBaseParams: { BedrockKnowledgeBaseId: 'kb1' } },
+            { KnowledgeBaseType: 'Kendra', KendraKnowledgeBaseParams: { ExistingKendraIndexId: 'index1' } },
+            { KnowledgeBaseType: 'Bedrock', BedrockKnowledgeBaseParams: { BedrockKnowledgeBaseId: 'kb2' } }
+        ];
+        body.KnowledgeBaseParams.AdditionalKnowledgeBases = additionalKnowledgeBases;
+        const event = { ...createUseCaseApiEvent, body: JSON.stringify(body) };
+
+        const useCase = new ChatUseCaseDeploymentAdapter(event as any as APIGatewayEvent);
+        expect((useCase.configuration as UseCaseConfiguration).KnowledgeBaseParams!.AdditionalKnowledgeBases).toEqual(
+            additionalKnowledgeBases
+        );
+        expect(useCase.cfnParameters!.get(CfnParameterKeys.AdditionalKendraIndexIds)).toBe('index1');
+        expect(useCase.cfnParameters!.get(CfnParameterKeys.AdditionalBedrockKnowledgeBaseIds)).toBe('kb1,kb2');
+    });
+
+    it('should retain the additional knowledge base ids when they are not provided', () => {
+        const useCase = new ChatUseCaseDeploymentAdapter(createUseCaseApiEvent as any as APIGatewayEvent);
+        expect(useCase.cfnParameters!.has(CfnParameterKeys.AdditionalKendraIndexIds)).toBe(false);
+        expect(useCase.getRetainedParameterKeys()).toEqual(
+            expect.arrayContaining([
+                CfnParameterKeys.AdditionalKendraIndexIds,
+                CfnParameterKeys.AdditionalBedrockKnowledgeBaseIds
+            ])
+        );
+    });
+
     it('should set ExistingRestApiId when provided and no Cognito user pool exists', () => {
         const eventWithRestApi = {
             ...createUseCaseApiEvent,
@@ -97,6 +97,32 @@ describe('ConfigMergeUtils', () => {
             });
         });
 
+        it('should replace AdditionalKnowledgeBases rather than merge them', async () => {
+            const existingConfig = {
+                KnowledgeBaseParams: {
+                    KnowledgeBaseType: 'Kendra',
+                    AdditionalKnowledgeBases: [
+                        { KnowledgeBaseType: 'Bedrock', BedrockKnowledgeBaseParams: { BedrockKnowledgeBaseId: 'kb1' } },
+                        { KnowledgeBaseType: 'Bedrock', BedrockKnowledgeBaseParams: { BedrockKnowledgeBaseId: 'kb2' } }
+                    ]
+                }
+            };
+
+            const newConfig = {
+                KnowledgeBaseParams: {
+                    AdditionalKnowledgeBases: [
+                        { KnowledgeBaseType: 'Kendra', KendraKnowledgeBaseParams: { ExistingKendraIndexId: 'index' } }
+                    ]
+                }
+            };
+
+            const result = await ConfigMergeUtils.mergeConfigs(existingConfig, newConfig);
+
+            expect(result.KnowledgeBaseParams.AdditionalKnowledgeBases).toEqual([
+                { KnowledgeBaseType: 'Kendra', KendraKnowledgeBaseParams: { ExistingKendraIndexId: 'index' } }
+            ]);
+        });
+
         it('should handle empty new config', async () => {
             const existingConfig = {
                 UseCaseName: 'existing-name',
@@ -159,6 +159,8 @@ export const enum CfnParameterKeys {
     KnowledgeBaseType = 'KnowledgeBaseType',
     BedrockKnowledgeBaseId = 'BedrockKnowledgeBaseId',
     ExistingKendraIndexId = 'ExistingKendraIndexId',
+    AdditionalKendraIndexIds = 'AdditionalKendraIndexIds',
+    AdditionalBedrockKnowledgeBaseIds = 'AdditionalBedrockKnowledgeBaseIds',
     NewKendraIndexName = 'NewKendraIndexName',
     NewKendraQueryCapacityUnits = 'NewKendraQueryCapacityUnits',
     NewKendraStorageCapacityUnits = 'NewKendraStorageCapacityUnits',
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+In-process stand-ins for the AWS endpoints the chat, invoke-agent and agentcore-invocation Lambdas stream through:
+models that stream tokens at a configurable rate after a configurable latency, and an API Gateway management endpoint
+that records every frame posted to a connection and can make connections go away.
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from botocore.exceptions import ClientError
+
+# words the fake models answer with, one per token
+ANSWER_WORDS = (
+    "the quick brown fox jumps over a lazy dog while streaming tokens through the websocket to every connected client"
+).split()
+
+
+@dataclass
+class ModelProfile:
+    """
+    How a fake model streams its answers.
+
+    Attributes:
+        first_token_latency_ms (float): time from the invocation to the first token
+        tokens_per_second (float): rate at which the following tokens are streamed, 0 for no delay
+        output_tokens (int): number of tokens in each answer
+        input_tokens (int): number of prompt tokens reported in the usage metadata
+    """
+
+    first_token_latency_ms: float = 300.0
+    tokens_per_second: float = 50.0
+    output_tokens: int = 200
+    input_tokens: int = 500
+
+    def tokens(self) -> Iterator[str]:
+        """Yields the tokens of an answer, sleeping as a model generating them at this profile's pace would"""
+        time.sleep(self.first_token_latency_ms / 1000)
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for index in range(self.output_tokens):
+            if index and interval:
+                time.sleep(interval)
+            yield f" {ANSWER_WORDS[index % len(ANSWER_WORDS)]}"
+
+    @property
+    def generation_seconds(self) -> float:
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        return self.first_token_latency_ms / 1000 + max(self.output_tokens - 1, 0) * interval
+
+    def usage(self) -> Dict[str, int]:
+        return {
+            "inputTokens": self.input_tokens,
+            "outputTokens": self.output_tokens,
+            "totalTokens": self.input_tokens + self.output_tokens,
+        }
+
+
+class FakeServiceClient:
+    """Base of the fake clients, with the attributes of a boto3 client that the Lambdas or LangChain read"""
+
+    service_name: str = None
+
+    def __init__(self, region_name: str = "us-east-1"):
+        self.meta = SimpleNamespace(
+            region_name=region_name, service_model=SimpleNamespace(service_name=self.service_name)
+        )
+        self.invocations = 0
+        self._lock = threading.Lock()
+
+    def count_invocation(self) -> None:
+        with self._lock:
+            self.invocations += 1
+
+
+class FakeBedrockRuntimeClient(FakeServiceClient):
+    """
+    bedrock-runtime client answering Converse and ConverseStream requests with the tokens of its model profile
+    """
+
+    service_name = "bedrock-runtime"
+
+    def __init__(self, profile: ModelProfile, region_name: str = "us-east-1"):
+        super().__init__(region_name)
+        self.profile = profile
+
+    def converse_stream(self, **kwargs) -> Dict[str, Any]:
+        self.count_invocation()
+        return {"stream": self.stream_events()}
+
+    def stream_events(self) -> Iterator[Dict[str, Any]]:
+        yield {"messageStart": {"role": "assistant"}}
+        for token in self.profile.tokens():
+            yield {"contentBlockDelta": {"delta": {"text": token}, "contentBlockIndex": 0}}
+        yield {"contentBlockStop": {"contentBlockIndex": 0}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {
+            "metadata": {
+                "usage": self.profile.usage(),
+                "metrics": {"latencyMs": int(self.profile.generation_seconds * 1000)},
+            }
+        }
+
+    def converse(self, **kwargs) -> Dict[str, Any]:
+        self.count_invocation()
+        text = "".join(self.profile.tokens())
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": "end_turn",
+            "usage": self.profile.usage(),
+            "metrics": {"latencyMs": int(self.profile.generation_seconds * 1000)},
+        }
+
+
+class FakeBedrockAgentRuntimeClient(FakeServiceClient):
+    """
+    bedrock-agent-runtime client answering InvokeAgent requests with a completion stream of the model profile's tokens
+    """
+
+    service_name = "bedrock-agent-runtime"
+
+    def __init__(self, profile: ModelProfile, region_name: str = "us-east-1"):
+        super().__init__(region_name)
+        self.profile = profile
+
+    def invoke_agent(self, **kwargs) -> Dict[str, Any]:
+        self.count_invocation()
+        return {
+            "completion": ({"chunk": {"bytes": token.encode("utf-8")}} for token in self.profile.tokens()),
+            "sessionId": kwargs.get("sessionId"),
+        }
+
+
+class FakeStreamingBody:
+    """
+    Response body of InvokeAgentRuntime, returning one server-sent event line per read as the tokens are generated
+    """
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return next(self._lines, "").encode("utf-8")
+
+
+class FakeBedrockAgentCoreClient(FakeServiceClient):
+    """
+    bedrock-agentcore client answering InvokeAgentRuntime requests with a server-sent event stream of the model
+    profile's tokens, followed by a completion event with the usage
+    """
+
+    service_name = "bedrock-agentcore"
+
+    def __init__(self, profile: ModelProfile, region_name: str = "us-east-1"):
+        super().__init__(region_name)
+        self.profile = profile
+
+    def invoke_agent_runtime(self, **kwargs) -> Dict[str, Any]:
+        self.count_invocation()
+        return {"response": FakeStreamingBody(self.event_lines()), "contentType": "text/event-stream"}
+
+    def event_lines(self) -> Iterator[str]:
+        for token in self.profile.tokens():
+            yield f"data: {json.dumps({'type': 'content', 'text': token})}\n"
+        yield f"data: {json.dumps({'type': 'completion', 'usage': self.profile.usage()})}\n"
+
+
+@dataclass
+class Frame:
+    """A payload posted to a connection, and when it was posted"""
+
+    connection_id: str
+    data: Dict[str, Any]
+    posted_at: float
+
+
+class FakeApiGatewayManagementClient(FakeServiceClient):
+    """
+    apigatewaymanagementapi client recording the frames posted to each connection. Posting to a connection in
+    gone_connections fails with a GoneException (HTTP 410) once gone_after_frames frames have been posted to it, as
+    when the client disconnects in the middle of an answer.
+
+    Attributes:
+        gone_connections (Set[str]): connections that go away
+        gone_after_frames (int): number of frames a gone connection receives before it goes away
+        post_latency_ms (float): time each post takes
+        frames (List[Frame]): the frames posted, in order
+        rejected_posts (int): number of posts that failed because the connection was gone
+    """
+
+    service_name = "apigatewaymanagementapi"
+
+    def __init__(
+        self,
+        gone_connections: Optional[Set[str]] = None,
+        gone_after_frames: int = 0,
+        post_latency_ms: float = 0.0,
+        region_name: str = "us-east-1",
+    ):
+        super().__init__(region_name)
+        self.gone_connections = gone_connections or set()
+        self.gone_after_frames = gone_after_frames
+        self.post_latency_ms = post_latency_ms
+        self.frames: List[Frame] = []
+        self.rejected_posts = 0
+        self._frames_per_connection: Dict[str, int] = {}
+
+    def post_to_connection(self, ConnectionId: str, Data: Any) -> Dict[str, Any]:
+        if self.post_latency_ms:
+            time.sleep(self.post_latency_ms / 1000)
+
+        with self._lock:
+            posted = self._frames_per_connection.get(ConnectionId, 0)
+            if ConnectionId in self.gone_connections and posted >= self.gone_after_frames:
+                self.rejected_posts += 1
+                raise ClientError(
+                    {
+                        "Error": {"Code": "GoneException", "Message": f"Connection {ConnectionId} is gone"},
+                        "ResponseMetadata": {"HTTPStatusCode": 410},
+                    },
+                    "PostToConnection",
+                )
+            self._frames_per_connection[ConnectionId] = posted + 1
+            self.frames.append(Frame(ConnectionId, json.loads(Data), time.monotonic()))
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    @staticmethod
+    def choose_gone_connections(connection_ids: List[str], gone_rate: float, seed: Optional[int] = None) -> Set[str]:
+        """Returns the share gone_rate of the connections, chosen at random"""
+        rng = random.Random(seed)
+        return {connection_id for connection_id in connection_ids if rng.random() < gone_rate}
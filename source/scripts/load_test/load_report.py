@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Turns the frames recorded by the fake API Gateway management endpoint and the batch responses of the Lambda into the
+metrics of a load test: time to first token, tokens per second, frames per answer and batch failure rate.
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fake_endpoints import Frame
+
+END_CONVERSATION_TOKEN = "##END_CONVERSATION##"
+# tokens the Lambdas post to keep the connection open while the agent works, which carry no part of the answer
+CONTROL_TOKENS = {END_CONVERSATION_TOKEN, "##KEEP_ALIVE##", "##PROCESSING##"}
+
+
+@dataclass
+class InvocationResult:
+    """
+    The outcome of one Lambda invocation with a batch.
+
+    Attributes:
+        connection_ids (List[str]): the connections with records in the batch
+        record_count (int): number of records in the batch
+        started_at (float): time.monotonic() when the batch was delivered to the Lambda
+        finished_at (float): time.monotonic() when the Lambda returned
+        failed_records (int): number of records reported in batchItemFailures, or all of them if the Lambda raised
+        error (Optional[str]): the exception raised by the Lambda, if any
+    """
+
+    connection_ids: List[str]
+    record_count: int
+    started_at: float
+    finished_at: float
+    failed_records: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class AnswerStats:
+    """
+    What a connection received for one of its questions, from its first frame to the end of conversation token.
+
+    Attributes:
+        connection_id (str): the connection the answer was posted to
+        first_token_ms (Optional[float]): time from the delivery of the batch to the first token of the answer
+        tokens (int): number of tokens (words) in the answer
+        frames (int): number of frames posted for the answer, including references and control tokens
+        tokens_per_second (Optional[float]): tokens streamed per second between the first and the last token frame
+        completed (bool): whether the end of conversation token was received
+        errored (bool): whether an error message was received
+    """
+
+    connection_id: str
+    first_token_ms: Optional[float] = None
+    tokens: int = 0
+    frames: int = 0
+    tokens_per_second: Optional[float] = None
+    completed: bool = False
+    errored: bool = False
+
+
+@dataclass
+class Distribution:
+    count: int = 0
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+
+    @classmethod
+    def of(cls, values: List[float]) -> "Distribution":
+        if not values:
+            return cls()
+        ordered = sorted(values)
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=percentile(ordered, 50),
+            p90=percentile(ordered, 90),
+            p99=percentile(ordered, 99),
+            max=ordered[-1],
+        )
+
+
+@dataclass
+class LoadReport:
+    target: str
+    batches: int
+    records: int
+    failed_records: int
+    batch_failure_rate: float
+    failed_invocations: int
+    answers: int
+    completed_answers: int
+    errored_answers: int
+    gone_connections: int
+    rejected_posts: int
+    model_invocations: int
+    wall_seconds: float
+    total_tokens: int
+    aggregate_tokens_per_second: float
+    first_token_ms: Distribution = field(default_factory=Distribution)
+    tokens_per_second: Distribution = field(default_factory=Distribution)
+    frames_per_answer: Distribution = field(default_factory=Distribution)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def format(self) -> str:
+        lines = [
+            f"Target:                    {self.target}",
+            f"Batches / records:         {self.batches} / {self.records}",
+            f"Failed records:            {self.failed_records} ({self.batch_failure_rate:.1%} of records)",
+            f"Failed invocations:        {self.failed_invocations}",
+            f"Answers:                   {self.answers} ({self.completed_answers} completed, "
+            f"{self.errored_answers} with errors)",
+            f"Gone connections:          {self.gone_connections} ({self.rejected_posts} posts rejected)",
+            f"Model invocations:         {self.model_invocations}",
+            f"Wall time:                 {self.wall_seconds:.2f} s",
+            f"Tokens delivered:          {self.total_tokens} ({self.aggregate_tokens_per_second:.1f} tokens/s overall)",
+            "",
+            f"{'':27}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}",
+            format_distribution("Time to first token (ms)", self.first_token_ms),
+            format_distribution("Tokens/s per answer", self.tokens_per_second),
+            format_distribution("Frames per answer", self.frames_per_answer),
+        ]
+        return "\n".join(lines)
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of values sorted in ascending order"""
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def format_distribution(name: str, distribution: Distribution) -> str:
+    values = [distribution.mean, distribution.p50, distribution.p90, distribution.p99, distribution.max]
+    return f"{name:27}" + "".join(f"{value:>10.1f}" if value is not None else f"{'-':>10}" for value in values)
+
+
+def collect_answers(frames: List[Frame], results: List[InvocationResult]) -> List[AnswerStats]:
+    """
+    Splits the frames posted to each connection into answers, each ending with the end of conversation token. Frames
+    after the last end of conversation token of a connection make up an answer that did not complete, as when the
+    connection went away or the Lambda ran out of time.
+    """
+    delivered_at = {connection_id: result.started_at for result in results for connection_id in result.connection_ids}
+    frames_by_connection: Dict[str, List[Frame]] = {}
+    for frame in frames:
+        frames_by_connection.setdefault(frame.connection_id, []).append(frame)
+
+    answers = []
+    for connection_id, connection_frames in frames_by_connection.items():
+        answer, token_times = AnswerStats(connection_id), []
+        for frame in connection_frames:
+            answer.frames += 1
+            if "errorMessage" in frame.data:
+                answer.errored = True
+            data = frame.data.get("data")
+            if data == END_CONVERSATION_TOKEN:
+                answer.completed = True
+                answers.append(finish_answer(answer, token_times, delivered_at.get(connection_id)))
+                answer, token_times = AnswerStats(connection_id), []
+            elif isinstance(data, str) and data not in CONTROL_TOKENS and data.strip():
+                answer.tokens += len(data.split())
+                token_times.append(frame.posted_at)
+        if answer.frames:
+            answers.append(finish_answer(answer, token_times, delivered_at.get(connection_id)))
+    return answers
+
+
+def finish_answer(answer: AnswerStats, token_times: List[float], delivered_at: Optional[float]) -> AnswerStats:
+    if token_times and delivered_at is not None:
+        answer.first_token_ms = (token_times[0] - delivered_at) * 1000
+    if len(token_times) > 1 and token_times[-1] > token_times[0]:
+        answer.tokens_per_second = answer.tokens / (token_times[-1] - token_times[0])
+    return answer
+
+
+def build_report(
+    target: str,
+    frames: List[Frame],
+    results: List[InvocationResult],
+    gone_connections: int,
+    rejected_posts: int,
+    model_invocations: int,
+) -> LoadReport:
+    answers = collect_answers(frames, results)
+    records = sum(result.record_count for result in results)
+    failed_records = sum(result.failed_records for result in results)
+    wall_seconds = (
+        max(result.finished_at for result in results) - min(result.started_at for result in results) if results else 0
+    )
+    total_tokens = sum(answer.tokens for answer in answers)
+
+    return LoadReport(
+        target=target,
+        batches=len(results),
+        records=records,
+        failed_records=failed_records,
+        batch_failure_rate=failed_records / records if records else 0.0,
+        failed_invocations=sum(1 for result in results if result.error),
+        answers=len(answers),
+        completed_answers=sum(1 for answer in answers if answer.completed),
+        errored_answers=sum(1 for answer in answers if answer.errored),
+        gone_connections=gone_connections,
+        rejected_posts=rejected_posts,
+        model_invocations=model_invocations,
+        wall_seconds=wall_seconds,
+        total_tokens=total_tokens,
+        aggregate_tokens_per_second=total_tokens / wall_seconds if wall_seconds else 0.0,
+        first_token_ms=Distribution.of([a.first_token_ms for a in answers if a.first_token_ms is not None]),
+        tokens_per_second=Distribution.of([a.tokens_per_second for a in answers if a.tokens_per_second is not None]),
+        frames_per_answer=Distribution.of([float(answer.frames) for answer in answers]),
+    )
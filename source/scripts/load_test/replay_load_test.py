@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Replays synthesised SQS batches through the chat, invoke-agent or agentcore-invocation Lambda, without AWS, to size the
+concurrency and batch settings of a deployment. The Lambda's handler runs unmodified in this process: DynamoDB is
+served by moto, the model is a fake that streams tokens at a configurable rate after a configurable latency, and the
+API Gateway management endpoint is a fake that records every frame posted to a connection and can make connections go
+away (GoneException) in the middle of an answer.
+
+It reports time to first token, measured from the delivery of the batch so that it includes the time a record waits
+for the records before it, tokens per second, frames per answer and the share of records reported as batch item
+failures.
+
+Each Lambda has its own dependencies, so the script is run with those of the target, from the target's directory, eg:
+
+    cd source/lambda/chat
+    uv run python ../../scripts/load_test/replay_load_test.py --target chat --batches 20 --connections-per-batch 5
+
+The chat target uses the Bedrock handler with a Converse model. Concurrent invocations (--concurrency) run on threads
+of this process and share its warm caches, as invocations of one Lambda execution environment would if they could
+overlap, and CPU-bound work is serialised by the GIL, so the numbers are most telling for the I/O-bound streaming path.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+import boto3
+from fake_endpoints import (
+    FakeApiGatewayManagementClient,
+    FakeBedrockAgentCoreClient,
+    FakeBedrockAgentRuntimeClient,
+    FakeBedrockRuntimeClient,
+    FakeServiceClient,
+    ModelProfile,
+)
+from load_report import InvocationResult, LoadReport, build_report
+from moto import mock_aws
+from sqs_events import MESSAGE_BUILDERS, SyntheticBatch, synthesise_batches
+
+SOURCE_DIR = Path(__file__).resolve().parents[2]
+LAMBDA_DIR = SOURCE_DIR / "lambda"
+MODEL_INFO_DIR = SOURCE_DIR / "model-info"
+
+USE_CASE_CONFIG_TABLE_NAME = "load-test-use-case-config"
+USE_CASE_CONFIG_RECORD_KEY = "load-test-config-key"
+CONVERSATION_TABLE_NAME = "load-test-conversations"
+MODEL_INFO_TABLE_NAME = "load-test-model-info"
+
+ENVIRONMENT = {
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "POWERTOOLS_TRACE_DISABLED": "true",
+    "POWERTOOLS_METRICS_DISABLED": "true",
+    "POWERTOOLS_LOG_LEVEL": "ERROR",
+    "_X_AMZN_TRACE_ID": "Root=1-00000000-000000000000000000000000",
+    "WEBSOCKET_CALLBACK_URL": "https://load-test.execute-api.us-east-1.amazonaws.com/prod",
+    "USE_CASE_UUID": "00000000-load-test",
+    "USE_CASE_CONFIG_TABLE_NAME": USE_CASE_CONFIG_TABLE_NAME,
+    "USE_CASE_CONFIG_RECORD_KEY": USE_CASE_CONFIG_RECORD_KEY,
+    "CONVERSATION_TABLE_NAME": CONVERSATION_TABLE_NAME,
+    "MODEL_INFO_TABLE_NAME": MODEL_INFO_TABLE_NAME,
+    "AGENT_RUNTIME_ARN": "arn:aws:bedrock-agentcore:us-east-1:123456789012:runtime/load-test",
+}
+
+
+@dataclass
+class Target:
+    """
+    A Lambda the load test can drive.
+
+    Attributes:
+        lambda_dir (Path): directory of the Lambda's code
+        handler_module (str): module of the Lambda's handler, which defines lambda_handler
+        fake_model (Callable): builds the fake model client from the model profile
+        use_case_config (Callable): returns the use case config, from whether streaming is enabled, or None if the
+            Lambda reads none
+    """
+
+    lambda_dir: Path
+    handler_module: str
+    fake_model: Callable[[ModelProfile], FakeServiceClient]
+    use_case_config: Callable[[bool], Dict[str, Any]] = None
+
+
+def chat_use_case_config(streaming: bool) -> Dict[str, Any]:
+    return {
+        "UseCaseName": "load-test",
+        "UseCaseType": "Text",
+        "ConversationMemoryParams": {"ConversationMemoryType": "DynamoDB"},
+        "LlmParams": {
+            "ModelProvider": "Bedrock",
+            "BedrockLlmParams": {"ModelId": "amazon.nova-lite-v1:0"},
+            "ModelParams": {},
+            "PromptParams": {
+                "PromptTemplate": "You are a friendly AI assistant that is helpful, honest, and harmless."
+            },
+            "Temperature": Decimal("0.5"),
+            "Streaming": streaming,
+            "RAGEnabled": False,
+            "Verbose": False,
+        },
+    }
+
+
+def invoke_agent_use_case_config(streaming: bool) -> Dict[str, Any]:
+    return {
+        "UseCaseName": "load-test",
+        "UseCaseType": "Agent",
+        "AgentParams": {
+            "BedrockAgentParams": {
+                "AgentId": "LOADTEST01",
+                "AgentAliasId": "LOADTEST01",
+                "EnableTrace": False,
+                "EnableStreaming": streaming,
+            }
+        },
+    }
+
+
+TARGETS: Dict[str, Target] = {
+    "chat": Target(LAMBDA_DIR / "chat", "bedrock_handler", FakeBedrockRuntimeClient, chat_use_case_config),
+    "invoke-agent": Target(
+        LAMBDA_DIR / "invoke-agent", "handler", FakeBedrockAgentRuntimeClient, invoke_agent_use_case_config
+    ),
+    "agentcore-invocation": Target(LAMBDA_DIR / "agentcore-invocation", "handler", FakeBedrockAgentCoreClient),
+}
+
+
+class LoadTestContext:
+    """LambdaContext of an invocation, running out of time timeout_seconds after it was created"""
+
+    function_name = "load-test-function"
+    function_version = "$LATEST"
+    memory_limit_in_mb = 1024
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:load-test-function"
+    log_group_name = "/aws/lambda/load-test-function"
+    log_stream_name = "load-test"
+
+    def __init__(self, request_id: str, timeout_seconds: float):
+        self.aws_request_id = request_id
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(int((self._deadline - time.monotonic()) * 1000), 0)
+
+
+def create_tables(target: Target, streaming: bool) -> None:
+    """Creates the DynamoDB tables the Lambdas read and write in moto, with the use case config and model info"""
+    ddb = boto3.resource("dynamodb")
+    conversation_keys = [("UserId", "HASH"), ("ConversationId", "RANGE")]
+    for table_name, keys in [
+        (CONVERSATION_TABLE_NAME, conversation_keys),
+        (USE_CASE_CONFIG_TABLE_NAME, [("key", "HASH")]),
+        (MODEL_INFO_TABLE_NAME, [("UseCase", "HASH"), ("SortKey", "RANGE")]),
+    ]:
+        ddb.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": name, "KeyType": key_type} for name, key_type in keys],
+            AttributeDefinitions=[{"AttributeName": name, "AttributeType": "S"} for name, _ in keys],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+    if target.use_case_config:
+        ddb.Table(USE_CASE_CONFIG_TABLE_NAME).put_item(
+            Item={"key": USE_CASE_CONFIG_RECORD_KEY, "config": target.use_case_config(streaming)}
+        )
+
+    model_info_table = ddb.Table(MODEL_INFO_TABLE_NAME)
+    for model_info_file in sorted(MODEL_INFO_DIR.glob("*.json")):
+        model_info = json.loads(model_info_file.read_text(), parse_float=Decimal)
+        model_info["SortKey"] = f"{model_info['ModelProviderName']}#{model_info['ModelName']}"
+        model_info_table.put_item(Item=model_info)
+
+
+def fake_clients_patch(fake_clients: Dict[str, FakeServiceClient]):
+    """
+    Patches boto3 sessions to return the fake client of the services in fake_clients, whichever way the Lambda creates
+    its clients (its helper's cached clients, boto3.client or a session of its own). Other services are served by moto.
+    """
+    session_client = boto3.session.Session.client
+
+    def client(self, service_name, *args, **kwargs):
+        if service_name in fake_clients:
+            return fake_clients[service_name]
+        return session_client(self, service_name, *args, **kwargs)
+
+    return patch.object(boto3.session.Session, "client", client)
+
+
+def invoke(lambda_handler: Callable, batch: SyntheticBatch, index: int, timeout_seconds: float) -> InvocationResult:
+    context = LoadTestContext(f"load-test-request-{index}", timeout_seconds)
+    started_at = time.monotonic()
+    try:
+        response = lambda_handler(batch.event, context)
+        return InvocationResult(
+            batch.connection_ids,
+            batch.record_count,
+            started_at,
+            time.monotonic(),
+            failed_records=len(response.get("batchItemFailures", [])),
+        )
+    except Exception as ex:
+        # the whole batch is returned to the queue
+        return InvocationResult(
+            batch.connection_ids, batch.record_count, started_at, time.monotonic(), batch.record_count, repr(ex)
+        )
+
+
+def run_load_test(args: argparse.Namespace) -> LoadReport:
+    target = TARGETS[args.target]
+    for name, value in ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+    if args.record_concurrency:
+        os.environ["RECORD_PROCESSING_CONCURRENCY"] = str(args.record_concurrency)
+    sys.path.insert(0, str(target.lambda_dir))
+
+    batches = synthesise_batches(args.target, args.batches, args.connections_per_batch, args.records_per_connection)
+    connection_ids = [connection_id for batch in batches for connection_id in batch.connection_ids]
+    apigateway = FakeApiGatewayManagementClient(
+        gone_connections=FakeApiGatewayManagementClient.choose_gone_connections(
+            connection_ids, args.gone_rate, args.seed
+        ),
+        gone_after_frames=args.gone_after_frames,
+        post_latency_ms=args.post_latency_ms,
+    )
+    model = target.fake_model(
+        ModelProfile(
+            first_token_latency_ms=args.first_token_latency_ms,
+            tokens_per_second=args.tokens_per_second,
+            output_tokens=args.output_tokens,
+        )
+    )
+
+    with mock_aws(), fake_clients_patch({model.service_name: model, apigateway.service_name: apigateway}):
+        create_tables(target, not args.disable_streaming)
+        lambda_handler = importlib.import_module(target.handler_module).lambda_handler
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(
+                executor.map(
+                    lambda indexed_batch: invoke(lambda_handler, indexed_batch[1], indexed_batch[0], args.timeout),
+                    enumerate(batches),
+                )
+            )
+
+    return build_report(
+        args.target,
+        apigateway.frames,
+        results,
+        len(apigateway.gone_connections),
+        apigateway.rejected_posts,
+        model.invocations,
+    )
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--target", required=True, choices=sorted(MESSAGE_BUILDERS), help="Lambda to drive")
+    parser.add_argument("--batches", type=int, default=10, help="number of SQS batches (Lambda invocations)")
+    parser.add_argument("--connections-per-batch", type=int, default=5, help="connections with records in a batch")
+    parser.add_argument("--records-per-connection", type=int, default=1, help="questions of a connection in a batch")
+    parser.add_argument("--concurrency", type=int, default=1, help="invocations running at the same time")
+    parser.add_argument(
+        "--record-concurrency",
+        type=int,
+        default=0,
+        help="RECORD_PROCESSING_CONCURRENCY of the chat Lambda, unset if 0",
+    )
+    parser.add_argument("--timeout", type=float, default=900, help="timeout of each invocation, in seconds")
+    parser.add_argument("--first-token-latency-ms", type=float, default=300, help="model latency to the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50, help="model token rate, 0 for no delay")
+    parser.add_argument("--output-tokens", type=int, default=200, help="tokens in each answer of the model")
+    parser.add_argument("--post-latency-ms", type=float, default=0, help="latency of each post to a connection")
+    parser.add_argument("--gone-rate", type=float, default=0, help="share of connections that go away (410)")
+    parser.add_argument(
+        "--gone-after-frames", type=int, default=0, help="frames a connection receives before it goes away"
+    )
+    parser.add_argument("--disable-streaming", action="store_true", help="configure the use case without streaming")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the choice of gone connections")
+    parser.add_argument("--output-json", type=Path, default=None, help="also write the report to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> None:
+    args = parse_args(argv)
+    report = run_load_test(args)
+    print(report.format())
+    if args.output_json:
+        args.output_json.write_text(json.dumps(report.to_dict(), indent=4) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Synthesises the SQS batch events the chat, invoke-agent and agentcore-invocation Lambdas receive. The websocket API
+sends each message to a FIFO queue with the connection as the message group (see requestTemplate in
+infrastructure/lib/api/websocket-endpoint.ts), so the records of a connection are contiguous and in order within a
+batch.
+"""
+
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+QUEUE_ARN = "arn:aws:sqs:us-east-1:123456789012:load-test-queue.fifo"
+
+
+def chat_message(question: str, conversation_id: str) -> Dict[str, Any]:
+    return {"action": "sendMessage", "question": question, "conversationId": conversation_id}
+
+
+def invoke_agent_message(question: str, conversation_id: str) -> Dict[str, Any]:
+    return {"action": "invokeAgent", "inputText": question, "conversationId": conversation_id}
+
+
+def agentcore_message(question: str, conversation_id: str) -> Dict[str, Any]:
+    return {
+        "action": "invokeAgentCore",
+        "inputText": question,
+        "conversationId": conversation_id,
+        "messageId": str(uuid.uuid4()),
+    }
+
+
+# the message the client sends on the websocket route of each target
+MESSAGE_BUILDERS: Dict[str, Callable[[str, str], Dict[str, Any]]] = {
+    "chat": chat_message,
+    "invoke-agent": invoke_agent_message,
+    "agentcore-invocation": agentcore_message,
+}
+
+
+@dataclass
+class SyntheticBatch:
+    """An SQS batch event and the connections its records belong to"""
+
+    event: Dict[str, Any]
+    connection_ids: List[str]
+
+    @property
+    def record_count(self) -> int:
+        return len(self.event["Records"])
+
+
+def sqs_record(connection_id: str, user_id: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns an SQS record shaped as the websocket API's request template writes it"""
+    request_id = str(uuid.uuid4())
+    body = {"requestContext": {"authorizer": {"UserId": user_id}, "connectionId": connection_id}, "message": message}
+    return {
+        "messageId": str(uuid.uuid4()),
+        "receiptHandle": f"receipt-{request_id}",
+        "body": json.dumps(body),
+        "attributes": {
+            "ApproximateReceiveCount": "1",
+            "SentTimestamp": str(int(time.time() * 1000)),
+            "MessageGroupId": connection_id,
+            "MessageDeduplicationId": request_id,
+        },
+        "messageAttributes": {
+            "requestId": {"stringValue": request_id, "dataType": "String"},
+            "connectionId": {"stringValue": connection_id, "dataType": "String"},
+        },
+        "eventSource": "aws:sqs",
+        "eventSourceARN": QUEUE_ARN,
+        "awsRegion": "us-east-1",
+    }
+
+
+def synthesise_batches(
+    target: str, batches: int, connections_per_batch: int, records_per_connection: int
+) -> List[SyntheticBatch]:
+    """
+    Returns the batches of a load test. Each connection belongs to one user and one conversation, and sends
+    records_per_connection questions.
+
+    Args:
+        target (str): the Lambda the batches are for, a key of MESSAGE_BUILDERS
+        batches (int): number of batches
+        connections_per_batch (int): number of connections with records in each batch
+        records_per_connection (int): number of records of each connection in its batch
+    """
+    build_message = MESSAGE_BUILDERS[target]
+    synthetic_batches = []
+    for batch_index in range(batches):
+        records = []
+        connection_ids = []
+        for connection_index in range(connections_per_batch):
+            connection_id = f"conn-{batch_index}-{connection_index}"
+            user_id = f"load-test-user-{connection_index}"
+            conversation_id = str(uuid.uuid4())
+            connection_ids.append(connection_id)
+            for question_index in range(records_per_connection):
+                message = build_message(f"Load test question {question_index} on {connection_id}", conversation_id)
+                records.append(sqs_record(connection_id, user_id, message))
+        synthetic_batches.append(SyntheticBatch({"Records": records}, connection_ids))
+    return synthetic_batches
@@ -0,0 +1,8 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import sys
+from pathlib import Path
+
+# the load test modules import each other as scripts, from their own directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
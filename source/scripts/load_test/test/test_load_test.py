@@ -0,0 +1,191 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+from fake_endpoints import (
+    FakeApiGatewayManagementClient,
+    FakeBedrockAgentCoreClient,
+    FakeBedrockAgentRuntimeClient,
+    FakeBedrockRuntimeClient,
+    Frame,
+    ModelProfile,
+)
+from load_report import InvocationResult, build_report, collect_answers, percentile
+from sqs_events import synthesise_batches
+
+INSTANT_PROFILE = ModelProfile(first_token_latency_ms=0, tokens_per_second=0, output_tokens=5)
+
+
+def post(client, connection_id, data):
+    client.post_to_connection(ConnectionId=connection_id, Data=json.dumps({"data": data}))
+
+
+def test_converse_stream_events():
+    client = FakeBedrockRuntimeClient(INSTANT_PROFILE)
+    events = list(client.converse_stream(modelId="fake-model", messages=[])["stream"])
+
+    assert list(events[0]) == ["messageStart"]
+    deltas = [event["contentBlockDelta"]["delta"]["text"] for event in events if "contentBlockDelta" in event]
+    assert deltas == [" the", " quick", " brown", " fox", " jumps"]
+    assert events[-2] == {"messageStop": {"stopReason": "end_turn"}}
+    assert events[-1]["metadata"]["usage"] == {"inputTokens": 500, "outputTokens": 5, "totalTokens": 505}
+    assert client.invocations == 1
+
+
+def test_converse():
+    client = FakeBedrockRuntimeClient(INSTANT_PROFILE)
+    response = client.converse(modelId="fake-model", messages=[])
+
+    assert response["output"]["message"]["content"] == [{"text": " the quick brown fox jumps"}]
+    assert response["usage"]["outputTokens"] == 5
+
+
+def test_invoke_agent_completion():
+    client = FakeBedrockAgentRuntimeClient(INSTANT_PROFILE)
+    response = client.invoke_agent(agentId="agent", agentAliasId="alias", sessionId="session", inputText="hi")
+
+    chunks = [event["chunk"]["bytes"].decode("utf-8") for event in response["completion"]]
+    assert "".join(chunks) == " the quick brown fox jumps"
+    assert response["sessionId"] == "session"
+
+
+def test_invoke_agent_runtime_events():
+    client = FakeBedrockAgentCoreClient(INSTANT_PROFILE)
+    body = client.invoke_agent_runtime(agentRuntimeArn="arn", payload="{}")["response"]
+
+    lines = []
+    while chunk := body.read(1024):
+        lines.append(json.loads(chunk.decode("utf-8").removeprefix("data: ")))
+    assert [line["text"] for line in lines[:-1]] == [" the", " quick", " brown", " fox", " jumps"]
+    assert lines[-1]["type"] == "completion"
+    assert lines[-1]["usage"]["outputTokens"] == 5
+
+
+def test_post_to_connection_records_frames():
+    client = FakeApiGatewayManagementClient()
+    post(client, "conn-1", " hello")
+    post(client, "conn-2", " world")
+
+    assert [(frame.connection_id, frame.data) for frame in client.frames] == [
+        ("conn-1", {"data": " hello"}),
+        ("conn-2", {"data": " world"}),
+    ]
+    assert client.rejected_posts == 0
+
+
+def test_post_to_gone_connection():
+    client = FakeApiGatewayManagementClient(gone_connections={"conn-gone"}, gone_after_frames=2)
+    post(client, "conn-gone", " one")
+    post(client, "conn-gone", " two")
+
+    with pytest.raises(ClientError) as error:
+        post(client, "conn-gone", " three")
+
+    assert error.value.response["Error"]["Code"] == "GoneException"
+    assert error.value.response["ResponseMetadata"]["HTTPStatusCode"] == 410
+    assert len(client.frames) == 2
+    assert client.rejected_posts == 1
+
+
+def test_choose_gone_connections():
+    connection_ids = [f"conn-{index}" for index in range(100)]
+
+    assert FakeApiGatewayManagementClient.choose_gone_connections(connection_ids, 0) == set()
+    assert FakeApiGatewayManagementClient.choose_gone_connections(connection_ids, 1) == set(connection_ids)
+    assert FakeApiGatewayManagementClient.choose_gone_connections(
+        connection_ids, 0.3, seed=7
+    ) == FakeApiGatewayManagementClient.choose_gone_connections(connection_ids, 0.3, seed=7)
+
+
+@pytest.mark.parametrize(
+    "target, question_key, action",
+    [
+        ("chat", "question", "sendMessage"),
+        ("invoke-agent", "inputText", "invokeAgent"),
+        ("agentcore-invocation", "inputText", "invokeAgentCore"),
+    ],
+)
+def test_synthesise_batches(target, question_key, action):
+    batches = synthesise_batches(target, batches=2, connections_per_batch=3, records_per_connection=2)
+
+    assert len(batches) == 2
+    batch = batches[1]
+    assert batch.connection_ids == ["conn-1-0", "conn-1-1", "conn-1-2"]
+    assert batch.record_count == 6
+
+    record = batch.event["Records"][2]
+    body = json.loads(record["body"])
+    assert body["requestContext"] == {"authorizer": {"UserId": "load-test-user-1"}, "connectionId": "conn-1-1"}
+    assert body["message"]["action"] == action
+    assert body["message"][question_key] == "Load test question 0 on conn-1-1"
+    assert record["messageAttributes"]["connectionId"]["stringValue"] == "conn-1-1"
+    assert record["attributes"]["MessageGroupId"] == "conn-1-1"
+
+    # the records of a connection are contiguous and share its conversation
+    conversations = [json.loads(record["body"])["message"]["conversationId"] for record in batch.event["Records"]]
+    assert conversations[0] == conversations[1] != conversations[2] == conversations[3]
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 11)]
+
+    assert percentile(values, 50) == 5
+    assert percentile(values, 90) == 9
+    assert percentile(values, 99) == 10
+    assert percentile([3.0], 50) == 3
+
+
+def test_collect_answers():
+    frames = [
+        Frame("conn-1", {"data": " the quick"}, 10.5),
+        Frame("conn-1", {"data": " brown fox"}, 11.0),
+        Frame("conn-1", {"sourceDocument": {}}, 11.1),
+        Frame("conn-1", {"data": "##END_CONVERSATION##"}, 11.2),
+        Frame("conn-1", {"data": " jumps"}, 12.0),
+        Frame("conn-1", {"data": "##END_CONVERSATION##"}, 12.1),
+        Frame("conn-2", {"data": "##PROCESSING##"}, 10.2),
+        Frame("conn-2", {"data": " over"}, 10.4),
+    ]
+    results = [InvocationResult(["conn-1", "conn-2"], 3, started_at=10.0, finished_at=12.5)]
+
+    first, second, unfinished = collect_answers(frames, results)
+
+    assert (first.tokens, first.frames, first.completed) == (4, 4, True)
+    assert first.first_token_ms == pytest.approx(500)
+    assert first.tokens_per_second == pytest.approx(8)
+    assert (second.tokens, second.frames, second.completed) == (1, 2, True)
+    assert second.first_token_ms == pytest.approx(2000)
+    assert second.tokens_per_second is None
+    assert (unfinished.connection_id, unfinished.tokens, unfinished.completed) == ("conn-2", 1, False)
+    assert unfinished.first_token_ms == pytest.approx(400)
+
+
+def test_build_report():
+    frames = [
+        Frame("conn-1", {"data": " one two"}, 1.0),
+        Frame("conn-1", {"data": "##END_CONVERSATION##"}, 1.5),
+        Frame("conn-2", {"errorMessage": "Chat service failed to respond."}, 2.0),
+        Frame("conn-2", {"data": "##END_CONVERSATION##"}, 2.0),
+    ]
+    results = [
+        InvocationResult(["conn-1"], 2, started_at=0.0, finished_at=2.0, failed_records=1),
+        InvocationResult(["conn-2"], 2, started_at=0.5, finished_at=4.0, failed_records=2, error="RuntimeError()"),
+    ]
+
+    report = build_report("chat", frames, results, gone_connections=1, rejected_posts=3, model_invocations=2)
+
+    assert report.records == 4
+    assert report.failed_records == 3
+    assert report.batch_failure_rate == pytest.approx(0.75)
+    assert report.failed_invocations == 1
+    assert (report.answers, report.completed_answers, report.errored_answers) == (2, 2, 1)
+    assert report.wall_seconds == pytest.approx(4)
+    assert report.total_tokens == 2
+    assert report.first_token_ms.count == 1
+    assert report.first_token_ms.mean == pytest.approx(1000)
+    assert report.frames_per_answer.max == 2
+    assert json.loads(json.dumps(report.to_dict()))["gone_connections"] == 1
+    assert "Time to first token (ms)" in report.format()